@@ -3,7 +3,7 @@ Flask API Server for XFORIA DAD
 Handles Check, Paystub, Money Order, and Bank Statement Analysis
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, g
 from flask_cors import CORS
 import os
 import sys
@@ -11,18 +11,30 @@ import logging
 from logging.handlers import RotatingFileHandler
 from werkzeug.utils import secure_filename
 import importlib.util
+import io
+import json
 import re
-import fitz
 import uuid
 from datetime import datetime
-from google.cloud import vision
 from auth import login_user, register_user
 from database.supabase_client import get_supabase, check_connection as check_supabase_connection
-from auth.supabase_auth import login_user_supabase, register_user_supabase, verify_token
+from auth.supabase_auth import login_user_supabase, register_user_supabase, verify_token, get_auth_metrics
 from database.document_storage import store_money_order_analysis, store_bank_statement_analysis, store_paystub_analysis, store_check_analysis
+from database.document_search import get_document_search
+from database.dashboard_rollups import get_dashboard_rollups
+from database.similar_cases import similar_case_index_stats
+from lazy_components import register_component, get_component, readiness, warm_up
 
 # Import centralized configuration
 from config import Config
+from utils.llm_cache import get_llm_cache_stats
+from utils.decision_tiers import get_decision_tier_stats
+from utils.prompt_budget import get_prompt_token_stats
+from utils.resilience import get_resilience_stats
+from utils.stage_timing import (
+    start_stage_timing, stop_stage_timing, current_stage_timings, SERVER_TIMING_HEADER
+)
+from utils.cassettes import get_cassette_store, cassette_mode
 
 # Ensure necessary directories exist
 Config.ensure_directories()
@@ -52,22 +64,6 @@ if Config.GOOGLE_APPLICATION_CREDENTIALS:
 else:
     logger.warning("GOOGLE_APPLICATION_CREDENTIALS not set")
 
-# Load the production extractor
-try:
-    spec = importlib.util.spec_from_file_location(
-        "production_extractor", 
-        "production_google_vision-extractor.py"
-    )
-    production_extractor = importlib.util.module_from_spec(spec)
-    sys.modules["production_extractor"] = production_extractor
-    spec.loader.exec_module(production_extractor)
-    ProductionCheckExtractor = production_extractor.ProductionCheckExtractor
-    PRODUCTION_EXTRACTOR_AVAILABLE = True
-except Exception as e:
-    logger.warning(f"Production extractor not available: {e}. Using Mindee extractor instead.")
-    ProductionCheckExtractor = None
-    PRODUCTION_EXTRACTOR_AVAILABLE = False
-
 # Legacy import removed - using check.CheckExtractor instead
 # from check_analysis.orchestrator import CheckAnalysisOrchestrator
 
@@ -78,27 +74,89 @@ app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
 # Enable CORS with configured origins
 CORS(app, origins=Config.CORS_ORIGINS)
 
+
+@app.before_request
+def _start_stage_timing():
+    """Record per-stage durations (OCR, LLM) of the request when SERVER_TIMING_ENABLED"""
+    if Config.SERVER_TIMING_ENABLED:
+        g.stage_timing_token = start_stage_timing()
+
+
+@app.after_request
+def _add_server_timing(response):
+    """Report the recorded stage durations in the Server-Timing header"""
+    timings = current_stage_timings()
+    if timings is not None:
+        response.headers[SERVER_TIMING_HEADER] = timings.server_timing()
+    return response
+
+
+@app.teardown_request
+def _stop_stage_timing(error=None):
+    token = g.pop('stage_timing_token', None)
+    if token is not None:
+        stop_stage_timing(token)
+
+
 # Configuration from centralized config
 UPLOAD_FOLDER = Config.UPLOAD_FOLDER
 ALLOWED_EXTENSIONS = Config.ALLOWED_EXTENSIONS
 CREDENTIALS_PATH = Config.GOOGLE_APPLICATION_CREDENTIALS or 'google-credentials.json'
-
-# Initialize Vision API client once
-try:
-    vision_client = vision.ImageAnnotatorClient.from_service_account_file(CREDENTIALS_PATH)
+MONEY_ORDER_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'money_order', 'analysis_results')
+
+# Heavy clients are built on first use (or by warm_up), not while this module is imported,
+# so new workers start serving quickly; /api/ready reports which ones are warm.
+def _create_vision_client():
+    """Google Cloud Vision client"""
+    from google.cloud import vision
+    client = vision.ImageAnnotatorClient.from_service_account_file(CREDENTIALS_PATH)
     logger.info(f"Successfully loaded Google Cloud Vision credentials from {CREDENTIALS_PATH}")
-except Exception as e:
-    logger.warning(f"Failed to load Vision API credentials: {e}")
-    vision_client = None
+    return client
+
+
+def _load_production_extractor():
+    """ProductionCheckExtractor class from production_google_vision-extractor.py"""
+    spec = importlib.util.spec_from_file_location(
+        "production_extractor",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "production_google_vision-extractor.py")
+    )
+    production_extractor = importlib.util.module_from_spec(spec)
+    sys.modules["production_extractor"] = production_extractor
+    spec.loader.exec_module(production_extractor)
+    return production_extractor.ProductionCheckExtractor
 
-# Initialize Supabase client
-try:
-    supabase = get_supabase()
+
+def _connect_supabase():
+    """Supabase client, after a connection check"""
+    client = get_supabase()
     supabase_status = check_supabase_connection()
     logger.info(f"Supabase initialization: {supabase_status['message']}")
-except Exception as e:
-    logger.warning(f"Failed to initialize Supabase: {e}")
-    supabase = None
+    return client
+
+
+def _import_module(name):
+    """Import a document pipeline (pulls in its ML models' libraries and LangChain agent)"""
+    return lambda: importlib.import_module(name)
+
+
+register_component('supabase', _connect_supabase, required=True)
+register_component('vision', _create_vision_client)
+register_component('production_extractor', _load_production_extractor)
+register_component('check_pipeline', _import_module('check.check_extractor'))
+register_component('paystub_pipeline', _import_module('paystub.paystub_extractor'))
+register_component('money_order_pipeline', _import_module('money_order.extractor'))
+register_component('bank_statement_pipeline', _import_module('bank_statement.bank_statement_extractor'))
+
+
+def get_vision_client():
+    """Get the Vision API client (None if credentials are unavailable)"""
+    return get_component('vision')
+
+
+def get_production_check_extractor():
+    """Get the ProductionCheckExtractor class (None if the production extractor is unavailable)"""
+    return get_component('production_extractor')
+
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -161,9 +219,19 @@ def detect_document_type(text):
     else:
         return 'money_order'
 
+def _optional_stats(collect):
+    """Stats of an optional feature for the health check; a failure is reported, never raised"""
+    try:
+        return collect()
+    except Exception as e:
+        logger.warning(f"Health check stats unavailable: {e}")
+        return {'error': str(e)}
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    supabase = get_component('supabase')
     supabase_status = check_supabase_connection() if supabase else {'status': 'disconnected', 'message': 'Supabase not initialized'}
 
     return jsonify({
@@ -173,9 +241,24 @@ def health_check():
         'database': {
             'supabase': supabase_status['status'],
             'message': supabase_status['message']
-        }
+        },
+        'auth_metrics': _optional_stats(get_auth_metrics),
+        'llm_cache': _optional_stats(get_llm_cache_stats),
+        'llm_bypass': _optional_stats(get_decision_tier_stats),
+        'prompt_tokens': _optional_stats(get_prompt_token_stats),
+        'outbound': _optional_stats(get_resilience_stats),
+        'cassettes': _optional_stats(lambda: {'mode': cassette_mode(), **get_cassette_store().stats()}),
+        # Reported only once the index is built; the health check never builds it
+        'similar_cases': _optional_stats(similar_case_index_stats)
     })
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint - starts warming components on first call, 200 once all are warm"""
+    warm_up()
+    status = readiness()
+    return jsonify(status), 200 if status['ready'] else 503
+
 @app.route('/api/auth/login', methods=['POST'])
 def api_login():
     """Login endpoint - Uses Supabase for user authentication with fallback to local JSON"""
@@ -504,6 +587,7 @@ def analyze_money_order():
             # Handle PDF conversion if needed
             if filename.lower().endswith('.pdf'):
                 try:
+                    import fitz
                     pdf_document = fitz.open(filepath)
                     page = pdf_document[0]
                     pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
@@ -690,7 +774,21 @@ def analyze_money_order():
 def download_analysis(analysis_id):
     """Download complete JSON analysis by ID"""
     try:
-        # Build file path
+        # Indexed lookup in the money order result store
+        from money_order.ai.result_storage import ResultStorage
+        storage = ResultStorage(MONEY_ORDER_RESULTS_DIR)
+        analysis = storage.get_analysis_by_id(analysis_id)
+
+        if analysis is not None:
+            content = json.dumps(analysis, indent=2, ensure_ascii=False).encode('utf-8')
+            return send_file(
+                io.BytesIO(content),
+                mimetype='application/json',
+                as_attachment=True,
+                download_name=f'{analysis_id}.json'
+            )
+
+        # Fallback: legacy per-analysis JSON file
         filepath = os.path.join('analysis_results', f"{analysis_id}.json")
 
         # Check if file exists
@@ -742,6 +840,7 @@ def analyze_bank_statement():
             # Handle PDF conversion if needed
             if filename.lower().endswith('.pdf'):
                 try:
+                    import fitz
                     pdf_document = fitz.open(filepath)
                     page = pdf_document[0]
                     pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
@@ -1037,9 +1136,8 @@ def get_check_details(check_id):
 
 @app.route('/api/checks/search', methods=['GET'])
 def search_checks():
-    """Search checks by payer name from view"""
+    """Search checks by payer or payee name (ranked, prefix matches first)"""
     try:
-        supabase = get_supabase()
         query = request.args.get('q', default='', type=str)
         limit = request.args.get('limit', default=20, type=int)
         if not query:
@@ -1048,11 +1146,11 @@ def search_checks():
                 'error': 'Query parameter required',
                 'message': 'Please provide a search query'
             }), 400
-        response = supabase.table('v_checks_analysis').select('*').ilike('payer_name', f'%{query}%').limit(limit).execute()
+        data = get_document_search().search('checks', query, limit)
         return jsonify({
             'success': True,
-            'data': response.data,
-            'count': len(response.data)
+            'data': data,
+            'count': len(data)
         })
     except Exception as e:
         logger.error(f"Failed to search checks: {e}")
@@ -1179,9 +1277,8 @@ def get_money_order_details(money_order_id):
 
 @app.route('/api/money-orders/search', methods=['GET'])
 def search_money_orders():
-    """Search money orders by purchaser name from view"""
+    """Search money orders by purchaser or payee name (ranked, prefix matches first)"""
     try:
-        supabase = get_supabase()
         query = request.args.get('q', default='', type=str)
         limit = request.args.get('limit', default=20, type=int)
         if not query:
@@ -1190,11 +1287,11 @@ def search_money_orders():
                 'error': 'Query parameter required',
                 'message': 'Please provide a search query'
             }), 400
-        response = supabase.table('v_money_orders_analysis').select('*').ilike('purchaser_name', f'%{query}%').limit(limit).execute()
+        data = get_document_search().search('money_orders', query, limit)
         return jsonify({
             'success': True,
-            'data': response.data,
-            'count': len(response.data)
+            'data': data,
+            'count': len(data)
         })
     except Exception as e:
         logger.error(f"Failed to search money orders: {e}")
@@ -1350,7 +1447,6 @@ def get_bank_statements_list():
 def search_bank_statements():
     """Search bank statements by account holder or bank name"""
     try:
-        supabase = get_supabase()
         query = request.args.get('q', default='', type=str)
         limit = request.args.get('limit', default=20, type=int)
         if not query:
@@ -1359,12 +1455,12 @@ def search_bank_statements():
                 'error': 'Query parameter required',
                 'message': 'Please provide a search query'
             }), 400
-        # Search in both account_holder and bank_name fields
-        response = supabase.table('bank_statements').select('*').or_(f'account_holder.ilike.%{query}%,bank_name.ilike.%{query}%').limit(limit).execute()
+        # Search in both account_holder_name and bank_name fields
+        data = get_document_search().search('bank_statements', query, limit)
         return jsonify({
             'success': True,
-            'data': response.data or [],
-            'count': len(response.data or [])
+            'data': data,
+            'count': len(data)
         })
     except Exception as e:
         logger.error(f"Failed to search bank statements: {e}")
@@ -1605,7 +1701,6 @@ def get_enriched_documents():
 def search_documents():
     """Search documents by file_name or document_id"""
     try:
-        supabase = get_supabase()
         query = request.args.get('q', '').strip()
         limit = int(request.args.get('limit', 20))
 
@@ -1616,18 +1711,13 @@ def search_documents():
                 'message': 'Please provide a search query'
             }), 400
 
-        # Search in file_name and document_id - try both and combine results
-        try:
-            # Try searching both fields using or_ filter
-            response = supabase.table('v_documents_with_risk').select('*').or_(f'file_name.ilike.%{query}%,document_id.ilike.%{query}%').order('upload_date', desc=True).limit(limit).execute()
-        except:
-            # Fallback: search file_name only if or_ doesn't work
-            response = supabase.table('v_documents_with_risk').select('*').ilike('file_name', f'%{query}%').order('upload_date', desc=True).limit(limit).execute()
+        # Ranked search in file_name and document_id (trigram-indexed RPC, ILIKE fallback)
+        data = get_document_search().search('documents', query, limit)
 
         return jsonify({
             'success': True,
-            'data': response.data or [],
-            'count': len(response.data or []),
+            'data': data,
+            'count': len(data),
             'query': query
         })
     except Exception as e:
@@ -1734,6 +1824,48 @@ def get_paystubs_insights():
         }), 500
 
 
+@app.route('/api/paystubs/insights/summary', methods=['GET'])
+def get_paystubs_insights_summary():
+    """Fetch paystub dashboard summary from the incrementally maintained rollups"""
+    try:
+        date_filter = request.args.get('date_filter', default=None)  # 'last_30', 'last_60', 'last_90', 'older'
+        summary = get_dashboard_rollups().get_summary(document_type='paystub', date_filter=date_filter)
+        return jsonify({
+            'success': True,
+            'data': summary,
+            'date_filter': date_filter
+        })
+    except Exception as e:
+        logger.error(f"Error fetching paystub insights summary: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Failed to fetch paystub insights summary'
+        }), 500
+
+
+@app.route('/api/documents/summary', methods=['GET'])
+def get_documents_summary():
+    """Fetch per-day, per-type and per-risk-level document summary from the rollups"""
+    try:
+        document_type = request.args.get('document_type', default=None)
+        date_filter = request.args.get('date_filter', default=None)
+        summary = get_dashboard_rollups().get_summary(document_type=document_type, date_filter=date_filter)
+        return jsonify({
+            'success': True,
+            'data': summary,
+            'document_type': document_type,
+            'date_filter': date_filter
+        })
+    except Exception as e:
+        logger.error(f"Failed to fetch documents summary: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Failed to fetch documents summary'
+        }), 500
+
+
 @app.route('/api/real-time/regenerate-plots', methods=['POST'])
 def regenerate_plots_with_filters():
     """Regenerate plots with filter parameters applied"""
@@ -1783,6 +1915,7 @@ if __name__ == '__main__':
     print(f"Server running on: http://localhost:5001")
     print(f"API Endpoints:")
     print(f"  - GET  /api/health")
+    print(f"  - GET  /api/ready")
     print(f"  - POST /api/check/analyze")
     print(f"  - POST /api/paystub/analyze")
     print(f"  - POST /api/money-order/analyze")
@@ -1801,5 +1934,6 @@ if __name__ == '__main__':
     print(f"  - GET  /api/paystubs/insights")
     print("=" * 60)
 
+    warm_up()
     app.run(debug=False, host='0.0.0.0', port=5001, use_reloader=False)
 
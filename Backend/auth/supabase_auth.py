@@ -5,8 +5,13 @@ Adapts to existing table schema with UserID, UserName, Email columns
 """
 
 import hashlib
+import hmac
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from typing import Dict, Optional
 import jwt
 import os
 import logging
@@ -17,6 +22,103 @@ SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-change-in-production')
 TOKEN_EXPIRY_HOURS = 24
 USERS_TABLE = 'users'
 
+# Only the columns login needs (avoids select('*'))
+LOGIN_COLUMNS = 'UserID,UserName,Email,password_hash'
+
+# Verified-token cache: short-lived, in-process, keyed by SHA-256 of the token
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv('TOKEN_CACHE_TTL_SECONDS', '60'))
+TOKEN_CACHE_MAX_SIZE = int(os.getenv('TOKEN_CACHE_MAX_SIZE', '4096'))
+
+
+class AuthMetrics:
+    """Thread-safe call counts and latency totals for the auth paths"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, elapsed_seconds: float):
+        """Record one call of `name` taking `elapsed_seconds`"""
+        elapsed_ms = elapsed_seconds * 1000
+        with self._lock:
+            stats = self._stats.setdefault(name, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            stats['count'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Get count, average and max latency (ms) per recorded name"""
+        with self._lock:
+            return {
+                name: {
+                    'count': int(stats['count']),
+                    'avg_ms': round(stats['total_ms'] / stats['count'], 3) if stats['count'] else 0.0,
+                    'max_ms': round(stats['max_ms'], 3)
+                }
+                for name, stats in self._stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+class TokenCache:
+    """LRU of verified token claims with per-entry expiry"""
+
+    def __init__(self, max_size: int = TOKEN_CACHE_MAX_SIZE, ttl_seconds: float = TOKEN_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    @staticmethod
+    def key(token) -> str:
+        token_bytes = token.encode() if isinstance(token, str) else bytes(token)
+        return hashlib.sha256(token_bytes).hexdigest()
+
+    def get(self, token) -> Optional[Dict]:
+        """Copy of the cached claims for a token, or None on miss/expiry"""
+        key = self.key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            payload, expires_at = entry
+            if now >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return dict(payload)
+
+    def put(self, token, payload: Dict):
+        """Cache verified claims until the cache TTL or the token's own exp, whichever is first"""
+        if self.ttl_seconds <= 0 or self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if isinstance(payload.get('exp'), (int, float)):
+            expires_at = min(expires_at, payload['exp'])
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (dict(payload), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+auth_metrics = AuthMetrics()
+_token_cache = TokenCache()
+
+
+def get_auth_metrics() -> Dict[str, Dict[str, float]]:
+    """Latency metrics for login, token verification and user lookups"""
+    return auth_metrics.snapshot()
+
 
 def hash_password(password):
     """Hash password with salt"""
@@ -30,7 +132,7 @@ def verify_password(stored_hash, password):
     try:
         salt, pwd_hash = stored_hash.split('$')
         new_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-        return new_hash.hex() == pwd_hash
+        return hmac.compare_digest(new_hash.hex(), pwd_hash)
     except Exception:
         return False
 
@@ -47,14 +149,59 @@ def generate_token(email, user_id):
 
 
 def verify_token(token):
-    """Verify JWT token and return payload"""
+    """Verify JWT token and return payload (verified claims are cached briefly)"""
+    start = time.perf_counter()
+    cached = _token_cache.get(token)
+    if cached is not None:
+        auth_metrics.record('verify_token.cache_hit', time.perf_counter() - start)
+        return cached
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
+        _token_cache.put(token, payload)
         return payload
     except jwt.ExpiredSignatureError:
         return {'error': 'Token expired'}
     except jwt.InvalidTokenError:
         return {'error': 'Invalid token'}
+    finally:
+        if cached is None:
+            auth_metrics.record('verify_token.decode', time.perf_counter() - start)
+
+
+def _quote_filter_value(value: str) -> str:
+    """Quote a value for a PostgREST or_() filter so commas/parentheses are literal"""
+    escaped = value.replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _find_login_user(supabase, username_or_email):
+    """
+    Find a user by email or username with a single query
+
+    Matches the previous lookup order: for input containing '@' an Email match
+    wins over a UserName match, otherwise UserName wins. All matching rows are
+    fetched (exact matches on the two identity columns, so only a handful) and
+    ordered by UserID, so the preferred row is never cut off by a limit and ties
+    between duplicates resolve the same way every time.
+    """
+    start = time.perf_counter()
+    quoted = _quote_filter_value(username_or_email)
+    try:
+        response = supabase.table(USERS_TABLE).select(LOGIN_COLUMNS).or_(
+            f'Email.eq.{quoted},UserName.eq.{quoted}'
+        ).order('UserID').execute()
+    finally:
+        auth_metrics.record('login.user_lookup', time.perf_counter() - start)
+
+    rows = response.data or []
+    if not rows:
+        return None
+
+    preferred, other = ('Email', 'UserName') if '@' in username_or_email else ('UserName', 'Email')
+    rows = sorted(rows, key=lambda row: (row.get(preferred) != username_or_email,
+                                         row.get(other) != username_or_email))
+    return rows[0]
 
 
 def register_user_supabase(email, password):
@@ -119,34 +266,17 @@ def register_user_supabase(email, password):
 
 def login_user_supabase(username_or_email, password):
     """Login user with username OR email and return JWT token"""
+    start = time.perf_counter()
     try:
         from database.supabase_client import get_supabase
         supabase = get_supabase()
 
-        # Try to find user by username first, then by email
-        response = None
-
-        # Check if input contains @ (likely email)
-        if '@' in username_or_email:
-            # Try email lookup first
-            response = supabase.table(USERS_TABLE).select('*').eq('Email', username_or_email).execute()
-        else:
-            # Try username lookup first
-            response = supabase.table(USERS_TABLE).select('*').eq('UserName', username_or_email).execute()
-
-        # If not found and doesn't contain @, try as email anyway (edge case)
-        if (not response or not response.data or len(response.data) == 0) and '@' not in username_or_email:
-            response = supabase.table(USERS_TABLE).select('*').eq('Email', username_or_email).execute()
-
-        # If still not found and contains @, try as username (edge case)
-        if (not response or not response.data or len(response.data) == 0) and '@' in username_or_email:
-            response = supabase.table(USERS_TABLE).select('*').eq('UserName', username_or_email).execute()
+        # One round trip: match Email OR UserName, only the needed columns
+        user = _find_login_user(supabase, username_or_email)
 
-        if not response or not response.data or len(response.data) == 0:
+        if not user:
             return {'error': 'Invalid username or password'}, 401
 
-        user = response.data[0]
-
         # Verify password
         password_hash = user.get('password_hash')
         if not password_hash or not verify_password(password_hash, password):
@@ -168,3 +298,5 @@ def login_user_supabase(username_or_email, password):
     except Exception as e:
         logger.error(f"Error logging in user: {str(e)}")
         return {'error': f'Login failed: {str(e)}'}, 500
+    finally:
+        auth_metrics.record('login', time.perf_counter() - start)
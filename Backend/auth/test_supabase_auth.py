@@ -0,0 +1,138 @@
+"""
+Test Supabase Auth
+Verifies the token verification cache, single-query login lookup and password check.
+"""
+
+import sys
+import os
+import time
+import unittest
+
+import jwt
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import supabase_auth
+from auth.supabase_auth import (
+    TokenCache, _find_login_user, _token_cache, generate_token, get_auth_metrics,
+    hash_password, verify_password, verify_token
+)
+
+
+class _FakeQuery:
+    def __init__(self, rows, calls):
+        self.rows = rows
+        self.calls = calls
+
+    def select(self, columns):
+        self.calls.append(('select', columns))
+        return self
+
+    def or_(self, filters):
+        self.calls.append(('or_', filters))
+        return self
+
+    def order(self, column, desc=False):
+        self.calls.append(('order', column))
+        return self
+
+    def execute(self):
+        return type('Response', (), {'data': self.rows})()
+
+
+class _FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def table(self, name):
+        self.calls.append(('table', name))
+        return _FakeQuery(self.rows, self.calls)
+
+
+class TestTokenCache(unittest.TestCase):
+
+    def setUp(self):
+        _token_cache.clear()
+        supabase_auth.auth_metrics.reset()
+
+    def test_verify_token_cached(self):
+        token = generate_token('a@example.com', 'u1')
+        first = verify_token(token)
+        second = verify_token(token)
+        self.assertEqual(first['user_id'], 'u1')
+        self.assertEqual(first, second)
+        # Callers get copies, so mutating one does not corrupt the cache
+        first['user_id'] = 'tampered'
+        second['email'] = 'tampered'
+        self.assertEqual(verify_token(token)['user_id'], 'u1')
+        self.assertEqual(verify_token(token)['email'], 'a@example.com')
+        metrics = get_auth_metrics()
+        self.assertEqual(metrics['verify_token.decode']['count'], 1)
+        self.assertEqual(metrics['verify_token.cache_hit']['count'], 3)
+
+    def test_invalid_token_not_cached(self):
+        self.assertEqual(verify_token('not-a-token'), {'error': 'Invalid token'})
+        self.assertEqual(verify_token('not-a-token'), {'error': 'Invalid token'})
+        self.assertEqual(get_auth_metrics()['verify_token.decode']['count'], 2)
+
+    def test_entry_expires_with_token(self):
+        cache = TokenCache(max_size=10, ttl_seconds=60)
+        cache.put('tok', {'user_id': 'u1', 'exp': time.time() - 1})
+        self.assertIsNone(cache.get('tok'))
+
+        expired = jwt.encode({'user_id': 'u1', 'exp': int(time.time()) - 10},
+                             supabase_auth.SECRET_KEY, algorithm='HS256')
+        self.assertEqual(verify_token(expired), {'error': 'Token expired'})
+
+    def test_lru_eviction(self):
+        cache = TokenCache(max_size=2, ttl_seconds=60)
+        cache.put('a', {'n': 1})
+        cache.put('b', {'n': 2})
+        cache.get('a')
+        cache.put('c', {'n': 3})
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+
+class TestLogin(unittest.TestCase):
+
+    def test_single_query_prefers_email_for_email_input(self):
+        rows = [
+            {'UserID': 'u1', 'UserName': 'a@example.com', 'Email': 'other@example.com'},
+            {'UserID': 'u2', 'UserName': 'alice', 'Email': 'a@example.com'}
+        ]
+        supabase = _FakeSupabase(rows)
+        user = _find_login_user(supabase, 'a@example.com')
+        self.assertEqual(user['UserID'], 'u2')
+        self.assertEqual(supabase.calls.count(('table', 'users')), 1)
+        self.assertIn(('select', supabase_auth.LOGIN_COLUMNS), supabase.calls)
+        self.assertIn(('or_', 'Email.eq."a@example.com",UserName.eq."a@example.com"'), supabase.calls)
+
+    def test_prefers_username_for_plain_input(self):
+        rows = [
+            {'UserID': 'u1', 'UserName': 'bob', 'Email': 'x@example.com'},
+            {'UserID': 'u2', 'UserName': 'robert', 'Email': 'bob'}
+        ]
+        self.assertEqual(_find_login_user(_FakeSupabase(rows), 'bob')['UserID'], 'u1')
+        self.assertIsNone(_find_login_user(_FakeSupabase([]), 'bob'))
+
+    def test_preferred_match_after_other_matches(self):
+        # Several UserName matches ahead of the Email match must not hide it
+        rows = [{'UserID': f'u{i}', 'UserName': 'a@example.com', 'Email': f'{i}@example.com'} for i in range(3)]
+        rows.append({'UserID': 'u9', 'UserName': 'alice', 'Email': 'a@example.com'})
+        supabase = _FakeSupabase(rows)
+        self.assertEqual(_find_login_user(supabase, 'a@example.com')['UserID'], 'u9')
+        self.assertIn(('order', 'UserID'), supabase.calls)
+
+    def test_verify_password(self):
+        stored = hash_password('correct horse')
+        self.assertTrue(verify_password(stored, 'correct horse'))
+        self.assertFalse(verify_password(stored, 'wrong'))
+        self.assertFalse(verify_password('malformed', 'x'))
+
+
+if __name__ == '__main__':
+    unittest.main()
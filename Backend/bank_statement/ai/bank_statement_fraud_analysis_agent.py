@@ -4,7 +4,6 @@ Uses LangChain + OpenAI to analyze bank statement fraud and make final decisions
 Completely independent from other document type AI agents
 """
 
-import json
 import logging
 from typing import Dict, Optional
 import os
@@ -28,14 +27,23 @@ except ImportError as e:
     logger.warning(f"LangChain not available: {e}")
 
 from .bank_statement_prompts import (
-    SYSTEM_PROMPT,
-    RECOMMENDATION_GUIDELINES,
+    INSTRUCTION_PREFIX,
+    COMPACTION_LEVELS,
     format_analysis_template
 )
 from .bank_statement_tools import BankStatementDataAccessTools
+from . import bank_statement_prompts
+from utils.llm_cache import LLMResponseCache
+from utils.decision_tiers import DecisionTierEngine
+from utils.prompt_budget import fit_prompt
+from utils.structured_output import invoke_structured
+from utils.resilience import ResilientClient, openai_client_kwargs
 
 logger = logging.getLogger(__name__)
 
+_llm_cache = LLMResponseCache('bank_statement', prompt_modules=[bank_statement_prompts])
+_decision_tiers = DecisionTierEngine('bank_statement')
+
 
 class BankStatementFraudAnalysisAgent:
     """
@@ -71,7 +79,9 @@ class BankStatementFraudAnalysisAgent:
                 if not (self.model_name.startswith('o4') or self.model_name.startswith('o1')):
                     llm_kwargs['max_tokens'] = 1500
                 
-                self.llm = ChatOpenAI(**llm_kwargs)
+                # Deadline, retries and circuit breaking are handled by utils.resilience
+                llm_kwargs.update(openai_client_kwargs())
+                self.llm = ResilientClient(ChatOpenAI(**llm_kwargs), 'openai')
                 logger.info(f"Initialized BankStatementFraudAnalysisAgent with LangChain model: {model}")
             except Exception as e:
                 logger.warning(f"Could not initialize LangChain: {e}")
@@ -100,6 +110,7 @@ class BankStatementFraudAnalysisAgent:
         Returns:
             AI analysis dict with recommendation, confidence, reasoning, etc.
         """
+        _decision_tiers.record_document()
         # Try multiple sources for account holder name
         if not account_holder_name:
             account_holder_name = (
@@ -238,34 +249,54 @@ class BankStatementFraudAnalysisAgent:
                         # Continue with normal analysis flow - this will be analyzed normally
                         # IMPORTANT: Do NOT mark as duplicate - let it go through normal analysis
 
-            # Format the analysis prompt
-            analysis_prompt = format_analysis_template(
-                bank_statement_data=extracted_data,
-                ml_analysis=ml_analysis,
-                customer_info=customer_info
+            # Clear-cut ML scores are decided without the LLM
+            tier_decision = _decision_tiers.decide(
+                account_holder_name, ml_analysis, customer_info,
+                validate=lambda decision: self._validate_and_format_result(decision, ml_analysis, customer_info)
+            )
+            if tier_decision:
+                return tier_decision
+
+            # Nearest previously rejected / escalated statements
+            ending_balance = extracted_data.get('ending_balance')
+            if isinstance(ending_balance, dict):
+                ending_balance = ending_balance.get('value')
+            similar_cases = self.data_tools.get_similar_fraud_cases(
+                extracted_data.get('bank_name'), float(ending_balance or 0),
+                ml_analysis.get('fraud_risk_score', 0.0),
+                extracted_data=extracted_data, ml_analysis=ml_analysis
+            )
+            institution_stats = self.data_tools.get_bank_fraud_stats(extracted_data.get('bank_name'))
+
+            # Format the analysis prompt, compacted to the model's token budget
+            # (recommendation guidelines are part of the static system prefix)
+            full_prompt, _ = fit_prompt(
+                'bank_statement', self.model_name, INSTRUCTION_PREFIX,
+                lambda **limits: format_analysis_template(
+                    bank_statement_data=extracted_data,
+                    ml_analysis=ml_analysis,
+                    customer_info=customer_info,
+                    similar_cases=similar_cases,
+                    institution_stats=institution_stats,
+                    **limits
+                ),
+                COMPACTION_LEVELS
             )
-
-            # Add recommendation guidelines
-            full_prompt = f"{analysis_prompt}\n\n{RECOMMENDATION_GUIDELINES}"
 
             # Create LangChain prompt
-            system_msg = SystemMessage(content=SYSTEM_PROMPT)
+            system_msg = SystemMessage(content=INSTRUCTION_PREFIX)
             user_msg = HumanMessage(content=full_prompt)
             messages = [system_msg, user_msg]
 
             # Generate analysis using LangChain
             logger.info("Calling LangChain LLM for bank statement fraud analysis...")
-            response = self.llm.invoke(messages)
-
-            # Parse response
-            ai_response = response.content
-            logger.info(f"Received LLM response (length: {len(ai_response)} chars)")
-            logger.info(f"LLM raw response: {ai_response[:500]}...")  # Log first 500 chars for debugging
+            from utils.llm_schemas import DocumentDecision
+            decision = invoke_structured(
+                self.llm, messages, DocumentDecision, cache=_llm_cache, model_name=self.model_name
+            )
+            result = decision.model_dump(exclude_none=True)
+            logger.info("Received schema-validated LLM response")
 
-            # Try to parse as JSON - NO FALLBACK, error if invalid
-            # But try harder to extract JSON from common LLM response formats
-            result = self._parse_json_response(ai_response)
-            
             # Log what LLM returned for fraud_types and fraud_explanations
             logger.info(f"LLM returned fraud_types: {result.get('fraud_types', [])}")
             logger.info(f"LLM returned fraud_explanations: {result.get('fraud_explanations', [])}")
@@ -548,88 +579,6 @@ class BankStatementFraudAnalysisAgent:
             ]
         }
 
-    def _parse_json_response(self, ai_response: str) -> Dict:
-        """
-        Parse JSON from LLM response, handling common formats.
-        Tries multiple strategies but raises error if JSON cannot be extracted.
-        NO FALLBACK - must return valid JSON or raise error.
-        
-        Args:
-            ai_response: Raw response from LLM
-            
-        Returns:
-            Parsed JSON dict
-            
-        Raises:
-            ValueError: If JSON cannot be parsed from response
-        """
-        import re
-        
-        if not ai_response or not ai_response.strip():
-            raise ValueError(
-                "LLM returned empty response. "
-                "LLM must return valid JSON format. "
-                "Please check OpenAI API key and network connectivity."
-            )
-        
-        # Strategy 1: Try direct JSON parse
-        try:
-            return json.loads(ai_response.strip())
-        except json.JSONDecodeError:
-            pass
-        
-        # Strategy 2: Extract JSON from markdown code blocks (```json ... ```)
-        json_block_pattern = r'```(?:json)?\s*(\{.*?\})\s*```'
-        matches = re.findall(json_block_pattern, ai_response, re.DOTALL)
-        if matches:
-            for match in matches:
-                try:
-                    return json.loads(match.strip())
-                except json.JSONDecodeError:
-                    continue
-        
-        # Strategy 3: Find JSON object in response (look for { ... })
-        # Try to find the first complete JSON object
-        brace_count = 0
-        start_idx = -1
-        for i, char in enumerate(ai_response):
-            if char == '{':
-                if start_idx == -1:
-                    start_idx = i
-                brace_count += 1
-            elif char == '}':
-                brace_count -= 1
-                if brace_count == 0 and start_idx != -1:
-                    # Found complete JSON object
-                    json_str = ai_response[start_idx:i+1]
-                    try:
-                        return json.loads(json_str.strip())
-                    except json.JSONDecodeError:
-                        # Try next JSON object
-                        start_idx = -1
-                        brace_count = 0
-                        continue
-        
-        # Strategy 4: Try to fix common JSON issues (trailing commas, etc.)
-        # Remove trailing commas before closing braces/brackets
-        cleaned = re.sub(r',\s*}', '}', ai_response)
-        cleaned = re.sub(r',\s*]', ']', cleaned)
-        try:
-            return json.loads(cleaned.strip())
-        except json.JSONDecodeError:
-            pass
-        
-        # All strategies failed - raise error with helpful message
-        response_preview = ai_response[:1000] if len(ai_response) > 1000 else ai_response
-        raise ValueError(
-            f"LLM returned invalid JSON response. "
-            f"LLM must return valid JSON format. "
-            f"Response length: {len(ai_response)} chars. "
-            f"Response preview: {response_preview}... "
-            f"Please check OpenAI API key and network connectivity. "
-            f"LLM analysis is required - no fallback available."
-        )
-
     def _validate_and_format_result(self, result: Dict, ml_analysis: Dict, customer_info: Dict) -> Dict:
         """Validate and format the AI result"""
         # Check if this is a new customer
@@ -660,9 +609,10 @@ class BankStatementFraudAnalysisAgent:
             ]
         
         # For repeat customers: Validate that LLM provided fraud_types and fraud_explanations for REJECT/ESCALATE
+        # (decision-tier results skipped the LLM and carry none by design)
         is_repeat_customer = not is_new_customer
         recommendation = validated.get('recommendation', 'UNKNOWN')
-        if is_repeat_customer and recommendation in ['REJECT', 'ESCALATE']:
+        if is_repeat_customer and recommendation in ['REJECT', 'ESCALATE'] and 'decision_tier' not in result:
             # LLM MUST provide fraud_types and fraud_explanations for repeat customers with REJECT/ESCALATE
             fraud_types = validated.get('fraud_types', [])
             fraud_explanations = validated.get('fraud_explanations', [])
@@ -3,6 +3,10 @@ Bank Statement Fraud Analysis AI Prompts
 System prompts and decision logic for bank statement fraud analysis agent
 """
 
+from utils.prompt_budget import compact_items
+from database.similar_cases import format_similar_cases
+from database.institution_fraud_stats import format_institution_stats
+
 # System prompt for the bank statement fraud analysis agent
 SYSTEM_PROMPT = """You are an expert bank statement fraud analyst specializing in bank statement verification and fraud detection.
 
@@ -81,6 +85,14 @@ Previous Fraud Count: {fraud_count}
 Previous Escalation Count: {escalate_count}
 Last Recommendation: {last_recommendation}
 
+## INSTITUTION HISTORY
+Previously processed statements from this bank (for context only - a bank's fraud rate is not evidence about this document):
+{institution_stats}
+
+## SIMILAR HISTORICAL CASES
+Nearest previously rejected or escalated statements (for context only - decide on this document's own evidence):
+{similar_cases}
+
 ## TASK
 Based on the above information and the decision guidelines below, provide your fraud analysis.
 
@@ -271,7 +283,10 @@ Finally, if the customer is a repeat offender (i.e., their fraud_count is {great
 - No interpretation or override of the decision matrix is permitted
 """
 
-def format_analysis_template(bank_statement_data: dict, ml_analysis: dict, customer_info: dict) -> str:
+def format_analysis_template(bank_statement_data: dict, ml_analysis: dict, customer_info: dict,
+                             max_transactions: int = 10, max_risk_factors: int = None,
+                             similar_cases: list = None, max_similar_cases: int = None,
+                             institution_stats: dict = None) -> str:
     """
     Format the analysis template with actual data
 
@@ -279,6 +294,11 @@ def format_analysis_template(bank_statement_data: dict, ml_analysis: dict, custo
         bank_statement_data: Extracted bank statement data
         ml_analysis: ML fraud analysis results
         customer_info: Customer history information
+        max_transactions: Transactions listed; the rest are summarized by count and totals
+        max_risk_factors: Risk factors listed before the rest are summarized (None lists all)
+        similar_cases: Similar historical cases (database.similar_cases)
+        max_similar_cases: Similar cases listed (None lists all)
+        institution_stats: Fraud statistics of the bank (database.institution_fraud_stats)
 
     Returns:
         Formatted prompt string
@@ -368,18 +388,29 @@ def format_analysis_template(bank_statement_data: dict, ml_analysis: dict, custo
         except Exception as e:
             transaction_period_coverage = f"CHECK REQUIRED: Could not verify coverage ({str(e)})"
     
-    # Get transaction samples for pattern analysis (up to 10 transactions)
+    # Get transaction samples for pattern analysis (up to max_transactions)
+    def summarize_omitted(omitted):
+        credits = debits = 0.0
+        for txn in omitted:
+            amount = get_amount_value(txn.get('amount', {}))
+            if amount < 0 or str(txn.get('type', '')).lower() in ('debit', 'withdrawal'):
+                debits += abs(amount)
+            else:
+                credits += amount
+        return f"credits ${credits:,.2f}, debits ${debits:,.2f}"
+
     transaction_samples = []
     if transactions:
-        for i, txn in enumerate(transactions[:10], 1):
+        for i, txn in enumerate(compact_items(transactions, max_transactions, 'transactions', summarize_omitted), 1):
+            if isinstance(txn, str):
+                transaction_samples.append(txn)
+                continue
             txn_date = txn.get('date', 'N/A')
             txn_desc = txn.get('description', 'N/A')
             txn_amount = txn.get('amount', {})
             txn_amount_val = get_amount_value(txn_amount)
             txn_type = txn.get('type', 'N/A')
             transaction_samples.append(f"{i}. Date: {txn_date} | Type: {txn_type} | Amount: ${txn_amount_val:,.2f} | Description: {txn_desc}")
-        if len(transactions) > 10:
-            transaction_samples.append(f"... and {len(transactions) - 10} more transactions")
     else:
         transaction_samples.append("No transaction details available")
     
@@ -397,6 +428,7 @@ def format_analysis_template(bank_statement_data: dict, ml_analysis: dict, custo
     risk_factors = ml_analysis.get('feature_importance', [])
     if not risk_factors:
         risk_factors = ml_analysis.get('anomalies', [])
+    risk_factors = compact_items(risk_factors, max_risk_factors, 'risk factors')
     risk_factors_str = '\n'.join([f"- {factor}" for factor in risk_factors]) if risk_factors else "None"
 
     # Extract customer info
@@ -442,6 +474,18 @@ def format_analysis_template(bank_statement_data: dict, ml_analysis: dict, custo
         has_fraud_history=has_fraud_history,
         fraud_count=fraud_count,
         escalate_count=escalate_count,
-        last_recommendation=last_recommendation
+        last_recommendation=last_recommendation,
+        similar_cases=format_similar_cases(similar_cases, max_similar_cases),
+        institution_stats=format_institution_stats(institution_stats)
     )
 
+
+# Static prefix sent before every analysis - kept byte-identical so provider prompt caching applies
+INSTRUCTION_PREFIX = f"{SYSTEM_PROMPT}\n\n{RECOMMENDATION_GUIDELINES}"
+
+# format_analysis_template limits, most to least detailed, tried until the prompt fits the token budget
+COMPACTION_LEVELS = (
+    {},
+    {'max_transactions': 5, 'max_risk_factors': 10, 'max_similar_cases': 3},
+    {'max_transactions': 2, 'max_risk_factors': 3, 'max_similar_cases': 1}
+)
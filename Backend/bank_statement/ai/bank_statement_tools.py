@@ -55,7 +55,9 @@ class BankStatementDataAccessTools:
         # Use real database
         return self.customer_storage.get_customer_history(account_holder_name)
 
-    def get_similar_fraud_cases(self, bank_name: str, amount: float, fraud_score: float) -> List[Dict]:
+    def get_similar_fraud_cases(self, bank_name: str, amount: float, fraud_score: float,
+                                extracted_data: Optional[Dict] = None, ml_analysis: Optional[Dict] = None,
+                                limit: Optional[int] = None) -> List[Dict]:
         """
         Find similar fraud cases from historical data
 
@@ -63,15 +65,31 @@ class BankStatementDataAccessTools:
             bank_name: Bank name
             amount: Statement amount (ending balance)
             fraud_score: ML fraud score
+            extracted_data: Full extracted statement (more precise than bank_name and amount)
+            ml_analysis: Full ML analysis (default: fraud_score only)
+            limit: Maximum number of cases (default SIMILAR_CASES_TOP_K)
 
         Returns:
-            List of similar fraud cases
+            List of similar fraud cases, nearest first
         """
         if self.mock_mode:
             return self._get_mock_similar_cases(bank_name, amount, fraud_score)
 
-        # TODO: Query historical fraud cases
-        return []
+        from database.similar_cases import find_similar_cases
+        cases = find_similar_cases(
+            'bank_statement',
+            extracted_data or {'bank_name': bank_name, 'ending_balance': amount},
+            ml_analysis or {'fraud_risk_score': fraud_score},
+            k=limit
+        )
+        return [
+            {
+                **case,
+                'bank_name': case.get('institution'),
+                'reason': ', '.join(case.get('fraud_types') or [])
+            }
+            for case in cases
+        ]
 
     def check_duplicate(self, account_number: str, statement_period_start: str, account_holder_name: str) -> Dict:
         """
@@ -99,13 +117,16 @@ class BankStatementDataAccessTools:
             bank_name: Bank name
 
         Returns:
-            Stats dict with fraud rate, common patterns, etc.
+            Stats dict with fraud rate, common patterns, etc. (see database.institution_fraud_stats)
         """
         if self.mock_mode:
             return self._get_mock_bank_stats(bank_name)
 
-        # TODO: Query aggregated fraud stats
-        return {}
+        from database.institution_fraud_stats import get_institution_stats
+        stats = get_institution_stats(bank_name, 'bank_statement')
+        if stats:
+            stats = {'total_statements_processed': stats['total_documents_processed'], **stats}
+        return stats
 
     def get_amount_risk_profile(self, amount: float) -> str:
         """
@@ -8,6 +8,8 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import numpy as np
 
+from utils.date_parser import parse_date, parse_date_array
+
 # Import bank list loader for dynamic bank support
 try:
     from ..utils.bank_list_loader import get_supported_bank_names, is_supported_bank
@@ -18,6 +20,40 @@ except ImportError:
     logger = __import__('logging').getLogger(__name__)
     logger.warning("Bank list loader not available, using default bank list")
 
+_NON_NUMERIC = re.compile(r'[^\d.-]')
+
+DATE_FORMATS = (
+    '%Y-%m-%d', '%m-%d-%Y', '%m/%d/%Y', '%m-%d-%y', '%m/%d/%y',
+    '%d-%m-%Y', '%d/%m/%Y', '%B %d, %Y', '%b %d, %Y'
+)
+
+# 1970-01-01 was a Thursday (weekday 3)
+_EPOCH_WEEKDAY = 3
+
+
+class ParsedTransactions:
+    """
+    Columnar view of a statement's transactions, parsed once per document
+
+    Only dict transactions contribute rows; `total` is the length of the
+    original list (ratios are taken over all transactions, as before).
+    """
+
+    def __init__(self, amounts: np.ndarray, dates: np.ndarray, signature_hashes: np.ndarray, total: int):
+        self.amounts = amounts                    # float64, signed
+        self.abs_amounts = np.abs(amounts)
+        self.dates = dates                        # datetime64[D], NaT where unparseable
+        self.signature_hashes = signature_hashes  # int64 hash of date|amount|description[:20]
+        self.total = total
+
+    @property
+    def count(self) -> int:
+        return len(self.amounts)
+
+    @property
+    def nonzero_abs_amounts(self) -> np.ndarray:
+        return self.abs_amounts[self.amounts != 0]
+
 
 class BankStatementFeatureExtractor:
     """
@@ -78,23 +114,15 @@ class BankStatementFeatureExtractor:
 
         # Get transactions first (needed for balance calculation)
         transactions = extracted_data.get('transactions', [])
-        
+
+        # Parse amounts/dates once; every transaction feature reads from these columns
+        txns = self._parse_transactions(transactions)
+
         # ALWAYS calculate total_credits and total_debits from transactions to verify accuracy
         # This ensures we use the most accurate values for balance consistency checking
-        calculated_credits = 0.0
-        calculated_debits = 0.0
-        
-        if transactions:
-            for txn in transactions:
-                if isinstance(txn, dict):
-                    amount = txn.get('amount', {})
-                    txn_value = self._extract_numeric_amount(amount)
-                    
-                    if txn_value > 0:
-                        calculated_credits += txn_value
-                    elif txn_value < 0:
-                        calculated_debits += abs(txn_value)
-        
+        calculated_credits = float(txns.amounts[txns.amounts > 0].sum())
+        calculated_debits = float(-txns.amounts[txns.amounts < 0].sum())
+
         # Use calculated values if:
         # 1. Original values are missing/zero, OR
         # 2. Calculated values produce a better balance match (more accurate)
@@ -184,11 +212,11 @@ class BankStatementFeatureExtractor:
         features.append(min(transaction_count, 1000.0))  # Cap at 1000
 
         # Feature 15: Average transaction amount
-        avg_txn_amount = self._calculate_avg_transaction_amount(transactions)
+        avg_txn_amount = self._calculate_avg_transaction_amount(txns)
         features.append(min(abs(avg_txn_amount), 50000.0) if avg_txn_amount else 0.0)
 
         # Feature 16: Largest transaction amount
-        max_txn_amount = self._calculate_max_transaction_amount(transactions)
+        max_txn_amount = self._calculate_max_transaction_amount(txns)
         features.append(min(abs(max_txn_amount), 100000.0) if max_txn_amount else 0.0)
 
         # Feature 17: Balance change (ending - beginning)
@@ -211,10 +239,10 @@ class BankStatementFeatureExtractor:
         # === ADVANCED FEATURES (21-35) ===
 
         # Feature 21: Suspicious transaction pattern (many small transactions)
-        features.append(self._detect_suspicious_transaction_pattern(transactions))
+        features.append(self._detect_suspicious_transaction_pattern(txns))
 
         # Feature 22: Large transaction count (transactions > $10,000)
-        large_txn_count = self._count_large_transactions(transactions, threshold=10000)
+        large_txn_count = self._count_large_transactions(txns, threshold=10000)
         features.append(min(large_txn_count, 50.0))
 
         # Feature 23: Round number transactions (deprecated - always returns 0.0 for model compatibility)
@@ -236,13 +264,13 @@ class BankStatementFeatureExtractor:
         features.append(self._calculate_field_quality(extracted_data, raw_text))
 
         # Feature 28: Transaction date consistency (all within statement period)
-        features.append(self._check_transaction_date_consistency(transactions, statement_period_start, statement_period_end))
+        features.append(self._check_transaction_date_consistency(txns, statement_period_start, statement_period_end))
 
         # Feature 29: Duplicate transaction detection
-        features.append(self._detect_duplicate_transactions(transactions))
+        features.append(self._detect_duplicate_transactions(txns))
 
         # Feature 30: Unusual transaction timing (weekend/holiday transactions)
-        features.append(self._detect_unusual_timing(transactions))
+        features.append(self._detect_unusual_timing(txns))
 
         # Feature 31: Account number format validation
         features.append(self._validate_account_number_format(account_number))
@@ -251,7 +279,7 @@ class BankStatementFeatureExtractor:
         features.append(self._validate_name_format(account_holder_name))
 
         # Feature 33: Balance volatility (large swings)
-        features.append(self._calculate_balance_volatility(transactions, beginning_balance))
+        features.append(self._calculate_balance_volatility(txns, beginning_balance))
 
         # Feature 34: Credit/Debit ratio
         credit_debit_ratio = total_credits / total_debits if total_debits > 0 else (total_credits if total_credits > 0 else 0.0)
@@ -287,7 +315,7 @@ class BankStatementFeatureExtractor:
 
         # If string, parse it
         if isinstance(amount_value, str):
-            clean_amount = re.sub(r'[^\d.-]', '', amount_value)
+            clean_amount = _NON_NUMERIC.sub('', amount_value)
             try:
                 return float(clean_amount)
             except ValueError:
@@ -295,6 +323,37 @@ class BankStatementFeatureExtractor:
 
         return 0.0
 
+    def _parse_transactions(self, transactions: Optional[List]) -> ParsedTransactions:
+        """
+        Single pass over the transaction list into NumPy columns
+
+        Each amount is parsed once; the date column is parsed in one vectorized
+        call using the format inferred for this statement.
+        """
+        transactions = transactions or []
+        amounts = []
+        raw_dates = []
+        signature_hashes = []
+
+        for txn in transactions:
+            if not isinstance(txn, dict):
+                continue
+            amount = self._extract_numeric_amount(txn.get('amount'))
+            raw_date = txn.get('date', '')
+            amounts.append(amount)
+            raw_dates.append(raw_date or None)
+
+            # Signature: date + amount + description (first 20 chars)
+            desc = (txn.get('description', '') or '')[:20]
+            signature_hashes.append(hash(f"{raw_date}|{amount}|{desc}"))
+
+        return ParsedTransactions(
+            amounts=np.array(amounts, dtype=np.float64),
+            dates=parse_date_array(raw_dates, DATE_FORMATS),
+            signature_hashes=np.array(signature_hashes, dtype=np.int64),
+            total=len(transactions)
+        )
+
     def _is_future_period(self, start_date: Optional[str], end_date: Optional[str]) -> float:
         """Check if statement period is in the future"""
         if not end_date:
@@ -326,46 +385,17 @@ class BankStatementFeatureExtractor:
         """Parse date string to datetime object"""
         if not date_str:
             return None
+        return parse_date(date_str, DATE_FORMATS)
 
-        date_formats = [
-            '%Y-%m-%d', '%m-%d-%Y', '%m/%d/%Y', '%m-%d-%y', '%m/%d/%y',
-            '%d-%m-%Y', '%d/%m/%Y', '%B %d, %Y', '%b %d, %Y'
-        ]
+    def _calculate_avg_transaction_amount(self, txns: ParsedTransactions) -> Optional[float]:
+        """Calculate average transaction amount (non-zero amounts only)"""
+        amounts = txns.nonzero_abs_amounts
+        return float(amounts.mean()) if amounts.size else None
 
-        for fmt in date_formats:
-            try:
-                return datetime.strptime(str(date_str).strip(), fmt)
-            except ValueError:
-                continue
-        return None
-
-    def _calculate_avg_transaction_amount(self, transactions: List) -> Optional[float]:
-        """Calculate average transaction amount"""
-        if not transactions:
-            return None
-
-        amounts = []
-        for txn in transactions:
-            if isinstance(txn, dict):
-                amount = self._extract_numeric_amount(txn.get('amount'))
-                if amount:
-                    amounts.append(abs(amount))
-
-        return sum(amounts) / len(amounts) if amounts else None
-
-    def _calculate_max_transaction_amount(self, transactions: List) -> Optional[float]:
+    def _calculate_max_transaction_amount(self, txns: ParsedTransactions) -> Optional[float]:
         """Calculate maximum transaction amount"""
-        if not transactions:
-            return None
-
-        amounts = []
-        for txn in transactions:
-            if isinstance(txn, dict):
-                amount = self._extract_numeric_amount(txn.get('amount'))
-                if amount:
-                    amounts.append(abs(amount))
-
-        return max(amounts) if amounts else None
+        amounts = txns.nonzero_abs_amounts
+        return float(amounts.max()) if amounts.size else None
 
     def _check_balance_consistency(
         self,
@@ -389,35 +419,16 @@ class BankStatementFeatureExtractor:
         else:
             return 0.0
 
-    def _detect_suspicious_transaction_pattern(self, transactions: List) -> float:
+    def _detect_suspicious_transaction_pattern(self, txns: ParsedTransactions) -> float:
         """
         Detect suspicious patterns: Only flag if any transaction amount exceeds $20,000
         This aligns with the policy that only large transfers (>$20,000) are considered suspicious
         """
-        if not transactions:
-            return 0.0
-
-        # Check if any transaction exceeds $20,000 threshold
-        for txn in transactions:
-            if isinstance(txn, dict):
-                amount = abs(self._extract_numeric_amount(txn.get('amount')))
-                if amount > 20000:  # Only flag if transaction > $20,000
-                    return 1.0
-        
-        return 0.0
+        return 1.0 if np.any(txns.abs_amounts > 20000) else 0.0
 
-    def _count_large_transactions(self, transactions: List, threshold: float = 10000) -> int:
+    def _count_large_transactions(self, txns: ParsedTransactions, threshold: float = 10000) -> int:
         """Count transactions above threshold"""
-        if not transactions:
-            return 0
-
-        count = 0
-        for txn in transactions:
-            if isinstance(txn, dict):
-                amount = abs(self._extract_numeric_amount(txn.get('amount')))
-                if amount >= threshold:
-                    count += 1
-        return count
+        return int(np.count_nonzero(txns.abs_amounts >= threshold))
 
     def _validate_date_format(self, date_str: Optional[str]) -> float:
         """Validate date format"""
@@ -462,50 +473,32 @@ class BankStatementFeatureExtractor:
 
     def _check_transaction_date_consistency(
         self,
-        transactions: List,
+        txns: ParsedTransactions,
         period_start: Optional[str],
         period_end: Optional[str]
     ) -> float:
         """Check if all transactions are within statement period"""
-        if not transactions or not period_start or not period_end:
+        if not txns.total or not period_start or not period_end:
             return 0.5
 
-        try:
-            start = self._parse_date(period_start)
-            end = self._parse_date(period_end)
-            if not start or not end:
-                return 0.5
-
-            consistent_count = 0
-            for txn in transactions:
-                if isinstance(txn, dict):
-                    txn_date = self._parse_date(txn.get('date'))
-                    if txn_date and start <= txn_date <= end:
-                        consistent_count += 1
-
-            return consistent_count / len(transactions) if transactions else 0.0
-        except:
+        start = self._parse_date(period_start)
+        end = self._parse_date(period_end)
+        if not start or not end:
             return 0.5
 
-    def _detect_duplicate_transactions(self, transactions: List) -> float:
+        # NaT compares False, so unparseable dates never count as consistent
+        start_day = np.datetime64(start.date(), 'D')
+        end_day = np.datetime64(end.date(), 'D')
+        consistent_count = np.count_nonzero((txns.dates >= start_day) & (txns.dates <= end_day))
+        return consistent_count / txns.total
+
+    def _detect_duplicate_transactions(self, txns: ParsedTransactions) -> float:
         """Detect duplicate transactions"""
-        if not transactions or len(transactions) < 2:
+        if txns.total < 2:
             return 0.0
 
-        seen = set()
-        duplicates = 0
-        for txn in transactions:
-            if isinstance(txn, dict):
-                # Create a signature: date + amount + description (first 20 chars)
-                date = txn.get('date', '')
-                amount = self._extract_numeric_amount(txn.get('amount'))
-                desc = (txn.get('description', '') or '')[:20]
-                signature = f"{date}|{amount}|{desc}"
-                
-                if signature in seen:
-                    duplicates += 1
-                else:
-                    seen.add(signature)
+        # Every repeat of an already-seen signature counts as one duplicate
+        duplicates = txns.count - len(np.unique(txns.signature_hashes))
 
         # MEDIUM IMPACT: Only return 1.0 if multiple duplicates (2+), otherwise return 0.5 for single duplicate
         # This reduces the impact of a single duplicate transaction
@@ -516,19 +509,15 @@ class BankStatementFeatureExtractor:
         else:
             return 0.0
 
-    def _detect_unusual_timing(self, transactions: List) -> float:
+    def _detect_unusual_timing(self, txns: ParsedTransactions) -> float:
         """Detect transactions on weekends/holidays"""
-        if not transactions:
+        if not txns.total:
             return 0.0
 
-        weekend_count = 0
-        for txn in transactions:
-            if isinstance(txn, dict):
-                txn_date = self._parse_date(txn.get('date'))
-                if txn_date and txn_date.weekday() >= 5:  # Saturday or Sunday
-                    weekend_count += 1
-
-        return weekend_count / len(transactions) if transactions else 0.0
+        valid_dates = txns.dates[~np.isnat(txns.dates)]
+        weekdays = (valid_dates.astype(np.int64) + _EPOCH_WEEKDAY) % 7
+        weekend_count = np.count_nonzero(weekdays >= 5)  # Saturday or Sunday
+        return weekend_count / txns.total
 
     def _validate_account_number_format(self, account_number: Optional[str]) -> float:
         """Validate account number format"""
@@ -550,22 +539,13 @@ class BankStatementFeatureExtractor:
             return 1.0
         return 0.5
 
-    def _calculate_balance_volatility(self, transactions: List, beginning_balance: Optional[float]) -> float:
+    def _calculate_balance_volatility(self, txns: ParsedTransactions, beginning_balance: Optional[float]) -> float:
         """Calculate balance volatility (large swings)"""
-        if not transactions or beginning_balance is None:
+        if not txns.total or beginning_balance is None:
             return 0.0
 
-        current_balance = beginning_balance
-        max_swing = 0.0
-
-        for txn in transactions:
-            if isinstance(txn, dict):
-                amount = self._extract_numeric_amount(txn.get('amount'))
-                # Assume positive amounts are credits, negative are debits
-                # This is simplified - real implementation would check transaction type
-                current_balance += amount
-                swing = abs(amount)
-                max_swing = max(max_swing, swing)
+        # Largest single swing in either direction
+        max_swing = float(txns.abs_amounts.max()) if txns.count else 0.0
 
         # Normalize by beginning balance
         if beginning_balance > 0:
@@ -6,7 +6,7 @@ Completely independent from other document type fraud detection
 
 import os
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 from .bank_statement_feature_extractor import BankStatementFeatureExtractor
 
@@ -31,6 +31,48 @@ FRAUD_TYPE_LABELS = {
 }
 
 
+def balance_leniency_factor(bank_statement_data: Dict) -> Tuple[float, float]:
+    """
+    Leniency applied to the ensemble score, based on balance consistency
+    (also used by training/bulk_rescoring.py so re-scored documents match live scoring)
+
+    Args:
+        bank_statement_data: Statement data with beginning_balance, ending_balance,
+            total_credits and total_debits (numbers or {'value': ...} dicts)
+
+    Returns:
+        (leniency_factor, balance_difference)
+    """
+    # Helper to extract numeric value
+    def get_numeric(val):
+        if isinstance(val, (int, float)):
+            return float(val)
+        if isinstance(val, dict):
+            return float(val.get('value', 0.0))
+        return 0.0
+
+    beginning = get_numeric(bank_statement_data.get('beginning_balance', {}))
+    ending = get_numeric(bank_statement_data.get('ending_balance', {}))
+    credits = get_numeric(bank_statement_data.get('total_credits', {}))
+    debits = get_numeric(bank_statement_data.get('total_debits', {}))
+
+    # Calculate expected ending balance
+    expected_ending = beginning + credits - debits
+    balance_difference = abs(ending - expected_ending) if ending else 0.0
+
+    if balance_difference <= 1.0:
+        # Perfect or near-perfect balance match (≤$1 difference due to rounding)
+        # Apply strong leniency (35% reduction) for statements with consistent balances
+        return 0.65, balance_difference
+    if balance_difference <= 10.0:
+        # Small discrepancy (≤$10) - might be rounding or fees
+        # Apply moderate leniency (25% reduction)
+        return 0.75, balance_difference
+    # Significant balance inconsistency (>$10)
+    # Apply minimal leniency (10% reduction) to ensure fraud score stays high
+    return 0.90, balance_difference
+
+
 class BankStatementFraudDetector:
     """
     ML-based fraud detector for bank statements
@@ -51,9 +93,12 @@ class BankStatementFraudDetector:
         # Model paths - use bank_statement/ml/models directory (self-contained, NO FALLBACK)
         ml_dir = os.path.join(os.path.dirname(__file__), 'models')
         os.makedirs(ml_dir, exist_ok=True)
-        self.rf_model_path = os.path.join(ml_dir, 'bank_statement_random_forest.pkl')
-        self.xgb_model_path = os.path.join(ml_dir, 'bank_statement_xgboost.pkl')
-        self.scaler_path = os.path.join(ml_dir, 'bank_statement_feature_scaler.pkl')
+        # Active model bundle if one has been activated, else the legacy .pkl files
+        from training.model_artifacts import resolve_model_paths
+        model_paths = resolve_model_paths(ml_dir, 'bank_statement')
+        self.rf_model_path = model_paths['random_forest']
+        self.xgb_model_path = model_paths['xgboost']
+        self.scaler_path = model_paths['feature_scaler']
 
         # Load models
         self._load_models()
@@ -61,25 +106,25 @@ class BankStatementFraudDetector:
     def _load_models(self):
         """Load trained models from disk"""
         try:
-            # Try to load pre-trained models
-            import joblib
+            # Try to load pre-trained models (bundle arrays are memory-mapped, shared across workers)
+            from training.model_artifacts import load_model
 
             if os.path.exists(self.rf_model_path):
-                self.rf_model = joblib.load(self.rf_model_path)
+                self.rf_model = load_model(self.rf_model_path)
                 logger.info("Loaded Random Forest model for bank statements")
             else:
                 logger.error(f"Random Forest model not found at {self.rf_model_path}")
                 self.rf_model = None
 
             if os.path.exists(self.xgb_model_path):
-                self.xgb_model = joblib.load(self.xgb_model_path)
+                self.xgb_model = load_model(self.xgb_model_path)
                 logger.info("Loaded XGBoost model for bank statements")
             else:
                 logger.error(f"XGBoost model not found at {self.xgb_model_path}")
                 self.xgb_model = None
 
             if os.path.exists(self.scaler_path):
-                self.scaler = joblib.load(self.scaler_path)
+                self.scaler = load_model(self.scaler_path)
                 logger.info("Loaded feature scaler for bank statements")
             else:
                 logger.error(f"Feature scaler not found at {self.scaler_path}")
@@ -142,128 +187,106 @@ class BankStatementFraudDetector:
             )
         
         # Use models - no fallback
-        return self._predict_with_models(features, feature_names, bank_statement_data)
+        return self._predict_with_models([features], feature_names, [bank_statement_data])[0]
+
+    def predict_fraud_batch(self, bank_statements: List[Dict], raw_texts: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Predict fraud likelihood for many bank statements at once
+
+        Features for all statements are extracted into one matrix, scaled once,
+        and each model is run once for the whole batch. Anomalies and fraud
+        types are then produced per statement from the batched scores.
+
+        Args:
+            bank_statements: Extracted bank statement data dicts
+            raw_texts: Raw OCR text per statement (optional, same order)
+
+        Returns:
+            List of results in input order, each the same shape as predict_fraud().
+            Statements whose features could not be extracted or whose prediction
+            could not be built get {'error': ...}.
+        """
+        if not bank_statements:
+            return []
+
+        if not self.models_loaded:
+            raise RuntimeError(
+                "ML models are not loaded. Bank statement fraud detection requires trained models. "
+                f"Expected models at: {self.rf_model_path} and {self.xgb_model_path}. "
+                "Please ensure models are trained and available."
+            )
 
-    def _predict_with_models(self, features: List[float], feature_names: List[str], bank_statement_data: Dict) -> Dict:
-        """Predict using trained models"""
+        raw_texts = raw_texts or [""] * len(bank_statements)
+        feature_names = self.feature_extractor.get_feature_names()
+
+        results: List[Optional[Dict]] = [None] * len(bank_statements)
+        batch_indices = []
+        batch_features = []
+        for index, (statement, raw_text) in enumerate(zip(bank_statements, raw_texts)):
+            try:
+                batch_features.append(self.feature_extractor.extract_features(statement, raw_text or ""))
+                batch_indices.append(index)
+            except Exception as e:
+                logger.warning(f"Feature extraction failed for bank statement {index} in batch: {e}")
+                results[index] = {'error': f'Feature extraction failed: {str(e)}'}
+
+        logger.info(f"Extracted features for {len(batch_indices)}/{len(bank_statements)} bank statements in batch")
+
+        if batch_indices:
+            batch_results = self._predict_with_models(
+                batch_features, feature_names, [bank_statements[index] for index in batch_indices],
+                isolate_errors=True
+            )
+            for index, result in zip(batch_indices, batch_results):
+                results[index] = result
+
+        return results
+
+    def _score_model(self, model, X: np.ndarray) -> np.ndarray:
+        """Fraud probability per row for one model (regressor scores 0-100 are normalized to 0-1)"""
+        if model is None:
+            return np.zeros(len(X))
+        try:
+            # Try predict_proba first (if classifier)
+            proba = model.predict_proba(X)
+            return proba[:, 1] if proba.shape[1] > 1 else proba[:, 0]
+        except AttributeError:
+            # Use predict() for regressors and normalize (0-100 -> 0-1)
+            return np.clip(np.asarray(model.predict(X), dtype=float) / 100.0, 0.0, 1.0)
+
+    def _predict_with_models(self, features_batch: List[List[float]], feature_names: List[str],
+                             bank_statements: List[Dict], isolate_errors: bool = False) -> List[Dict]:
+        """
+        Predict using trained models (one model call per batch)
+
+        Args:
+            isolate_errors: Return {'error': ...} for a statement whose prediction cannot be
+                built instead of failing the whole batch (model errors always raise)
+        """
         try:
             # Convert to numpy array
-            X = np.array([features])
+            X = np.array(features_batch, dtype=float)
 
             # Scale features if scaler available
             if self.scaler:
                 X = self.scaler.transform(X)
 
-            # Get predictions from each model (regressors return risk scores 0-100, normalize to 0-1)
-            rf_score = 0.0
-            xgb_score = 0.0
+            # Get predictions from each model
+            rf_scores = self._score_model(self.rf_model, X)
+            xgb_scores = self._score_model(self.xgb_model, X)
 
-            if self.rf_model:
-                try:
-                    # Try predict_proba first (if classifier)
-                    rf_proba = self.rf_model.predict_proba(X)[0]
-                    rf_score = rf_proba[1] if len(rf_proba) > 1 else rf_proba[0]
-                except AttributeError:
-                    # Use predict() for regressors and normalize (0-100 -> 0-1)
-                    rf_pred = self.rf_model.predict(X)[0]
-                    rf_score = max(0.0, min(1.0, rf_pred / 100.0))
-
-            if self.xgb_model:
+            results = []
+            for index, (features, bank_statement_data, rf_score, xgb_score) in enumerate(
+                    zip(features_batch, bank_statements, rf_scores, xgb_scores)):
                 try:
-                    # Try predict_proba first (if classifier)
-                    xgb_proba = self.xgb_model.predict_proba(X)[0]
-                    xgb_score = xgb_proba[1] if len(xgb_proba) > 1 else xgb_proba[0]
-                except AttributeError:
-                    # Use predict() for regressors and normalize (0-100 -> 0-1)
-                    xgb_pred = self.xgb_model.predict(X)[0]
-                    xgb_score = max(0.0, min(1.0, xgb_pred / 100.0))
-
-            # Ensemble prediction (40% RF, 60% XGB)
-            ensemble_score = (0.4 * rf_score) + (0.6 * xgb_score)
-
-            # INTELLIGENT LENIENCY: Apply different leniency based on balance consistency
-            # Check if balances are consistent to determine appropriate leniency factor
-            beginning_balance = bank_statement_data.get('beginning_balance', {})
-            ending_balance = bank_statement_data.get('ending_balance', {})
-            total_credits = bank_statement_data.get('total_credits', {})
-            total_debits = bank_statement_data.get('total_debits', {})
-
-            # Helper to extract numeric value
-            def get_numeric(val):
-                if isinstance(val, (int, float)):
-                    return float(val)
-                if isinstance(val, dict):
-                    return float(val.get('value', 0.0))
-                return 0.0
-
-            beginning = get_numeric(beginning_balance)
-            ending = get_numeric(ending_balance)
-            credits = get_numeric(total_credits)
-            debits = get_numeric(total_debits)
-
-            # Calculate expected ending balance
-            expected_ending = beginning + credits - debits
-            balance_difference = abs(ending - expected_ending) if ending else 0.0
-
-            # Determine leniency factor based on balance consistency
-            if balance_difference <= 1.0:
-                # Perfect or near-perfect balance match (≤$1 difference due to rounding)
-                # Apply strong leniency (35% reduction) for statements with consistent balances
-                leniency_factor = 0.65
-                logger.info(f"Balance consistency: PERFECT (diff=${balance_difference:.2f}) → Applying strong leniency (0.65)")
-            elif balance_difference <= 10.0:
-                # Small discrepancy (≤$10) - might be rounding or fees
-                # Apply moderate leniency (25% reduction)
-                leniency_factor = 0.75
-                logger.info(f"Balance consistency: GOOD (diff=${balance_difference:.2f}) → Applying moderate leniency (0.75)")
-            else:
-                # Significant balance inconsistency (>$10)
-                # Apply minimal leniency (10% reduction) to ensure fraud score stays high
-                leniency_factor = 0.90
-                logger.info(f"Balance consistency: POOR (diff=${balance_difference:.2f}) → Applying minimal leniency (0.90)")
-
-            final_score = ensemble_score * leniency_factor
-
-            # Get feature importance
-            feature_importance = self._get_feature_importance(features, feature_names)
-            
-            # Log top contributing features for debugging high fraud scores
-            if final_score > 0.30:
-                logger.info(f"High fraud risk score ({final_score:.1%}) detected. Analyzing contributing features...")
-                feature_values = list(zip(feature_names, features))
-                # Sort by feature value (highest first) to see what's contributing
-                sorted_features = sorted(feature_values, key=lambda x: abs(x[1]), reverse=True)
-                top_features = sorted_features[:10]  # Top 10 features
-                logger.info(f"Top contributing features to fraud score:")
-                for feat_name, feat_value in top_features:
-                    logger.info(f"  - {feat_name}: {feat_value:.4f}")
-
-            # Determine risk level
-            risk_level = self._determine_risk_level(final_score)
-
-            # Generate anomalies
-            anomalies = self._generate_anomalies(bank_statement_data, features, feature_names, final_score)
-
-            # Classify fraud types
-            fraud_classification = self._classify_fraud_types(
-                features, feature_names, bank_statement_data, anomalies
-            )
-
-            return {
-                'fraud_risk_score': round(final_score, 4),
-                'risk_level': risk_level,
-                'model_confidence': round(max(rf_score, xgb_score), 4),
-                'model_scores': {
-                    'random_forest': round(rf_score, 4),
-                    'xgboost': round(xgb_score, 4),
-                    'ensemble': round(ensemble_score, 4),
-                    'adjusted': round(final_score, 4)
-                },
-                'feature_importance': feature_importance,
-                'anomalies': anomalies,
-                'fraud_types': fraud_classification.get('fraud_types', []),
-                'fraud_reasons': fraud_classification.get('fraud_reasons', [])
-            }
+                    results.append(self._build_prediction(features, feature_names, bank_statement_data,
+                                                          float(rf_score), float(xgb_score)))
+                except Exception as e:
+                    if not isolate_errors:
+                        raise
+                    logger.warning(f"Prediction failed for bank statement {index} in batch: {e}")
+                    results.append({'error': f'Prediction failed: {str(e)}'})
+            return results
 
         except Exception as e:
             logger.error(f"Error in model prediction: {e}", exc_info=True)
@@ -272,6 +295,64 @@ class BankStatementFraudDetector:
                 f"Error: {str(e)}"
             ) from e
 
+    def _build_prediction(self, features: List[float], feature_names: List[str], bank_statement_data: Dict,
+                          rf_score: float, xgb_score: float) -> Dict:
+        """Turn one statement's model scores into the prediction result"""
+        # Ensemble prediction (40% RF, 60% XGB)
+        ensemble_score = (0.4 * rf_score) + (0.6 * xgb_score)
+
+        # INTELLIGENT LENIENCY: Apply different leniency based on balance consistency
+        leniency_factor, balance_difference = balance_leniency_factor(bank_statement_data)
+        if leniency_factor == 0.65:
+            logger.info(f"Balance consistency: PERFECT (diff=${balance_difference:.2f}) → Applying strong leniency (0.65)")
+        elif leniency_factor == 0.75:
+            logger.info(f"Balance consistency: GOOD (diff=${balance_difference:.2f}) → Applying moderate leniency (0.75)")
+        else:
+            logger.info(f"Balance consistency: POOR (diff=${balance_difference:.2f}) → Applying minimal leniency (0.90)")
+
+        final_score = ensemble_score * leniency_factor
+
+        # Get feature importance
+        feature_importance = self._get_feature_importance(features, feature_names)
+        
+        # Log top contributing features for debugging high fraud scores
+        if final_score > 0.30:
+            logger.info(f"High fraud risk score ({final_score:.1%}) detected. Analyzing contributing features...")
+            feature_values = list(zip(feature_names, features))
+            # Sort by feature value (highest first) to see what's contributing
+            sorted_features = sorted(feature_values, key=lambda x: abs(x[1]), reverse=True)
+            top_features = sorted_features[:10]  # Top 10 features
+            logger.info(f"Top contributing features to fraud score:")
+            for feat_name, feat_value in top_features:
+                logger.info(f"  - {feat_name}: {feat_value:.4f}")
+
+        # Determine risk level
+        risk_level = self._determine_risk_level(final_score)
+
+        # Generate anomalies
+        anomalies = self._generate_anomalies(bank_statement_data, features, feature_names, final_score)
+
+        # Classify fraud types
+        fraud_classification = self._classify_fraud_types(
+            features, feature_names, bank_statement_data, anomalies
+        )
+
+        return {
+            'fraud_risk_score': round(final_score, 4),
+            'risk_level': risk_level,
+            'model_confidence': round(max(rf_score, xgb_score), 4),
+            'model_scores': {
+                'random_forest': round(rf_score, 4),
+                'xgboost': round(xgb_score, 4),
+                'ensemble': round(ensemble_score, 4),
+                'adjusted': round(final_score, 4)
+            },
+            'feature_importance': feature_importance,
+            'anomalies': anomalies,
+            'fraud_types': fraud_classification.get('fraud_types', []),
+            'fraud_reasons': fraud_classification.get('fraud_reasons', [])
+        }
+
     def _determine_risk_level(self, score: float) -> str:
         """Determine risk level from score"""
         if score < 0.30:
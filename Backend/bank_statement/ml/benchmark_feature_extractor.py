@@ -0,0 +1,74 @@
+"""
+Benchmark BankStatementFeatureExtractor on large statements
+
+Usage (from Backend/):
+    python -m bank_statement.ml.benchmark_feature_extractor --lines 5000 --repeat 20
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict
+
+from bank_statement.ml.bank_statement_feature_extractor import BankStatementFeatureExtractor
+
+DATE_STYLES = ['%Y-%m-%d', '%m/%d/%Y', '%b %d, %Y']
+DESCRIPTIONS = ['ATM WITHDRAWAL', 'PAYROLL DEPOSIT', 'POS PURCHASE GROCERY', 'ONLINE TRANSFER', 'CHECK #1042']
+
+
+def build_statement(lines: int, seed: int = 7) -> Dict:
+    """Build a synthetic statement with `lines` transactions over one month"""
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    date_style = rng.choice(DATE_STYLES)
+    transactions = []
+    for _ in range(lines):
+        day = start + timedelta(days=rng.randint(0, 30))
+        amount = round(rng.uniform(-2500, 2500), 2)
+        transactions.append({
+            'date': day.strftime(date_style),
+            'amount': {'value': amount} if rng.random() < 0.5 else f"${amount:,.2f}",
+            'description': rng.choice(DESCRIPTIONS)
+        })
+    return {
+        'bank_name': 'Chase',
+        'account_number': '123456789012',
+        'account_holder_name': 'Jane Doe',
+        'beginning_balance': 15000.0,
+        'ending_balance': 15000.0 + sum(
+            t['amount']['value'] if isinstance(t['amount'], dict) else float(t['amount'].replace('$', '').replace(',', ''))
+            for t in transactions
+        ),
+        'statement_period_start_date': start.isoformat(),
+        'statement_period_end_date': (start + timedelta(days=30)).isoformat(),
+        'transactions': transactions
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bank statement feature extraction')
+    parser.add_argument('--lines', type=int, default=5000, help='Transactions per statement')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed iterations')
+    args = parser.parse_args()
+
+    extractor = BankStatementFeatureExtractor()
+    statement = build_statement(args.lines)
+    extractor.extract_features(statement)  # warm-up
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        extractor.extract_features(statement)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    print(f"{args.lines} transactions x {args.repeat} runs")
+    print(f"  median: {timings[len(timings) // 2]:.2f} ms")
+    print(f"  min:    {timings[0]:.2f} ms")
+    print(f"  max:    {timings[-1]:.2f} ms")
+    print(f"  throughput: {args.lines / (timings[len(timings) // 2] / 1000):,.0f} transactions/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Test Bank Statement Feature Extractor
+Verifies the transaction features computed from the single-pass columnar parse.
+"""
+
+import sys
+import os
+import unittest
+
+# Add Backend directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from bank_statement.ml.bank_statement_feature_extractor import BankStatementFeatureExtractor
+
+
+class TestBankStatementFeatureExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = BankStatementFeatureExtractor()
+        self.names = self.extractor.get_feature_names()
+        self.statement = {
+            'bank_name': 'Chase',
+            'account_number': '12345678',
+            'beginning_balance': 1000.0,
+            'ending_balance': 23450.0,
+            'statement_period_start_date': '2024-01-01',
+            'statement_period_end_date': '01/31/2024',
+            'transactions': [
+                {'date': '2024-01-06', 'amount': '$25,000.00', 'description': 'WIRE IN'},    # Saturday
+                {'date': '01/08/2024', 'amount': {'value': -500.0}, 'description': 'RENT'},
+                {'date': '01/08/2024', 'amount': {'value': -500.0}, 'description': 'RENT'},  # duplicate
+                {'date': 'Feb 3, 2024', 'amount': -50, 'description': 'ATM'},               # outside period, Saturday
+                {'date': 'not a date', 'amount': 0, 'description': None},
+                'malformed row'
+            ]
+        }
+
+    def _features(self):
+        return dict(zip(self.names, self.extractor.extract_features(self.statement)))
+
+    def test_amount_features(self):
+        features = self._features()
+        self.assertEqual(features['transaction_count'], 6)
+        self.assertAlmostEqual(features['avg_transaction_amount'], (25000 + 500 + 500 + 50) / 4)
+        self.assertEqual(features['max_transaction_amount'], 25000.0)
+        self.assertEqual(features['suspicious_transaction_pattern'], 1.0)
+        self.assertEqual(features['large_transaction_count'], 1)
+        self.assertEqual(features['total_credits'], 25000.0)
+        self.assertEqual(features['total_debits'], 1050.0)
+        self.assertEqual(features['balance_volatility'], 10.0)
+
+    def test_date_features(self):
+        features = self._features()
+        self.assertAlmostEqual(features['transaction_date_consistency'], 3 / 6)
+        self.assertAlmostEqual(features['unusual_timing'], 2 / 6)
+        self.assertEqual(features['duplicate_transactions'], 0.5)
+
+    def test_no_transactions(self):
+        self.statement['transactions'] = []
+        features = self._features()
+        self.assertEqual(features['avg_transaction_amount'], 0.0)
+        self.assertEqual(features['transaction_date_consistency'], 0.5)
+        self.assertEqual(features['duplicate_transactions'], 0.0)
+        self.assertEqual(features['unusual_timing'], 0.0)
+        self.assertEqual(features['balance_volatility'], 0.0)
+        self.assertEqual(len(self.extractor.extract_features(self.statement)), 35)
+
+
+if __name__ == '__main__':
+    unittest.main()
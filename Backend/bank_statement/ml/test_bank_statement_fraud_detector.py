@@ -0,0 +1,118 @@
+"""
+Test Bank Statement Fraud Detector
+Verifies that batch scoring matches single-document scoring.
+"""
+
+import sys
+import os
+import unittest
+
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+# Add Backend directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from bank_statement.ml.bank_statement_feature_extractor import BankStatementFeatureExtractor
+from bank_statement.ml.bank_statement_fraud_detector import BankStatementFraudDetector
+
+
+class _CountingModel:
+    """Wraps a model and counts scoring calls"""
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.model, name)
+        if name in ('predict', 'predict_proba'):
+            def counted(X):
+                self.calls += 1
+                return attr(X)
+            return counted
+        return attr
+
+
+def _statement(index):
+    return {
+        'bank_name': 'Chase' if index % 2 else 'Unknown Bank',
+        'account_number': '12345678',
+        'account_holder_name': 'Jane Doe' if index % 3 else None,
+        'beginning_balance': 1000.0 + index,
+        'ending_balance': 1500.0 if index % 4 else 99999.0,
+        'statement_period_start_date': '2024-01-01',
+        'statement_period_end_date': '2024-01-31',
+        'transactions': [
+            {'date': '2024-01-05', 'amount': 500.0, 'description': 'DEPOSIT'},
+            {'date': '2024-01-06', 'amount': -25000.0 * (index % 2), 'description': 'WIRE'}
+        ]
+    }
+
+
+class TestBatchPrediction(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.RandomState(0)
+        X = rng.rand(200, 35) * 10
+        y = (X[:, 0] + X[:, 5] > 10).astype(int)
+        cls.scaler = StandardScaler().fit(X)
+        X_scaled = cls.scaler.transform(X)
+        cls.rf = RandomForestClassifier(n_estimators=10, random_state=0).fit(X_scaled, y)
+        cls.regressor = GradientBoostingRegressor(n_estimators=10, random_state=0).fit(X_scaled, y * 100.0)
+
+    def setUp(self):
+        # Bypass model loading from disk
+        self.detector = BankStatementFraudDetector.__new__(BankStatementFraudDetector)
+        self.detector.feature_extractor = BankStatementFeatureExtractor()
+        self.detector.rf_model = _CountingModel(self.rf)
+        self.detector.xgb_model = _CountingModel(self.regressor)  # exercises the predict() path
+        self.detector.scaler = self.scaler
+        self.detector.models_loaded = True
+        self.detector.rf_model_path = self.detector.xgb_model_path = 'unused'
+
+    def test_batch_matches_single(self):
+        statements = [_statement(i) for i in range(8)]
+        batch = self.detector.predict_fraud_batch(statements)
+        self.assertEqual(self.detector.rf_model.calls, 1)
+        self.assertEqual(self.detector.xgb_model.calls, 1)
+
+        single = [self.detector.predict_fraud(statement) for statement in statements]
+        self.assertEqual(batch, single)
+
+    def test_extraction_failure_isolated(self):
+        statements = [_statement(0), {'transactions': [{'amount': {'value': None}}]}, _statement(1)]
+        results = self.detector.predict_fraud_batch(statements, raw_texts=['', '', 'text'])
+        self.assertIn('error', results[1])
+        self.assertIn('fraud_risk_score', results[0])
+        self.assertIn('fraud_risk_score', results[2])
+
+    def test_prediction_failure_isolated(self):
+        statements = [_statement(0), _statement(1), _statement(2)]
+        build = self.detector._build_prediction
+
+        def failing_build(features, feature_names, data, rf_score, xgb_score):
+            if data is statements[1]:
+                raise ValueError('bad statement')
+            return build(features, feature_names, data, rf_score, xgb_score)
+
+        self.detector._build_prediction = failing_build
+        results = self.detector.predict_fraud_batch(statements)
+        self.assertEqual(results[1], {'error': 'Prediction failed: bad statement'})
+        self.assertIn('fraud_risk_score', results[0])
+        self.assertIn('fraud_risk_score', results[2])
+        # Single-document prediction still raises
+        with self.assertRaises(RuntimeError):
+            self.detector.predict_fraud(statements[1])
+
+    def test_empty_batch_and_models_missing(self):
+        self.assertEqual(self.detector.predict_fraud_batch([]), [])
+        self.detector.models_loaded = False
+        with self.assertRaises(RuntimeError):
+            self.detector.predict_fraud_batch([_statement(0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
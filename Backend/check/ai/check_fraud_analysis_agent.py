@@ -24,14 +24,25 @@ except ImportError as e:
     logger.warning(f"LangChain not available: {e}")
 
 from .check_prompts import (
-    SYSTEM_PROMPT,
-    RECOMMENDATION_GUIDELINES,
+    INSTRUCTION_PREFIX,
+    COMPACTION_LEVELS,
     format_analysis_template
 )
 from .check_tools import CheckDataAccessTools
+from . import check_prompts
+from utils.llm_cache import LLMResponseCache
+from utils.decision_tiers import DecisionTierEngine
+from utils.prompt_budget import fit_prompt
+from utils.structured_output import invoke_structured
+from utils.resilience import ResilientClient, openai_client_kwargs
+from database.similar_cases import find_similar_cases
+from database.institution_fraud_stats import get_institution_stats
 
 logger = logging.getLogger(__name__)
 
+_llm_cache = LLMResponseCache('check', prompt_modules=[check_prompts])
+_decision_tiers = DecisionTierEngine('check')
+
 
 class CheckFraudAnalysisAgent:
     """
@@ -70,7 +81,9 @@ class CheckFraudAnalysisAgent:
                     llm_kwargs['max_tokens'] = 1500
                     llm_kwargs['temperature'] = 0.7  # Custom temperature for older models
                 
-                self.llm = ChatOpenAI(**llm_kwargs)
+                # Deadline, retries and circuit breaking are handled by utils.resilience
+                llm_kwargs.update(openai_client_kwargs())
+                self.llm = ResilientClient(ChatOpenAI(**llm_kwargs), 'openai')
                 logger.info(f"Initialized CheckFraudAnalysisAgent with LangChain model: {model}")
             except Exception as e:
                 logger.warning(f"Could not initialize LangChain: {e}")
@@ -101,6 +114,7 @@ class CheckFraudAnalysisAgent:
         Returns:
             AI analysis dict with recommendation, confidence, reasoning, etc.
         """
+        _decision_tiers.record_document()
         if not payer_name:
             payer_name = extracted_data.get('payer_name')
 
@@ -203,6 +217,14 @@ class CheckFraudAnalysisAgent:
                     customer_info['is_duplicate'] = True
                     customer_info['duplicate_check_number'] = check_number
 
+            # Clear-cut ML scores are decided without the LLM
+            tier_decision = _decision_tiers.decide(
+                payer_name, ml_analysis, customer_info, is_duplicate=is_duplicate,
+                validate=lambda decision: self._validate_and_format_result(decision, ml_analysis, customer_info)
+            )
+            if tier_decision:
+                return tier_decision
+
             # Apply LLM guardrails before formatting prompt
             from real_time.guardrails import InputGuard
             
@@ -228,57 +250,40 @@ class CheckFraudAnalysisAgent:
             
             logger.info("Applied LLM guardrails: sanitized PII and validated input length")
             
-            # Format the analysis prompt with sanitized data
-            analysis_prompt = format_analysis_template(
-                check_data=sanitized_extracted_data,
-                ml_analysis=ml_analysis,
-                customer_info=sanitized_customer_info
+            # Nearest previously rejected / escalated checks
+            similar_cases = find_similar_cases('check', extracted_data, ml_analysis)
+            institution_stats = get_institution_stats(extracted_data.get('bank_name'), 'check')
+
+            # Format the analysis prompt with sanitized data, compacted to the model's token budget
+            full_prompt, _ = fit_prompt(
+                'check', self.model_name, INSTRUCTION_PREFIX,
+                lambda **limits: InputGuard.sanitize(format_analysis_template(
+                    check_data=sanitized_extracted_data,
+                    ml_analysis=ml_analysis,
+                    customer_info=sanitized_customer_info,
+                    similar_cases=similar_cases,
+                    institution_stats=institution_stats,
+                    **limits
+                )),
+                COMPACTION_LEVELS
             )
 
-            # Sanitize the full prompt before sending
-            full_prompt = f"{analysis_prompt}\n\n{RECOMMENDATION_GUIDELINES}"
-            full_prompt = InputGuard.sanitize(full_prompt)
-            
-            # Validate final prompt length
-            if not InputGuard.validate_length(full_prompt, max_chars=15000):
-                logger.error("Final prompt exceeds length limit, truncating")
-                full_prompt = full_prompt[:15000]
-
             # Create LangChain prompt - full_prompt is already formatted, so pass it directly
             # Don't use .from_template() since full_prompt already has { } in JSON schema
             from langchain_core.messages import SystemMessage, HumanMessage
+            from utils.llm_schemas import DocumentDecision
 
-            system_msg = SystemMessage(content=SYSTEM_PROMPT)
+            system_msg = SystemMessage(content=INSTRUCTION_PREFIX)
             user_msg = HumanMessage(content=full_prompt)
             messages = [system_msg, user_msg]
 
             # Generate analysis using LangChain
             logger.info("Calling LangChain LLM for check fraud analysis...")
-            response = self.llm.invoke(messages)
-
-            # Parse response
-            ai_response = response.content
-            logger.info(f"Received LLM response (length: {len(ai_response)} chars)")
-            logger.info(f"LLM raw response: {ai_response[:500]}...")  # Log first 500 chars
-
-            # Strip markdown code blocks if present (LLM sometimes wraps JSON in ```json ... ```)
-            ai_response_cleaned = ai_response.strip()
-            if ai_response_cleaned.startswith('```json'):
-                ai_response_cleaned = ai_response_cleaned[7:]  # Remove ```json
-            elif ai_response_cleaned.startswith('```'):
-                ai_response_cleaned = ai_response_cleaned[3:]  # Remove ```
-            if ai_response_cleaned.endswith('```'):
-                ai_response_cleaned = ai_response_cleaned[:-3]  # Remove trailing ```
-            ai_response_cleaned = ai_response_cleaned.strip()
-
-            # Try to parse as JSON
-            try:
-                result = json.loads(ai_response_cleaned)
-                logger.info(f"Successfully parsed LLM response as JSON")
-            except json.JSONDecodeError as e:
-                logger.warning(f"Failed to parse LLM response as JSON: {e}")
-                # If not JSON, try to extract structured data from text
-                result = self._parse_text_response(ai_response_cleaned)
+            decision = invoke_structured(
+                self.llm, messages, DocumentDecision, cache=_llm_cache, model_name=self.model_name
+            )
+            result = decision.model_dump(exclude_none=True)
+            logger.info("Received schema-validated LLM response")
 
             # Log what the LLM returned before validation
             logger.info(f"LLM returned recommendation: {result.get('recommendation')}")
@@ -399,38 +404,6 @@ class CheckFraudAnalysisAgent:
             'fraud_explanations': []
         }
 
-    def _parse_text_response(self, text_response: str) -> Dict:
-        """Parse text response if JSON parsing fails"""
-        # Simple heuristic parsing
-        result = {
-            'recommendation': 'ESCALATE',  # Default to safe option
-            'confidence_score': 0.7,
-            'summary': text_response[:200],
-            'reasoning': [],
-            'key_indicators': [],
-            'actionable_recommendations': [],
-            'fraud_types': [],
-            'fraud_explanations': []
-        }
-
-        # Try to extract recommendation
-        text_lower = text_response.lower()
-        if 'approve' in text_lower and 'reject' not in text_lower:
-            result['recommendation'] = 'APPROVE'
-        elif 'reject' in text_lower:
-            result['recommendation'] = 'REJECT'
-        else:
-            result['recommendation'] = 'ESCALATE'
-
-        # Extract reasoning (look for bullet points or numbered lists)
-        lines = text_response.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.startswith(('-', '*', '•')) or (len(line) > 2 and line[0].isdigit() and line[1] in '.):'): 
-                result['reasoning'].append(line.lstrip('-*•0123456789.) '))
-
-        return result
-
     def _validate_and_format_result(self, result: Dict, ml_analysis: Dict, customer_info: Dict) -> Dict:
         """Validate and format the AI result"""
         # Ensure required fields exist
@@ -3,6 +3,10 @@ Check Fraud Analysis AI Prompts
 System prompts and decision logic for check fraud analysis agent
 """
 
+from utils.prompt_budget import compact_items
+from database.similar_cases import format_similar_cases
+from database.institution_fraud_stats import format_institution_stats
+
 # System prompt for the check fraud analysis agent
 SYSTEM_PROMPT = """You are an expert check fraud analyst specializing in bank check verification and fraud detection.
 
@@ -173,10 +177,20 @@ Last Recommendation: {last_recommendation}
 Duplicate Check Detected: {is_duplicate}
 {duplicate_info}
 
+## INSTITUTION HISTORY
+Previously processed checks from this bank (for context only - a bank's fraud rate is not evidence about this document):
+{institution_stats}
+
+## SIMILAR HISTORICAL CASES
+Nearest previously rejected or escalated checks (for context only - decide on this document's own evidence):
+{similar_cases}
+
 ## TASK
 Based on the above information and the decision guidelines below, provide your fraud analysis.
 
-Return your analysis in the following JSON format:
+**CRITICAL: You MUST return ONLY valid JSON. Do not include markdown code blocks, explanations, or any text outside the JSON object.**
+
+Return your analysis in the following JSON format (valid JSON only, no markdown):
 
 **FOR APPROVE DECISIONS:**
 {{
@@ -229,6 +243,8 @@ Return your analysis in the following JSON format:
 - **CRITICAL**: For checks with future dates, only include STALE_CHECK, never routing or bank support issues
 - **CRITICAL**: Do NOT mention ML fraud risk scores, ML model confidence, or any ML-related metrics in fraud explanations
 - **CRITICAL**: Fraud explanations should only reference document data (signature status, amounts, dates, etc.), NOT ML scores
+
+**REMINDER: Return ONLY the JSON object. No markdown formatting, no code blocks, no explanations before or after the JSON.**
 """
 
 # Decision guidelines based on customer type and ML scores
@@ -359,7 +375,10 @@ Similar Cases: {similar_cases}
 Are there patterns that match known fraud cases?
 """
 
-def format_analysis_template(check_data: dict, ml_analysis: dict, customer_info: dict) -> str:
+def format_analysis_template(check_data: dict, ml_analysis: dict, customer_info: dict,
+                             max_risk_factors: int = None, similar_cases: list = None,
+                             max_similar_cases: int = None,
+                             institution_stats: dict = None) -> str:
     """
     Format the analysis template with actual data
 
@@ -367,6 +386,10 @@ def format_analysis_template(check_data: dict, ml_analysis: dict, customer_info:
         check_data: Extracted check data
         ml_analysis: ML fraud analysis results
         customer_info: Customer history information
+        max_risk_factors: Risk factors listed before the rest are summarized (None lists all)
+        similar_cases: Similar historical cases (database.similar_cases)
+        max_similar_cases: Similar cases listed (None lists all)
+        institution_stats: Fraud statistics of the bank (database.institution_fraud_stats)
 
     Returns:
         Formatted prompt string
@@ -402,6 +425,7 @@ def format_analysis_template(check_data: dict, ml_analysis: dict, customer_info:
     risk_factors = ml_analysis.get('feature_importance', [])
     if not risk_factors:
         risk_factors = ml_analysis.get('anomalies', [])
+    risk_factors = compact_items(risk_factors, max_risk_factors, 'risk factors')
     risk_factors_str = '\n'.join([f"- {factor}" for factor in risk_factors]) if risk_factors else "None"
 
     # Extract customer info
@@ -484,5 +508,18 @@ def format_analysis_template(check_data: dict, ml_analysis: dict, customer_info:
         escalate_count=escalate_count,
         last_recommendation=last_recommendation,
         is_duplicate='Yes' if is_duplicate else 'No',
-        duplicate_info=duplicate_info
+        duplicate_info=duplicate_info,
+        similar_cases=format_similar_cases(similar_cases, max_similar_cases),
+        institution_stats=format_institution_stats(institution_stats)
     )
+
+
+# Static prefix sent before every analysis - kept byte-identical so provider prompt caching applies
+INSTRUCTION_PREFIX = f"{SYSTEM_PROMPT}\n\n{RECOMMENDATION_GUIDELINES}"
+
+# format_analysis_template limits, most to least detailed, tried until the prompt fits the token budget
+COMPACTION_LEVELS = (
+    {},
+    {'max_risk_factors': 10, 'max_similar_cases': 3},
+    {'max_risk_factors': 3, 'max_similar_cases': 1}
+)
@@ -20,17 +20,8 @@ load_dotenv()
 from config import Config
 logger = Config.get_logger(__name__)
 
-# Import Mindee - use ClientV2 API (requires mindee>=4.31.0)
-try:
-    from mindee import ClientV2, InferenceParameters, PathInput
-    MINDEE_AVAILABLE = True
-except ImportError as e:
-    logger.error(f"Mindee library not properly installed: {e}")
-    logger.error("Requires mindee>=4.31.0. Install with: pip install --upgrade 'mindee>=4.31.0'")
-    MINDEE_AVAILABLE = False
-    ClientV2 = None
-    InferenceParameters = None
-    PathInput = None
+# Mindee ClientV2 (requires mindee>=4.31.0) is imported and built on first extraction
+from lazy_components import get_mindee_client
 
 # Import check-specific components from local modules
 from .normalization.check_normalizer_factory import CheckNormalizerFactory
@@ -55,13 +46,6 @@ logger.info(f"Mindee Account Name: {MINDEE_ACCOUNT_NAME or 'Not set (will use de
 
 if not MINDEE_API_KEY:
     logger.warning("MINDEE_API_KEY is not set - check extraction may fail")
-    mindee_client = None
-elif not MINDEE_AVAILABLE:
-    logger.error("Mindee library not available")
-    mindee_client = None
-else:
-    mindee_client = ClientV2(api_key=MINDEE_API_KEY)
-    logger.info("Mindee ClientV2 initialized successfully")
 
 
 class CheckExtractor:
@@ -161,6 +145,7 @@ class CheckExtractor:
 
     def _extract_with_mindee(self, file_path: str) -> Tuple[Dict, str]:
         """Extract check data using Mindee API only (no fallback, with caching)"""
+        mindee_client = get_mindee_client()
         if not mindee_client:
             raise RuntimeError("Mindee client not initialized. Check API key and installation.")
 
@@ -190,6 +175,8 @@ class CheckExtractor:
             logger.info(f"Extracting with Mindee using model ID: {MINDEE_MODEL_ID_CHECK}")
             
             # Create inference parameters with the model ID (as per API docs)
+            from mindee import InferenceParameters, PathInput
+
             params = InferenceParameters(model_id=MINDEE_MODEL_ID_CHECK, raw_text=True)
             input_source = PathInput(file_path)
             
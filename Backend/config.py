@@ -97,6 +97,20 @@ class Config:
     CACHE_TTL = int(os.getenv('CACHE_TTL', '3600'))  # Default 1 hour
     CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'true').lower() == 'true'
 
+    # ==================== PIPELINE MODULE SETTINGS ====================
+    # Read from the environment by their modules at call time (so scripts and tests can change
+    # them at runtime), not through Config; see each module for defaults:
+    #   LLM_CACHE_ENABLED, LLM_CACHE_TTL   utils/llm_cache.py
+    #   LLM_BYPASS_*                       utils/decision_tiers.py
+    #   RESILIENCE_<PROVIDER>_*            utils/resilience.py
+    #   PROVIDER_CASSETTE_*                utils/cassettes.py
+    #   SIMILAR_CASES_*                    database/similar_cases.py
+    #   INSTITUTION_STATS_CACHE_TTL        database/institution_fraud_stats.py
+
+    # ==================== LOAD TESTING ====================
+    # Per-stage Server-Timing headers on API responses
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+
     @classmethod
     def validate(cls) -> list:
         """
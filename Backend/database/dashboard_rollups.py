@@ -0,0 +1,195 @@
+"""
+Dashboard Rollups
+Maintains per-day, per-document-type and per-risk-level summary rows (document_daily_rollups)
+incrementally as documents are stored, and serves dashboard summaries from them.
+See setup_dashboard_rollups.sql for the table and increment function.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from database.fraud_scores import normalize_fraud_score
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = 'document_daily_rollups'
+
+# Same thresholds as the dashboard (0-1 scale)
+HIGH_RISK_THRESHOLD = 0.75
+FRAUD_THRESHOLD = 0.70
+
+# date_filter values accepted by the list endpoints -> (min_days_old, max_days_old)
+DATE_FILTERS = {
+    'last_30': (None, 30),
+    'last_60': (None, 60),
+    'last_90': (None, 90),
+    'older': (91, None)
+}
+
+
+def build_rollup_increment(document_type: str, ml_analysis: Optional[Dict], ai_analysis: Optional[Dict],
+                           day: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Build the increment_document_rollup RPC parameters for one stored document
+
+    Args:
+        document_type: Type of document (check, paystub, bank_statement, money_order)
+        ml_analysis: ML analysis result (fraud_risk_score, risk_level)
+        ai_analysis: AI analysis result (recommendation)
+        day: Day to attribute the document to (defaults to today, UTC)
+
+    Returns:
+        Dict of RPC parameters
+    """
+    ml_analysis = ml_analysis or {}
+    ai_analysis = ai_analysis or {}
+    score = normalize_fraud_score(ml_analysis.get('fraud_risk_score'))
+    recommendation = str(ai_analysis.get('recommendation') or 'UNKNOWN').upper()
+    risk_level = str(ml_analysis.get('risk_level') or 'UNKNOWN').upper()
+    day = day or datetime.utcnow().date()
+
+    return {
+        'p_day': day.isoformat(),
+        'p_document_type': document_type,
+        'p_risk_level': risk_level,
+        'p_ai_recommendation': recommendation,
+        'p_high_risk': 1 if score >= HIGH_RISK_THRESHOLD else 0,
+        'p_fraud': 1 if score >= FRAUD_THRESHOLD or recommendation == 'REJECT' else 0,
+        'p_risk_score': round(score, 6)
+    }
+
+
+def summarize_rollups(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate rollup rows into dashboard summaries
+
+    Args:
+        rows: Rows from document_daily_rollups
+
+    Returns:
+        Dict with totals, by_day, by_type, by_risk_level and by_recommendation
+    """
+    totals = {'document_count': 0, 'high_risk_count': 0, 'fraud_count': 0, 'risk_score_sum': 0.0}
+    by_day: Dict[str, Dict[str, float]] = {}
+    by_type: Dict[str, Dict[str, float]] = {}
+    by_risk_level: Dict[str, int] = {}
+    by_recommendation: Dict[str, int] = {}
+
+    for row in rows:
+        count = int(row.get('document_count') or 0)
+        high_risk = int(row.get('high_risk_count') or 0)
+        fraud = int(row.get('fraud_count') or 0)
+        score_sum = float(row.get('risk_score_sum') or 0)
+
+        for bucket in (
+            totals,
+            by_day.setdefault(str(row.get('day')), {'document_count': 0, 'high_risk_count': 0, 'fraud_count': 0, 'risk_score_sum': 0.0}),
+            by_type.setdefault(row.get('document_type') or 'unknown', {'document_count': 0, 'high_risk_count': 0, 'fraud_count': 0, 'risk_score_sum': 0.0})
+        ):
+            bucket['document_count'] += count
+            bucket['high_risk_count'] += high_risk
+            bucket['fraud_count'] += fraud
+            bucket['risk_score_sum'] += score_sum
+
+        risk_level = row.get('risk_level') or 'UNKNOWN'
+        by_risk_level[risk_level] = by_risk_level.get(risk_level, 0) + count
+        recommendation = row.get('ai_recommendation') or 'UNKNOWN'
+        by_recommendation[recommendation] = by_recommendation.get(recommendation, 0) + count
+
+    def _finish(bucket: Dict[str, float]) -> Dict[str, Any]:
+        count = bucket['document_count']
+        return {
+            'document_count': count,
+            'high_risk_count': bucket['high_risk_count'],
+            'fraud_count': bucket['fraud_count'],
+            'fraud_rate': round(bucket['fraud_count'] / count * 100, 1) if count else 0.0,
+            'avg_risk_score': round(bucket['risk_score_sum'] / count * 100, 1) if count else 0.0
+        }
+
+    return {
+        'totals': _finish(totals),
+        'by_day': [dict(date=day, **_finish(bucket)) for day, bucket in sorted(by_day.items())],
+        'by_type': [dict(document_type=doc_type, **_finish(bucket)) for doc_type, bucket in sorted(by_type.items())],
+        'by_risk_level': by_risk_level,
+        'by_recommendation': by_recommendation
+    }
+
+
+class DashboardRollups:
+    """Read and maintain document_daily_rollups"""
+
+    def __init__(self):
+        """Initialize Supabase client"""
+        from database.supabase_client import get_supabase
+        self.supabase = get_supabase()
+
+    def record_document(self, document_type: str, ml_analysis: Optional[Dict], ai_analysis: Optional[Dict]) -> bool:
+        """
+        Increment the rollups for a newly stored document. Failures are logged, never raised,
+        so a missing rollup table never blocks document storage.
+
+        Returns:
+            True if the rollup was updated
+        """
+        params = build_rollup_increment(document_type, ml_analysis, ai_analysis)
+        try:
+            self.supabase.rpc('increment_document_rollup', params).execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Could not update dashboard rollup for {document_type} "
+                           f"(run database/setup_dashboard_rollups.sql): {e}")
+            return False
+
+    def get_summary(self, document_type: Optional[str] = None, date_filter: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get dashboard summary from the rollups
+
+        Args:
+            document_type: Restrict to one document type
+            date_filter: 'last_30', 'last_60', 'last_90' or 'older'
+
+        Returns:
+            Summary dict (see summarize_rollups)
+        """
+        filters = []
+        if document_type:
+            filters.append(('eq', 'document_type', document_type))
+        if date_filter in DATE_FILTERS:
+            today = datetime.utcnow().date()
+            min_days_old, max_days_old = DATE_FILTERS[date_filter]
+            if max_days_old is not None:
+                filters.append(('gte', 'day', (today - timedelta(days=max_days_old)).isoformat()))
+            if min_days_old is not None:
+                filters.append(('lte', 'day', (today - timedelta(days=min_days_old)).isoformat()))
+
+        # Rollup rows are bounded by days x types x risk levels x recommendations, page anyway
+        rows = []
+        page_size = 1000
+        offset = 0
+        while True:
+            query = self.supabase.table(ROLLUP_TABLE).select(
+                'day, document_type, risk_level, ai_recommendation, document_count, high_risk_count, fraud_count, risk_score_sum'
+            )
+            for operator, column, value in filters:
+                query = getattr(query, operator)(column, value)
+            response = query.order('day').range(offset, offset + page_size - 1).execute()
+            page_data = response.data or []
+            rows.extend(page_data)
+            if len(page_data) < page_size:
+                break
+            offset += page_size
+
+        return summarize_rollups(rows)
+
+
+# Global instance
+_dashboard_rollups: Optional[DashboardRollups] = None
+
+
+def get_dashboard_rollups() -> DashboardRollups:
+    """Get or create the global dashboard rollups instance"""
+    global _dashboard_rollups
+    if _dashboard_rollups is None:
+        _dashboard_rollups = DashboardRollups()
+    return _dashboard_rollups
@@ -0,0 +1,187 @@
+"""
+Document Search
+Ranked search for the document search endpoints, backed by the trigram-indexed
+RPC functions in setup_document_search.sql with a short-TTL result cache for type-ahead.
+"""
+
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from utils.cache import get_cache_manager
+
+logger = logging.getLogger(__name__)
+
+# Characters that would break a PostgREST or_() filter expression
+_FILTER_UNSAFE = re.compile(r'[,()*]')
+
+# Seconds before an RPC that was not installed is tried again (picks up the migration without a restart)
+RPC_REPROBE_SECONDS = 300
+
+
+def is_missing_function_error(error: Exception) -> bool:
+    """Whether an RPC error means the function is not installed (PostgREST PGRST202 / Postgres 42883)"""
+    code = str(getattr(error, 'code', '') or '')
+    message = str(error).lower()
+    return (code in ('PGRST202', '42883') or 'could not find the function' in message
+            or ('function' in message and 'does not exist' in message))
+
+
+class DocumentSearch:
+    """Search documents, checks, money orders and bank statements"""
+
+    # Search kind -> RPC function, fallback source, searched fields and ordering column
+    SEARCH_SPECS = {
+        'documents': {
+            'rpc': 'search_documents',
+            'source': 'v_documents_with_risk',
+            'fields': ['file_name', 'document_id'],
+            'order_by': 'upload_date'
+        },
+        'checks': {
+            'rpc': 'search_checks',
+            'source': 'v_checks_analysis',
+            'fields': ['payer_name', 'payee_name'],
+            'order_by': 'created_at'
+        },
+        'money_orders': {
+            'rpc': 'search_money_orders',
+            'source': 'v_money_orders_analysis',
+            'fields': ['purchaser_name', 'payee_name'],
+            'order_by': 'created_at'
+        },
+        'bank_statements': {
+            # account_holder_name is the stored column (the old endpoint filtered on a non-existent account_holder)
+            'rpc': 'search_bank_statements',
+            'source': 'bank_statements',
+            'fields': ['account_holder_name', 'bank_name'],
+            'order_by': 'created_at'
+        }
+    }
+
+    def __init__(self, cache_ttl: Optional[int] = None, supabase=None):
+        """
+        Initialize document search
+
+        Args:
+            cache_ttl: Seconds to cache results for identical queries (0 disables caching)
+            supabase: Supabase client (defaults to get_supabase())
+        """
+        if supabase is None:
+            from database.supabase_client import get_supabase
+            supabase = get_supabase()
+        self.supabase = supabase
+        self.cache = get_cache_manager()
+        self.cache_ttl = cache_ttl if cache_ttl is not None else int(os.getenv('SEARCH_CACHE_TTL', '30'))
+        # Kind -> monotonic time its RPC was found missing (fallback until RPC_REPROBE_SECONDS have passed)
+        self._rpc_missing_since: Dict[str, float] = {}
+
+    def search(self, kind: str, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Run a ranked search
+
+        Args:
+            kind: One of SEARCH_SPECS keys
+            query: Search text
+            limit: Maximum number of results
+
+        Returns:
+            List of matching rows, exact and prefix matches first
+        """
+        spec = self.SEARCH_SPECS[kind]
+        query = query.strip()
+        if not query:
+            return []
+
+        cache_key = None
+        if self.cache_ttl:
+            cache_key = self.cache._generate_key(f'search:{kind}', query.lower(), limit)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Search cache HIT: {kind} '{query}'")
+                return cached
+
+        results = None
+        missing_since = self._rpc_missing_since.get(kind)
+        if missing_since is None or time.monotonic() - missing_since >= RPC_REPROBE_SECONDS:
+            results = self._search_rpc(kind, spec, query, limit)
+        if results is None:
+            results = self._search_fallback(spec, query, limit)
+
+        if cache_key:
+            self.cache.set(cache_key, results, ttl=self.cache_ttl)
+        return results
+
+    def _search_rpc(self, kind: str, spec: Dict, query: str, limit: int) -> Optional[List[Dict]]:
+        """
+        Search through the indexed RPC function
+
+        Returns:
+            Matching rows, or None to use the fallback for this call. Only a missing
+            function switches the kind to the fallback (re-probed after RPC_REPROBE_SECONDS);
+            other errors, e.g. timeouts, fall back for this call alone.
+        """
+        try:
+            response = self.supabase.rpc(spec['rpc'], {'search_query': query, 'max_results': limit}).execute()
+        except Exception as e:
+            if is_missing_function_error(e):
+                if kind not in self._rpc_missing_since:
+                    logger.warning(f"Search RPC {spec['rpc']} not available, using ILIKE fallback "
+                                   f"(run database/setup_document_search.sql): {e}")
+                self._rpc_missing_since[kind] = time.monotonic()
+            else:
+                logger.warning(f"Search RPC {spec['rpc']} failed, using ILIKE fallback for this query: {e}")
+            return None
+        self._rpc_missing_since.pop(kind, None)
+        return response.data or []
+
+    def _search_fallback(self, spec: Dict, query: str, limit: int) -> List[Dict]:
+        """Unindexed ILIKE search, ranked in Python"""
+        fields = spec['fields']
+        safe_query = _FILTER_UNSAFE.sub(' ', query).strip()
+        if not safe_query:
+            return []
+        try:
+            filters = ','.join(f'{field}.ilike.%{safe_query}%' for field in fields)
+            response = self.supabase.table(spec['source']).select('*').or_(filters).order(spec['order_by'], desc=True).limit(limit).execute()
+        except Exception:
+            # Fallback: search the primary field only if or_ doesn't work
+            response = self.supabase.table(spec['source']).select('*').ilike(fields[0], f'%{safe_query}%').order(
+                spec['order_by'], desc=True).limit(limit).execute()
+        return rank_results(response.data or [], fields, query)
+
+
+def rank_results(rows: List[Dict], fields: List[str], query: str) -> List[Dict]:
+    """
+    Order rows by best match across fields: exact, then prefix, then substring.
+    Ties keep their incoming (recency) order.
+    """
+    needle = query.strip().lower()
+
+    def match_rank(row: Dict) -> int:
+        best = 3
+        for field in fields:
+            value = str(row.get(field) or '').lower()
+            if value == needle:
+                return 0
+            if value.startswith(needle):
+                best = min(best, 1)
+            elif needle in value:
+                best = min(best, 2)
+        return best
+
+    return sorted(rows, key=match_rank)
+
+
+# Global instance
+_document_search: Optional[DocumentSearch] = None
+
+
+def get_document_search() -> DocumentSearch:
+    """Get or create the global document search instance"""
+    global _document_search
+    if _document_search is None:
+        _document_search = DocumentSearch()
+    return _document_search
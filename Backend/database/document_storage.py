@@ -81,60 +81,11 @@ class DocumentStorage:
                 logger.warning("No banks found in financial_institutions table, using original name")
                 return bank_name_upper
             
-            # Get all bank names from database (stored in UPPERCASE)
-            db_bank_names = [inst.get('name', '').upper().strip() for inst in response.data if inst.get('name')]
-            
-            # Keyword matching: Check if input contains keywords from any bank name
-            # Split input into keywords (words)
-            input_keywords = set(bank_name_upper.split())
-            
-            best_match = None
-            best_match_score = 0
-            
-            # Sort db_bank_names by length (longer names first) to prefer more specific matches
-            # This ensures "WELLS FARGO BANK" is checked before "WELLS FARGO"
-            # Even if "WELLS FARGO" is an exact match, we prefer "WELLS FARGO BANK" if it exists
-            sorted_db_banks = sorted(db_bank_names, key=lambda x: (len(x), x), reverse=True)
-            
-            for db_bank in sorted_db_banks:
-                if not db_bank:
-                    continue
-                
-                # Split database bank name into keywords
-                db_keywords = set(db_bank.split())
-                
-                # Calculate match score based on keyword overlap
-                # Higher score = more keywords match
-                common_keywords = input_keywords.intersection(db_keywords)
-                match_score = len(common_keywords)
-                
-                # Bonus for exact match (but still prefer longer matches)
-                if bank_name_upper == db_bank:
-                    match_score += 10
-                # Bonus for substring match
-                elif bank_name_upper in db_bank or db_bank in bank_name_upper:
-                    match_score += 8
-                
-                # CRITICAL: Prefer longer/more specific matches (e.g., "WELLS FARGO BANK" over "WELLS FARGO")
-                # Add significant bonus based on length - longer names get much higher priority
-                # This ensures "WELLS FARGO BANK" (18 chars) beats "WELLS FARGO" (11 chars)
-                match_score += len(db_bank) * 0.5  # Increased from 0.2 to 0.5
-                
-                # Special handling for Wells Fargo - ALWAYS prefer "WELLS FARGO BANK" over "WELLS FARGO"
-                if 'WELLS' in input_keywords and 'FARGO' in input_keywords:
-                    if 'WELLS' in db_keywords and 'FARGO' in db_keywords:
-                        match_score += 5
-                        # CRITICAL: Extra large bonus if it contains "BANK" (prefer "WELLS FARGO BANK")
-                        if 'BANK' in db_keywords:
-                            match_score += 30  # Increased from 20 to 30 to ensure "WELLS FARGO BANK" always wins
-                
-                if match_score > best_match_score:
-                    best_match_score = match_score
-                    best_match = db_bank
-            
-            # If we found a good match (at least 1 keyword match), return it
-            if best_match and best_match_score > 0:
-                logger.info(f"Matched '{bank_name}' to '{best_match}' from financial_institutions table (score: {best_match_score:.1f})")
+            # Keyword matching against all bank names (stored in UPPERCASE)
+            from database.institution_fraud_stats import match_institution_name
+            best_match = match_institution_name(bank_name, [inst.get('name') for inst in response.data])
+            if best_match:
+                logger.info(f"Matched '{bank_name}' to '{best_match}' from financial_institutions table")
                 return best_match
             
             # If no match found, log and return original uppercase
@@ -449,6 +400,35 @@ class DocumentStorage:
         except Exception as e:
             logger.warning(f"Error updating document status: {e}")
     
+    def _record_rollup(self, document_type: str, ml_analysis: Optional[Dict], ai_analysis: Optional[Dict]):
+        """Increment dashboard rollups for a stored document (never raises)"""
+        try:
+            from database.dashboard_rollups import get_dashboard_rollups
+            get_dashboard_rollups().record_document(document_type, ml_analysis, ai_analysis)
+        except Exception as e:
+            logger.warning(f"Error updating dashboard rollups: {e}")
+
+    def _record_institution_stats(self, document_type: str, institution_name: Optional[str], amount: Any,
+                                  ml_analysis: Optional[Dict], ai_analysis: Optional[Dict]):
+        """Increment per-institution fraud stats for a stored document (never raises)"""
+        try:
+            from database.institution_fraud_stats import get_institution_fraud_stats
+            get_institution_fraud_stats().record_document(institution_name, document_type, amount, ml_analysis, ai_analysis)
+        except Exception as e:
+            logger.warning(f"Error updating institution fraud stats: {e}")
+
+    def _record_similar_case(self, document_type: str, document_id: str, analysis_data: Dict):
+        """Add a rejected or escalated document to the similar case index (never raises)"""
+        try:
+            from database.similar_cases import get_similar_case_index, similar_cases_enabled
+            if similar_cases_enabled():
+                get_similar_case_index().add_document(
+                    document_type, document_id, analysis_data.get('extracted_data'),
+                    analysis_data.get('ml_analysis'), analysis_data.get('ai_analysis')
+                )
+        except Exception as e:
+            logger.warning(f"Error updating similar case index: {e}")
+    
     def _add_unmapped_fields(self, prepared_data: Dict, extracted_data: Dict, document_type: str) -> Dict:
         """
         Add unmapped fields from extracted_data to prepared_data.
@@ -467,25 +447,16 @@ class DocumentStorage:
         schema_manager = get_schema_manager()
         flat_extracted = schema_manager._flatten_dict(extracted_data)
         
-        # Get field mappings for this document type
-        mappings = schema_manager.FIELD_MAPPINGS.get(document_type, {})
+        # Normalized names with excluded/mapped fields removed (cached per payload shape)
+        signature = schema_manager.get_field_signature(document_type, tuple(flat_extracted.keys()))
         
-        for field_name, value in flat_extracted.items():
-            # Normalize field name
-            normalized_name = schema_manager._normalize_field_name(field_name)
+        for field_name, normalized_name in signature:
+            value = flat_extracted[field_name]
             
             # Skip if already in prepared_data
             if normalized_name in prepared_data:
                 continue
             
-            # Skip if excluded
-            if schema_manager._should_exclude_field(field_name, document_type):
-                continue
-            
-            # Skip if maps to existing field
-            if field_name.lower() in mappings:
-                continue
-            
             # Add field with appropriate conversion
             if isinstance(value, (list, dict)):
                 prepared_data[normalized_name] = json.dumps(value) if value else None
@@ -580,6 +551,8 @@ class DocumentStorage:
 
             # Update document status
             self._update_document_status(document_id, 'success')
+            self._record_rollup('money_order', ml_analysis, ai_analysis)
+            self._record_similar_case('money_order', document_id, analysis_data)
 
             return document_id
 
@@ -762,6 +735,10 @@ class DocumentStorage:
 
             # Update document status
             self._update_document_status(document_id, 'success')
+            self._record_rollup('bank_statement', ml_analysis, ai_analysis)
+            self._record_institution_stats('bank_statement', bank_name_normalized, statement_data['ending_balance'],
+                                           ml_analysis, ai_analysis)
+            self._record_similar_case('bank_statement', document_id, analysis_data)
 
             return document_id
 
@@ -883,6 +860,8 @@ class DocumentStorage:
 
             # Update document status
             self._update_document_status(document_id, 'success')
+            self._record_rollup('paystub', ml_analysis, ai_analysis)
+            self._record_similar_case('paystub', document_id, analysis_data)
 
             return document_id
 
@@ -964,6 +943,9 @@ class DocumentStorage:
 
             # Update document status
             self._update_document_status(document_id, 'success')
+            self._record_rollup('check', ml_analysis, ai_analysis)
+            self._record_institution_stats('check', bank_name_normalized, check_data['amount'], ml_analysis, ai_analysis)
+            self._record_similar_case('check', document_id, analysis_data)
 
             return document_id
 
@@ -6,10 +6,11 @@ Automatically detects new fields in extracted document data and adds them as col
 import logging
 import json
 import re
-from typing import Dict, List, Set, Optional, Any
+from typing import Dict, FrozenSet, Iterable, List, Optional, Any, Tuple
 from datetime import datetime
 import requests
 from database.supabase_client import get_supabase
+from database.schema_registry import SchemaRegistry, FieldSignature
 import os
 
 logger = logging.getLogger(__name__)
@@ -58,16 +59,17 @@ class DynamicSchemaManager:
         }
     }
     
-    def __init__(self, enabled: bool = True):
+    def __init__(self, enabled: bool = True, cache_ttl: Optional[float] = None):
         """
         Initialize the Dynamic Schema Manager
         
         Args:
             enabled: Whether automatic column addition is enabled
+            cache_ttl: Seconds before cached column sets are reloaded (None = until invalidated)
         """
         self.enabled = enabled
         self.supabase = get_supabase()
-        self._column_cache: Dict[str, Set[str]] = {}  # Cache table columns
+        self.registry = SchemaRegistry(ttl_seconds=cache_ttl)  # Cache table columns and field signatures
         
     def _get_supabase_service_key(self) -> Optional[str]:
         """Get Supabase service role key for admin operations"""
@@ -216,7 +218,7 @@ class DynamicSchemaManager:
         logger.warning(f"{sql}")
         return False
     
-    def _get_table_columns(self, table_name: str, use_cache: bool = True) -> Set[str]:
+    def _get_table_columns(self, table_name: str, use_cache: bool = True) -> FrozenSet[str]:
         """
         Get existing columns for a table
         
@@ -227,8 +229,10 @@ class DynamicSchemaManager:
         Returns:
             Set of column names
         """
-        if use_cache and table_name in self._column_cache:
-            return self._column_cache[table_name]
+        if use_cache:
+            cached_columns = self.registry.get_columns(table_name)
+            if cached_columns is not None:
+                return cached_columns
         
         columns = set()
         
@@ -274,8 +278,7 @@ class DynamicSchemaManager:
                     cursor.close()
                     conn.close()
                     logger.debug(f"Retrieved {len(columns)} columns for {table_name} via direct DB connection")
-                    self._column_cache[table_name] = columns
-                    return columns
+                    return self.registry.set_columns(table_name, columns)
             except ImportError:
                 pass
             except Exception as e:
@@ -293,8 +296,7 @@ class DynamicSchemaManager:
                             else:
                                 columns = set(response.data)
                     if columns:
-                        self._column_cache[table_name] = columns
-                        return columns
+                        return self.registry.set_columns(table_name, columns)
             except Exception as e:
                 logger.debug(f"RPC function not available: {e}")
             
@@ -304,8 +306,7 @@ class DynamicSchemaManager:
                 if response.data and len(response.data) > 0:
                     columns = set(response.data[0].keys())
                     logger.debug(f"Inferred {len(columns)} columns for {table_name} from sample query")
-                    self._column_cache[table_name] = columns
-                    return columns
+                    return self.registry.set_columns(table_name, columns)
             except Exception as e:
                 logger.debug(f"Could not infer columns from table query: {e}")
             
@@ -313,12 +314,11 @@ class DynamicSchemaManager:
             if not columns:
                 logger.warning(f"Could not determine columns for table {table_name}. Will attempt to add columns and catch errors.")
             
-            self._column_cache[table_name] = columns
-            return columns
+            return self.registry.set_columns(table_name, columns)
             
         except Exception as e:
             logger.error(f"Error getting columns for table {table_name}: {e}")
-            return set()
+            return frozenset()
     
     def _infer_column_type(self, value: Any, field_name: str) -> str:
         """
@@ -437,10 +437,51 @@ class DynamicSchemaManager:
         
         return False
     
+    def get_field_signature(self, document_type: str, field_names: Iterable[str]) -> FieldSignature:
+        """
+        Get the candidate columns for a set of flattened field names (cached per payload shape)
+        
+        Args:
+            document_type: Type of document
+            field_names: Flattened field names
+            
+        Returns:
+            Tuple of (field_name, normalized_column_name), excluded and mapped fields removed
+        """
+        return self.registry.get_signature(document_type, field_names, self._build_field_signature)
+    
+    def _build_field_signature(self, document_type: str, field_names: Tuple[str, ...]) -> FieldSignature:
+        """Normalize field names and drop excluded/mapped fields"""
+        return tuple(
+            (field_name, self._normalize_field_name(field_name))
+            for field_name in field_names
+            if not self._should_exclude_field(field_name, document_type)
+        )
+    
+    def _build_add_columns_sql(self, table_name: str, columns: List[Tuple[str, str]]) -> str:
+        """
+        Build a single ALTER TABLE statement adding all given columns
+        
+        Args:
+            table_name: Name of the table
+            columns: List of (column_name, column_type)
+            
+        Returns:
+            SQL statement
+        """
+        clauses = ",\n".join(
+            f"ADD COLUMN IF NOT EXISTS {column_name} {column_type} DEFAULT NULL"
+            for column_name, column_type in columns
+        )
+        return f"ALTER TABLE {table_name}\n{clauses};"
+    
     def ensure_columns_exist(self, document_type: str, extracted_data: Dict[str, Any]) -> List[str]:
         """
         Ensure all fields in extracted_data have corresponding columns in the database table.
-        Adds missing columns automatically.
+        Adds missing columns automatically, batched into a single ALTER TABLE statement.
+        
+        Once the table's column set is cached and the payload shape has been seen,
+        this makes no schema queries at all.
         
         Args:
             document_type: Type of document (check, paystub, bank_statement, money_order)
@@ -457,61 +498,36 @@ class DynamicSchemaManager:
             logger.warning(f"Unknown document type: {document_type}")
             return []
         
-        # Get existing columns
-        existing_columns = self._get_table_columns(table_name)
-        
         # Flatten extracted_data if it's nested
         flat_data = self._flatten_dict(extracted_data)
+        field_names = tuple(flat_data.keys())
+        signature = self.get_field_signature(document_type, field_names)
+        
+        # Get existing columns (cached after the first load)
+        existing_columns = self._get_table_columns(table_name)
         
         # Find missing columns
-        missing_columns = []
-        added_columns = []
+        missing = self.registry.diff(table_name, document_type, field_names, signature, existing_columns)
+        if not missing:
+            return []
         
-        for field_name, value in flat_data.items():
-            # Normalize field name
-            normalized_name = self._normalize_field_name(field_name)
-            
-            # Check if should exclude
-            if self._should_exclude_field(field_name, document_type):
-                continue
-            
-            # Check if maps to existing column
-            mappings = self.FIELD_MAPPINGS.get(document_type, {})
-            mapped_name = mappings.get(field_name.lower())
-            if mapped_name and mapped_name.lower() in existing_columns:
-                continue
-            
-            # Check if column already exists
-            if normalized_name in existing_columns:
-                continue
-            
-            # Infer column type
-            column_type = self._infer_column_type(value, field_name)
-            
-            # Add column
-            sql = f"""
-            ALTER TABLE {table_name}
-            ADD COLUMN IF NOT EXISTS {normalized_name} {column_type} DEFAULT NULL;
-            """
-            
-            logger.info(f"Adding column {normalized_name} ({column_type}) to table {table_name}")
-            
-            # Try to execute SQL
-            if self._execute_sql(sql):
-                added_columns.append(normalized_name)
-                existing_columns.add(normalized_name)  # Update cache
-            else:
-                # Log SQL for manual execution
-                logger.warning(f"Could not auto-add column. Please run manually:\n{sql}")
-                missing_columns.append((normalized_name, column_type, sql))
+        new_columns = [
+            (column_name, self._infer_column_type(flat_data[field_name], field_name))
+            for field_name, column_name in missing
+        ]
+        sql = self._build_add_columns_sql(table_name, new_columns)
         
-        # Log summary
-        if added_columns:
-            logger.info(f"Successfully added {len(added_columns)} columns to {table_name}: {added_columns}")
+        logger.info(f"Adding {len(new_columns)} columns to table {table_name}: {new_columns}")
         
-        if missing_columns:
-            logger.warning(f"Could not auto-add {len(missing_columns)} columns. SQL statements logged above.")
+        # Try to execute SQL
+        if not self._execute_sql(sql):
+            # Log SQL for manual execution
+            logger.warning(f"Could not auto-add {len(new_columns)} columns. Please run manually:\n{sql}")
+            return []
         
+        added_columns = [column_name for column_name, _ in new_columns]
+        self.registry.add_columns(table_name, added_columns)  # Update cache
+        logger.info(f"Successfully added {len(added_columns)} columns to {table_name}: {added_columns}")
         return added_columns
     
     def _flatten_dict(self, data: Dict[str, Any], parent_key: str = '', sep: str = '_') -> Dict[str, Any]:
@@ -545,10 +561,7 @@ class DynamicSchemaManager:
         Args:
             table_name: Specific table to clear cache for, or None to clear all
         """
-        if table_name:
-            self._column_cache.pop(table_name, None)
-        else:
-            self._column_cache.clear()
+        self.registry.invalidate(table_name)
 
 
 # Global instance
@@ -572,7 +585,8 @@ def get_schema_manager(enabled: Optional[bool] = None) -> DynamicSchemaManager:
         enabled = os.getenv('ENABLE_AUTO_COLUMN_ADDITION', 'true').lower() == 'true'
     
     if _schema_manager is None:
-        _schema_manager = DynamicSchemaManager(enabled=enabled)
+        cache_ttl = float(os.getenv('SCHEMA_CACHE_TTL', '0'))
+        _schema_manager = DynamicSchemaManager(enabled=enabled, cache_ttl=cache_ttl)
     elif enabled != _schema_manager.enabled:
         _schema_manager.enabled = enabled
     
@@ -0,0 +1,28 @@
+"""
+Fraud Score Normalization
+Shared conversion of stored / ML fraud risk scores to the 0-1 scale used by the
+dashboard rollups, institution fraud stats and the similar case index.
+"""
+
+import math
+from typing import Any
+
+
+def normalize_fraud_score(value: Any) -> float:
+    """
+    Convert a fraud risk score to 0-1 scale (scores above 1 are percentages)
+
+    Args:
+        value: Score as a number or numeric string (0-1 or 0-100)
+
+    Returns:
+        Score in 0-1 scale; 0.0 for missing, non-numeric, NaN or infinite values,
+        which would otherwise end up as invalid JSON in RPC payloads
+    """
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if not math.isfinite(score):
+        return 0.0
+    return score / 100.0 if score > 1 else score
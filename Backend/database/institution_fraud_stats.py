@@ -0,0 +1,407 @@
+"""
+Institution Fraud Stats
+Maintains per-institution fraud statistics (institution_fraud_stats) incrementally as bank
+statements and checks are stored, and serves them to the agents from an in-process TTL cache.
+See setup_institution_fraud_stats.sql for the table and increment function.
+
+One row per (normalized financial_institutions name, document type) holds document, reject
+and escalate counts, the ML score sum, fraud type counts and a histogram of amounts over
+fixed log-scale buckets, so fraud rate, fraud-type mix and amount percentiles are all read
+from a single row instead of scanning bank_statements / checks.
+
+Fraud types are counted by primary label only (the first AI fraud type), the one value
+bank_statements.fraud_types / checks.fraud_type store, so the SQL backfill and the live
+increments produce the same counts.
+"""
+
+import os
+import math
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from database.fraud_scores import normalize_fraud_score
+
+logger = logging.getLogger(__name__)
+
+STATS_TABLE = 'institution_fraud_stats'
+STATS_COLUMNS = ('institution_name, document_type, document_count, reject_count, escalate_count, '
+                 'risk_score_sum, fraud_type_counts, amount_histogram')
+
+# Amount histogram: bucket 0 holds amounts below $1, bucket b >= 1 holds
+# [10^((b-1)/16), 10^(b/16)), i.e. about 15% wide, up to $100M (the SQL backfill uses the same formula)
+AMOUNT_BUCKETS_PER_DECADE = 16
+MAX_AMOUNT_BUCKET = 8 * AMOUNT_BUCKETS_PER_DECADE + 1
+AMOUNT_PERCENTILES = (50, 90, 99)
+
+DEFAULT_CACHE_TTL = 300.0
+
+
+def _parse_amount(value: Any) -> Optional[float]:
+    if isinstance(value, dict):
+        value = value.get('value')
+    if isinstance(value, str):
+        value = value.replace('$', '').replace(',', '').strip()
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        return None
+    return amount if math.isfinite(amount) else None
+
+
+def fraud_type_label(fraud_type: Any) -> Optional[str]:
+    """Fraud type as stored in bank_statements / checks ('BALANCE_INCONSISTENCY' -> 'Balance Inconsistency')"""
+    if not fraud_type or not isinstance(fraud_type, str):
+        return None
+    return fraud_type.replace('_', ' ').strip().title() or None
+
+
+def match_institution_name(bank_name: Optional[str], institution_names: Iterable[str]) -> Optional[str]:
+    """
+    Best keyword match of a raw bank name among financial_institutions names
+
+    Args:
+        bank_name: Raw bank name from extraction
+        institution_names: Names from the financial_institutions table
+
+    Returns:
+        Matched name (UPPERCASE), or None when no name shares a keyword or substring
+    """
+    if not bank_name:
+        return None
+    bank_name_upper = bank_name.upper().strip()
+    input_keywords = set(bank_name_upper.split())
+
+    best_match = None
+    best_match_score = 0
+
+    # Longer names first, so "WELLS FARGO BANK" is checked before "WELLS FARGO"
+    db_bank_names = {name.upper().strip() for name in institution_names if name}
+    for db_bank in sorted(db_bank_names, key=lambda x: (len(x), x), reverse=True):
+        if not db_bank:
+            continue
+        db_keywords = set(db_bank.split())
+
+        # Higher score = more keywords match
+        common_keywords = input_keywords.intersection(db_keywords)
+        if not common_keywords and bank_name_upper not in db_bank and db_bank not in bank_name_upper:
+            continue
+        match_score = len(common_keywords)
+
+        # Bonus for exact match (but still prefer longer matches)
+        if bank_name_upper == db_bank:
+            match_score += 10
+        # Bonus for substring match
+        elif bank_name_upper in db_bank or db_bank in bank_name_upper:
+            match_score += 8
+
+        # Prefer longer/more specific matches (e.g., "WELLS FARGO BANK" over "WELLS FARGO")
+        match_score += len(db_bank) * 0.5
+
+        # Always prefer "WELLS FARGO BANK" over "WELLS FARGO"
+        if 'WELLS' in input_keywords and 'FARGO' in input_keywords:
+            if 'WELLS' in db_keywords and 'FARGO' in db_keywords:
+                match_score += 5
+                if 'BANK' in db_keywords:
+                    match_score += 30
+
+        if match_score > best_match_score:
+            best_match_score = match_score
+            best_match = db_bank
+
+    return best_match
+
+
+def amount_bucket(amount: Any) -> Optional[int]:
+    """Histogram bucket of an amount (None when the amount is missing)"""
+    amount = _parse_amount(amount)
+    if amount is None:
+        return None
+    if amount < 1:
+        return 0
+    return min(int(math.floor(math.log10(amount) * AMOUNT_BUCKETS_PER_DECADE)) + 1, MAX_AMOUNT_BUCKET)
+
+
+def bucket_bounds(bucket: int) -> Tuple[float, float]:
+    """Amount range [low, high) covered by a histogram bucket"""
+    if bucket <= 0:
+        return 0.0, 1.0
+    return (10 ** ((bucket - 1) / AMOUNT_BUCKETS_PER_DECADE), 10 ** (bucket / AMOUNT_BUCKETS_PER_DECADE))
+
+
+def histogram_percentile(histogram: Optional[Dict[Any, Any]], pct: float) -> Optional[float]:
+    """
+    Approximate percentile of the amounts in a histogram
+
+    Args:
+        histogram: Bucket (int or str) -> count
+        pct: Percentile (0-100)
+
+    Returns:
+        Amount, interpolated geometrically within its bucket (within ~8%), or None for no amounts
+    """
+    counts = sorted((int(bucket), int(count)) for bucket, count in (histogram or {}).items() if int(count) > 0)
+    total = sum(count for _, count in counts)
+    if not total:
+        return None
+    rank = pct / 100.0 * total
+    seen = 0
+    for bucket, count in counts:
+        if seen + count >= rank:
+            low, high = bucket_bounds(bucket)
+            fraction = min(max((rank - seen) / count, 0.0), 1.0)
+            if bucket == 0:
+                return low + (high - low) * fraction
+            return low * (high / low) ** fraction
+        seen += count
+    return bucket_bounds(counts[-1][0])[1]
+
+
+def build_stats_increment(institution_name: str, document_type: str, amount: Any,
+                          ml_analysis: Optional[Dict], ai_analysis: Optional[Dict]) -> Dict[str, Any]:
+    """
+    Build the increment_institution_fraud_stats RPC parameters for one stored document
+
+    Args:
+        institution_name: Normalized financial_institutions name
+        document_type: 'bank_statement' or 'check'
+        amount: Amount of the document (statement ending balance, check amount)
+        ml_analysis: ML analysis result (fraud_risk_score)
+        ai_analysis: AI analysis result (recommendation, fraud_types; only the primary type is counted)
+
+    Returns:
+        Dict of RPC parameters
+    """
+    ml_analysis = ml_analysis or {}
+    ai_analysis = ai_analysis or {}
+    recommendation = str(ai_analysis.get('recommendation') or '').upper()
+    fraud_types = ai_analysis.get('fraud_types') or []
+    if isinstance(fraud_types, str):
+        fraud_types = [fraud_types]
+    # Primary label only, matching what the document tables (and so the backfill) hold
+    primary = fraud_type_label(fraud_types[0]) if fraud_types else None
+    bucket = amount_bucket(amount)
+
+    return {
+        'p_institution_name': institution_name.upper().strip(),
+        'p_document_type': document_type,
+        'p_reject': 1 if recommendation == 'REJECT' else 0,
+        'p_escalate': 1 if recommendation == 'ESCALATE' else 0,
+        'p_risk_score': round(normalize_fraud_score(ml_analysis.get('fraud_risk_score')), 6),
+        'p_fraud_types': [primary] if primary else [],
+        'p_amount_buckets': [str(bucket)] if bucket is not None else []
+    }
+
+
+def summarize_institution_stats(row: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Agent-facing statistics from an institution_fraud_stats row
+
+    Args:
+        row: Row from institution_fraud_stats (None for an institution without history)
+
+    Returns:
+        Dict with total_documents_processed, fraud_rate and escalation_rate (REJECT / ESCALATE
+        share, 0-1), average_fraud_score (0-1), fraud_type_mix (share of documents per type),
+        common_fraud_patterns (most frequent types first) and amount_percentiles (p50/p90/p99)
+    """
+    row = row or {}
+    count = int(row.get('document_count') or 0)
+    fraud_type_counts = {name: int(value) for name, value in (row.get('fraud_type_counts') or {}).items()}
+    ranked_types = sorted(fraud_type_counts.items(), key=lambda item: (-item[1], item[0]))
+    histogram = row.get('amount_histogram') or {}
+
+    percentiles = {}
+    for pct in AMOUNT_PERCENTILES:
+        value = histogram_percentile(histogram, pct)
+        if value is not None:
+            percentiles[f"p{pct}"] = round(value, 2)
+
+    return {
+        'institution_name': row.get('institution_name'),
+        'document_type': row.get('document_type'),
+        'total_documents_processed': count,
+        'fraud_rate': round(int(row.get('reject_count') or 0) / count, 4) if count else 0.0,
+        'escalation_rate': round(int(row.get('escalate_count') or 0) / count, 4) if count else 0.0,
+        'average_fraud_score': round(float(row.get('risk_score_sum') or 0) / count, 4) if count else 0.0,
+        'fraud_type_mix': {name: round(value / count, 4) for name, value in ranked_types} if count else {},
+        'common_fraud_patterns': [name for name, _ in ranked_types[:5]],
+        'amount_percentiles': percentiles
+    }
+
+
+def format_institution_stats(stats: Optional[Dict[str, Any]], max_fraud_types: Optional[int] = 3) -> str:
+    """
+    Institution statistics as a prompt line
+
+    Args:
+        stats: Result of InstitutionFraudStats.get_stats()
+        max_fraud_types: Fraud types listed (None lists all)
+
+    Returns:
+        One line, or a note that the institution has no history
+    """
+    count = (stats or {}).get('total_documents_processed', (stats or {}).get('total_statements_processed'))
+    if not count:
+        return "No processing history for this institution"
+    mix = list((stats.get('fraud_type_mix') or {}).items())
+    if max_fraud_types is not None:
+        mix = mix[:max_fraud_types]
+    fraud_types = ', '.join(f"{name} ({share:.0%})" for name, share in mix)
+    if not mix:
+        # Stats without a mix (mock data) list their patterns only
+        fraud_types = ', '.join((stats.get('common_fraud_patterns') or [])[:max_fraud_types]) or 'none recorded'
+    percentiles = stats.get('amount_percentiles') or {}
+    amounts = ', '.join(f"{name} ${value:,.0f}" for name, value in percentiles.items()) or 'n/a'
+    return (
+        f"{stats.get('institution_name') or 'Institution'}: {count:,} documents, "
+        f"rejected {stats.get('fraud_rate', 0.0):.1%}, escalated {stats.get('escalation_rate', 0.0):.1%}, "
+        f"average ML score {stats.get('average_fraud_score', 0.0):.0%}, fraud types: {fraud_types}, "
+        f"amounts (approx.): {amounts}"
+    )
+
+
+class InstitutionFraudStats:
+    """Read and maintain institution_fraud_stats"""
+
+    def __init__(self, cache_ttl: Optional[float] = None):
+        """
+        Initialize Supabase client
+
+        Args:
+            cache_ttl: Seconds served stats and the institution name list are cached
+                       (default INSTITUTION_STATS_CACHE_TTL, 0 disables)
+        """
+        from database.supabase_client import get_supabase
+        self.supabase = get_supabase()
+        self.cache_ttl = float(os.getenv('INSTITUTION_STATS_CACHE_TTL', DEFAULT_CACHE_TTL)) if cache_ttl is None else cache_ttl
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+        self._institution_names: Optional[Tuple[float, List[str]]] = None
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._cache[key]
+                return None
+            return value
+
+    def _store(self, key, value):
+        if self.cache_ttl > 0:
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self.cache_ttl, value)
+
+    def institution_names(self) -> List[str]:
+        """financial_institutions names (UPPERCASE), cached for the cache TTL"""
+        with self._lock:
+            if self._institution_names and time.monotonic() < self._institution_names[0]:
+                return self._institution_names[1]
+        response = self.supabase.table('financial_institutions').select('name').execute()
+        names = [inst['name'].upper().strip() for inst in (response.data or []) if inst.get('name')]
+        if self.cache_ttl > 0:
+            with self._lock:
+                self._institution_names = (time.monotonic() + self.cache_ttl, names)
+        return names
+
+    def normalize_name(self, bank_name: Optional[str]) -> Optional[str]:
+        """Raw bank name -> financial_institutions name (original uppercased when unmatched)"""
+        if not bank_name:
+            return None
+        return match_institution_name(bank_name, self.institution_names()) or bank_name.upper().strip()
+
+    def record_document(self, institution_name: Optional[str], document_type: str, amount: Any,
+                        ml_analysis: Optional[Dict], ai_analysis: Optional[Dict]) -> bool:
+        """
+        Increment the stats of an institution for a newly stored document. Failures are logged,
+        never raised, so a missing stats table never blocks document storage.
+
+        Args:
+            institution_name: Normalized bank name as stored with the document
+
+        Returns:
+            True if the stats were updated
+        """
+        if not institution_name:
+            return False
+        params = build_stats_increment(institution_name, document_type, amount, ml_analysis, ai_analysis)
+        try:
+            self.supabase.rpc('increment_institution_fraud_stats', params).execute()
+        except Exception as e:
+            logger.warning(f"Could not update institution fraud stats for {document_type} "
+                           f"(run database/setup_institution_fraud_stats.sql): {e}")
+            return False
+        # Other workers pick the change up when their cache entry expires
+        with self._lock:
+            self._cache.pop((params['p_institution_name'], document_type), None)
+        return True
+
+    def get_stats(self, bank_name: Optional[str], document_type: str = 'bank_statement') -> Dict[str, Any]:
+        """
+        Fraud statistics of an institution
+
+        Args:
+            bank_name: Raw or normalized bank name
+            document_type: 'bank_statement' or 'check'
+
+        Returns:
+            Dict from summarize_institution_stats() (zero counts for an unknown institution),
+            or {} when no bank name is given
+        """
+        institution_name = self.normalize_name(bank_name)
+        if not institution_name:
+            return {}
+        key = (institution_name, document_type)
+        stats = self._cached(key)
+        if stats is not None:
+            return stats
+
+        response = self.supabase.table(STATS_TABLE).select(STATS_COLUMNS).eq(
+            'institution_name', institution_name
+        ).eq('document_type', document_type).limit(1).execute()
+        row = (response.data or [None])[0]
+        stats = summarize_institution_stats(row)
+        stats['institution_name'] = institution_name
+        stats['document_type'] = document_type
+        self._store(key, stats)
+        return stats
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+            self._institution_names = None
+
+
+# Global instance
+_institution_fraud_stats: Optional[InstitutionFraudStats] = None
+_instance_lock = threading.Lock()
+
+
+def get_institution_fraud_stats() -> InstitutionFraudStats:
+    """Get or create the global institution fraud stats instance"""
+    global _institution_fraud_stats
+    if _institution_fraud_stats is None:
+        with _instance_lock:
+            if _institution_fraud_stats is None:
+                _institution_fraud_stats = InstitutionFraudStats()
+    return _institution_fraud_stats
+
+
+def get_institution_stats(bank_name: Optional[str], document_type: str = 'bank_statement') -> Dict[str, Any]:
+    """
+    Institution statistics for an agent prompt (never raises)
+
+    Returns:
+        Stats from InstitutionFraudStats.get_stats(), or {} when unavailable
+    """
+    if not bank_name:
+        return {}
+    try:
+        return get_institution_fraud_stats().get_stats(bank_name, document_type)
+    except Exception as e:
+        logger.warning(f"Institution fraud stats unavailable: {e}")
+        return {}
@@ -0,0 +1,157 @@
+"""
+Schema Registry
+In-process cache of table column sets and per-document-type field signatures.
+Lets DynamicSchemaManager skip schema queries entirely once a table is warm.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (original field name, normalized column name)
+FieldSignature = Tuple[Tuple[str, str], ...]
+
+
+class SchemaRegistry:
+    """
+    Caches column sets per table with a version counter per table.
+
+    Every change to a table's column set (load, add, invalidate) bumps its
+    version, which implicitly invalidates all memoized diffs for that table.
+    Field signatures only depend on the field names of a payload, so they are
+    computed once per (document_type, field names) and reused.
+    """
+
+    # Upper bound for memoized signatures/diffs before they are reset
+    MAX_ENTRIES = 1024
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the registry
+
+        Args:
+            ttl_seconds: Seconds before a cached column set is considered stale
+                and reloaded. None or 0 keeps column sets until invalidated.
+        """
+        self.ttl_seconds = ttl_seconds or None
+        self._lock = threading.RLock()
+        self._columns: Dict[str, FrozenSet[str]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._versions: Dict[str, int] = {}
+        self._signatures: Dict[Tuple[str, Tuple[str, ...]], FieldSignature] = {}
+        self._diffs: Dict[Tuple[str, int, str, Tuple[str, ...]], FieldSignature] = {}
+
+    # ==================== COLUMN SETS ====================
+
+    def version(self, table_name: str) -> int:
+        """Current version of a table's column set"""
+        return self._versions.get(table_name, 0)
+
+    def get_columns(self, table_name: str) -> Optional[FrozenSet[str]]:
+        """
+        Get cached columns for a table
+
+        Returns:
+            Frozen set of column names, or None if not cached (or expired)
+        """
+        with self._lock:
+            columns = self._columns.get(table_name)
+            if columns is None:
+                return None
+            if self.ttl_seconds and time.time() - self._loaded_at[table_name] > self.ttl_seconds:
+                logger.debug(f"Column cache for {table_name} expired")
+                self._drop(table_name)
+                return None
+            return columns
+
+    def set_columns(self, table_name: str, columns: Iterable[str]) -> FrozenSet[str]:
+        """Replace the cached column set for a table and bump its version"""
+        with self._lock:
+            frozen = frozenset(columns)
+            self._columns[table_name] = frozen
+            self._loaded_at[table_name] = time.time()
+            self._bump(table_name)
+            return frozen
+
+    def add_columns(self, table_name: str, columns: Iterable[str]) -> FrozenSet[str]:
+        """Record newly added columns for a table and bump its version"""
+        with self._lock:
+            current = self._columns.get(table_name, frozenset())
+            merged = current | frozenset(columns)
+            self._columns[table_name] = merged
+            self._loaded_at.setdefault(table_name, time.time())
+            self._bump(table_name)
+            return merged
+
+    def invalidate(self, table_name: Optional[str] = None):
+        """
+        Invalidate cached columns
+
+        Args:
+            table_name: Specific table to invalidate, or None to invalidate all
+        """
+        with self._lock:
+            tables = [table_name] if table_name else list(self._columns.keys())
+            for name in tables:
+                self._drop(name)
+
+    def _drop(self, table_name: str):
+        self._columns.pop(table_name, None)
+        self._loaded_at.pop(table_name, None)
+        self._bump(table_name)
+
+    def _bump(self, table_name: str):
+        self._versions[table_name] = self._versions.get(table_name, 0) + 1
+
+    # ==================== FIELD SIGNATURES ====================
+
+    def get_signature(self, document_type: str, field_names: Iterable[str],
+                      builder: Callable[[str, Tuple[str, ...]], FieldSignature]) -> FieldSignature:
+        """
+        Get the precomputed field signature for a payload shape
+
+        Args:
+            document_type: Type of document
+            field_names: Flattened field names of the payload
+            builder: Called as builder(document_type, field_names) on a miss
+
+        Returns:
+            Tuple of (field_name, normalized_column_name) for candidate columns
+        """
+        key = (document_type, tuple(field_names))
+        signature = self._signatures.get(key)
+        if signature is None:
+            signature = builder(document_type, key[1])
+            with self._lock:
+                if len(self._signatures) >= self.MAX_ENTRIES:
+                    self._signatures.clear()
+                self._signatures[key] = signature
+        return signature
+
+    def diff(self, table_name: str, document_type: str, field_names: Tuple[str, ...],
+             signature: FieldSignature, existing_columns: FrozenSet[str]) -> FieldSignature:
+        """
+        Get the signature entries that have no column in the table yet
+
+        Results are memoized per table version, so repeated payloads of the same
+        shape cost a single dict lookup once the table is warm.
+        """
+        key = (table_name, self.version(table_name), document_type, field_names)
+        missing = self._diffs.get(key)
+        if missing is None:
+            seen = set()
+            entries: List[Tuple[str, str]] = []
+            for field_name, column_name in signature:
+                if column_name in existing_columns or column_name in seen:
+                    continue
+                seen.add(column_name)
+                entries.append((field_name, column_name))
+            missing = tuple(entries)
+            with self._lock:
+                if len(self._diffs) >= self.MAX_ENTRIES:
+                    self._diffs.clear()
+                self._diffs[key] = missing
+        return missing
@@ -0,0 +1,36 @@
+-- SQL script to set up bulk fraud score write-back for model re-scoring
+-- Run this in Supabase SQL Editor (one-time setup, safe to re-run)
+--
+-- Used by training/bulk_rescoring.py after a new model version is activated.
+-- updates is a JSON array of {"id": <primary key>, "fraud_risk_score": <0-1>}.
+-- If this function is missing, the job falls back to one UPDATE per row.
+
+CREATE OR REPLACE FUNCTION apply_fraud_score_updates(target_table TEXT, key_column TEXT, updates JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    updated_count INTEGER;
+BEGIN
+    -- Only the document tables may be targeted (identifiers are interpolated below)
+    IF (target_table, key_column) NOT IN (
+        ('checks', 'check_id'),
+        ('paystubs', 'paystub_id'),
+        ('money_orders', 'money_order_id'),
+        ('bank_statements', 'statement_id')
+    ) THEN
+        RAISE EXCEPTION 'apply_fraud_score_updates: unsupported table/key %.%', target_table, key_column;
+    END IF;
+
+    EXECUTE format(
+        'UPDATE %I AS t
+            SET fraud_risk_score = u.fraud_risk_score
+           FROM jsonb_to_recordset($1) AS u(id TEXT, fraud_risk_score NUMERIC)
+          WHERE t.%I::text = u.id',
+        target_table, key_column
+    ) USING updates;
+
+    GET DIAGNOSTICS updated_count = ROW_COUNT;
+    RETURN updated_count;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION apply_fraud_score_updates(TEXT, TEXT, JSONB) TO service_role;
@@ -0,0 +1,85 @@
+-- SQL script to set up incrementally maintained dashboard rollups
+-- Run this in Supabase SQL Editor (one-time setup, safe to re-run)
+--
+-- document_daily_rollups holds one row per (day, document_type, risk_level, ai_recommendation).
+-- database/dashboard_rollups.py increments it every time a document is stored, and the
+-- /api/documents/summary and /api/paystubs/insights/summary endpoints read it instead of
+-- paging through the full views, so dashboard latency no longer grows with history size.
+
+CREATE TABLE IF NOT EXISTS document_daily_rollups (
+    day DATE NOT NULL,
+    document_type TEXT NOT NULL,
+    risk_level TEXT NOT NULL DEFAULT 'UNKNOWN',
+    ai_recommendation TEXT NOT NULL DEFAULT 'UNKNOWN',
+    document_count INTEGER NOT NULL DEFAULT 0,
+    high_risk_count INTEGER NOT NULL DEFAULT 0,   -- fraud_risk_score >= 0.75
+    fraud_count INTEGER NOT NULL DEFAULT 0,       -- fraud_risk_score >= 0.70 or REJECT
+    risk_score_sum NUMERIC NOT NULL DEFAULT 0,    -- fraud_risk_score in 0-1 scale
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (day, document_type, risk_level, ai_recommendation)
+);
+
+CREATE INDEX IF NOT EXISTS idx_document_daily_rollups_type_day
+    ON document_daily_rollups (document_type, day);
+
+-- Atomic increment (safe under concurrent stores)
+CREATE OR REPLACE FUNCTION increment_document_rollup(
+    p_day DATE,
+    p_document_type TEXT,
+    p_risk_level TEXT,
+    p_ai_recommendation TEXT,
+    p_high_risk INTEGER,
+    p_fraud INTEGER,
+    p_risk_score NUMERIC
+)
+RETURNS VOID AS $$
+    INSERT INTO document_daily_rollups AS r (
+        day, document_type, risk_level, ai_recommendation,
+        document_count, high_risk_count, fraud_count, risk_score_sum
+    )
+    VALUES (
+        p_day, p_document_type, p_risk_level, p_ai_recommendation,
+        1, p_high_risk, p_fraud, p_risk_score
+    )
+    ON CONFLICT (day, document_type, risk_level, ai_recommendation) DO UPDATE SET
+        document_count = r.document_count + 1,
+        high_risk_count = r.high_risk_count + EXCLUDED.high_risk_count,
+        fraud_count = r.fraud_count + EXCLUDED.fraud_count,
+        risk_score_sum = r.risk_score_sum + EXCLUDED.risk_score_sum,
+        updated_at = NOW();
+$$ LANGUAGE sql;
+
+GRANT EXECUTE ON FUNCTION increment_document_rollup(DATE, TEXT, TEXT, TEXT, INTEGER, INTEGER, NUMERIC)
+    TO authenticated, service_role;
+
+-- Backfill / rebuild from existing documents (safe to re-run, e.g. if the code was deployed before this script)
+-- Every row is recomputed from the view, so documents already counted by live increments are
+-- neither skipped (days that already have rows) nor double counted.
+-- The lock holds concurrent increments until the recount commits; a document stored at that exact
+-- moment can be counted twice, so run this when uploads are quiet.
+BEGIN;
+LOCK TABLE document_daily_rollups IN SHARE ROW EXCLUSIVE MODE;
+DELETE FROM document_daily_rollups;
+INSERT INTO document_daily_rollups (
+    day, document_type, risk_level, ai_recommendation,
+    document_count, high_risk_count, fraud_count, risk_score_sum
+)
+SELECT
+    upload_date::date,
+    document_type,
+    COALESCE(UPPER(risk_level), 'UNKNOWN'),
+    COALESCE(UPPER(ai_recommendation), 'UNKNOWN'),
+    COUNT(*),
+    COUNT(*) FILTER (WHERE score >= 0.75),
+    COUNT(*) FILTER (WHERE score >= 0.70 OR UPPER(ai_recommendation) = 'REJECT'),
+    COALESCE(SUM(score), 0)
+FROM (
+    SELECT *,
+           CASE WHEN fraud_risk_score = 'NaN' THEN 0  -- NaN sorts above every number in Postgres
+                WHEN fraud_risk_score > 1 THEN fraud_risk_score / 100.0
+                ELSE COALESCE(fraud_risk_score, 0) END AS score
+    FROM v_documents_with_risk
+    WHERE upload_date IS NOT NULL AND document_type IS NOT NULL
+) d
+GROUP BY 1, 2, 3, 4;
+COMMIT;
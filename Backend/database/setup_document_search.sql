@@ -0,0 +1,147 @@
+-- SQL script to set up indexed, ranked search for the document search endpoints
+-- Run this in Supabase SQL Editor (one-time setup, safe to re-run)
+--
+-- Used by database/document_search.py for:
+--   /api/documents/search, /api/checks/search,
+--   /api/money-orders/search, /api/bank-statements/search
+-- If these functions are missing, the API falls back to plain ILIKE queries.
+
+-- Trigram matching (similarity() and index-backed ILIKE '%q%')
+-- Each search function matches with a prefix branch (lower(col) LIKE lower(q) || '%', B-tree
+-- text_pattern_ops indexes, also for 1-2 character type-ahead queries that trigrams cannot narrow)
+-- OR'd with a substring branch (ILIKE '%q%', GIN trigram indexes); the planner combines both with a BitmapOr.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ==================== INDEXES ====================
+
+-- Substring search (GIN trigram)
+CREATE INDEX IF NOT EXISTS idx_documents_file_name_trgm
+    ON documents USING gin (file_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_documents_document_id_trgm
+    ON documents USING gin ((document_id::text) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_checks_payer_name_trgm
+    ON checks USING gin (payer_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_checks_payee_name_trgm
+    ON checks USING gin (payee_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_money_orders_purchaser_name_trgm
+    ON money_orders USING gin (purchaser_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_money_orders_payee_name_trgm
+    ON money_orders USING gin (payee_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_bank_statements_account_holder_name_trgm
+    ON bank_statements USING gin (account_holder_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_bank_statements_bank_name_trgm
+    ON bank_statements USING gin (bank_name gin_trgm_ops);
+
+-- Prefix search (B-tree, lower(col) LIKE 'q%')
+CREATE INDEX IF NOT EXISTS idx_documents_file_name_prefix
+    ON documents (lower(file_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_documents_document_id_prefix
+    ON documents (lower(document_id::text) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_checks_payer_name_prefix
+    ON checks (lower(payer_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_checks_payee_name_prefix
+    ON checks (lower(payee_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_money_orders_purchaser_name_prefix
+    ON money_orders (lower(purchaser_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_money_orders_payee_name_prefix
+    ON money_orders (lower(payee_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_bank_statements_account_holder_name_prefix
+    ON bank_statements (lower(account_holder_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_bank_statements_bank_name_prefix
+    ON bank_statements (lower(bank_name) text_pattern_ops);
+
+-- ==================== HELPERS ====================
+
+-- Escape LIKE wildcards so user input such as "check_01" matches literally
+CREATE OR REPLACE FUNCTION search_escape_like(search_query TEXT)
+RETURNS TEXT AS $$
+    SELECT replace(replace(replace(search_query, '\', '\\'), '%', '\%'), '_', '\_');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Rank: 2 = exact, 1 = prefix, 0 = substring match
+CREATE OR REPLACE FUNCTION search_match_rank(value TEXT, search_query TEXT)
+RETURNS INT AS $$
+    SELECT CASE
+        WHEN lower(value) = lower(search_query) THEN 2
+        WHEN lower(value) LIKE lower(search_escape_like(search_query)) || '%' THEN 1
+        ELSE 0
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- ==================== SEARCH FUNCTIONS ====================
+
+CREATE OR REPLACE FUNCTION search_documents(search_query TEXT, max_results INT DEFAULT 20)
+RETURNS SETOF v_documents_with_risk AS $$
+    SELECT v.*
+    FROM v_documents_with_risk v
+    WHERE lower(v.file_name) LIKE lower(search_escape_like(search_query)) || '%'
+       OR v.file_name ILIKE '%' || search_escape_like(search_query) || '%'
+       OR lower(v.document_id::text) LIKE lower(search_escape_like(search_query)) || '%'
+       OR v.document_id::text ILIKE '%' || search_escape_like(search_query) || '%'
+    ORDER BY
+        GREATEST(search_match_rank(v.file_name, search_query),
+                 search_match_rank(v.document_id::text, search_query)) DESC,
+        similarity(coalesce(v.file_name, ''), search_query) DESC,
+        v.upload_date DESC
+    LIMIT max_results;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION search_checks(search_query TEXT, max_results INT DEFAULT 20)
+RETURNS SETOF v_checks_analysis AS $$
+    SELECT v.*
+    FROM v_checks_analysis v
+    WHERE lower(v.payer_name) LIKE lower(search_escape_like(search_query)) || '%'
+       OR v.payer_name ILIKE '%' || search_escape_like(search_query) || '%'
+       OR lower(v.payee_name) LIKE lower(search_escape_like(search_query)) || '%'
+       OR v.payee_name ILIKE '%' || search_escape_like(search_query) || '%'
+    ORDER BY
+        GREATEST(search_match_rank(v.payer_name, search_query),
+                 search_match_rank(v.payee_name, search_query)) DESC,
+        GREATEST(similarity(coalesce(v.payer_name, ''), search_query),
+                 similarity(coalesce(v.payee_name, ''), search_query)) DESC,
+        v.created_at DESC
+    LIMIT max_results;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION search_money_orders(search_query TEXT, max_results INT DEFAULT 20)
+RETURNS SETOF v_money_orders_analysis AS $$
+    SELECT v.*
+    FROM v_money_orders_analysis v
+    WHERE lower(v.purchaser_name) LIKE lower(search_escape_like(search_query)) || '%'
+       OR v.purchaser_name ILIKE '%' || search_escape_like(search_query) || '%'
+       OR lower(v.payee_name) LIKE lower(search_escape_like(search_query)) || '%'
+       OR v.payee_name ILIKE '%' || search_escape_like(search_query) || '%'
+    ORDER BY
+        GREATEST(search_match_rank(v.purchaser_name, search_query),
+                 search_match_rank(v.payee_name, search_query)) DESC,
+        GREATEST(similarity(coalesce(v.purchaser_name, ''), search_query),
+                 similarity(coalesce(v.payee_name, ''), search_query)) DESC,
+        v.created_at DESC
+    LIMIT max_results;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION search_bank_statements(search_query TEXT, max_results INT DEFAULT 20)
+RETURNS SETOF bank_statements AS $$
+    SELECT b.*
+    FROM bank_statements b
+    WHERE lower(b.account_holder_name) LIKE lower(search_escape_like(search_query)) || '%'
+       OR b.account_holder_name ILIKE '%' || search_escape_like(search_query) || '%'
+       OR lower(b.bank_name) LIKE lower(search_escape_like(search_query)) || '%'
+       OR b.bank_name ILIKE '%' || search_escape_like(search_query) || '%'
+    ORDER BY
+        GREATEST(search_match_rank(b.account_holder_name, search_query),
+                 search_match_rank(b.bank_name, search_query)) DESC,
+        GREATEST(similarity(coalesce(b.account_holder_name, ''), search_query),
+                 similarity(coalesce(b.bank_name, ''), search_query)) DESC,
+        b.created_at DESC
+    LIMIT max_results;
+$$ LANGUAGE sql STABLE;
+
+-- Grant execute permissions (adjust role as needed)
+GRANT EXECUTE ON FUNCTION search_documents(TEXT, INT) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION search_checks(TEXT, INT) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION search_money_orders(TEXT, INT) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION search_bank_statements(TEXT, INT) TO authenticated, service_role;
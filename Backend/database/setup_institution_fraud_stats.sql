@@ -0,0 +1,141 @@
+-- SQL script to set up incrementally maintained per-institution fraud statistics
+-- Run this in Supabase SQL Editor (safe to re-run)
+--
+-- institution_fraud_stats holds one row per (normalized financial_institutions name, document_type).
+-- database/institution_fraud_stats.py increments it every time a bank statement or check is stored,
+-- and the agents read fraud rate, fraud-type mix and amount percentiles from it (through an
+-- in-process TTL cache) instead of scanning bank_statements / checks per request.
+
+CREATE TABLE IF NOT EXISTS institution_fraud_stats (
+    institution_name TEXT NOT NULL,               -- financial_institutions.name (UPPERCASE)
+    document_type TEXT NOT NULL,                  -- bank_statement or check
+    document_count INTEGER NOT NULL DEFAULT 0,
+    reject_count INTEGER NOT NULL DEFAULT 0,      -- ai_recommendation = REJECT
+    escalate_count INTEGER NOT NULL DEFAULT 0,    -- ai_recommendation = ESCALATE
+    risk_score_sum NUMERIC NOT NULL DEFAULT 0,    -- fraud_risk_score in 0-1 scale
+    fraud_type_counts JSONB NOT NULL DEFAULT '{}'::jsonb,  -- fraud type label -> documents
+    amount_histogram JSONB NOT NULL DEFAULT '{}'::jsonb,   -- log-scale amount bucket -> documents
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (institution_name, document_type)
+);
+
+-- Add 1 to each key of a JSONB count object
+CREATE OR REPLACE FUNCTION jsonb_increment_counts(p_counts JSONB, p_keys TEXT[])
+RETURNS JSONB AS $$
+    SELECT COALESCE(jsonb_object_agg(key, total), '{}'::jsonb)
+    FROM (
+        SELECT key, SUM(n)::INTEGER AS total
+        FROM (
+            SELECT key, value::INTEGER AS n FROM jsonb_each_text(COALESCE(p_counts, '{}'::jsonb))
+            UNION ALL
+            SELECT k, 1 FROM unnest(COALESCE(p_keys, ARRAY[]::TEXT[])) AS k
+        ) c
+        GROUP BY key
+    ) t;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Atomic increment (safe under concurrent stores)
+CREATE OR REPLACE FUNCTION increment_institution_fraud_stats(
+    p_institution_name TEXT,
+    p_document_type TEXT,
+    p_reject INTEGER,
+    p_escalate INTEGER,
+    p_risk_score NUMERIC,
+    p_fraud_types TEXT[],
+    p_amount_buckets TEXT[]
+)
+RETURNS VOID AS $$
+    INSERT INTO institution_fraud_stats AS s (
+        institution_name, document_type, document_count, reject_count, escalate_count,
+        risk_score_sum, fraud_type_counts, amount_histogram
+    )
+    VALUES (
+        p_institution_name, p_document_type, 1, p_reject, p_escalate, p_risk_score,
+        jsonb_increment_counts('{}'::jsonb, p_fraud_types),
+        jsonb_increment_counts('{}'::jsonb, p_amount_buckets)
+    )
+    ON CONFLICT (institution_name, document_type) DO UPDATE SET
+        document_count = s.document_count + 1,
+        reject_count = s.reject_count + EXCLUDED.reject_count,
+        escalate_count = s.escalate_count + EXCLUDED.escalate_count,
+        risk_score_sum = s.risk_score_sum + EXCLUDED.risk_score_sum,
+        fraud_type_counts = jsonb_increment_counts(s.fraud_type_counts, p_fraud_types),
+        amount_histogram = jsonb_increment_counts(s.amount_histogram, p_amount_buckets),
+        updated_at = NOW();
+$$ LANGUAGE sql;
+
+GRANT EXECUTE ON FUNCTION increment_institution_fraud_stats(TEXT, TEXT, INTEGER, INTEGER, NUMERIC, TEXT[], TEXT[])
+    TO authenticated, service_role;
+
+-- Backfill from existing documents. Rows are rebuilt from scratch under a lock, so re-running
+-- never skips or double counts documents; run it while uploads are quiet, since live increments
+-- wait for the lock. Fraud types count the stored primary label (bank_statements.fraud_types,
+-- checks.fraud_type), which is also all that build_stats_increment() counts live.
+-- Amount buckets use the same formula as amount_bucket() in institution_fraud_stats.py:
+-- 0 below $1, else floor(log10(amount) * 16) + 1, capped at 129.
+BEGIN;
+
+LOCK TABLE institution_fraud_stats IN SHARE ROW EXCLUSIVE MODE;
+
+DELETE FROM institution_fraud_stats;
+
+WITH documents AS (
+    SELECT UPPER(TRIM(bank_name)) AS institution_name, 'bank_statement' AS document_type,
+           UPPER(ai_recommendation) AS recommendation, fraud_risk_score, fraud_types AS fraud_type,
+           ending_balance AS amount
+    FROM bank_statements
+    WHERE bank_name IS NOT NULL AND TRIM(bank_name) <> ''
+    UNION ALL
+    SELECT UPPER(TRIM(bank_name)), 'check',
+           UPPER(ai_recommendation), fraud_risk_score, fraud_type,
+           amount
+    FROM checks
+    WHERE bank_name IS NOT NULL AND TRIM(bank_name) <> ''
+),
+scored AS (
+    SELECT *,
+           CASE WHEN fraud_risk_score = 'NaN' THEN 0  -- NaN sorts above every number in Postgres
+                WHEN fraud_risk_score > 1 THEN fraud_risk_score / 100.0
+                ELSE COALESCE(fraud_risk_score, 0) END AS score,
+           CASE WHEN amount IS NULL THEN NULL
+                WHEN amount < 1 THEN '0'
+                ELSE LEAST(FLOOR(LOG(amount::NUMERIC) * 16)::INTEGER + 1, 129)::TEXT END AS bucket
+    FROM documents
+),
+fraud_types AS (
+    SELECT institution_name, document_type, jsonb_object_agg(fraud_type, n) AS counts
+    FROM (
+        SELECT institution_name, document_type, fraud_type, COUNT(*) AS n
+        FROM scored WHERE fraud_type IS NOT NULL AND fraud_type <> ''
+        GROUP BY 1, 2, 3
+    ) f
+    GROUP BY 1, 2
+),
+amounts AS (
+    SELECT institution_name, document_type, jsonb_object_agg(bucket, n) AS histogram
+    FROM (
+        SELECT institution_name, document_type, bucket, COUNT(*) AS n
+        FROM scored WHERE bucket IS NOT NULL
+        GROUP BY 1, 2, 3
+    ) a
+    GROUP BY 1, 2
+)
+INSERT INTO institution_fraud_stats (
+    institution_name, document_type, document_count, reject_count, escalate_count,
+    risk_score_sum, fraud_type_counts, amount_histogram
+)
+SELECT
+    s.institution_name,
+    s.document_type,
+    COUNT(*),
+    COUNT(*) FILTER (WHERE s.recommendation = 'REJECT'),
+    COUNT(*) FILTER (WHERE s.recommendation = 'ESCALATE'),
+    COALESCE(SUM(s.score), 0),
+    COALESCE(MAX(f.counts::TEXT)::JSONB, '{}'::jsonb),
+    COALESCE(MAX(a.histogram::TEXT)::JSONB, '{}'::jsonb)
+FROM scored s
+LEFT JOIN fraud_types f USING (institution_name, document_type)
+LEFT JOIN amounts a USING (institution_name, document_type)
+GROUP BY s.institution_name, s.document_type;
+
+COMMIT;
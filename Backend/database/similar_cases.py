@@ -0,0 +1,614 @@
+"""
+Similar Case Index
+Nearest-neighbour retrieval of historical REJECT and ESCALATE documents for the AI agents
+
+Every stored document the agent rejected or escalated is added to a local SQLite
+file as a numeric feature vector - the retrainers' features from
+training.feature_frames, log-compressed, plus the ML fraud score - with a short
+case description. Each process keeps the vectors of a document type in one
+NumPy matrix and answers top-k queries by exact Euclidean distance (one
+matrix-vector product: about 1-2 ms for 50,000 cases, plus a few ms to build the
+query's features); rows added by other processes are picked up incrementally
+(by row id) before queries.
+
+Cases are reused in other customers' prompts, so the stored description holds no
+free text: institution, amount, ML score, recommendation and fraud type codes only.
+A query never returns the document it is asked about: cases with the same content
+fingerprint (the document's projected fields) are left out.
+
+With SIMILAR_CASES_EMBEDDINGS=true the case's fraud signals (ML anomalies and
+fraud types) are also embedded with OpenAI and the cosine distance of the
+embeddings is added to the feature distance.
+
+Settings:
+    SIMILAR_CASES_ENABLED           Index and query similar cases (default true)
+    SIMILAR_CASES_PATH              SQLite file (default Backend/similar_cases/similar_cases.sqlite3)
+    SIMILAR_CASES_TOP_K             Cases added to prompts (default 5)
+    SIMILAR_CASES_EMBEDDINGS        Add text embeddings (default false)
+    SIMILAR_CASES_EMBEDDING_MODEL   OpenAI embedding model (default text-embedding-3-small)
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from database.fraud_scores import normalize_fraud_score
+
+logger = logging.getLogger(__name__)
+
+INDEXED_RECOMMENDATIONS = ('REJECT', 'ESCALATE')
+OUTCOMES = {'REJECT': 'REJECTED', 'ESCALATE': 'ESCALATED'}
+
+DEFAULT_INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'similar_cases', 'similar_cases.sqlite3'
+)
+
+# Weight of the ML fraud score (0-1) relative to one log-compressed feature
+SCORE_WEIGHT = 4.0
+# Weight of the embedding cosine distance (0-2) when both cases have embeddings
+EMBEDDING_WEIGHT = 2.0
+# Seconds between checks for rows added by other processes
+SYNC_INTERVAL = 5.0
+
+# Feature-frame column -> keys it is read from (extracted data or stored row), first present wins
+ROW_FIELDS = {
+    'check': {
+        'bank_name': ('bank_name',),
+        'routing_number': ('routing_number',),
+        'account_number': ('account_number',),
+        'check_number': ('check_number',),
+        'amount': ('amount_numeric', 'amount'),
+        'payer_name': ('payer_name',),
+        'payee_name': ('payee_name',),
+        'payer_address': ('payer_address',),
+        'date': ('date', 'check_date'),
+        'signature_present': ('signature_present', 'signature_detected'),
+        'memo': ('memo',)
+    },
+    'money_order': {
+        'issuer_name': ('issuer_name', 'issuer'),
+        'serial_number': ('serial_number', 'serial_number_primary', 'money_order_number'),
+        'amount': ('amount',),
+        'payee_name': ('payee_name', 'payee'),
+        'payer_name': ('payer_name', 'purchaser', 'purchaser_name')
+    },
+    'bank_statement': {
+        'bank_name': ('bank_name',),
+        'account_number': ('account_number',),
+        'account_holder_name': ('account_holder_name', 'account_holder'),
+        'beginning_balance': ('beginning_balance', 'opening_balance'),
+        'ending_balance': ('ending_balance', 'closing_balance'),
+        'total_credits': ('total_credits',),
+        'total_debits': ('total_debits',),
+        'period_start': ('period_start', 'statement_period_start_date', 'statement_period_start'),
+        'period_end': ('period_end', 'statement_period_end_date', 'statement_period_end'),
+        'statement_date': ('statement_date',)
+    },
+    'paystub': {
+        'employer_name': ('employer_name', 'company_name'),
+        'employee_name': ('employee_name',),
+        'gross_pay': ('gross_pay',),
+        'net_pay': ('net_pay',),
+        'deductions': ('deductions',)
+    }
+}
+
+# Case description fields: institution column and headline amount column per document type
+CASE_FIELDS = {
+    'check': ('bank_name', 'amount'),
+    'money_order': ('issuer_name', 'amount'),
+    'bank_statement': ('bank_name', 'ending_balance'),
+    'paystub': ('employer_name', 'gross_pay')
+}
+
+# Stored tables read by rebuild_from_database(): document type -> (table, id column, fraud type column)
+SOURCE_TABLES = {
+    'check': ('checks', 'document_id', 'fraud_type'),
+    'money_order': ('money_orders', 'document_id', 'fraud_type'),
+    'bank_statement': ('bank_statements', 'document_id', 'fraud_types'),
+    'paystub': ('paystubs', 'document_id', 'fraud_types')
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    document_type TEXT NOT NULL,
+    case_id TEXT,
+    vector BLOB NOT NULL,
+    embedding BLOB,
+    metadata TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_cases_case_id ON cases (document_type, case_id);
+"""
+
+
+def _scalar(value: Any) -> Any:
+    """Plain value of an extracted field ({'value': ...} dicts, '$1,234.50' strings)"""
+    if isinstance(value, dict):
+        value = value.get('value')
+    if isinstance(value, str):
+        cleaned = value.replace('$', '').replace(',', '').strip()
+        try:
+            return float(cleaned)
+        except ValueError:
+            return value
+    return value
+
+
+def case_row(document_type: str, data: Optional[Dict], ml_analysis: Optional[Dict] = None) -> Dict[str, Any]:
+    """
+    Project extracted data or a stored row onto the feature-frame columns
+
+    Args:
+        document_type: Type of document (check, money_order, bank_statement, paystub)
+        data: Extracted data or stored row
+        ml_analysis: ML analysis (fraud_risk_score, model_confidence); stored row values otherwise
+
+    Returns:
+        Row dict accepted by training.feature_frames.build_feature_frame
+    """
+    data = data or {}
+    ml_analysis = ml_analysis or {}
+    row = {}
+    for column, keys in ROW_FIELDS[document_type].items():
+        value = next((data[key] for key in keys if data.get(key) not in (None, '')), None)
+        row[column] = value if column == 'deductions' else _scalar(value)
+    # The money order agent's ML result names the score fraud_score
+    row['fraud_risk_score'] = ml_analysis.get(
+        'fraud_risk_score', ml_analysis.get('fraud_score', data.get('fraud_risk_score'))
+    )
+    row['model_confidence'] = ml_analysis.get('model_confidence', data.get('model_confidence'))
+    return row
+
+
+def case_fingerprint(document_type: str, row: Dict) -> str:
+    """
+    Content fingerprint of a case row: its document fields, without the ML score or confidence
+    (which change when the document is re-analyzed with another model)
+    """
+    fields = {column: row.get(column) for column in ROW_FIELDS[document_type]}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:32]
+
+
+def vectorize(document_type: str, rows: Sequence[Dict]) -> np.ndarray:
+    """
+    Feature vectors of case rows
+
+    Args:
+        document_type: Type of document
+        rows: Rows from case_row()
+
+    Returns:
+        (n, features + 1) float32 matrix: signed log1p of the features, then the weighted ML score
+    """
+    from training.feature_frames import build_feature_frame
+
+    # The seeded generator only feeds risk_score, which is dropped
+    frame = build_feature_frame(document_type, list(rows), rng=np.random.default_rng(0))
+    features = np.nan_to_num(frame.drop(columns=['risk_score']).to_numpy(dtype=float))
+    scores = np.array([normalize_fraud_score(row.get('fraud_risk_score')) for row in rows])
+    compressed = np.sign(features) * np.log1p(np.abs(features))
+    return np.column_stack([compressed, scores * SCORE_WEIGHT]).astype(np.float32)
+
+
+def case_text(ml_analysis: Optional[Dict], fraud_types: Iterable[str] = ()) -> str:
+    """Fraud signals of a case as embedding input (ML anomalies and fraud types)"""
+    ml_analysis = ml_analysis or {}
+    signals = list(ml_analysis.get('anomalies') or []) + list(ml_analysis.get('fraud_types') or [])
+    signals += [str(fraud_type) for fraud_type in fraud_types or ()]
+    return '\n'.join(str(signal) for signal in signals)
+
+
+def format_similar_cases(cases: Optional[List[Dict]], max_cases: Optional[int] = None) -> str:
+    """
+    Similar historical cases as prompt lines
+
+    Args:
+        cases: Cases from SimilarCaseIndex.query()
+        max_cases: Cases listed (None lists all)
+
+    Returns:
+        One line per case, or a note that none were found
+    """
+    cases = list(cases or [])
+    if max_cases is not None:
+        cases = cases[:max_cases]
+    if not cases:
+        return "No similar historical cases found"
+    lines = []
+    for index, case in enumerate(cases, 1):
+        fraud_types = ', '.join(case.get('fraud_types') or []) or 'none recorded'
+        institution = case.get('institution') or case.get('bank_name') or 'Unknown institution'
+        line = (
+            f"{index}. {case.get('recommendation') or case.get('outcome')} "
+            f"(similarity {case.get('similarity', 0.0):.2f}) - "
+            f"{institution}, amount ${case.get('amount') or 0:,.2f}, "
+            f"ML score {case.get('fraud_score', 0.0):.0%}, fraud types: {fraud_types}"
+        )
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+class _TypeIndex:
+    """In-memory vectors and case metadata of one document type"""
+
+    def __init__(self):
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.sq_norms = np.zeros(0, dtype=np.float32)
+        self.embeddings: List[Optional[np.ndarray]] = []
+        self.metadata: List[Dict] = []
+        self.positions: Dict[str, int] = {}
+        self.fingerprints: Dict[str, List[int]] = {}
+        self.count = 0
+
+    def add(self, vector: np.ndarray, embedding: Optional[np.ndarray], metadata: Dict) -> bool:
+        if self.count and vector.shape[0] != self.vectors.shape[1]:
+            # Written with a different feature set (older or newer code)
+            return False
+        if self.count == self.vectors.shape[0]:
+            # Grow by doubling; rows below count are never rewritten, so readers may keep old buffers
+            capacity = max(2 * self.count, 64)
+            vectors = np.zeros((capacity, vector.shape[0]), dtype=np.float32)
+            sq_norms = np.zeros(capacity, dtype=np.float32)
+            if self.count:
+                vectors[:self.count] = self.vectors[:self.count]
+                sq_norms[:self.count] = self.sq_norms[:self.count]
+            self.vectors, self.sq_norms = vectors, sq_norms
+        self.vectors[self.count] = vector
+        self.sq_norms[self.count] = float(vector @ vector)
+        self.embeddings.append(embedding)
+        self.metadata.append(metadata)
+        if metadata.get('case_id') is not None:
+            self.positions[str(metadata['case_id'])] = self.count
+        if metadata.get('fingerprint'):
+            self.fingerprints.setdefault(metadata['fingerprint'], []).append(self.count)
+        self.count += 1
+        return True
+
+
+class SimilarCaseIndex:
+    """
+    Exact k-nearest-neighbour index of rejected and escalated documents
+    """
+
+    def __init__(self, path: Optional[str] = None, embedder: Optional[Callable[[str], List[float]]] = None):
+        """
+        Initialize similar case index
+
+        Args:
+            path: SQLite file (default SIMILAR_CASES_PATH or Backend/similar_cases/similar_cases.sqlite3)
+            embedder: Text -> embedding function (default: OpenAI when SIMILAR_CASES_EMBEDDINGS is set,
+                False disables embeddings)
+        """
+        self.path = path or os.getenv('SIMILAR_CASES_PATH') or DEFAULT_INDEX_PATH
+        self.embedder = embedder if embedder is not None else _default_embedder()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+        self._lock = threading.Lock()
+        self._types: Dict[str, _TypeIndex] = {}
+        self._last_row_id = 0
+        self._last_sync = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self._sync(force=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def _sync(self, force: bool = False):
+        """Load rows added since the last sync (by this or another process)"""
+        if not force and time.monotonic() - self._last_sync < SYNC_INTERVAL:
+            return
+        with self._lock:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    "SELECT id, document_type, vector, embedding, metadata FROM cases WHERE id > ? ORDER BY id",
+                    (self._last_row_id,)
+                ).fetchall()
+            skipped = 0
+            for row_id, document_type, vector, embedding, metadata in rows:
+                index = self._types.setdefault(document_type, _TypeIndex())
+                if not index.add(
+                    np.frombuffer(vector, dtype=np.float32),
+                    np.frombuffer(embedding, dtype=np.float32) if embedding else None,
+                    json.loads(metadata)
+                ):
+                    skipped += 1
+                self._last_row_id = row_id
+            self._last_sync = time.monotonic()
+        if skipped:
+            logger.warning(f"Skipped {skipped} similar cases with a different feature dimension")
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        if not self.embedder or not text:
+            return None
+        try:
+            return np.asarray(self.embedder(text), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Error embedding similar case text: {e}")
+            return None
+
+    def add_cases(self, document_type: str, cases: List[Dict]) -> int:
+        """
+        Add cases in one batch
+
+        Args:
+            document_type: Type of document
+            cases: Dicts with 'row' (from case_row()), 'metadata' and optionally 'text' (embedding input)
+
+        Returns:
+            Number of cases inserted (cases whose case_id is already indexed are skipped)
+        """
+        if not cases:
+            return 0
+        vectors = vectorize(document_type, [case['row'] for case in cases])
+        records = []
+        for case, vector in zip(cases, vectors):
+            embedding = self._embed(case.get('text', ''))
+            records.append((
+                document_type,
+                case['metadata'].get('case_id'),
+                vector.tobytes(),
+                embedding.tobytes() if embedding is not None else None,
+                json.dumps(case['metadata'], default=str)
+            ))
+        with closing(self._connect()) as conn, conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO cases (document_type, case_id, vector, embedding, metadata) VALUES (?, ?, ?, ?, ?)",
+                records
+            )
+            inserted = conn.total_changes - before
+        self._sync(force=True)
+        return inserted
+
+    def add_document(self, document_type: str, case_id: Optional[str], extracted_data: Optional[Dict],
+                     ml_analysis: Optional[Dict], ai_analysis: Optional[Dict]) -> bool:
+        """
+        Add an analyzed document if the agent rejected or escalated it
+
+        Args:
+            document_type: Type of document
+            case_id: Document ID
+            extracted_data: Extracted document fields
+            ml_analysis: ML analysis result
+            ai_analysis: AI analysis result (recommendation, fraud_types, summary)
+
+        Returns:
+            True if the document was indexed
+        """
+        ai_analysis = ai_analysis or {}
+        recommendation = str(ai_analysis.get('recommendation') or '').upper()
+        if recommendation not in INDEXED_RECOMMENDATIONS:
+            return False
+        row = case_row(document_type, extracted_data, ml_analysis)
+        fraud_types = ai_analysis.get('fraud_types') or []
+        if isinstance(fraud_types, str):
+            fraud_types = [fraud_types]
+        metadata = self._case_metadata(document_type, case_id, row, recommendation, fraud_types)
+        return self.add_cases(document_type, [{
+            'row': row, 'metadata': metadata, 'text': case_text(ml_analysis, fraud_types)
+        }]) > 0
+
+    def _case_metadata(self, document_type: str, case_id: Optional[str], row: Dict, recommendation: str,
+                       fraud_types: List[str]) -> Dict:
+        institution_column, amount_column = CASE_FIELDS[document_type]
+        amount = _scalar(row.get(amount_column))
+        return {
+            'case_id': case_id or f"{document_type}_{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}",
+            'recommendation': recommendation,
+            'fraud_types': [str(fraud_type) for fraud_type in fraud_types],
+            'fraud_score': round(normalize_fraud_score(row.get('fraud_risk_score')), 4),
+            'institution': row.get(institution_column),
+            'amount': amount if isinstance(amount, (int, float)) else None,
+            'fingerprint': case_fingerprint(document_type, row),
+            'indexed_at': datetime.utcnow().isoformat()
+        }
+
+    def query(self, document_type: str, extracted_data: Optional[Dict], ml_analysis: Optional[Dict],
+              k: Optional[int] = None, exclude_case_id: Optional[str] = None) -> List[Dict]:
+        """
+        Most similar rejected / escalated cases of a document
+
+        Args:
+            document_type: Type of document
+            extracted_data: Extracted fields of the document being analyzed
+            ml_analysis: Its ML analysis result
+            k: Number of cases (default SIMILAR_CASES_TOP_K)
+            exclude_case_id: Case to leave out (the document itself, when its ID is known)
+
+        Returns:
+            Case metadata dicts, nearest first, with 'outcome', 'distance' and 'similarity' (0-1];
+            cases with the document's own content fingerprint are left out
+        """
+        k = k or int(os.getenv('SIMILAR_CASES_TOP_K', '5'))
+        self._sync()
+        index = self._types.get(document_type)
+        if index is None or index.count == 0:
+            return []
+
+        started = time.perf_counter()
+        row = case_row(document_type, extracted_data, ml_analysis)
+        vector = vectorize(document_type, [row])[0]
+        with self._lock:
+            if vector.shape[0] != index.vectors.shape[1]:
+                return []
+            count = index.count
+            vectors, sq_norms = index.vectors[:count], index.sq_norms[:count]
+            excluded = list(index.fingerprints.get(case_fingerprint(document_type, row), ()))
+            if exclude_case_id is not None and str(exclude_case_id) in index.positions:
+                excluded.append(index.positions[str(exclude_case_id)])
+
+        # |v - q|^2 = |v|^2 - 2 v.q + |q|^2: one matrix-vector product over all cases
+        distances = np.sqrt(np.maximum(sq_norms - 2.0 * (vectors @ vector) + float(vector @ vector), 0.0))
+        if self.embedder and any(embedding is not None for embedding in index.embeddings[:count]):
+            query_embedding = self._embed(case_text(ml_analysis))
+            if query_embedding is not None:
+                distances = distances + EMBEDDING_WEIGHT * np.array([
+                    _cosine_distance(query_embedding, embedding) if embedding is not None else 0.0
+                    for embedding in index.embeddings[:count]
+                ])
+        if excluded:
+            distances[excluded] = np.inf
+
+        k = min(k, count)
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest])]
+
+        results = []
+        for position in nearest:
+            distance = float(distances[position])
+            if not np.isfinite(distance):
+                continue
+            case = dict(index.metadata[position])
+            # Cases indexed by earlier versions may carry a free-text reason
+            case.pop('reason', None)
+            case['outcome'] = OUTCOMES.get(case.get('recommendation'), case.get('recommendation'))
+            case['distance'] = round(distance, 4)
+            case['similarity'] = round(1.0 / (1.0 + distance), 4)
+            results.append(case)
+
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += time.perf_counter() - started
+        return results
+
+    def rebuild_from_database(self, supabase=None, document_types: Optional[Iterable[str]] = None,
+                              limit: int = 10000) -> Dict[str, int]:
+        """
+        Add the stored rejected and escalated documents (initial fill or after deleting the file)
+
+        Args:
+            supabase: Supabase client (default: database.supabase_client.get_supabase())
+            document_types: Types to load (default: all)
+            limit: Most recent rows read per type
+
+        Returns:
+            Cases inserted per document type
+        """
+        if supabase is None:
+            from database.supabase_client import get_supabase
+            supabase = get_supabase()
+
+        inserted = {}
+        for document_type in document_types or SOURCE_TABLES:
+            table, id_column, fraud_type_column = SOURCE_TABLES[document_type]
+            response = supabase.table(table).select('*').in_(
+                'ai_recommendation', list(INDEXED_RECOMMENDATIONS)
+            ).order('created_at', desc=True).limit(limit).execute()
+            cases = []
+            for stored in response.data or []:
+                row = case_row(document_type, stored)
+                fraud_type = stored.get(fraud_type_column)
+                metadata = self._case_metadata(
+                    document_type, stored.get(id_column), row, str(stored.get('ai_recommendation')).upper(),
+                    [fraud_type] if fraud_type else []
+                )
+                cases.append({'row': row, 'metadata': metadata, 'text': case_text(stored, metadata['fraud_types'])})
+            inserted[document_type] = self.add_cases(document_type, cases)
+            logger.info(f"Indexed {inserted[document_type]} stored {document_type} cases")
+        return inserted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'path': self.path,
+                'cases': {document_type: index.count for document_type, index in self._types.items()},
+                'embeddings': bool(self.embedder),
+                'queries': self.queries,
+                'avg_query_ms': round(self.query_seconds / self.queries * 1000, 3) if self.queries else 0.0
+            }
+
+
+def _cosine_distance(a: np.ndarray, b: np.ndarray) -> float:
+    if a.shape != b.shape:
+        return 0.0
+    norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return 1.0 - float(a @ b) / norm if norm else 0.0
+
+
+def _default_embedder() -> Optional[Callable[[str], List[float]]]:
+    """OpenAI embeddings when SIMILAR_CASES_EMBEDDINGS is set, else None"""
+    if os.getenv('SIMILAR_CASES_EMBEDDINGS', 'false').lower() != 'true':
+        return None
+    try:
+        from langchain_openai import OpenAIEmbeddings
+        from utils.resilience import ResilientClient
+    except ImportError as e:
+        logger.warning(f"Similar case embeddings disabled: {e}")
+        return None
+    model = os.getenv('SIMILAR_CASES_EMBEDDING_MODEL', 'text-embedding-3-small')
+    client = ResilientClient(OpenAIEmbeddings(model=model), 'openai', methods=('embed_query',), wrap_results=())
+    return client.embed_query
+
+
+def similar_cases_enabled() -> bool:
+    return os.getenv('SIMILAR_CASES_ENABLED', 'true').lower() == 'true'
+
+
+_similar_case_index: Optional[SimilarCaseIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_similar_case_index() -> SimilarCaseIndex:
+    """Get the process-wide similar case index"""
+    global _similar_case_index
+    if _similar_case_index is None:
+        with _index_lock:
+            if _similar_case_index is None:
+                _similar_case_index = SimilarCaseIndex()
+    return _similar_case_index
+
+
+def similar_case_index_stats() -> Dict[str, Any]:
+    """
+    Stats of the process-wide index for health checks, without building it
+
+    Returns:
+        {'enabled': False} when disabled, {'built': False} before the first index use,
+        else SimilarCaseIndex.stats() with 'built': True
+    """
+    if not similar_cases_enabled():
+        return {'enabled': False}
+    index = _similar_case_index
+    if index is None:
+        return {'built': False}
+    return {'built': True, **index.stats()}
+
+
+def find_similar_cases(document_type: str, extracted_data: Optional[Dict], ml_analysis: Optional[Dict],
+                       k: Optional[int] = None, exclude_case_id: Optional[str] = None) -> List[Dict]:
+    """
+    Similar historical cases for an agent prompt (never raises)
+
+    Args:
+        document_type: Type of document
+        extracted_data: Extracted fields of the document being analyzed
+        ml_analysis: Its ML analysis result
+        k: Number of cases (default SIMILAR_CASES_TOP_K)
+        exclude_case_id: Document ID to leave out, when known (the document's own content is always left out)
+
+    Returns:
+        Cases from SimilarCaseIndex.query(), or [] when disabled or on error
+    """
+    if not similar_cases_enabled():
+        return []
+    try:
+        return get_similar_case_index().query(document_type, extracted_data, ml_analysis, k=k,
+                                              exclude_case_id=exclude_case_id)
+    except Exception as e:
+        logger.warning(f"Error querying similar cases: {e}")
+        return []
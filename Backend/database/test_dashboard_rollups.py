@@ -0,0 +1,79 @@
+"""
+Test Dashboard Rollups
+Verifies rollup increments and summary aggregation.
+"""
+
+import sys
+import os
+import json
+import unittest
+from datetime import date
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.dashboard_rollups import build_rollup_increment, summarize_rollups
+
+
+class TestDashboardRollups(unittest.TestCase):
+
+    def test_increment_high_risk(self):
+        params = build_rollup_increment('check', {'fraud_risk_score': 0.82, 'risk_level': 'high'},
+                                        {'recommendation': 'escalate'}, day=date(2025, 1, 2))
+        self.assertEqual(params['p_day'], '2025-01-02')
+        self.assertEqual(params['p_risk_level'], 'HIGH')
+        self.assertEqual(params['p_ai_recommendation'], 'ESCALATE')
+        self.assertEqual(params['p_high_risk'], 1)
+        self.assertEqual(params['p_fraud'], 1)
+
+    def test_increment_percent_score_and_reject(self):
+        params = build_rollup_increment('paystub', {'fraud_risk_score': 20}, {'recommendation': 'REJECT'})
+        self.assertAlmostEqual(params['p_risk_score'], 0.2)
+        self.assertEqual(params['p_high_risk'], 0)
+        self.assertEqual(params['p_fraud'], 1)
+
+    def test_increment_nan_score(self):
+        for value in (float('nan'), 'nan', float('inf')):
+            params = build_rollup_increment('check', {'fraud_risk_score': value}, None)
+            self.assertEqual(params['p_risk_score'], 0.0)
+            self.assertEqual((params['p_high_risk'], params['p_fraud']), (0, 0))
+        # Valid JSON for the RPC payload
+        json.dumps(params, allow_nan=False)
+
+    def test_increment_missing_analysis(self):
+        params = build_rollup_increment('money_order', None, None)
+        self.assertEqual(params['p_risk_level'], 'UNKNOWN')
+        self.assertEqual(params['p_ai_recommendation'], 'UNKNOWN')
+        self.assertEqual(params['p_fraud'], 0)
+
+    def test_summarize(self):
+        rows = [
+            {'day': '2025-01-01', 'document_type': 'check', 'risk_level': 'LOW', 'ai_recommendation': 'APPROVE',
+             'document_count': 3, 'high_risk_count': 0, 'fraud_count': 0, 'risk_score_sum': 0.3},
+            {'day': '2025-01-01', 'document_type': 'paystub', 'risk_level': 'HIGH', 'ai_recommendation': 'REJECT',
+             'document_count': 1, 'high_risk_count': 1, 'fraud_count': 1, 'risk_score_sum': 0.9},
+            {'day': '2025-01-02', 'document_type': 'check', 'risk_level': 'HIGH', 'ai_recommendation': 'REJECT',
+             'document_count': 1, 'high_risk_count': 1, 'fraud_count': 1, 'risk_score_sum': 0.8},
+        ]
+        summary = summarize_rollups(rows)
+        self.assertEqual(summary['totals']['document_count'], 5)
+        self.assertEqual(summary['totals']['fraud_count'], 2)
+        self.assertEqual(summary['totals']['fraud_rate'], 40.0)
+        self.assertEqual(summary['totals']['avg_risk_score'], 40.0)
+        self.assertEqual([d['date'] for d in summary['by_day']], ['2025-01-01', '2025-01-02'])
+        self.assertEqual(summary['by_day'][0]['document_count'], 4)
+        check = next(t for t in summary['by_type'] if t['document_type'] == 'check')
+        self.assertEqual(check['document_count'], 4)
+        self.assertEqual(check['fraud_rate'], 25.0)
+        self.assertEqual(summary['by_risk_level'], {'LOW': 3, 'HIGH': 2})
+        self.assertEqual(summary['by_recommendation'], {'APPROVE': 3, 'REJECT': 2})
+
+    def test_summarize_empty(self):
+        summary = summarize_rollups([])
+        self.assertEqual(summary['totals']['document_count'], 0)
+        self.assertEqual(summary['totals']['fraud_rate'], 0.0)
+        self.assertEqual(summary['by_day'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
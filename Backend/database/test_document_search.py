@@ -0,0 +1,118 @@
+"""
+Test Document Search
+Verifies result ranking, the RPC / ILIKE fallback switch and the type-ahead cache.
+"""
+
+import sys
+import os
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import document_search
+from database.document_search import DocumentSearch, rank_results, is_missing_function_error
+
+CHECKS = [
+    {'check_id': 1, 'payer_name': 'Anna Smithson', 'payee_name': 'ACME'},
+    {'check_id': 2, 'payer_name': 'John Smith', 'payee_name': 'Blue Corp'},
+    {'check_id': 3, 'payer_name': 'Bob', 'payee_name': 'Smith'},
+]
+
+
+class FakeQuery:
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    def select(self, columns):
+        return self
+
+    def or_(self, filters):
+        self.supabase.fallback_filters.append(filters)
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def limit(self, count):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=list(CHECKS))
+
+
+class FakeSupabase:
+    def __init__(self, rpc_error=None):
+        self.rpc_error = rpc_error
+        self.rpc_calls = []
+        self.fallback_filters = []
+
+    def table(self, name):
+        return FakeQuery(self)
+
+    def rpc(self, name, params):
+        self.rpc_calls.append((name, params))
+
+        def execute():
+            if self.rpc_error:
+                raise self.rpc_error
+            return SimpleNamespace(data=[CHECKS[1]])
+        return SimpleNamespace(execute=execute)
+
+
+class TestDocumentSearch(unittest.TestCase):
+
+    def test_rank_results(self):
+        ranked = rank_results(CHECKS, ['payer_name', 'payee_name'], 'smith')
+        self.assertEqual([row['check_id'] for row in ranked], [3, 1, 2])
+
+    def test_missing_function_errors(self):
+        self.assertTrue(is_missing_function_error(Exception('function search_checks(text, integer) does not exist')))
+        self.assertTrue(is_missing_function_error(SimpleNamespace(code='PGRST202')))
+        self.assertFalse(is_missing_function_error(TimeoutError('canceling statement due to statement timeout')))
+        self.assertFalse(is_missing_function_error(Exception('column "payee_name" does not exist')))
+
+    def test_rpc_search(self):
+        supabase = FakeSupabase()
+        results = DocumentSearch(cache_ttl=0, supabase=supabase).search('checks', ' John ', limit=5)
+        self.assertEqual(results, [CHECKS[1]])
+        self.assertEqual(supabase.rpc_calls, [('search_checks', {'search_query': 'John', 'max_results': 5})])
+        self.assertEqual(supabase.fallback_filters, [])
+
+    def test_transient_rpc_error_keeps_rpc(self):
+        supabase = FakeSupabase(rpc_error=TimeoutError('statement timeout'))
+        search = DocumentSearch(cache_ttl=0, supabase=supabase)
+        self.assertEqual(len(search.search('checks', 'smith')), 3)
+        supabase.rpc_error = None
+        self.assertEqual(search.search('checks', 'smith'), [CHECKS[1]])
+        self.assertEqual(len(supabase.rpc_calls), 2)
+
+    def test_missing_rpc_is_reprobed(self):
+        supabase = FakeSupabase(rpc_error=Exception('Could not find the function public.search_checks'))
+        search = DocumentSearch(cache_ttl=0, supabase=supabase)
+        with mock.patch.object(document_search.time, 'monotonic', return_value=1000.0):
+            self.assertEqual(len(search.search('checks', 'smith')), 3)
+            supabase.rpc_error = None
+            search.search('checks', 'smith')
+        self.assertEqual(len(supabase.rpc_calls), 1)
+        self.assertEqual(supabase.fallback_filters[0], 'payer_name.ilike.%smith%,payee_name.ilike.%smith%')
+
+        # After the re-probe interval the installed function is used again
+        later = 1000.0 + document_search.RPC_REPROBE_SECONDS
+        with mock.patch.object(document_search.time, 'monotonic', return_value=later):
+            self.assertEqual(search.search('checks', 'smith'), [CHECKS[1]])
+        self.assertEqual(len(supabase.rpc_calls), 2)
+
+    def test_cached_results(self):
+        supabase = FakeSupabase()
+        search = DocumentSearch(cache_ttl=30, supabase=supabase)
+        first = search.search('bank_statements', 'Chase Unique Query')
+        self.assertEqual(search.search('bank_statements', 'chase unique query'), first)
+        self.assertEqual(len(supabase.rpc_calls), 1)
+        self.assertEqual(search.search('bank_statements', '  '), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""
+Test Institution Fraud Stats
+Verifies bank name matching, amount histogram percentiles, stats increments,
+summaries and the TTL cache in front of institution_fraud_stats.
+"""
+
+import sys
+import os
+import random
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.institution_fraud_stats import (
+    InstitutionFraudStats, match_institution_name, amount_bucket, histogram_percentile,
+    build_stats_increment, summarize_institution_stats, format_institution_stats
+)
+
+INSTITUTIONS = ['BANK OF AMERICA', 'WELLS FARGO', 'WELLS FARGO BANK', 'JPMORGAN CHASE BANK', 'CHASE']
+
+
+class FakeQuery:
+    def __init__(self, supabase, table):
+        self.supabase = supabase
+        self.table = table
+        self.filters = {}
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def limit(self, count):
+        return self
+
+    def execute(self):
+        self.supabase.selects += 1
+        if self.table == 'financial_institutions':
+            return SimpleNamespace(data=[{'name': name} for name in INSTITUTIONS])
+        row = self.supabase.rows.get((self.filters['institution_name'], self.filters['document_type']))
+        return SimpleNamespace(data=[dict(row)] if row else [])
+
+
+class FakeSupabase:
+    """Applies increment_institution_fraud_stats the way the SQL function does"""
+
+    def __init__(self):
+        self.rows = {}
+        self.selects = 0
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        key = (params['p_institution_name'], params['p_document_type'])
+        row = self.rows.setdefault(key, {
+            'institution_name': key[0], 'document_type': key[1], 'document_count': 0, 'reject_count': 0,
+            'escalate_count': 0, 'risk_score_sum': 0.0, 'fraud_type_counts': {}, 'amount_histogram': {}
+        })
+        row['document_count'] += 1
+        row['reject_count'] += params['p_reject']
+        row['escalate_count'] += params['p_escalate']
+        row['risk_score_sum'] += params['p_risk_score']
+        for column, keys in (('fraud_type_counts', params['p_fraud_types']),
+                             ('amount_histogram', params['p_amount_buckets'])):
+            for key_name in keys:
+                row[column][key_name] = row[column].get(key_name, 0) + 1
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=None))
+
+
+class TestInstitutionFraudStats(unittest.TestCase):
+
+    def test_match_institution_name(self):
+        self.assertEqual(match_institution_name('Wells Fargo', INSTITUTIONS), 'WELLS FARGO BANK')
+        self.assertEqual(match_institution_name('bank of america, n.a.', INSTITUTIONS), 'BANK OF AMERICA')
+        self.assertEqual(match_institution_name('Chase', INSTITUTIONS), 'JPMORGAN CHASE BANK')
+        # Unrelated names are not forced onto the longest institution
+        self.assertIsNone(match_institution_name('Navy Federal Credit Union', INSTITUTIONS))
+        self.assertIsNone(match_institution_name(None, INSTITUTIONS))
+
+    def test_histogram_percentiles(self):
+        rng = random.Random(7)
+        amounts = sorted(rng.lognormvariate(7, 1.5) for _ in range(5000))
+        histogram = {}
+        for amount in amounts:
+            bucket = str(amount_bucket(amount))
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+        for pct in (50, 90, 99):
+            exact = amounts[int(pct / 100 * len(amounts)) - 1]
+            self.assertAlmostEqual(histogram_percentile(histogram, pct) / exact, 1.0, delta=0.08)
+        self.assertEqual(amount_bucket('$0.50'), 0)
+        self.assertIsNone(amount_bucket(None))
+        self.assertIsNone(histogram_percentile({}, 50))
+
+    def test_increment(self):
+        params = build_stats_increment(' Chase ', 'check', '$1,000.00', {'fraud_risk_score': 85},
+                                       {'recommendation': 'reject', 'fraud_types': ['COUNTERFEIT_CHECK', 'ALTERED_AMOUNT']})
+        self.assertEqual(params['p_institution_name'], 'CHASE')
+        self.assertEqual((params['p_reject'], params['p_escalate']), (1, 0))
+        self.assertAlmostEqual(params['p_risk_score'], 0.85)
+        # Only the primary fraud type is counted, as in the backfill
+        self.assertEqual(params['p_fraud_types'], ['Counterfeit Check'])
+        self.assertEqual(params['p_amount_buckets'], ['49'])
+        self.assertEqual(build_stats_increment('CHASE', 'check', None, None, None)['p_amount_buckets'], [])
+        self.assertEqual(build_stats_increment('CHASE', 'check', 10, {'fraud_risk_score': float('nan')},
+                                               None)['p_risk_score'], 0.0)
+
+    def test_summarize_and_format(self):
+        stats = summarize_institution_stats({
+            'institution_name': 'CHASE', 'document_type': 'bank_statement', 'document_count': 40,
+            'reject_count': 4, 'escalate_count': 6, 'risk_score_sum': 10.0,
+            'fraud_type_counts': {'Balance Inconsistency': 3, 'Altered Dates': 1}, 'amount_histogram': {'65': 40}
+        })
+        self.assertEqual(stats['fraud_rate'], 0.1)
+        self.assertEqual(stats['escalation_rate'], 0.15)
+        self.assertEqual(stats['average_fraud_score'], 0.25)
+        self.assertEqual(stats['common_fraud_patterns'], ['Balance Inconsistency', 'Altered Dates'])
+        self.assertTrue(10000 <= stats['amount_percentiles']['p50'] < 11550)
+        text = format_institution_stats(stats)
+        self.assertIn('CHASE: 40 documents, rejected 10.0%, escalated 15.0%', text)
+        self.assertIn('Balance Inconsistency (8%)', text)
+        self.assertEqual(summarize_institution_stats(None)['total_documents_processed'], 0)
+        self.assertEqual(format_institution_stats({}), 'No processing history for this institution')
+
+    def test_record_then_cached_stats(self):
+        supabase = FakeSupabase()
+        with mock.patch.dict(sys.modules, {'database.supabase_client': SimpleNamespace(get_supabase=lambda: supabase)}):
+            stats = InstitutionFraudStats(cache_ttl=60)
+        for amount, recommendation in ((500, 'APPROVE'), (9000, 'REJECT')):
+            self.assertTrue(stats.record_document('JPMORGAN CHASE BANK', 'check', amount, {'fraud_risk_score': 0.5},
+                                                  {'recommendation': recommendation, 'fraud_types': ['FORGERY']}))
+
+        first = stats.get_stats('Chase', 'check')
+        self.assertEqual(first['institution_name'], 'JPMORGAN CHASE BANK')
+        self.assertEqual(first['total_documents_processed'], 2)
+        self.assertEqual(first['fraud_rate'], 0.5)
+        selects = supabase.selects
+        self.assertIs(stats.get_stats('chase', 'check'), first)
+        self.assertEqual(supabase.selects, selects)
+
+        # A local store invalidates the cached entry
+        stats.record_document('JPMORGAN CHASE BANK', 'check', 100, {}, {'recommendation': 'ESCALATE'})
+        self.assertEqual(stats.get_stats('Chase', 'check')['total_documents_processed'], 3)
+        self.assertEqual(stats.get_stats('Unknown Savings', 'bank_statement')['total_documents_processed'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
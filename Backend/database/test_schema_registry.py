@@ -0,0 +1,80 @@
+"""
+Test Schema Registry
+Verifies column-set caching, versioned invalidation and memoized diffs.
+"""
+
+import sys
+import os
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.schema_registry import SchemaRegistry
+
+
+def _builder(calls):
+    def build(document_type, field_names):
+        calls.append((document_type, field_names))
+        return tuple((name, name.lower()) for name in field_names if name != 'raw_text')
+    return build
+
+
+class TestSchemaRegistry(unittest.TestCase):
+
+    def test_columns_cached_until_invalidated(self):
+        registry = SchemaRegistry()
+        self.assertIsNone(registry.get_columns('checks'))
+        registry.set_columns('checks', ['check_id', 'amount'])
+        self.assertEqual(registry.get_columns('checks'), frozenset({'check_id', 'amount'}))
+
+        registry.invalidate('checks')
+        self.assertIsNone(registry.get_columns('checks'))
+
+    def test_version_bumps_on_change(self):
+        registry = SchemaRegistry()
+        v0 = registry.version('checks')
+        registry.set_columns('checks', ['check_id'])
+        v1 = registry.version('checks')
+        registry.add_columns('checks', ['memo'])
+        v2 = registry.version('checks')
+        self.assertTrue(v0 < v1 < v2)
+        self.assertIn('memo', registry.get_columns('checks'))
+
+    def test_ttl_expiry(self):
+        registry = SchemaRegistry(ttl_seconds=0.01)
+        registry.set_columns('checks', ['check_id'])
+        import time
+        time.sleep(0.02)
+        self.assertIsNone(registry.get_columns('checks'))
+
+    def test_signature_built_once_per_shape(self):
+        registry = SchemaRegistry()
+        calls = []
+        fields = ('Memo', 'raw_text', 'Amount')
+        first = registry.get_signature('check', fields, _builder(calls))
+        second = registry.get_signature('check', fields, _builder(calls))
+        self.assertEqual(first, (('Memo', 'memo'), ('Amount', 'amount')))
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 1)
+
+    def test_diff_respects_existing_and_dedupes(self):
+        registry = SchemaRegistry()
+        existing = registry.set_columns('checks', ['amount'])
+        signature = (('Memo', 'memo'), ('memo', 'memo'), ('Amount', 'amount'))
+        missing = registry.diff('checks', 'check', ('Memo', 'memo', 'Amount'), signature, existing)
+        self.assertEqual(missing, (('Memo', 'memo'),))
+
+    def test_diff_recomputed_after_columns_added(self):
+        registry = SchemaRegistry()
+        fields = ('Memo',)
+        signature = (('Memo', 'memo'),)
+        existing = registry.set_columns('checks', ['amount'])
+        self.assertEqual(registry.diff('checks', 'check', fields, signature, existing), signature)
+
+        existing = registry.add_columns('checks', ['memo'])
+        self.assertEqual(registry.diff('checks', 'check', fields, signature, existing), ())
+
+
+if __name__ == '__main__':
+    unittest.main()
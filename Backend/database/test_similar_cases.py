@@ -0,0 +1,165 @@
+"""
+Test Similar Case Index
+Verifies indexing of rejected / escalated documents, nearest-neighbour queries,
+cross-process sync, rebuild from stored rows and prompt formatting.
+"""
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import similar_cases
+from database.similar_cases import SimilarCaseIndex, case_row, format_similar_cases, similar_case_index_stats
+
+
+def _check(amount, routing='021000021', signature=True):
+    return {'bank_name': 'Chase', 'routing_number': routing, 'account_number': '123456', 'check_number': '1001',
+            'amount': amount, 'payer_name': 'A Payer', 'payee_name': 'A Payee', 'check_date': '2025-01-02',
+            'signature_detected': signature}
+
+
+def _analysis(recommendation, score, fraud_types=()):
+    return {'fraud_risk_score': score, 'model_confidence': 0.9}, {
+        'recommendation': recommendation, 'fraud_types': list(fraud_types), 'summary': f'{recommendation} case'
+    }
+
+
+class FakeTable:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+class TestSimilarCaseIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.path = os.path.join(self.directory, 'cases.sqlite3')
+        self.index = SimilarCaseIndex(self.path, embedder=False)
+
+    def test_only_rejected_and_escalated_indexed(self):
+        ml, ai = _analysis('APPROVE', 0.1)
+        self.assertFalse(self.index.add_document('check', 'doc-ok', _check(100), ml, ai))
+        ml, ai = _analysis('reject', 0.9, ['COUNTERFEIT_CHECK'])
+        self.assertTrue(self.index.add_document('check', 'doc-bad', _check(9500), ml, ai))
+        # Same document stored twice is indexed once
+        self.assertFalse(self.index.add_document('check', 'doc-bad', _check(9500), ml, ai))
+        self.assertEqual(self.index.stats()['cases'], {'check': 1})
+
+    def test_nearest_cases_first(self):
+        for case_id, amount, score, routing in (('near', 9400, 0.88, '021000021'),
+                                                ('far', 15, 0.35, ''),
+                                                ('mid', 2500, 0.6, '021000021')):
+            ml, ai = _analysis('REJECT' if score > 0.5 else 'ESCALATE', score)
+            self.index.add_document('check', case_id, _check(amount, routing), ml, ai)
+
+        cases = self.index.query('check', _check(9500), {'fraud_risk_score': 0.9}, k=2)
+        self.assertEqual([case['case_id'] for case in cases], ['near', 'mid'])
+        self.assertEqual(cases[0]['outcome'], 'REJECTED')
+        self.assertGreater(cases[0]['similarity'], cases[1]['similarity'])
+        self.assertEqual(self.index.query('money_order', {'amount': 500}, {}), [])
+
+    def test_document_itself_excluded(self):
+        ml, ai = _analysis('REJECT', 0.9)
+        self.index.add_document('check', 'doc-1', _check(9500), ml, ai)
+        self.index.add_document('check', 'doc-2', _check(9400), ml, ai)
+        # Re-analyzing doc-1 (new model score, same fields) does not return doc-1 itself
+        cases = self.index.query('check', _check(9500), {'fraud_risk_score': 0.7}, k=5)
+        self.assertEqual([case['case_id'] for case in cases], ['doc-2'])
+        self.assertEqual(self.index.query('check', _check(9300), ml, k=5, exclude_case_id='doc-2')[0]['case_id'],
+                         'doc-1')
+
+    def test_no_free_text_stored(self):
+        ml, ai = _analysis('REJECT', 0.9, ['FORGERY'])
+        ai['summary'] = 'Check written by John Doe, SSN 123-45-6789, to Jane Roe'
+        self.index.add_document('check', 'doc-pii', _check(9500), ml, ai)
+        case = self.index.query('check', _check(9000), ml)[0]
+        self.assertNotIn('reason', case)
+        self.assertNotIn('John Doe', str(case))
+        self.assertEqual(case['fraud_types'], ['FORGERY'])
+
+    def test_query_takes_milliseconds(self):
+        ml, ai = _analysis('REJECT', 0.9)
+        rows = [case_row('check', _check(100 + i * 7, signature=i % 2 == 0), {'fraud_risk_score': (i % 100) / 100})
+                for i in range(5000)]
+        cases = [{'row': row, 'metadata': {'case_id': f'c{i}', 'recommendation': 'REJECT'}}
+                 for i, row in enumerate(rows)]
+        self.assertEqual(self.index.add_cases('check', cases), 5000)
+
+        started = time.perf_counter()
+        for _ in range(20):
+            self.index.query('check', _check(4321), ml, k=5)
+        self.assertLess((time.perf_counter() - started) / 20, 0.05)
+
+    def test_other_process_rows_picked_up(self):
+        other = SimilarCaseIndex(self.path, embedder=False)
+        ml, ai = _analysis('ESCALATE', 0.6)
+        other.add_document('money_order', 'mo-1', {'issuer': 'Western Union', 'amount': '$950.00'}, ml, ai)
+        self.index._sync(force=True)
+        cases = self.index.query('money_order', {'issuer': 'Western Union', 'amount': 940}, ml)
+        self.assertEqual(cases[0]['case_id'], 'mo-1')
+        self.assertEqual(cases[0]['amount'], 950.0)
+
+    def test_embeddings_break_ties(self):
+        vectors = {'balance mismatch': [1.0, 0.0], 'altered dates': [0.0, 1.0]}
+        index = SimilarCaseIndex(os.path.join(self.directory, 'embedded.sqlite3'),
+                                 embedder=lambda text: vectors[text])
+        statement = {'bank_name': 'Chase', 'ending_balance': 1000, 'beginning_balance': 800}
+        for case_id, signal in (('mismatch', 'balance mismatch'), ('dates', 'altered dates')):
+            index.add_document('bank_statement', case_id, statement,
+                               {'fraud_risk_score': 0.7, 'anomalies': [signal]}, {'recommendation': 'REJECT'})
+        cases = index.query('bank_statement', dict(statement, ending_balance=1001),
+                            {'fraud_risk_score': 0.7, 'anomalies': ['altered dates']})
+        self.assertEqual(cases[0]['case_id'], 'dates')
+
+    def test_rebuild_from_database(self):
+        stored = [{'document_id': 'p-1', 'employer_name': 'Acme', 'gross_pay': 5000, 'net_pay': 3900,
+                   'deductions': '[{"name": "Federal Tax", "amount": 600}]', 'fraud_risk_score': 82,
+                   'ai_recommendation': 'REJECT', 'fraud_types': 'Fabricated Document'}]
+        supabase = SimpleNamespace(table=lambda name: FakeTable(stored))
+        self.assertEqual(self.index.rebuild_from_database(supabase, ['paystub']), {'paystub': 1})
+        cases = self.index.query('paystub', {'company_name': 'Acme', 'gross_pay': 5000, 'net_pay': 3900},
+                                 {'fraud_risk_score': 0.8})
+        self.assertEqual(cases[0]['fraud_types'], ['Fabricated Document'])
+        self.assertAlmostEqual(cases[0]['fraud_score'], 0.82)
+
+    def test_format_similar_cases(self):
+        cases = [{'recommendation': 'REJECT', 'similarity': 0.91, 'institution': 'Chase', 'amount': 9400,
+                  'fraud_score': 0.88, 'fraud_types': ['COUNTERFEIT_CHECK'], 'reason': 'Altered amount'},
+                 {'outcome': 'ESCALATED', 'bank_name': 'Chase', 'amount': 100.0, 'fraud_score': 0.4}]
+        text = format_similar_cases(cases)
+        self.assertIn('1. REJECT (similarity 0.91) - Chase, amount $9,400.00, ML score 88%', text)
+        self.assertIn('fraud types: COUNTERFEIT_CHECK', text)
+        self.assertNotIn('Altered amount', text)
+        self.assertIn('2. ESCALATED', text)
+        self.assertEqual(len(format_similar_cases(cases, max_cases=1).splitlines()), 1)
+        self.assertEqual(format_similar_cases([]), 'No similar historical cases found')
+
+    def test_health_stats_do_not_build_index(self):
+        with mock.patch.object(similar_cases, '_similar_case_index', None), \
+                mock.patch.dict(os.environ, {'SIMILAR_CASES_ENABLED': 'true'}):
+            self.assertEqual(similar_case_index_stats(), {'built': False})
+            self.assertIsNone(similar_cases._similar_case_index)
+        with mock.patch.object(similar_cases, '_similar_case_index', self.index), \
+                mock.patch.dict(os.environ, {'SIMILAR_CASES_ENABLED': 'true'}):
+            self.assertEqual(similar_case_index_stats()['path'], self.path)
+        with mock.patch.dict(os.environ, {'SIMILAR_CASES_ENABLED': 'false'}):
+            self.assertEqual(similar_case_index_stats(), {'enabled': False})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+"""
+Lazy Components
+Heavy clients and libraries initialized on first use instead of at import time.
+
+Each component is built once (thread-safely) the first time it is requested, or
+ahead of traffic by warm_up() in a background thread; readiness() reports which
+components are warm. A failed initialization is retried on a later request once
+retry_interval seconds have passed, so a transient outage at startup does not
+disable a client for the life of the worker.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+COLD = 'cold'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class LazyComponent:
+    """A client or module created by factory() on first use"""
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        required: bool = False,
+        retry_interval: float = 30.0
+    ):
+        """
+        Args:
+            name: Component name (as reported by readiness())
+            factory: Builds the component; raising marks it failed
+            required: The server is not ready while this component is failed
+            retry_interval: Seconds before a failed component is built again
+        """
+        self.name = name
+        self.factory = factory
+        self.required = required
+        self.retry_interval = retry_interval
+        self.state = COLD
+        self.instance = None
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+
+    def _settled(self) -> bool:
+        if self.state == READY:
+            return True
+        return self.state == FAILED and time.monotonic() - self._failed_at < self.retry_interval
+
+    def get(self) -> Any:
+        """The component, building it if needed (None if it failed)"""
+        if self._settled():
+            return self.instance
+        with self._lock:
+            if self._settled():
+                return self.instance
+            self.state = LOADING
+            started = time.perf_counter()
+            try:
+                self.instance = self.factory()
+                self.state = READY
+                self.error = None
+                logger.info(f"Initialized {self.name} in {time.perf_counter() - started:.2f}s")
+            except Exception as e:
+                self.instance = None
+                self.state = FAILED
+                self.error = str(e)
+                self._failed_at = time.monotonic()
+                logger.warning(f"Failed to initialize {self.name}: {e}")
+            self.seconds = round(time.perf_counter() - started, 3)
+        return self.instance
+
+    def reset(self):
+        """Drop the instance so the next get() builds it again"""
+        with self._lock:
+            self.state = COLD
+            self.instance = None
+            self.error = None
+            self.seconds = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'required': self.required,
+            'init_seconds': self.seconds,
+            'error': self.error
+        }
+
+
+_components: Dict[str, LazyComponent] = {}
+_warm_up_thread: Optional[threading.Thread] = None
+_warm_up_lock = threading.Lock()
+
+
+def register_component(
+    name: str,
+    factory: Callable[[], Any],
+    required: bool = False,
+    retry_interval: float = 30.0
+) -> LazyComponent:
+    """Register (or replace) a lazily built component"""
+    component = LazyComponent(name, factory, required=required, retry_interval=retry_interval)
+    _components[name] = component
+    return component
+
+
+def get_component(name: str) -> Any:
+    """Get a component by name, building it on first use"""
+    return _components[name].get()
+
+
+def readiness() -> Dict[str, Any]:
+    """
+    Component states for the readiness endpoint
+
+    Returns:
+        Dict with 'ready' (every component warmed and no required component
+        failed) and per-component state, init time and error
+    """
+    components = {name: component.status() for name, component in _components.items()}
+    ready = all(
+        status['state'] in (READY, FAILED) and not (status['required'] and status['state'] == FAILED)
+        for status in components.values()
+    )
+    return {'ready': ready, 'components': components}
+
+
+def warm_up(names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+    """
+    Build components ahead of traffic
+
+    Args:
+        names: Components to build (default: all registered)
+        background: Build in a daemon thread (started once; later calls return it)
+
+    Returns:
+        The warm-up thread when background is True
+    """
+    global _warm_up_thread
+    targets = list(names) if names is not None else list(_components)
+
+    def _run():
+        for name in targets:
+            _components[name].get()
+
+    if not background:
+        _run()
+        return None
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=_run, name='component-warm-up', daemon=True)
+            _warm_up_thread.start()
+        return _warm_up_thread
+
+
+def _create_mindee_client():
+    """Mindee ClientV2 (requires mindee>=4.31.0), shared by all document extractors"""
+    api_key = os.getenv("MINDEE_API_KEY", "").strip()
+    if not api_key:
+        raise RuntimeError("MINDEE_API_KEY is not set")
+    from mindee import ClientV2
+    from utils.resilience import ResilientClient
+    # Inference calls get the 'mindee' deadline, breaker and concurrency limit
+    return ResilientClient(
+        ClientV2(api_key=api_key), 'mindee', methods=('enqueue_and_get_inference',), wrap_results=()
+    )
+
+
+register_component('mindee', _create_mindee_client)
+
+
+def get_mindee_client():
+    """Get the shared Mindee client (None if the key or library is missing)"""
+    return get_component('mindee')
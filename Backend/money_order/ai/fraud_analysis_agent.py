@@ -21,11 +21,21 @@ except ImportError as e:
     print(f"Warning: LangChain not installed. Error: {e}")
 
 from .prompts import (
-    SYSTEM_PROMPT,
+    INSTRUCTION_PREFIX,
     ANALYSIS_TEMPLATE,
-    RECOMMENDATION_GUIDELINES
+    COMPACTABLE_FIELDS,
+    COMPACTION_LEVELS
 )
 from .tools import DataAccessTools
+from . import prompts
+from utils.llm_cache import LLMResponseCache
+from utils.decision_tiers import DecisionTierEngine
+from utils.prompt_budget import fit_prompt
+from utils.resilience import ResilientClient, openai_client_kwargs
+from database.similar_cases import find_similar_cases, format_similar_cases
+
+_llm_cache = LLMResponseCache('money_order', prompt_modules=[prompts])
+_decision_tiers = DecisionTierEngine('money_order', document_label='money order')
 
 
 class FraudAnalysisAgent:
@@ -67,7 +77,9 @@ class FraudAnalysisAgent:
                     llm_kwargs['temperature'] = 1
                     llm_kwargs['max_tokens'] = 1500
                 
-                self.llm = ChatOpenAI(**llm_kwargs)
+                # Deadline, retries and circuit breaking are handled by utils.resilience
+                llm_kwargs.update(openai_client_kwargs())
+                self.llm = ResilientClient(ChatOpenAI(**llm_kwargs), 'openai')
             except Exception as e:
                 print(f"Warning: Could not initialize LangChain: {e}")
                 self.llm = None
@@ -97,6 +109,7 @@ class FraudAnalysisAgent:
         Returns:
             Dictionary with AI analysis and recommendation
         """
+        _decision_tiers.record_document()
         if self.llm is None:
             raise ValueError("AI Agent not initialized. OpenAI API key missing or invalid.")
 
@@ -337,6 +350,20 @@ class FraudAnalysisAgent:
         else:
             logger.info(f"[FRAUD_ANALYSIS] escalate_count={escalate_count}, proceeding with LLM analysis")
 
+        # Clear-cut ML scores are decided without the LLM (first uploads are escalated, never rejected)
+        tier_decision = _decision_tiers.decide(
+            purchaser, ml_analysis, customer_fraud_history, allow_reject=escalate_count > 0
+        )
+        if tier_decision:
+            tier_decision.update({
+                'verification_notes': '',
+                'training_insights': '',
+                'historical_comparison': '',
+                'analysis_type': 'decision_tier',
+                'model_used': 'decision_tier_engine'
+            })
+            return tier_decision
+
         # Get fraud risk score to determine if we should hide escalate_count from AI
         fraud_risk_score = ml_analysis.get('fraud_risk_score', 0) if ml_analysis else 0
         hide_escalate_count = fraud_risk_score < 0.30
@@ -359,9 +386,12 @@ class FraudAnalysisAgent:
                 else:
                     customer_history = str(history)
 
-        # Search for similar fraud cases
+        # Nearest previously rejected / escalated money orders, else the data tools' search
         similar_cases = "No similar cases found"
-        if self.data_tools:
+        nearest_cases = find_similar_cases('money_order', extracted_data, ml_analysis)
+        if nearest_cases:
+            similar_cases = format_similar_cases(nearest_cases)
+        elif self.data_tools:
             cases = self.data_tools.search_similar_fraud_cases(
                 issuer=extracted_data.get('issuer'),
                 amount_range=(
@@ -474,17 +504,7 @@ class FraudAnalysisAgent:
             "past_similar_cases": InputGuard.sanitize(past_similar_cases)
         }
         
-        # Validate prompt length
-        import json
-        prompt_preview = json.dumps(prompt_vars)
-        if not InputGuard.validate_length(prompt_preview, max_chars=15000):
-            logger.warning("Prompt data too long, truncating long fields")
-            # Truncate long string fields
-            for key in ['customer_history', 'similar_cases', 'past_similar_cases', 'raw_ocr_text']:
-                if isinstance(prompt_vars.get(key), str) and len(prompt_vars[key]) > 500:
-                    prompt_vars[key] = prompt_vars[key][:500] + "..."
-        
-        logger.info("Applied LLM guardrails: sanitized PII and validated input length")
+        logger.info("Applied LLM guardrails: sanitized PII")
 
         # DEBUG: Log raw_text availability
         logger.info(f"[FRAUD_ANALYSIS] DEBUG: extracted_data keys: {list(extracted_data.keys())}")
@@ -492,18 +512,24 @@ class FraudAnalysisAgent:
         logger.info(f"[FRAUD_ANALYSIS] DEBUG: raw_text value: {extracted_data.get('raw_text', 'MISSING')[:100] if extracted_data.get('raw_text') else 'NULL'}")
         logger.info(f"[FRAUD_ANALYSIS] DEBUG: raw_ocr_text for prompt: {prompt_vars.get('raw_ocr_text', 'NOT SET')[:100] if prompt_vars.get('raw_ocr_text') != 'N/A' else 'N/A'}")
 
-        # Create prompt
-        prompt = ChatPromptTemplate.from_messages([
-            SystemMessagePromptTemplate.from_template(SYSTEM_PROMPT),
-            HumanMessagePromptTemplate.from_template(ANALYSIS_TEMPLATE)
-        ])
+        # Format the analysis prompt, shortening long free-text fields to fit the model's token budget
+        def render(max_field_chars=None):
+            values = dict(prompt_vars)
+            if max_field_chars:
+                for key in COMPACTABLE_FIELDS:
+                    if isinstance(values.get(key), str) and len(values[key]) > max_field_chars:
+                        values[key] = values[key][:max_field_chars] + "..."
+            return ANALYSIS_TEMPLATE.format(**values)
+
+        analysis_prompt, _ = fit_prompt('money_order', self.model_name, INSTRUCTION_PREFIX, render, COMPACTION_LEVELS)
 
         # Generate analysis
-        messages = prompt.format_messages(**prompt_vars)
-        response = self.llm.invoke(messages)
+        from langchain_core.messages import SystemMessage, HumanMessage
+        messages = [SystemMessage(content=INSTRUCTION_PREFIX), HumanMessage(content=analysis_prompt)]
+        response_text = _llm_cache.invoke(self.llm, messages, self.model_name)
 
         # Parse response
-        return self._parse_llm_response(response.content)
+        return self._parse_llm_response(response_text)
 
     def _parse_llm_response(self, content: str) -> Dict:
         """
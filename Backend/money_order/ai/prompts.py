@@ -314,3 +314,13 @@ CRITICAL RULES (IN ABSOLUTE PRIORITY ORDER):
 6. New customers with high risk should be escalated for human review, not auto-rejected
 7. Repeat fraudsters should face stricter thresholds (REJECT at >= 30% risk)
 """
+
+
+# Static prefix sent before every analysis - kept byte-identical so provider prompt caching applies
+INSTRUCTION_PREFIX = SYSTEM_PROMPT
+
+# Free-text ANALYSIS_TEMPLATE fields shortened when the prompt exceeds the model's token budget
+COMPACTABLE_FIELDS = ('raw_ocr_text', 'customer_history', 'similar_cases', 'past_similar_cases')
+
+# Field length limits, most to least detailed, tried until the prompt fits the token budget
+COMPACTION_LEVELS = ({}, {'max_field_chars': 2000}, {'max_field_chars': 500}, {'max_field_chars': 200})
@@ -1,13 +1,35 @@
 """
 Result Storage Module for Analysis Results
-Saves and retrieves complete fraud analysis JSON files
+Saves and retrieves complete fraud analysis results in an indexed SQLite store
+(one row per analysis, JSON payload column, B-tree indexes on ID, timestamp and amount)
 """
 
 import os
 import json
-from datetime import datetime
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+INDEX_FILENAME = 'analysis_index.sqlite3'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    analysis_id TEXT PRIMARY KEY,
+    saved_timestamp TEXT NOT NULL,
+    serial_number TEXT,
+    issuer TEXT,
+    amount REAL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_saved_timestamp ON analyses (saved_timestamp);
+CREATE INDEX IF NOT EXISTS idx_analyses_amount ON analyses (amount);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
 
 class ResultStorage:
     """
@@ -19,93 +41,127 @@ class ResultStorage:
         Initialize result storage
 
         Args:
-            storage_dir: Directory to store analysis JSON files
+            storage_dir: Directory holding the analysis index (and any legacy JSON files)
         """
         self.storage_dir = storage_dir
+        self.index_path = os.path.join(self.storage_dir, INDEX_FILENAME)
 
         # Create directory if it doesn't exist
         if not os.path.exists(self.storage_dir):
             os.makedirs(self.storage_dir)
             print(f"Created results storage directory: {self.storage_dir}")
 
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+            imported = conn.execute("SELECT value FROM meta WHERE key = 'legacy_imported'").fetchone()
+        if not imported:
+            self.import_legacy_files()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.index_path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
     def save_analysis_result(self, analysis_data: Dict, serial_number: str = None) -> str:
         """
-        Save complete analysis result to JSON file
+        Save complete analysis result to the index
 
         Args:
             analysis_data: Complete analysis dictionary
-            serial_number: Money order serial number (for filename)
+            serial_number: Money order serial number (for the analysis ID)
 
         Returns:
-            analysis_id: Unique ID for this analysis (filename without extension)
+            analysis_id: Unique ID for this analysis
         """
-        # Generate unique filename
+        # Generate unique ID
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]  # Milliseconds
         serial_clean = self._clean_serial_for_filename(serial_number) if serial_number else 'unknown'
         analysis_id = f"analysis_{timestamp}_{serial_clean}"
-        filename = f"{analysis_id}.json"
-        filepath = os.path.join(self.storage_dir, filename)
 
         # Add metadata
         analysis_data['analysis_id'] = analysis_id
         analysis_data['saved_timestamp'] = datetime.now().isoformat()
 
-        # Save to file
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(analysis_data, f, indent=2, ensure_ascii=False)
-            print(f"[SUCCESS] Analysis saved: {filepath}")
+            with closing(self._connect()) as conn, conn:
+                self._insert(conn, analysis_id, analysis_data, serial_number)
+            print(f"[SUCCESS] Analysis saved: {analysis_id}")
             return analysis_id
         except Exception as e:
             print(f"[ERROR] Error saving analysis: {e}")
             return None
 
+    def _insert(self, conn: sqlite3.Connection, analysis_id: str, analysis_data: Dict,
+                serial_number: Optional[str] = None, replace: bool = True):
+        """Insert one analysis row"""
+        verb = 'INSERT OR REPLACE' if replace else 'INSERT OR IGNORE'
+        conn.execute(
+            f"{verb} INTO analyses (analysis_id, saved_timestamp, serial_number, issuer, amount, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                analysis_id,
+                analysis_data.get('saved_timestamp', ''),
+                serial_number or (analysis_data.get('extracted_data') or {}).get('serial_number'),
+                self._extract_issuer(analysis_data),
+                self._extract_amount(analysis_data),
+                json.dumps(analysis_data, ensure_ascii=False)
+            )
+        )
+
+    def get_analysis_json(self, analysis_id: str) -> Optional[str]:
+        """
+        Retrieve the raw JSON payload of an analysis by ID (indexed lookup)
+
+        Args:
+            analysis_id: Analysis ID
+
+        Returns:
+            JSON string or None
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT payload FROM analyses WHERE analysis_id = ?", (analysis_id,)).fetchone()
+        return row[0] if row else None
+
     def get_analysis_by_id(self, analysis_id: str) -> Optional[Dict]:
         """
         Retrieve analysis by ID
 
         Args:
-            analysis_id: Analysis ID (filename without extension)
+            analysis_id: Analysis ID
 
         Returns:
             Analysis dictionary or None
         """
-        filepath = os.path.join(self.storage_dir, f"{analysis_id}.json")
-
-        if not os.path.exists(filepath):
-            return None
-
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            payload = self.get_analysis_json(analysis_id)
+            return json.loads(payload) if payload else None
         except Exception as e:
             print(f"Error loading analysis {analysis_id}: {e}")
             return None
 
+    def _query(self, where: str = '', params: tuple = (), limit: Optional[int] = None) -> List[Dict]:
+        """Load payloads matching a WHERE clause, newest first"""
+        sql = f"SELECT payload FROM analyses {where} ORDER BY saved_timestamp DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = params + (limit,)
+        results = []
+        with closing(self._connect()) as conn:
+            for (payload,) in conn.execute(sql, params):
+                try:
+                    results.append(json.loads(payload))
+                except Exception as e:
+                    print(f"Error loading stored analysis: {e}")
+        return results
+
     def get_all_stored_results(self) -> List[Dict]:
         """
         Load all stored analysis results
 
         Returns:
-            List of analysis dictionaries
+            List of analysis dictionaries, newest first
         """
-        results = []
-
-        if not os.path.exists(self.storage_dir):
-            return results
-
-        for filename in os.listdir(self.storage_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.storage_dir, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        results.append(data)
-                except Exception as e:
-                    print(f"Error loading {filename}: {e}")
-                    continue
-
-        return results
+        return self._query()
 
     def get_recent_results(self, limit: int = 10) -> List[Dict]:
         """
@@ -117,16 +173,7 @@ class ResultStorage:
         Returns:
             List of recent analysis dictionaries, sorted by timestamp (newest first)
         """
-        all_results = self.get_all_stored_results()
-
-        # Sort by saved_timestamp (newest first)
-        sorted_results = sorted(
-            all_results,
-            key=lambda x: x.get('saved_timestamp', ''),
-            reverse=True
-        )
-
-        return sorted_results[:limit]
+        return self._query(limit=limit)
 
     def search_by_issuer(self, issuer: str, limit: int = 5) -> List[Dict]:
         """
@@ -139,25 +186,7 @@ class ResultStorage:
         Returns:
             List of matching analyses
         """
-        all_results = self.get_all_stored_results()
-        matches = []
-
-        for result in all_results:
-            # Check both raw and normalized data
-            extracted_issuer = result.get('extracted_data', {}).get('issuer', '')
-            normalized_issuer = result.get('normalized_data', {}).get('issuer_name', '')
-
-            if issuer.lower() in extracted_issuer.lower() or issuer.lower() in normalized_issuer.lower():
-                matches.append(result)
-
-        # Sort by timestamp (newest first) and limit
-        sorted_matches = sorted(
-            matches,
-            key=lambda x: x.get('saved_timestamp', ''),
-            reverse=True
-        )
-
-        return sorted_matches[:limit]
+        return self._query("WHERE instr(lower(issuer), lower(?)) > 0", (issuer,), limit)
 
     def search_by_amount_range(self, min_amount: float, max_amount: float, limit: int = 5) -> List[Dict]:
         """
@@ -171,51 +200,104 @@ class ResultStorage:
         Returns:
             List of matching analyses
         """
-        all_results = self.get_all_stored_results()
-        matches = []
-
-        for result in all_results:
-            # Try to extract amount
-            amount = None
-
-            # From normalized data
-            normalized_data = result.get('normalized_data', {})
-            if normalized_data:
-                amount_obj = normalized_data.get('amount_numeric', {})
-                if isinstance(amount_obj, dict):
-                    amount = amount_obj.get('value', 0)
-                elif isinstance(amount_obj, (int, float)):
-                    amount = amount_obj
-
-            # Fallback to extracted data
-            if amount is None:
-                extracted_data = result.get('extracted_data', {})
-                amount_value = extracted_data.get('amount', '')
-                # Handle both string and float values from Mindee
-                if isinstance(amount_value, (int, float)):
-                    amount = float(amount_value)
-                else:
-                    amount_str = str(amount_value).replace('$', '').replace(',', '')
-                    try:
-                        amount = float(amount_str) if amount_str else 0
-                    except:
-                        amount = 0
-
-            # Check if in range
-            if min_amount <= amount <= max_amount:
-                matches.append(result)
-
-        # Sort and limit
-        sorted_matches = sorted(
-            matches,
-            key=lambda x: x.get('saved_timestamp', ''),
-            reverse=True
-        )
+        return self._query("WHERE amount BETWEEN ? AND ?", (min_amount, max_amount), limit)
+
+    def compact(self, max_age_days: Optional[int] = None, keep_latest: Optional[int] = None) -> int:
+        """
+        Drop old analyses and reclaim space
+
+        Args:
+            max_age_days: Delete analyses saved more than this many days ago
+            keep_latest: Keep only the N most recent analyses
+
+        Returns:
+            Number of analyses deleted
+        """
+        deleted = 0
+        with closing(self._connect()) as conn:
+            with conn:
+                if max_age_days is not None:
+                    cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+                    deleted += conn.execute("DELETE FROM analyses WHERE saved_timestamp < ?", (cutoff,)).rowcount
+                if keep_latest is not None:
+                    deleted += conn.execute(
+                        "DELETE FROM analyses WHERE analysis_id NOT IN "
+                        "(SELECT analysis_id FROM analyses ORDER BY saved_timestamp DESC LIMIT ?)",
+                        (keep_latest,)
+                    ).rowcount
+            conn.execute('VACUUM')
+        print(f"Compacted analysis index: {deleted} analyses removed")
+        return deleted
+
+    def import_legacy_files(self) -> int:
+        """
+        One-time import of per-analysis JSON files written by earlier versions
 
-        return sorted_matches[:limit]
+        Returns:
+            Number of analyses imported
+        """
+        imported = 0
+        with closing(self._connect()) as conn, conn:
+            for filename in sorted(os.listdir(self.storage_dir)):
+                if not filename.endswith('.json'):
+                    continue
+                filepath = os.path.join(self.storage_dir, filename)
+                try:
+                    with open(filepath, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                except Exception as e:
+                    print(f"Error loading {filename}: {e}")
+                    continue
+                # Legacy download IDs are the filename stem
+                analysis_id = os.path.splitext(filename)[0]
+                self._insert(conn, analysis_id, data, replace=False)
+                imported += 1
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', ?)",
+                         (datetime.now().isoformat(),))
+        if imported:
+            print(f"Imported {imported} legacy analysis files into {self.index_path}")
+        return imported
+
+    def _extract_issuer(self, result: Dict) -> str:
+        """Issuer from raw or normalized data (for the issuer index)"""
+        extracted_issuer = (result.get('extracted_data') or {}).get('issuer') or ''
+        normalized_issuer = (result.get('normalized_data') or {}).get('issuer_name') or ''
+        return ' | '.join(name for name in (extracted_issuer, normalized_issuer) if name)
+
+    def _extract_amount(self, result: Dict) -> float:
+        """Amount from normalized data, falling back to extracted data (for the amount index)"""
+        amount = None
+
+        # From normalized data
+        normalized_data = result.get('normalized_data', {})
+        if normalized_data:
+            amount_obj = normalized_data.get('amount_numeric', {})
+            if isinstance(amount_obj, dict):
+                amount = amount_obj.get('value', 0)
+            elif isinstance(amount_obj, (int, float)):
+                amount = amount_obj
+
+        # Fallback to extracted data
+        if amount is None:
+            extracted_data = result.get('extracted_data', {})
+            amount_value = extracted_data.get('amount', '')
+            # Handle both string and float values from Mindee
+            if isinstance(amount_value, (int, float)):
+                amount = float(amount_value)
+            else:
+                amount_str = str(amount_value).replace('$', '').replace(',', '')
+                try:
+                    amount = float(amount_str) if amount_str else 0
+                except:
+                    amount = 0
+
+        try:
+            return float(amount or 0)
+        except (TypeError, ValueError):
+            return 0.0
 
     def _clean_serial_for_filename(self, serial: str) -> str:
-        """Clean serial number for use in filename"""
+        """Clean serial number for use in the analysis ID"""
         if not serial:
             return 'unknown'
 
@@ -0,0 +1,81 @@
+"""
+Test Result Storage
+Verifies the indexed money order analysis store.
+"""
+
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from money_order.ai.result_storage import ResultStorage
+
+
+def _analysis(issuer, amount):
+    return {
+        'status': 'success',
+        'extracted_data': {'issuer': issuer, 'amount': amount, 'serial_number': '123'},
+        'normalized_data': {}
+    }
+
+
+class TestResultStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.storage_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.storage_dir, ignore_errors=True)
+
+    def test_save_and_get_by_id(self):
+        storage = ResultStorage(self.storage_dir)
+        analysis_id = storage.save_analysis_result(_analysis('Western Union', '$325.00'), serial_number='47-83')
+        self.assertTrue(analysis_id.endswith('_4783'))
+        loaded = storage.get_analysis_by_id(analysis_id)
+        self.assertEqual(loaded['analysis_id'], analysis_id)
+        self.assertEqual(loaded['extracted_data']['issuer'], 'Western Union')
+        self.assertIsNone(storage.get_analysis_by_id('missing'))
+
+    def test_recent_results_newest_first(self):
+        storage = ResultStorage(self.storage_dir)
+        ids = [storage.save_analysis_result(_analysis('MoneyGram', i), serial_number=str(i)) for i in range(5)]
+        recent = storage.get_recent_results(limit=3)
+        self.assertEqual([r['analysis_id'] for r in recent], ids[::-1][:3])
+        self.assertEqual(len(storage.get_all_stored_results()), 5)
+
+    def test_search(self):
+        storage = ResultStorage(self.storage_dir)
+        storage.save_analysis_result(_analysis('Western Union', '$1,200.00'))
+        storage.save_analysis_result(_analysis('MoneyGram', 50))
+        self.assertEqual(len(storage.search_by_issuer('western')), 1)
+        matches = storage.search_by_amount_range(1000, 2000)
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0]['extracted_data']['issuer'], 'Western Union')
+
+    def test_legacy_files_imported_once(self):
+        legacy = _analysis('USPS', '$10.00')
+        legacy['saved_timestamp'] = '2025-01-01T00:00:00'
+        with open(os.path.join(self.storage_dir, 'analysis_legacy_1.json'), 'w') as f:
+            json.dump(legacy, f)
+        storage = ResultStorage(self.storage_dir)
+        self.assertEqual(storage.get_analysis_by_id('analysis_legacy_1')['extracted_data']['issuer'], 'USPS')
+
+        os.remove(os.path.join(self.storage_dir, 'analysis_legacy_1.json'))
+        storage = ResultStorage(self.storage_dir)
+        self.assertIsNotNone(storage.get_analysis_by_id('analysis_legacy_1'))
+
+    def test_compact(self):
+        storage = ResultStorage(self.storage_dir)
+        for i in range(4):
+            storage.save_analysis_result(_analysis('MoneyGram', i))
+        self.assertEqual(storage.compact(keep_latest=2), 2)
+        self.assertEqual(len(storage.get_all_stored_results()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,19 +15,11 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 # Import centralized config and logging
 from config import Config
+from utils.date_parser import parse_month_name_date
 logger = Config.get_logger(__name__)
 
-# Import Mindee - use ClientV2 API (same as checks/paystubs)
-try:
-    from mindee import ClientV2, InferenceParameters, PathInput
-    MINDEE_AVAILABLE = True
-except ImportError as e:
-    logger.error(f"Mindee library not properly installed: {e}")
-    logger.error("Requires mindee>=4.31.0. Install with: pip install --upgrade 'mindee>=4.31.0'")
-    MINDEE_AVAILABLE = False
-    ClientV2 = None
-    InferenceParameters = None
-    PathInput = None
+# Mindee ClientV2 (requires mindee>=4.31.0) is imported and built on first extraction
+from lazy_components import get_mindee_client
 
 # Mindee configuration
 MINDEE_API_KEY = os.getenv("MINDEE_API_KEY", "").strip()
@@ -38,13 +30,6 @@ logger.info(f"Mindee Model ID: {MINDEE_MODEL_ID_MONEY_ORDER}")
 
 if not MINDEE_API_KEY:
     logger.warning("MINDEE_API_KEY is not set - money order extraction may fail")
-    mindee_client = None
-elif not MINDEE_AVAILABLE:
-    logger.error("Mindee library not available")
-    mindee_client = None
-else:
-    mindee_client = ClientV2(api_key=MINDEE_API_KEY)
-    logger.info("Mindee ClientV2 initialized successfully")
 
 # Import ML models and AI agent
 try:
@@ -124,6 +109,7 @@ class MoneyOrderExtractor:
         Returns:
             Tuple of (extracted_data dict, raw_text string)
         """
+        mindee_client = get_mindee_client()
         if not mindee_client:
             raise RuntimeError("Mindee client not initialized. Check API key and installation.")
         
@@ -131,6 +117,8 @@ class MoneyOrderExtractor:
             logger.info(f"Extracting with Mindee using model ID: {MINDEE_MODEL_ID_MONEY_ORDER}")
             
             # Create inference parameters with the model ID
+            from mindee import InferenceParameters, PathInput
+
             params = InferenceParameters(model_id=MINDEE_MODEL_ID_MONEY_ORDER, raw_text=True)
             input_source = PathInput(file_path)
             
@@ -478,26 +466,13 @@ class MoneyOrderExtractor:
         """Normalize date string to MM/DD/YYYY format"""
         if not date_str:
             return date_str
-        
-        # Month name mapping
-        month_map = {
-            'JANUARY': '01', 'FEBRUARY': '02', 'MARCH': '03', 'APRIL': '04',
-            'MAY': '05', 'JUNE': '06', 'JULY': '07', 'AUGUST': '08',
-            'SEPTEMBER': '09', 'OCTOBER': '10', 'NOVEMBER': '11', 'DECEMBER': '12',
-            'JAN': '01', 'FEB': '02', 'MAR': '03', 'APR': '04',
-            'MAY': '05', 'JUN': '06', 'JUL': '07', 'AUG': '08',
-            'SEP': '09', 'OCT': '10', 'NOV': '11', 'DEC': '12'
-        }
-        
-        # Try to parse month name format
-        for month_name, month_num in month_map.items():
-            pattern = rf'({month_name})\s+(\d{{1,2}}),?\s+(\d{{4}})'
-            match = re.search(pattern, date_str, re.IGNORECASE)
-            if match:
-                day = match.group(2).zfill(2)
-                year = match.group(3)
-                return f'{month_num}/{day}/{year}'
-        
+
+        # Try to parse month name format (single compiled pattern, memoized)
+        month_name_date = parse_month_name_date(date_str)
+        if month_name_date:
+            month_num, day, year = month_name_date
+            return f'{month_num}/{day}/{year}'
+
         # If already in numeric format, return as is
         return date_str
 
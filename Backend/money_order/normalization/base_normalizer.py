@@ -7,8 +7,24 @@ import re
 from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Dict, Optional
+from utils.date_parser import parse_date
 from .schema import NormalizedMoneyOrder
 
+# Common date formats to try, in priority order
+DATE_FORMATS = (
+    '%m/%d/%Y',      # 10/15/2024
+    '%m-%d-%Y',      # 10-15-2024
+    '%m/%d/%y',      # 10/15/24
+    '%m-%d-%y',      # 10-15-24
+    '%d/%m/%Y',      # 15/10/2024 (European)
+    '%d-%m-%Y',      # 15-10-2024
+    '%Y-%m-%d',      # 2024-10-15 (ISO)
+    '%B %d, %Y',     # October 15, 2024
+    '%b %d, %Y',     # Oct 15, 2024
+    '%d %B %Y',      # 15 October 2024
+    '%d %b %Y',      # 15 Oct 2024
+)
+
 
 class BaseNormalizer(ABC):
     """
@@ -154,28 +170,11 @@ class BaseNormalizer(ABC):
             # Remove whitespace
             date_str = date_str.strip()
 
-        # Common date formats to try
-        date_formats = [
-            '%m/%d/%Y',      # 10/15/2024
-            '%m-%d-%Y',      # 10-15-2024
-            '%m/%d/%y',      # 10/15/24
-            '%m-%d-%y',      # 10-15-24
-            '%d/%m/%Y',      # 15/10/2024 (European)
-            '%d-%m-%Y',      # 15-10-2024
-            '%Y-%m-%d',      # 2024-10-15 (ISO)
-            '%B %d, %Y',     # October 15, 2024
-            '%b %d, %Y',     # Oct 15, 2024
-            '%d %B %Y',      # 15 October 2024
-            '%d %b %Y',      # 15 Oct 2024
-        ]
-
-        for fmt in date_formats:
-            try:
-                date_obj = datetime.strptime(date_str, fmt)
-                # Return in standardized MM-DD-YYYY format
-                return date_obj.strftime('%m-%d-%Y')
-            except ValueError:
-                continue
+        # Shared memoized parser (formats tried in DATE_FORMATS order)
+        date_obj = parse_date(date_str, DATE_FORMATS)
+        if date_obj:
+            # Return in standardized MM-DD-YYYY format
+            return date_obj.strftime('%m-%d-%Y')
 
         # If no format matched, return None
         return None
@@ -4,7 +4,6 @@ Uses LangChain + OpenAI to analyze paystub fraud and make final decisions
 Completely independent from other document type AI agents
 """
 
-import json
 import logging
 from typing import Dict, Optional
 import os
@@ -28,14 +27,24 @@ except ImportError as e:
     logger.warning(f"LangChain not available: {e}")
 
 from .paystub_prompts import (
-    SYSTEM_PROMPT,
-    RECOMMENDATION_GUIDELINES,
+    INSTRUCTION_PREFIX,
+    COMPACTION_LEVELS,
     format_analysis_template
 )
 from .paystub_tools import PaystubDataAccessTools
+from . import paystub_prompts
+from utils.llm_cache import LLMResponseCache
+from utils.decision_tiers import DecisionTierEngine
+from utils.prompt_budget import fit_prompt
+from utils.structured_output import invoke_structured
+from utils.resilience import ResilientClient, openai_client_kwargs
+from database.similar_cases import find_similar_cases
 
 logger = logging.getLogger(__name__)
 
+_llm_cache = LLMResponseCache('paystub', prompt_modules=[paystub_prompts])
+_decision_tiers = DecisionTierEngine('paystub')
+
 
 class PaystubFraudAnalysisAgent:
     """
@@ -71,7 +80,9 @@ class PaystubFraudAnalysisAgent:
                 if not (self.model_name.startswith('o4') or self.model_name.startswith('o1')):
                     llm_kwargs['max_tokens'] = 1500
                 
-                self.llm = ChatOpenAI(**llm_kwargs)
+                # Deadline, retries and circuit breaking are handled by utils.resilience
+                llm_kwargs.update(openai_client_kwargs())
+                self.llm = ResilientClient(ChatOpenAI(**llm_kwargs), 'openai')
                 logger.info(f"Initialized PaystubFraudAnalysisAgent with LangChain model: {model}")
             except Exception as e:
                 logger.warning(f"Could not initialize LangChain: {e}")
@@ -100,6 +111,7 @@ class PaystubFraudAnalysisAgent:
         Returns:
             AI analysis dict with recommendation, confidence, reasoning, etc.
         """
+        _decision_tiers.record_document()
         # Try multiple sources for employee name
         if not employee_name:
             employee_name = (
@@ -185,51 +197,45 @@ class PaystubFraudAnalysisAgent:
                     employee_info = self.data_tools.get_employee_history(employee_name)
                     logger.info(f"Retrieved employee history for: {employee_name}")
 
-            # Format the analysis prompt
-            analysis_prompt = format_analysis_template(
-                paystub_data=extracted_data,
-                ml_analysis=ml_analysis,
-                employee_info=employee_info
+            # Clear-cut ML scores are decided without the LLM (new employees are escalated, never rejected)
+            tier_decision = _decision_tiers.decide(
+                employee_name, ml_analysis, employee_info,
+                allow_reject=bool(employee_info.get('employee_id')),
+                validate=lambda decision: self._validate_and_format_result(decision, ml_analysis, employee_info)
+            )
+            if tier_decision:
+                return tier_decision
+
+            # Nearest previously rejected / escalated paystubs
+            similar_cases = find_similar_cases('paystub', extracted_data, ml_analysis)
+
+            # Format the analysis prompt, compacted to the model's token budget
+            # (recommendation guidelines are part of the static system prefix)
+            full_prompt, _ = fit_prompt(
+                'paystub', self.model_name, INSTRUCTION_PREFIX,
+                lambda **limits: format_analysis_template(
+                    paystub_data=extracted_data,
+                    ml_analysis=ml_analysis,
+                    employee_info=employee_info,
+                    similar_cases=similar_cases,
+                    **limits
+                ),
+                COMPACTION_LEVELS
             )
-
-            # Add recommendation guidelines
-            full_prompt = f"{analysis_prompt}\n\n{RECOMMENDATION_GUIDELINES}"
 
             # Create LangChain prompt
-            system_msg = SystemMessage(content=SYSTEM_PROMPT)
+            system_msg = SystemMessage(content=INSTRUCTION_PREFIX)
             user_msg = HumanMessage(content=full_prompt)
             messages = [system_msg, user_msg]
 
             # Generate analysis using LangChain
             logger.info("Calling LangChain LLM for paystub fraud analysis...")
-            response = self.llm.invoke(messages)
-
-            # Parse response
-            ai_response = response.content
-            logger.info("Received LLM response")
-
-            # Strip markdown code blocks if present (LLM sometimes wraps JSON in ```json ... ```)
-            ai_response_cleaned = ai_response.strip()
-            if ai_response_cleaned.startswith('```json'):
-                ai_response_cleaned = ai_response_cleaned[7:]  # Remove ```json
-            elif ai_response_cleaned.startswith('```'):
-                ai_response_cleaned = ai_response_cleaned[3:]  # Remove ```
-            if ai_response_cleaned.endswith('```'):
-                ai_response_cleaned = ai_response_cleaned[:-3]  # Remove trailing ```
-            ai_response_cleaned = ai_response_cleaned.strip()
-
-            # Sanitize common LLM JSON errors (e.g., "0. ninety" -> "0.90")
-            import re
-            ai_response_cleaned = re.sub(r'"confidence_score":\s*0\.\s*ninety', '"confidence_score":0.90', ai_response_cleaned)
-            ai_response_cleaned = re.sub(r'"confidence_score":\s*0\.\s*eighty', '"confidence_score":0.80', ai_response_cleaned)
-            ai_response_cleaned = re.sub(r'"confidence_score":\s*0\.\s*seventy', '"confidence_score":0.70', ai_response_cleaned)
-
-            # Try to parse as JSON
-            try:
-                result = json.loads(ai_response_cleaned)
-            except json.JSONDecodeError:
-                # If not JSON, try to extract structured data from text
-                result = self._parse_text_response(ai_response_cleaned)
+            from utils.llm_schemas import DocumentDecision
+            decision = invoke_structured(
+                self.llm, messages, DocumentDecision, cache=_llm_cache, model_name=self.model_name
+            )
+            result = decision.model_dump(exclude_none=True)
+            logger.info("Received schema-validated LLM response")
 
             # Validate and format result
             final_result = self._validate_and_format_result(result, ml_analysis, employee_info)
@@ -347,13 +353,6 @@ class PaystubFraudAnalysisAgent:
             }]
         }
 
-    def _parse_text_response(self, text_response: str) -> Dict:
-        """Parse text response if JSON parsing fails - NO FALLBACKS"""
-        raise RuntimeError(
-            f"LLM response could not be parsed as JSON. This is a critical error. "
-            f"Response was: {text_response[:500]}"
-        )
-
     def _validate_and_format_result(self, result: Dict, ml_analysis: Dict, employee_info: Dict) -> Dict:
         """Validate and format the AI result"""
         # Ensure required fields exist
@@ -4,6 +4,9 @@ System prompts and decision logic for paystub fraud analysis agent
 Completely independent from other document type prompts
 """
 
+from utils.prompt_budget import compact_items
+from database.similar_cases import format_similar_cases
+
 # System prompt for the paystub fraud analysis agent
 SYSTEM_PROMPT = """You are an expert paystub fraud analyst specializing in paystub verification and fraud detection.
 
@@ -86,6 +89,10 @@ Previous Fraud Count: {fraud_count}
 Previous Escalation Count: {escalate_count}
 Last Recommendation: {last_recommendation}
 
+## SIMILAR HISTORICAL CASES
+Nearest previously rejected or escalated paystubs (for context only - decide on this document's own evidence):
+{similar_cases}
+
 ## TASK
 Based on the above information and the decision guidelines below, provide your fraud analysis.
 
@@ -252,7 +259,9 @@ RECOMMENDATION_GUIDELINES = """
 - Reasoning: Fraud risk score is below 30% threshold (29% < 30%)
 """
 
-def format_analysis_template(paystub_data: dict, ml_analysis: dict, employee_info: dict) -> str:
+def format_analysis_template(paystub_data: dict, ml_analysis: dict, employee_info: dict,
+                             max_list_items: int = None, similar_cases: list = None,
+                             max_similar_cases: int = None) -> str:
     """
     Format the analysis template with actual data
 
@@ -260,6 +269,10 @@ def format_analysis_template(paystub_data: dict, ml_analysis: dict, employee_inf
         paystub_data: Extracted paystub data
         ml_analysis: ML fraud analysis results
         employee_info: Employee history information
+        max_list_items: Risk factors, fraud reasons and anomalies listed before the
+            rest are summarized (None lists all)
+        similar_cases: Similar historical cases (database.similar_cases)
+        max_similar_cases: Similar cases listed (None lists all)
 
     Returns:
         Formatted prompt string
@@ -302,12 +315,13 @@ def format_analysis_template(paystub_data: dict, ml_analysis: dict, employee_inf
     risk_factors = ml_analysis.get('feature_importance', [])
     if not risk_factors:
         risk_factors = ml_analysis.get('anomalies', [])
+    risk_factors = compact_items(risk_factors, max_list_items, 'risk factors')
     risk_factors_str = '\n'.join([f"- {factor}" for factor in risk_factors]) if risk_factors else "None"
 
     # Get fraud types and reasons from ML analysis
     fraud_types = ml_analysis.get('fraud_types', [])
-    fraud_reasons = ml_analysis.get('fraud_reasons', [])
-    anomalies = ml_analysis.get('anomalies', [])
+    fraud_reasons = compact_items(ml_analysis.get('fraud_reasons', []), max_list_items, 'reasons')
+    anomalies = compact_items(ml_analysis.get('anomalies', []), max_list_items, 'anomalies')
     
     fraud_types_str = '\n'.join([f"- {t}" for t in fraud_types]) if fraud_types else "None detected."
     fraud_reasons_str = '\n'.join([f"- {r}" for r in fraud_reasons]) if fraud_reasons else "No specific reasons detected."
@@ -354,7 +368,17 @@ def format_analysis_template(paystub_data: dict, ml_analysis: dict, employee_inf
         has_fraud_history=has_fraud_history,
         fraud_count=fraud_count,
         escalate_count=escalate_count,
-        last_recommendation=last_recommendation
+        last_recommendation=last_recommendation,
+        similar_cases=format_similar_cases(similar_cases, max_similar_cases)
     )
 
 
+# Static prefix sent before every analysis - kept byte-identical so provider prompt caching applies
+INSTRUCTION_PREFIX = f"{SYSTEM_PROMPT}\n\n{RECOMMENDATION_GUIDELINES}"
+
+# format_analysis_template limits, most to least detailed, tried until the prompt fits the token budget
+COMPACTION_LEVELS = (
+    {},
+    {'max_list_items': 10, 'max_similar_cases': 3},
+    {'max_list_items': 3, 'max_similar_cases': 1}
+)
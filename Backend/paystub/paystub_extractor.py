@@ -25,17 +25,8 @@ except ImportError:
     # dotenv already loaded by api_server.py or not available
     pass
 
-# Import Mindee - use ClientV2 API (requires mindee>=4.31.0)
-try:
-    from mindee import ClientV2, InferenceParameters, PathInput
-    MINDEE_AVAILABLE = True
-except ImportError as e:
-    logger.error(f"Mindee library not properly installed: {e}")
-    logger.error("Requires mindee>=4.31.0. Install with: pip install --upgrade 'mindee>=4.31.0'")
-    MINDEE_AVAILABLE = False
-    ClientV2 = None
-    InferenceParameters = None
-    PathInput = None
+# Mindee ClientV2 (requires mindee>=4.31.0) is imported and built on first extraction
+from lazy_components import get_mindee_client
 
 # Import paystub-specific components from local modules
 from .normalization.paystub_normalizer_factory import PaystubNormalizerFactory
@@ -49,13 +40,6 @@ logger.info(f"Mindee Model ID: {MINDEE_MODEL_ID_PAYSTUB}")
 
 if not MINDEE_API_KEY:
     logger.warning("MINDEE_API_KEY is not set - paystub extraction may fail")
-    mindee_client = None
-elif not MINDEE_AVAILABLE:
-    logger.error("Mindee library not available")
-    mindee_client = None
-else:
-    mindee_client = ClientV2(api_key=MINDEE_API_KEY)
-    logger.info("Mindee ClientV2 initialized successfully")
 
 
 class PaystubExtractor:
@@ -173,6 +157,7 @@ class PaystubExtractor:
 
     def _extract_with_mindee(self, file_path: str) -> Tuple[Dict, str]:
         """Extract paystub data using Mindee API only (no fallback)"""
+        mindee_client = get_mindee_client()
         if not mindee_client:
             raise RuntimeError("Mindee client not initialized. Check API key and installation.")
 
@@ -181,6 +166,8 @@ class PaystubExtractor:
             logger.info(f"Extracting with Mindee using model ID: {MINDEE_MODEL_ID_PAYSTUB}")
             
             # Create inference parameters with the model ID
+            from mindee import InferenceParameters, PathInput
+
             params = InferenceParameters(model_id=MINDEE_MODEL_ID_PAYSTUB, raw_text=True)
             input_source = PathInput(file_path)
             
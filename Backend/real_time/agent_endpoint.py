@@ -6,6 +6,7 @@ import logging
 from typing import Dict, Any, Optional, List
 from .realtime_agent import RealTimeAnalysisAgent
 from .agent_tools import TransactionAnalysisTools
+from .llm_concurrency import run_concurrently
 
 logger = logging.getLogger(__name__)
 
@@ -15,14 +16,17 @@ class AgentAnalysisService:
     Service for generating AI-powered analysis using LangChain agent
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, llm_timeout: Optional[float] = None):
         """
         Initialize agent analysis service
 
         Args:
             api_key: OpenAI API key (if None, reads from env)
+            llm_timeout: Seconds to wait for the concurrent LLM calls
+                (if None, reads AGENT_LLM_TIMEOUT_SECONDS from env)
         """
         self.agent = RealTimeAnalysisAgent(api_key=api_key)
+        self.llm_timeout = llm_timeout
 
     def generate_comprehensive_analysis(self, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -56,14 +60,12 @@ class AgentAnalysisService:
             # Generate CSV features analysis
             csv_features = self._analyze_csv_features(tools)
 
-            # Generate detailed insights
-            detailed_insights = self.agent.generate_comprehensive_insights(analysis_result)
-
-            # Generate fraud patterns explanation
-            fraud_patterns = self.agent.explain_fraud_patterns(analysis_result)
-
-            # Generate recommendations using LLM
-            recommendations = self.agent.generate_recommendations(analysis_result)
+            # Insights, fraud pattern explanation and recommendations are independent
+            # LLM calls over the same result: run them concurrently with one deadline
+            llm_calls = self._run_llm_calls(analysis_result)
+            detailed_insights = llm_calls['results']['detailed_insights']
+            fraud_patterns = llm_calls['results']['fraud_patterns']
+            recommendations = llm_calls['results']['recommendations']
 
             return {
                 'success': True,
@@ -74,7 +76,10 @@ class AgentAnalysisService:
                     'fraud_patterns': fraud_patterns.get('explanation', ''),
                     'recommendations': recommendations,
                     'analysis_type': detailed_insights.get('analysis_type', 'llm'),
-                    'model_used': detailed_insights.get('model_used', 'gpt-3.5-turbo')
+                    'model_used': detailed_insights.get('model_used', 'gpt-3.5-turbo'),
+                    'partial': bool(llm_calls['failed']),
+                    'failed_calls': llm_calls['failed'],
+                    'llm_call_seconds': llm_calls['seconds']
                 }
             }
 
@@ -86,6 +91,54 @@ class AgentAnalysisService:
                 'message': 'Failed to generate AI analysis'
             }
 
+    def _run_llm_calls(self, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the three analysis LLM calls concurrently
+
+        A call that times out or raises gets the same failure output the agent
+        itself returns when the LLM is unavailable, so the other results are
+        still returned.
+
+        Returns:
+            run_concurrently() result keyed by detailed_insights, fraud_patterns, recommendations
+        """
+        model_name = self.agent.model_name
+
+        def insights_fallback(error: str) -> Dict[str, Any]:
+            return {
+                'success': False,
+                'error': error,
+                'insights': f'AI Analysis unavailable: {error}',
+                'analysis_type': 'failed',
+                'model_used': model_name
+            }
+
+        def patterns_fallback(error: str) -> Dict[str, Any]:
+            return {
+                'success': False,
+                'error': error,
+                'explanation': f'[WARNING] AI Pattern Analysis unavailable: {error}',
+                'patterns_detected': 0
+            }
+
+        def recommendations_fallback(error: str) -> List[Dict[str, Any]]:
+            entries = self.agent._build_fraud_pattern_entries(analysis_result)
+            return [self.agent._build_basic_recommendation(entry) for entry in entries]
+
+        return run_concurrently(
+            {
+                'detailed_insights': lambda: self.agent.generate_comprehensive_insights(analysis_result),
+                'fraud_patterns': lambda: self.agent.explain_fraud_patterns(analysis_result),
+                'recommendations': lambda: self.agent.generate_recommendations(analysis_result)
+            },
+            {
+                'detailed_insights': insights_fallback,
+                'fraud_patterns': patterns_fallback,
+                'recommendations': recommendations_fallback
+            },
+            timeout=self.llm_timeout
+        )
+
     def _analyze_top_transactions(self, tools: TransactionAnalysisTools) -> Dict[str, Any]:
         """Analyze top fraudulent transactions"""
         try:
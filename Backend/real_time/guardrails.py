@@ -2,123 +2,381 @@
 LLM Input Guardrails
 Provides data sanitization and validation for LLM inputs to prevent PII leakage and injection attacks.
 Includes profanity filtering and content moderation.
+
+All PII classes are redacted by one compiled alternation regex (one named group per class),
+and profanity is found by Aho-Corasick automata built once from the better-profanity
+word list, so sanitizing a string is a few linear passes over it. The batch APIs
+(sanitize_many, sanitize_dict, sanitize_series, sanitize_frame) deduplicate their strings
+and sanitize them all in a single pass over one joined buffer.
 """
 
 import re
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from collections import deque
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
-# Try to import better-profanity, fallback gracefully if not available
+# Try to import better-profanity (word list, leetspeak map, word characters), fallback gracefully if not available
 try:
     from better_profanity import profanity
+    from better_profanity.constants import ALLOWED_CHARACTERS as PROFANITY_WORD_CHARACTERS
+    from better_profanity.utils import get_complete_path_of_file, read_wordlist
     PROFANITY_AVAILABLE = True
 except ImportError:
     PROFANITY_AVAILABLE = False
     logger.warning("better-profanity not available. Profanity filtering disabled. Install with: pip install better-profanity")
 
+# Joins the strings of a batch; it is not matched by any PII pattern or profanity word,
+# so matches never span two strings
+BATCH_SEPARATOR = '\x00'
+
+# Profanity is replaced like better-profanity does: a fixed-length run of the censor character
+CENSOR_LENGTH = 4
+
+
+class ProfanityMatcher:
+    """
+    Aho-Corasick matcher for a profanity word list with leetspeak variants.
+
+    The automata run over coarse character classes: a word character and all its
+    substitutes (e.g. 'i', 'l', '1', '*') share one class, so every leetspeak spelling of
+    a word follows the same path. Candidate matches are then verified character by
+    character against the exact substitutes and must span whole words, so results match
+    better-profanity's whole-word matching:
+
+    - Entries with separators ("hand job", "f.u.c.k") match with their separators as listed.
+    - Other entries match a single word or, like better-profanity, a run of adjacent words
+      with the separators between them dropped ("sh it", "fu-ck"). A run joins at most
+      max_join + 1 words, max_join being the largest number of separators in any entry.
+    """
+
+    def __init__(self, words: Iterable[str], char_map: Dict[str, Tuple[str, ...]], word_characters: Iterable[str]):
+        """
+        Build the automata
+
+        Args:
+            words: Words to censor (case-insensitive)
+            char_map: Word character -> accepted substitutes (including itself)
+            word_characters: Characters that form words; anything else separates words
+        """
+        self.words: List[str] = sorted({word.lower() for word in words if word and word.strip()})
+        self.word_characters = frozenset(word_characters)
+        self.substitutes = {char: frozenset(variants) for char, variants in char_map.items()}
+
+        # Coarse classes: union of each character with its substitutes
+        parent: Dict[str, str] = {}
+
+        def find(char: str) -> str:
+            parent.setdefault(char, char)
+            while parent[char] != char:
+                parent[char] = parent[parent[char]]
+                char = parent[char]
+            return char
+
+        for char, variants in char_map.items():
+            for variant in variants:
+                if len(variant) == 1:
+                    parent[find(variant)] = find(char)
+        self._classes = str.maketrans({char: find(char) for char in parent if find(char) != char})
+
+        separators = [sum(char not in self.word_characters for char in word) for word in self.words]
+        self.max_join = max([1] + separators)
+        self._phrases = [word for word, count in zip(self.words, separators) if count]
+        self._single_words = [word for word, count in zip(self.words, separators) if not count]
+        self._phrase_automaton = self._build_automaton(self._phrases)
+        self._word_automaton = self._build_automaton(self._single_words)
+        self._word_pattern = re.compile('[' + ''.join(re.escape(char) for char in sorted(self.word_characters)) + ']+')
+
+    def _build_automaton(self, words: List[str]) -> Tuple[List[Dict[str, int]], List[Tuple[int, ...]]]:
+        """Transition table and per-state matched word indices for words"""
+        # Trie over class symbols
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for index, word in enumerate(words):
+            state = 0
+            for symbol in word.translate(self._classes):
+                next_state = goto[state].get(symbol)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][symbol] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(index)
+
+        # Failure links (breadth first), folded into complete transitions so matching is one dict lookup per character
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for symbol, next_state in goto[state].items():
+                fail[next_state] = delta[fail[state]].get(symbol, 0) if state else 0
+                queue.append(next_state)
+        return delta, [tuple(output) for output in outputs]
+
+    def _scan(self, automaton, words: List[str], lowered: str):
+        """(start, end, word) of every verified occurrence of words in lowered, whole words or not"""
+        delta, outputs = automaton
+        state = 0
+        for end, symbol in enumerate(lowered.translate(self._classes)):
+            state = delta[state].get(symbol, 0)
+            for index in outputs[state]:
+                word = words[index]
+                start = end - len(word) + 1
+                if self._verify(lowered, start, word):
+                    yield start, end + 1, word
+
+    def _verify(self, lowered: str, start: int, word: str) -> bool:
+        substitutes = self.substitutes
+        for offset, char in enumerate(word):
+            text_char = lowered[start + offset]
+            if text_char != char and text_char not in substitutes.get(char, ()):
+                return False
+        return True
+
+    def find(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Spans of profane words in text
+
+        Args:
+            text: Text to search
+
+        Returns:
+            Non-overlapping (start, end) spans, longest match first where matches overlap
+        """
+        if not text or not self.words:
+            return []
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Keep indices aligned when lowercasing changes the length (e.g. 'İ')
+            lowered = ''.join(char.lower()[:1] for char in text)
+        word_characters = self.word_characters
+        candidates = []
+
+        # Entries with separators, matched as listed
+        if self._phrases:
+            for start, end, _ in self._scan(self._phrase_automaton, self._phrases, lowered):
+                if start > 0 and text[start - 1] in word_characters:
+                    continue
+                if end < len(text) and text[end] in word_characters:
+                    continue
+                candidates.append((start, end))
+
+        # Single entries over the words with separators dropped: a match must start and end on word
+        # boundaries and join at most max_join + 1 words, none across a BATCH_SEPARATOR
+        tokens = [match.span() for match in self._word_pattern.finditer(lowered)]
+        if tokens and self._single_words:
+            first_token = {}
+            last_token = {}
+            batch = []
+            pieces = []
+            position = 0
+            for index, (start, end) in enumerate(tokens):
+                first_token[position] = index
+                position += end - start
+                last_token[position] = index
+                pieces.append(lowered[start:end])
+                batch.append((batch[-1] if index else 0) +
+                             (index > 0 and BATCH_SEPARATOR in text[tokens[index - 1][1]:start]))
+            for start, end, _ in self._scan(self._word_automaton, self._single_words, ''.join(pieces)):
+                first = first_token.get(start)
+                last = last_token.get(end)
+                if first is None or last is None or last - first > self.max_join or batch[first] != batch[last]:
+                    continue
+                candidates.append((tokens[first][0], tokens[last][1]))
+
+        spans = []
+        covered_until = 0
+        for start, end in sorted(candidates, key=lambda span: (span[0], -span[1])):
+            if start >= covered_until:
+                spans.append((start, end))
+                covered_until = end
+        return spans
+
+    def censor(self, text: str, censor_char: str = '*') -> str:
+        """Replace profane words with a run of censor_char"""
+        spans = self.find(text)
+        if not spans:
+            return text
+        parts = []
+        position = 0
+        for start, end in spans:
+            parts.append(text[position:start])
+            parts.append(censor_char * CENSOR_LENGTH)
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts)
+
+    def contains(self, text: str) -> bool:
+        return bool(self.find(text))
+
+
+def combine_patterns(patterns: Dict[str, "re.Pattern"], names: Iterable[str]) -> "re.Pattern":
+    """
+    One alternation regex over several patterns
+
+    Args:
+        patterns: Name -> compiled pattern (without capturing groups of its own)
+        names: Patterns to combine, in precedence order
+
+    Returns:
+        Compiled regex with one named group per pattern (match.lastgroup is the matching name)
+    """
+    return re.compile('|'.join(f"(?P<{name}>{patterns[name].pattern})" for name in names))
+
+
 class InputGuard:
     """
     Guardrail system for LLM inputs.
     Redacts PII, filters profanity, and sanitizes text before sending to external APIs.
     """
-    
+
     # Pre-compiled regex patterns for performance
     PATTERNS = {
         'email': re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
-        'phone': re.compile(r'\b(\+\d{1,2}\s?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b'),
+        'phone': re.compile(r'\b(?:\+\d{1,2}\s?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b'),
         'ssn': re.compile(r'\b\d{3}-\d{2}-\d{4}\b'),
         'credit_card': re.compile(r'\b(?:\d{4}[-\s]?){3}\d{4}\b'),
         'ipv4': re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
     }
-    
-    # Initialize profanity filter if available
+
+    # PII classes redacted by sanitize(), in precedence order for matches starting at the same position
+    # (ipv4 is optional, maybe too aggressive for some logs)
+    REDACTIONS = {
+        'email': '[EMAIL]',
+        'phone': '[PHONE]',
+        'ssn': '[SSN]',
+        'credit_card': '[CREDIT_CARD]'
+    }
+
+    # All redacted classes in one pass: one named group per class
+    PII_PATTERN = combine_patterns(PATTERNS, REDACTIONS)
+
+    # Profanity matcher, built once on first use
+    _profanity_matcher: Optional[ProfanityMatcher] = None
     _profanity_initialized = False
-    
+    _profanity_lock = threading.Lock()
+
     @classmethod
     def _init_profanity(cls):
-        """Initialize profanity filter if available."""
+        """Build the profanity matcher from the better-profanity word list, if available."""
         if PROFANITY_AVAILABLE and not cls._profanity_initialized:
-            try:
-                profanity.load_censor_words()
-                cls._profanity_initialized = True
-                logger.info("Profanity filter initialized successfully")
-            except Exception as e:
-                logger.warning(f"Failed to initialize profanity filter: {e}")
-                cls._profanity_initialized = False
-    
+            with cls._profanity_lock:
+                if cls._profanity_initialized:
+                    return
+                try:
+                    words = read_wordlist(get_complete_path_of_file('profanity_wordlist.txt'))
+                    cls._profanity_matcher = ProfanityMatcher(words, profanity.CHARS_MAPPING, PROFANITY_WORD_CHARACTERS)
+                    cls._profanity_initialized = True
+                    logger.info(f"Profanity filter initialized successfully ({len(cls._profanity_matcher.words)} words)")
+                except Exception as e:
+                    logger.warning(f"Failed to initialize profanity filter: {e}")
+                    cls._profanity_initialized = False
+
+    @classmethod
+    def _redact_pii(cls, match) -> str:
+        return cls.REDACTIONS[match.lastgroup]
+
+    @classmethod
+    def _sanitize_text(cls, text: str, filter_profanity: bool) -> str:
+        sanitized = text
+
+        # Step 1: Filter profanity (before PII redaction to avoid interfering with patterns)
+        if filter_profanity:
+            cls._init_profanity()
+            if cls._profanity_matcher is not None:
+                try:
+                    sanitized = cls._profanity_matcher.censor(sanitized)
+                except Exception as e:
+                    logger.warning(f"Profanity filtering failed: {e}")
+
+        # Step 2: Redact PII
+        return cls.PII_PATTERN.sub(cls._redact_pii, sanitized)
+
     @classmethod
     def sanitize(cls, text: str, filter_profanity: bool = True) -> str:
         """
         Redact PII and filter profanity from text string.
-        
+
         Args:
             text: Input text to sanitize
             filter_profanity: Whether to filter profanity (default: True)
-            
+
         Returns:
             Sanitized text with PII replaced by placeholders and profanity censored
         """
         if not text or not isinstance(text, str):
             return text
-        
-        # Initialize profanity filter if needed
-        if filter_profanity:
-            cls._init_profanity()
-            
-        sanitized = text
-        
-        # Step 1: Filter profanity (before PII redaction to avoid interfering with patterns)
-        if filter_profanity and PROFANITY_AVAILABLE and cls._profanity_initialized:
-            try:
-                sanitized = profanity.censor(sanitized)
-            except Exception as e:
-                logger.warning(f"Profanity filtering failed: {e}")
-        
-        # Step 2: Redact PII
-        sanitized = cls.PATTERNS['email'].sub('[EMAIL]', sanitized)
-        sanitized = cls.PATTERNS['phone'].sub('[PHONE]', sanitized)
-        sanitized = cls.PATTERNS['ssn'].sub('[SSN]', sanitized)
-        sanitized = cls.PATTERNS['credit_card'].sub('[CREDIT_CARD]', sanitized)
-        # sanitized = cls.PATTERNS['ipv4'].sub('[IP_ADDRESS]', sanitized) # Optional, maybe too aggressive for some logs
-        
-        return sanitized
-    
+        return cls._sanitize_text(text, filter_profanity)
+
+    @classmethod
+    def _sanitize_unique(cls, texts: Iterable[Any], filter_profanity: bool) -> Dict[str, str]:
+        """Sanitized value of each distinct non-empty string, from one pass over the joined strings"""
+        unique = [text for text in dict.fromkeys(text for text in texts if isinstance(text, str) and text)]
+        if not unique:
+            return {}
+        if len(unique) > 1 and not any(BATCH_SEPARATOR in text for text in unique):
+            cleaned = cls._sanitize_text(BATCH_SEPARATOR.join(unique), filter_profanity).split(BATCH_SEPARATOR)
+            if len(cleaned) == len(unique):
+                return dict(zip(unique, cleaned))
+        return {text: cls._sanitize_text(text, filter_profanity) for text in unique}
+
+    @classmethod
+    def sanitize_many(cls, texts: Iterable[Any], filter_profanity: bool = True) -> List[Any]:
+        """
+        Sanitize a batch of strings (e.g. the merchants of a transaction list).
+
+        Args:
+            texts: Strings to sanitize; other values are returned unchanged
+            filter_profanity: Whether to filter profanity (default: True)
+
+        Returns:
+            List of sanitized values, in input order
+        """
+        texts = list(texts)
+        cleaned = cls._sanitize_unique(texts, filter_profanity)
+        return [cleaned.get(text, text) if isinstance(text, str) else text for text in texts]
+
     @classmethod
     def contains_profanity(cls, text: str) -> bool:
         """
         Check if text contains profanity without censoring it.
-        
+
         Args:
             text: Input text to check
-            
+
         Returns:
             True if profanity detected, False otherwise
         """
         if not text or not isinstance(text, str):
             return False
-        
+
         cls._init_profanity()
-        
-        if PROFANITY_AVAILABLE and cls._profanity_initialized:
+
+        if cls._profanity_matcher is not None:
             try:
-                return profanity.contains_profanity(text)
+                return cls._profanity_matcher.contains(text)
             except Exception as e:
                 logger.warning(f"Profanity check failed: {e}")
                 return False
-        
+
         return False
-    
+
     @classmethod
     def validate_length(cls, text: str, max_chars: int = 15000) -> bool:
         """
         Validate input length to prevent token exhauston attacks.
-        
+
         Args:
             text: Input text
             max_chars: Maximum allowed characters
-            
+
         Returns:
             True if valid, False if too long
         """
@@ -126,33 +384,108 @@ class InputGuard:
             return True
         return len(text) <= max_chars
 
+    @classmethod
+    def _collect_strings(cls, value: Any, strings: List[str]):
+        if isinstance(value, str):
+            strings.append(value)
+        elif isinstance(value, dict):
+            for item in value.values():
+                cls._collect_strings(item, strings)
+        elif isinstance(value, list):
+            for item in value:
+                cls._collect_strings(item, strings)
+
+    @classmethod
+    def _replace_strings(cls, value: Any, cleaned: Dict[str, str]) -> Any:
+        if isinstance(value, str):
+            return cleaned.get(value, value)
+        if isinstance(value, dict):
+            return {k: cls._replace_strings(v, cleaned) for k, v in value.items()}
+        if isinstance(value, list):
+            return [cls._replace_strings(item, cleaned) for item in value]
+        return value
+
     @classmethod
     def sanitize_dict(cls, data: Dict[str, Any], filter_profanity: bool = True) -> Dict[str, Any]:
         """
         Recursively sanitize generic dictionary values (useful for unstructured inputs).
-        Includes PII redaction and profanity filtering.
-        
+        Includes PII redaction and profanity filtering. Strings in nested dicts and lists
+        (including lists of dicts, e.g. transactions) are sanitized in one batch.
+
         Args:
             data: Dictionary to sanitize
             filter_profanity: Whether to filter profanity (default: True)
-            
+
         Returns:
             New dictionary with sanitized string values
         """
         if not isinstance(data, dict):
             return data
-            
-        clean_data = {}
-        for k, v in data.items():
-            if isinstance(v, str):
-                clean_data[k] = cls.sanitize(v, filter_profanity=filter_profanity)
-            elif isinstance(v, dict):
-                clean_data[k] = cls.sanitize_dict(v, filter_profanity=filter_profanity)
-            elif isinstance(v, list):
-                clean_data[k] = [
-                    cls.sanitize(item, filter_profanity=filter_profanity) if isinstance(item, str) else item 
-                    for item in v
-                ]
-            else:
-                clean_data[k] = v
-        return clean_data
+        strings: List[str] = []
+        cls._collect_strings(data, strings)
+        return cls._replace_strings(data, cls._sanitize_unique(strings, filter_profanity))
+
+    @staticmethod
+    def _series_strings(series) -> List[Any]:
+        """Values of a Series, plus its categories when categorical (unused categories are sanitized too)"""
+        import pandas as pd
+        values = series.tolist()
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            values.extend(series.cat.categories)
+        return values
+
+    @staticmethod
+    def _rebuild_series(series, cleaned: Dict[str, str]):
+        """Series with sanitized values, keeping index, name and dtype"""
+        import pandas as pd
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            # Placeholders are not among the original categories: sanitize the categories too
+            # (several may collapse into one, e.g. two phone numbers into [PHONE])
+            categories = dict.fromkeys(cleaned.get(category, category) if isinstance(category, str) else category
+                                       for category in dtype.categories)
+            dtype = pd.CategoricalDtype(list(categories), ordered=dtype.ordered)
+        return pd.Series([cleaned.get(text, text) if isinstance(text, str) else text for text in series.tolist()],
+                         index=series.index, name=series.name, dtype=dtype)
+
+    @classmethod
+    def sanitize_series(cls, series, filter_profanity: bool = True):
+        """
+        Sanitize the string values of a pandas Series.
+
+        Args:
+            series: Series to sanitize (non-string values are kept)
+            filter_profanity: Whether to filter profanity (default: True)
+
+        Returns:
+            New Series with the same index and name
+        """
+        cleaned = cls._sanitize_unique(cls._series_strings(series), filter_profanity)
+        return cls._rebuild_series(series, cleaned)
+
+    @classmethod
+    def sanitize_frame(cls, frame, columns: Optional[List[str]] = None, filter_profanity: bool = True):
+        """
+        Sanitize text columns of a pandas DataFrame in one batch.
+
+        Args:
+            frame: DataFrame to sanitize
+            columns: Columns to sanitize (default: all object, string and categorical columns)
+            filter_profanity: Whether to filter profanity (default: True)
+
+        Returns:
+            Sanitized copy of the DataFrame
+        """
+        import pandas as pd
+        if columns is None:
+            columns = [
+                column for column in frame.columns
+                if pd.api.types.is_object_dtype(frame[column]) or pd.api.types.is_string_dtype(frame[column])
+                or isinstance(frame[column].dtype, pd.CategoricalDtype)
+            ]
+        frame = frame.copy()
+        cleaned = cls._sanitize_unique((text for column in columns for text in cls._series_strings(frame[column])),
+                                       filter_profanity)
+        for column in columns:
+            frame[column] = cls._rebuild_series(frame[column], cleaned)
+        return frame
@@ -0,0 +1,98 @@
+"""
+Concurrent LLM Calls
+Runs independent blocking LLM calls on a shared, bounded thread pool with one deadline.
+
+The calls of an analysis start together, so the request waits for the slowest
+call rather than the sum of all of them. A call that misses the deadline or
+raises is replaced by its fallback result and the others are still returned
+(partial results). Threads cannot be interrupted, so a timed-out call finishes
+in the background; the pool is bounded so a slow provider cannot pile up
+unbounded threads.
+"""
+
+import os
+import time
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Worker threads shared by all requests of this process
+DEFAULT_MAX_WORKERS = int(os.getenv('AGENT_LLM_MAX_WORKERS', '8'))
+# Wall clock for one analysis' concurrent calls
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv('AGENT_LLM_TIMEOUT_SECONDS', '60'))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_llm_executor() -> ThreadPoolExecutor:
+    """Get the shared LLM call thread pool"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix='llm-call')
+    return _executor
+
+
+def run_concurrently(
+    calls: Dict[str, Callable[[], Any]],
+    fallbacks: Dict[str, Callable[[str], Any]],
+    timeout: Optional[float] = None,
+    executor: Optional[ThreadPoolExecutor] = None
+) -> Dict[str, Any]:
+    """
+    Run calls concurrently and wait at most timeout seconds for all of them
+
+    Args:
+        calls: Name -> zero-argument callable
+        fallbacks: Name -> callable(error message) producing the result used when
+            that call times out or raises
+        timeout: Seconds to wait (default AGENT_LLM_TIMEOUT_SECONDS)
+        executor: Thread pool (default: the shared LLM pool)
+
+    Returns:
+        Dict with 'results' (name -> result or fallback), 'failed' (name -> error
+        message) and 'seconds' (name -> call duration, or time waited if it did not finish)
+    """
+    timeout = DEFAULT_TIMEOUT_SECONDS if timeout is None else timeout
+    executor = executor or get_llm_executor()
+    started = time.perf_counter()
+    finished_at: Dict[str, float] = {}
+
+    def _timed(name: str, call: Callable[[], Any]) -> Any:
+        try:
+            return call()
+        finally:
+            finished_at[name] = time.perf_counter()
+
+    # Each call runs in a copy of the caller's context (request-scoped stage timing)
+    futures = {
+        name: executor.submit(contextvars.copy_context().run, _timed, name, call)
+        for name, call in calls.items()
+    }
+    wait(list(futures.values()), timeout=timeout)
+
+    results: Dict[str, Any] = {}
+    failed: Dict[str, str] = {}
+    seconds: Dict[str, float] = {}
+    for name, future in futures.items():
+        if not future.done():
+            future.cancel()
+            error = f"timed out after {timeout:g}s"
+        elif future.exception() is not None:
+            error = str(future.exception()) or type(future.exception()).__name__
+        else:
+            results[name] = future.result()
+            seconds[name] = round(finished_at[name] - started, 3)
+            continue
+        logger.warning(f"LLM call '{name}' failed: {error}")
+        failed[name] = error
+        results[name] = fallbacks[name](error)
+        seconds[name] = round(finished_at.get(name, time.perf_counter()) - started, 3)
+
+    return {'results': results, 'failed': failed, 'seconds': seconds}
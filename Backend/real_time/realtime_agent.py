@@ -35,6 +35,13 @@ from .agent_prompts import (
 )
 from .fraud_detector import STANDARD_FRAUD_REASONS
 from .guardrails import InputGuard
+from . import agent_prompts
+from utils.llm_cache import LLMResponseCache
+from utils.structured_output import invoke_structured, StructuredOutputError
+from utils.resilience import ResilientClient, openai_client_kwargs
+
+# The recommendations prompt is built in this module, so its source is part of the prompt version
+_llm_cache = LLMResponseCache('real_time', prompt_modules=[agent_prompts, __file__])
 
 
 class RealTimeAnalysisAgent:
@@ -78,7 +85,9 @@ class RealTimeAnalysisAgent:
                 if not (self.model_name.startswith('o4') or self.model_name.startswith('o1')):
                     llm_kwargs['max_tokens'] = 8000  # Increased for large recommendation lists
 
-                self.llm = ChatOpenAI(**llm_kwargs)
+                # Deadline, retries and circuit breaking are handled by utils.resilience
+                llm_kwargs.update(openai_client_kwargs())
+                self.llm = ResilientClient(ChatOpenAI(**llm_kwargs), 'openai')
                 logger.info(f"Initialized LangChain agent with {self.model_name} - GPT-4 mode active!")
 
             except Exception as e:
@@ -172,8 +181,7 @@ class RealTimeAnalysisAgent:
         )
 
         # Get LLM response
-        response = self.llm.invoke(messages)
-        insights_text = response.content
+        insights_text = _llm_cache.invoke(self.llm, messages, self.model_name)
 
         # Parse response
         return self._parse_insights_response(insights_text)
@@ -230,11 +238,11 @@ class RealTimeAnalysisAgent:
             patterns=patterns_text
         )
 
-        response = self.llm.invoke(messages)
+        explanation = _llm_cache.invoke(self.llm, messages, self.model_name)
 
         return {
             'success': True,
-            'explanation': response.content,
+            'explanation': explanation,
             'patterns_detected': len(fraud_transactions)
         }
 
@@ -272,8 +280,8 @@ class RealTimeAnalysisAgent:
 
     def _llm_recommendations(self, analysis_result: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate structured recommendations using LLM for ALL standard fraud patterns"""
-        import json
-        import re
+        from langchain_core.messages import HumanMessage
+        from utils.llm_schemas import PatternRecommendations
 
         # Extract key metrics
         fraud_count = analysis_result.get('fraud_detection', {}).get('fraud_count', 0)
@@ -303,10 +311,10 @@ MANDATORY RULES:
 4. Description must mention that pattern's percentage and case count (even if zero: "0 cases detected").
 5. Immediate actions and prevention steps must contain 4 concise, pattern-specific bullet points.
 6. Monitor field must describe what telemetry to watch for that specific pattern.
-7. Return ONLY a valid JSON array, no markdown fences or commentary.
+7. Return ONLY a valid JSON object with a "recommendations" array, no markdown fences or commentary.
 
 JSON OUTPUT TEMPLATE:
-[
+{{"recommendations": [
   {{
     "title": "SEVERITY: Exact Fraud Pattern Name",
     "description": "One sentence including the fraud percentage and case count for that pattern",
@@ -318,111 +326,26 @@ JSON OUTPUT TEMPLATE:
     "monitor": "Telemetry to monitor for that pattern"
   }}
   ... repeat for ALL {fraud_types_count} patterns ...
-]"""
+]}}"""
 
-        from langchain_core.messages import HumanMessage
         messages = [HumanMessage(content=prompt)]
 
-        response = self.llm.invoke(messages)
-
-        # Debug logging
-        logger.info(f"🔍 Received response from OpenAI")
-        logger.info(f"🔍 Response type: {type(response)}")
-        logger.info(f"🔍 Response hasattr content: {hasattr(response, 'content')}")
-        if hasattr(response, 'content'):
-            logger.info(f"🔍 Response content length: {len(str(response.content))} chars")
-            logger.info(f"🔍 Response content preview: {str(response.content)[:200]}")
-
-        # Parse JSON response
         try:
-            response_text = response.content.strip()
-            # Remove markdown code blocks if present
-            response_text = re.sub(r'```json\s*', '', response_text)
-            response_text = re.sub(r'```\s*$', '', response_text)
-            response_text = response_text.strip()
-
-            # Try to extract JSON from response (handle cases where there's extra text)
-            recommendations = None
-            
-            # First, try direct parsing
-            try:
-                recommendations = json.loads(response_text)
-            except json.JSONDecodeError:
-                # Try to find JSON array/object in the response
-                # Look for JSON array pattern
-                json_match = re.search(r'\[[\s\S]*\]', response_text)
-                if json_match:
-                    try:
-                        recommendations = json.loads(json_match.group(0))
-                    except json.JSONDecodeError:
-                        pass
-                
-                # If still no luck, try to find JSON object
-                if recommendations is None:
-                    json_match = re.search(r'\{[\s\S]*\}', response_text)
-                    if json_match:
-                        try:
-                            recommendations = json.loads(json_match.group(0))
-                        except json.JSONDecodeError:
-                            pass
-
-            # If still can't parse, try to extract and fix common issues
-            if recommendations is None:
-                # Try to fix common JSON issues
-                # Remove trailing commas before closing brackets/braces
-                fixed_text = re.sub(r',\s*}', '}', response_text)
-                fixed_text = re.sub(r',\s*]', ']', fixed_text)
-                try:
-                    recommendations = json.loads(fixed_text)
-                except json.JSONDecodeError:
-                    # Last resort: try to extract first valid JSON structure
-                    # Find the start of JSON array
-                    start_idx = response_text.find('[')
-                    if start_idx != -1:
-                        # Try to find matching closing bracket
-                        bracket_count = 0
-                        end_idx = start_idx
-                        for i in range(start_idx, len(response_text)):
-                            if response_text[i] == '[':
-                                bracket_count += 1
-                            elif response_text[i] == ']':
-                                bracket_count -= 1
-                                if bracket_count == 0:
-                                    end_idx = i + 1
-                                    break
-                        if end_idx > start_idx:
-                            try:
-                                recommendations = json.loads(response_text[start_idx:end_idx])
-                            except json.JSONDecodeError:
-                                pass
-
-            # If still None, raise error
-            if recommendations is None:
-                raise json.JSONDecodeError("Could not extract valid JSON from response", response_text, 0)
-
-            if isinstance(recommendations, dict):
-                recommendations = [recommendations]
-
-            if not isinstance(recommendations, list):
-                recommendations = []
-
-            recommendations = self._ensure_full_pattern_coverage(
-                recommendations,
-                fraud_pattern_entries
+            result = invoke_structured(
+                self.llm, messages, PatternRecommendations, cache=_llm_cache, model_name=self.model_name
             )
-
-            return recommendations
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM JSON response: {e}")
-            logger.error(f"Raw LLM response (first 1000 chars): {response_text[:1000]}")
-            logger.error(f"Response length: {len(response_text)} characters")
-            logger.error(f"Response type: {type(response)}")
-            logger.error(f"Response object: {response}")
+        except StructuredOutputError as e:
+            logger.error(f"LLM recommendations failed schema validation: {e}")
             # Return basic recommendations for all patterns as fallback
-            logger.warning("AI recommendations unavailable due to JSON parsing error. Generating basic recommendations.")
+            logger.warning("AI recommendations unavailable due to invalid LLM output. Generating basic recommendations.")
             return [self._build_basic_recommendation(entry) for entry in fraud_pattern_entries]
 
+        logger.info(f"Received {len(result.recommendations)} schema-validated recommendations from OpenAI")
+        return self._ensure_full_pattern_coverage(
+            [recommendation.model_dump() for recommendation in result.recommendations],
+            fraud_pattern_entries
+        )
+
     # REMOVED: _fallback_recommendations - no rule-based fallbacks allowed
     # REMOVED: _fallback_structured_recommendations - no rule-based fallbacks allowed
     # REMOVED: _generate_pattern_specific_recommendations - no rule-based fallbacks allowed
@@ -455,12 +378,11 @@ JSON OUTPUT TEMPLATE:
         plot_details = plot_data.get('details', [])
         plot_description = InputGuard.sanitize(plot_data.get('description', ''))
 
-        # Format details
-        sanitized_details = []
-        for d in plot_details:
-            label = InputGuard.sanitize(str(d.get('label', '')))
-            value = InputGuard.sanitize(str(d.get('value', '')))
-            sanitized_details.append(f"- {label}: {value}")
+        # Format details (labels and values sanitized in one batch)
+        sanitized = InputGuard.sanitize_many(
+            str(d.get(key, '')) for d in plot_details for key in ('label', 'value')
+        )
+        sanitized_details = [f"- {label}: {value}" for label, value in zip(sanitized[::2], sanitized[1::2])]
             
         details_text = "\n".join(sanitized_details)
 
@@ -480,21 +402,21 @@ JSON OUTPUT TEMPLATE:
             plot_details=details_text
         )
 
-        response = self.llm.invoke(messages)
-        return response.content
+        return _llm_cache.invoke(self.llm, messages, self.model_name)
 
     def _format_transactions(self, transactions: List[Dict]) -> str:
         """Format transactions for LLM prompt"""
         if not transactions:
             return "No fraudulent transactions detected"
 
+        merchants = InputGuard.sanitize_many(str(txn.get('merchant', 'N/A')) for txn in transactions)
+        categories = InputGuard.sanitize_many(str(txn.get('category', 'N/A')) for txn in transactions)
+
         formatted = []
-        for i, txn in enumerate(transactions, 1):
+        for i, (txn, merchant, category) in enumerate(zip(transactions, merchants, categories), 1):
             amount = txn.get('amount', 0)
             prob = txn.get('fraud_probability', 0)
             reason = txn.get('fraud_reason', 'Unknown')
-            merchant = InputGuard.sanitize(str(txn.get('merchant', 'N/A')))
-            category = InputGuard.sanitize(str(txn.get('category', 'N/A')))
 
             formatted.append(
                 f"{i}. Amount: ${amount:.2f} | Probability: {prob*100:.1f}% | "
@@ -508,10 +430,11 @@ JSON OUTPUT TEMPLATE:
         columns = csv_info.get('columns', [])
         total_count = csv_info.get('total_count', 0)
 
+        names = InputGuard.sanitize_many(str(col['name']) for col in columns)
+        types = InputGuard.sanitize_many(str(col['type']) for col in columns)
+
         features = []
-        for col in columns:
-            col_name = InputGuard.sanitize(str(col['name']))
-            col_type = InputGuard.sanitize(str(col['type']))
+        for col, col_name, col_type in zip(columns, names, types):
             features.append(f"- {col_name} ({col_type}): {col['non_null_count']} non-null values")
 
         return f"Total rows: {total_count}\nColumns:\n" + "\n".join(features)
@@ -596,9 +519,10 @@ JSON OUTPUT TEMPLATE:
 
     def _format_fraud_entries_for_prompt(self, entries: List[Dict[str, Any]]) -> str:
         """Format fraud pattern entries for the LLM prompt."""
+        names = InputGuard.sanitize_many(str(entry['name']) for entry in entries)
+
         lines = []
-        for idx, entry in enumerate(entries, 1):
-            name = InputGuard.sanitize(str(entry['name']))
+        for idx, (entry, name) in enumerate(zip(entries, names), 1):
             lines.append(
                 f"{idx}. {name}\n"
                 f"   - Cases: {entry['count']} ({entry['percentage']:.1f}% of all fraud)\n"
@@ -750,8 +674,7 @@ JSON OUTPUT TEMPLATE:
 
         # Category patterns
         categories = {}
-        for t in fraud_transactions:
-            cat = InputGuard.sanitize(str(t.get('category', 'Unknown')))
+        for cat in InputGuard.sanitize_many(str(t.get('category', 'Unknown')) for t in fraud_transactions):
             categories[cat] = categories.get(cat, 0) + 1
 
         if categories:
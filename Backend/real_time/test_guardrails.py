@@ -7,10 +7,15 @@ import sys
 import os
 import unittest
 
+import pandas as pd
+
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from real_time.guardrails import InputGuard
+from real_time.guardrails import InputGuard, ProfanityMatcher, PROFANITY_AVAILABLE
+
+CHARS_MAPPING = {'a': ('a', '@', '*', '4'), 'i': ('i', '*', 'l', '1'), 'o': ('o', '*', '0', '@'), 's': ('s', '$', '5')}
+WORD_CHARACTERS = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789@$*')
 
 class TestInputGuard(unittest.TestCase):
     
@@ -56,5 +61,71 @@ class TestInputGuard(unittest.TestCase):
         self.assertEqual(clean['meta']['safe'], "value")
         self.assertEqual(clean['list'][1], "[SSN]")
 
+    def test_all_classes_in_one_pass(self):
+        text = "SSN 123-45-6789, cell 555.123.4567, card 4111 1111 1111 1111, mail a.b@c.org"
+        self.assertEqual(InputGuard.sanitize(text), "SSN [SSN], cell [PHONE], card [CREDIT_CARD], mail [EMAIL]")
+
+    def test_sanitize_many(self):
+        texts = ["call 555-123-4567", None, "Starbucks", "call 555-123-4567", 42, "", "x\x00 123-45-6789"]
+        self.assertEqual(InputGuard.sanitize_many(texts),
+                         ["call [PHONE]", None, "Starbucks", "call [PHONE]", 42, "", "x\x00 [SSN]"])
+        # Batched strings never merge into one match
+        self.assertEqual(InputGuard.sanitize_many(["555-123", "4567"]), ["555-123", "4567"])
+
+    def test_sanitize_dict_transaction_list(self):
+        data = {"transactions": [{"merchant": "Shop", "note": "ssn 123-45-6789"}, ["user@example.com", 3]]}
+        clean = InputGuard.sanitize_dict(data)
+        self.assertEqual(clean["transactions"][0], {"merchant": "Shop", "note": "ssn [SSN]"})
+        self.assertEqual(clean["transactions"][1], ["[EMAIL]", 3])
+        self.assertEqual(data["transactions"][0]["note"], "ssn 123-45-6789")
+
+    def test_sanitize_frame(self):
+        frame = pd.DataFrame({"merchant": ["Shop", "call 555-123-4567", None], "amount": [1.0, 2.0, 3.0]})
+        clean = InputGuard.sanitize_frame(frame)
+        self.assertEqual(clean["merchant"].tolist(), ["Shop", "call [PHONE]", None])
+        self.assertEqual(clean["amount"].tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(frame["merchant"][1], "call 555-123-4567")
+        self.assertEqual(InputGuard.sanitize_series(frame["merchant"]).tolist(), ["Shop", "call [PHONE]", None])
+
+    def test_sanitize_categorical(self):
+        series = pd.Series(["call 555-123-4567", "Shop", "call 555-987-6543", "Shop"], dtype="category")
+        clean = InputGuard.sanitize_series(series)
+        self.assertEqual(clean.tolist(), ["call [PHONE]", "Shop", "call [PHONE]", "Shop"])
+        self.assertEqual(sorted(clean.cat.categories), ["Shop", "call [PHONE]"])
+        frame = InputGuard.sanitize_frame(pd.DataFrame({"note": series, "amount": [1, 2, 3, 4]}))
+        self.assertEqual(frame["note"].tolist(), clean.tolist())
+        self.assertIsInstance(frame["note"].dtype, pd.CategoricalDtype)
+
+
+class TestProfanityMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = ProfanityMatcher(["ass", "bass", "hand job", "f.u.c.k", "piss"], CHARS_MAPPING, WORD_CHARACTERS)
+
+    def test_whole_words_only(self):
+        self.assertEqual(self.matcher.censor("Ass in class, grass, bass."), "**** in class, grass, ****.")
+
+    def test_leetspeak_variants(self):
+        self.assertEqual(self.matcher.censor("@$$ p1$5 p*ss 4ss"), "**** **** **** ****")
+        self.assertFalse(self.matcher.contains("oss ess"))
+
+    def test_multi_word_entries(self):
+        self.assertEqual(self.matcher.censor("a hand job and F.U.C.K!"), "a **** and ****!")
+        self.assertEqual(self.matcher.find("a hand job"), [(2, 10)])
+
+    def test_adjacent_words_joined(self):
+        self.assertEqual(self.matcher.censor("a ss, pi-ss and b ass"), "****, **** and ****")
+        self.assertEqual(self.matcher.censor("as is, as said"), "as is, as said")
+        # Words of different batched strings are never joined
+        self.assertFalse(self.matcher.contains("a\x00ss"))
+
+    @unittest.skipUnless(PROFANITY_AVAILABLE, "better-profanity not installed")
+    def test_default_word_list(self):
+        self.assertTrue(InputGuard.contains_profanity("what the sh1t"))
+        self.assertFalse(InputGuard.contains_profanity("Scunthorpe class assessment"))
+        self.assertEqual(InputGuard.sanitize("you b1tch, mail me at x@y.com"), "you ****, mail me at [EMAIL]")
+        for text in ("sh it", "bi tch", "fu ck", "f uck", "a ss", "fu-ck", "motherfu cker", "s-h-i-t", "f_u_c_k"):
+            self.assertEqual(InputGuard.sanitize(text), "****", text)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,68 @@
+"""
+Test Concurrent LLM Calls
+Verifies that calls overlap, and that timeouts and errors yield fallback results.
+"""
+
+import sys
+import os
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from real_time.llm_concurrency import run_concurrently
+
+
+def _slow(value, seconds):
+    def call():
+        time.sleep(seconds)
+        return value
+    return call
+
+
+def _fallback(name):
+    return lambda error: f'{name} fallback: {error}'
+
+
+class TestRunConcurrently(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def test_latency_is_slowest_call(self):
+        started = time.perf_counter()
+        outcome = run_concurrently(
+            {'a': _slow('A', 0.2), 'b': _slow('B', 0.2), 'c': _slow('C', 0.2)},
+            {name: _fallback(name) for name in 'abc'},
+            timeout=5, executor=self.executor
+        )
+        elapsed = time.perf_counter() - started
+        self.assertEqual(outcome['results'], {'a': 'A', 'b': 'B', 'c': 'C'})
+        self.assertEqual(outcome['failed'], {})
+        self.assertLess(elapsed, 0.5)
+        self.assertTrue(all(0.15 < seconds < 0.5 for seconds in outcome['seconds'].values()))
+
+    def test_timeout_and_error_give_partial_results(self):
+        def broken():
+            raise ValueError('rate limited')
+
+        started = time.perf_counter()
+        outcome = run_concurrently(
+            {'fast': _slow('ok', 0), 'slow': _slow('late', 2), 'broken': broken},
+            {name: _fallback(name) for name in ('fast', 'slow', 'broken')},
+            timeout=0.2, executor=self.executor
+        )
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(outcome['results']['fast'], 'ok')
+        self.assertEqual(outcome['results']['slow'], 'slow fallback: timed out after 0.2s')
+        self.assertEqual(outcome['results']['broken'], 'broken fallback: rate limited')
+        self.assertEqual(set(outcome['failed']), {'slow', 'broken'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Guardrail Throughput Benchmark
+Measures how fast InputGuard sanitizes transaction-like text (real_time/guardrails.py)
+
+Generates a synthetic transaction list (merchants, categories and free-text notes,
+some with PII or profanity) and reports strings/s and MB/s for per-string sanitize(),
+the batch APIs (sanitize_many, sanitize_dict, sanitize_frame) and, with --legacy,
+the previous implementation (better-profanity censor plus one regex pass per PII
+class) on a sample of the strings.
+
+Usage:
+    python scripts/benchmark_guardrails.py
+    python scripts/benchmark_guardrails.py --rows 50000 --runs 5
+    python scripts/benchmark_guardrails.py --legacy --legacy-sample 200 --json
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import statistics
+from typing import Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from real_time.guardrails import InputGuard, PROFANITY_AVAILABLE
+
+MERCHANTS = ['Starbucks', 'Amazon Marketplace', 'Shell Oil 5543', 'Walmart Supercenter', 'Uber Trip',
+             'Netflix.com', 'Delta Air Lines', "Dick's Sporting Goods", 'Best Buy #1120', 'Scunthorpe Deli']
+CATEGORIES = ['Food & Drink', 'Shopping', 'Gas', 'Groceries', 'Transport', 'Entertainment', 'Travel']
+NOTES = [
+    'Card ending 4444 used at terminal',
+    'Customer called from 555-123-{n:04d} to dispute',
+    'Refund sent to user{n}@example.com',
+    'SSN on file 123-45-{n:04d}',
+    'Paid with 4111 1111 1111 {n:04d}',
+    'Merchant flagged this sh1t as suspicious',
+    'Recurring payment, no issues reported by the account holder',
+]
+
+
+def make_transactions(rows: int, seed: int = 7) -> List[Dict]:
+    """Synthetic transaction list"""
+    rng = random.Random(seed)
+    return [
+        {
+            'merchant': rng.choice(MERCHANTS),
+            'category': rng.choice(CATEGORIES),
+            'note': rng.choice(NOTES).format(n=rng.randint(0, 9999)),
+            'amount': round(rng.lognormvariate(3.5, 1.2), 2)
+        }
+        for _ in range(rows)
+    ]
+
+
+def legacy_sanitizer() -> Callable[[str], str]:
+    """The previous sanitize(): better-profanity censor, then one sub() per PII class"""
+    patterns = [(InputGuard.PATTERNS[name], placeholder) for name, placeholder in InputGuard.REDACTIONS.items()]
+    censor = None
+    if PROFANITY_AVAILABLE:
+        from better_profanity import profanity
+        profanity.load_censor_words()
+        censor = profanity.censor
+
+    def _sanitize(text: str) -> str:
+        if censor:
+            text = censor(text)
+        for pattern, placeholder in patterns:
+            text = pattern.sub(placeholder, text)
+        return text
+
+    return _sanitize
+
+
+def measure(fn: Callable[[], object], runs: int) -> float:
+    """Median seconds of fn over runs"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark InputGuard sanitization throughput')
+    parser.add_argument('--rows', type=int, default=10000, help='Transactions to sanitize (default: 10000)')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per case, the median is reported (default: 3)')
+    parser.add_argument('--legacy', action='store_true', help='Also time the previous implementation')
+    parser.add_argument('--legacy-sample', type=int, default=100, help='Strings timed with --legacy (default: 100)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    transactions = make_transactions(args.rows)
+    texts = [txn[key] for txn in transactions for key in ('merchant', 'category', 'note')]
+    total_bytes = sum(len(text.encode('utf-8')) for text in texts)
+
+    started = time.perf_counter()
+    InputGuard._init_profanity()
+    build_seconds = time.perf_counter() - started
+
+    cases = {
+        'sanitize (per string)': (lambda: [InputGuard.sanitize(text) for text in texts], len(texts), total_bytes),
+        'sanitize_many': (lambda: InputGuard.sanitize_many(texts), len(texts), total_bytes),
+        'sanitize_dict': (lambda: InputGuard.sanitize_dict({'transactions': transactions}), len(texts), total_bytes),
+    }
+    try:
+        import pandas as pd
+        frame = pd.DataFrame(transactions)
+        cases['sanitize_frame'] = (lambda: InputGuard.sanitize_frame(frame), len(texts), total_bytes)
+    except ImportError:
+        pass
+    if args.legacy:
+        legacy = legacy_sanitizer()
+        sample = texts[:args.legacy_sample]
+        sample_bytes = sum(len(text.encode('utf-8')) for text in sample)
+        cases['legacy (per string)'] = (lambda: [legacy(text) for text in sample], len(sample), sample_bytes)
+
+    results = {}
+    for name, (fn, count, size) in cases.items():
+        seconds = measure(fn, args.runs)
+        results[name] = {
+            'strings': count,
+            'seconds': round(seconds, 4),
+            'strings_per_second': round(count / seconds) if seconds else None,
+            'mb_per_second': round(size / seconds / 1e6, 2) if seconds else None
+        }
+
+    if args.json:
+        print(json.dumps({'rows': args.rows, 'profanity_filter': PROFANITY_AVAILABLE,
+                          'matcher_build_seconds': round(build_seconds, 4), 'results': results}, indent=2))
+        return
+
+    print("=" * 72)
+    print(f"Guardrail throughput: {args.rows} transactions, {len(texts)} strings, "
+          f"{total_bytes / 1e6:.2f} MB (median of {args.runs})")
+    print(f"Profanity filter: {'on' if PROFANITY_AVAILABLE else 'unavailable'}, "
+          f"matcher built in {build_seconds * 1000:.1f} ms")
+    print("=" * 72)
+    print(f"  {'case':<24} {'strings':>9} {'seconds':>9} {'strings/s':>12} {'MB/s':>8}")
+    for name, result in results.items():
+        print(f"  {name:<24} {result['strings']:>9} {result['seconds']:>9.3f} "
+              f"{result['strings_per_second']:>12,} {result['mb_per_second']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Startup Import Benchmark
+Measures how long importing the API server takes, using python -X importtime
+
+Runs the import in fresh interpreters, reports wall time and the modules with the
+largest cumulative import time, and flags heavy libraries that should only load
+on first use (see lazy_components.py).
+
+Usage:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 5 --top 25
+    python scripts/benchmark_startup.py --module check --json
+"""
+
+import sys
+import os
+import re
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that must not be imported while the server module loads
+DEFERRED_MODULES = (
+    'google.cloud.vision',
+    'mindee',
+    'langchain_openai',
+    'langchain_core',
+    'xgboost',
+    'lightgbm',
+    'fitz'
+)
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+    """
+    Parse -X importtime output
+
+    Returns:
+        Dict of module -> {'self_us', 'cumulative_us', 'depth'}
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules[module] = {
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'depth': (len(indent) - 1) // 2
+            }
+    return modules
+
+
+def run_once(module: str) -> Dict:
+    """Import module in a fresh interpreter; returns wall time and parsed importtime"""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    wall = time.perf_counter() - started
+    modules = parse_importtime(completed.stderr)
+    errors = [line for line in completed.stderr.splitlines() if not line.startswith('import time:')]
+    return {
+        'wall_seconds': wall,
+        'returncode': completed.returncode,
+        'modules': modules,
+        'error': '\n'.join(errors[-5:]) if completed.returncode else None
+    }
+
+
+def summarize(module: str, runs: List[Dict], top: int) -> Dict:
+    last = runs[-1]
+    modules = last['modules']
+    top_level = [name for name, entry in modules.items() if entry['depth'] == 0]
+    slowest = sorted(top_level, key=lambda name: modules[name]['cumulative_us'], reverse=True)[:top]
+    deferred_loaded = sorted(
+        name for name in modules
+        if any(name == heavy or name.startswith(heavy + '.') for heavy in DEFERRED_MODULES)
+    )
+    walls = [run['wall_seconds'] for run in runs]
+    return {
+        'module': module,
+        'runs': len(runs),
+        'wall_seconds_median': statistics.median(walls),
+        'wall_seconds_min': min(walls),
+        'import_seconds': modules[module]['cumulative_us'] / 1e6 if module in modules else None,
+        'modules_imported': len(modules),
+        'slowest_top_level': [
+            {'module': name, 'cumulative_ms': modules[name]['cumulative_us'] / 1000}
+            for name in slowest
+        ],
+        'deferred_modules_loaded': deferred_loaded,
+        'error': last['error']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API server import time')
+    parser.add_argument('--module', default='api_server', help='Module to import (default: api_server)')
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreter runs (default: 3)')
+    parser.add_argument('--top', type=int, default=15, help='Slowest top-level imports to list')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args()
+
+    runs = [run_once(args.module) for _ in range(max(1, args.runs))]
+    summary = summarize(args.module, runs, args.top)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print("=" * 70)
+        print(f"Import benchmark: {args.module} ({summary['runs']} runs)")
+        print("=" * 70)
+        print(f"Wall time (median): {summary['wall_seconds_median']:.3f}s  (min {summary['wall_seconds_min']:.3f}s)")
+        if summary['import_seconds'] is not None:
+            print(f"Import time ({args.module}): {summary['import_seconds']:.3f}s")
+        print(f"Modules imported: {summary['modules_imported']}")
+        print(f"\nSlowest top-level imports:")
+        for entry in summary['slowest_top_level']:
+            print(f"  {entry['cumulative_ms']:9.1f} ms  {entry['module']}")
+        if summary['deferred_modules_loaded']:
+            print(f"\n⚠️  Heavy modules loaded at import time: {', '.join(summary['deferred_modules_loaded'])}")
+        else:
+            print(f"\n✓ No deferred heavy modules loaded at import time")
+        if summary['error']:
+            print(f"\n❌ Import failed:\n{summary['error']}")
+
+    sys.exit(1 if summary['error'] or summary['deferred_modules_loaded'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Pipeline Load Test
+Replays a corpus of sample documents through the API at a target request rate
+and reports p50/p95/p99 latency per pipeline stage
+
+Provider calls are served from recorded cassettes (utils/cassettes.py), so runs
+need neither network access nor paid API calls. Record the corpus once against
+the real providers, then replay it as often as needed:
+
+    PROVIDER_CASSETTE_MODE=record python scripts/load_test.py --corpus samples --requests 20 --rps 1
+    python scripts/load_test.py --corpus samples --rps 5 --duration 60
+    python scripts/load_test.py --corpus samples --rps 5 --duration 60 --latency 0 --json
+
+The corpus directory holds one subdirectory per pipeline (check, paystub,
+money_order, bank_statement, real_time) with the documents (or CSV files) to
+send; files are cycled in order. Requests are sent open-loop at --rps, so
+latency includes queueing when the API falls behind.
+
+By default the app runs in-process (Flask test client) with cassette replay,
+Server-Timing headers and the LLM / OCR response caches disabled, so every
+request exercises the full pipeline. With --url the requests go to a running
+server instead (start it with SERVER_TIMING_ENABLED=true and
+PROVIDER_CASSETTE_MODE=replay for per-stage results).
+
+Stages: client (end to end as seen by the driver), server (whole request in
+the app), mindee (OCR), openai (LLM) and app (server time outside provider calls).
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import threading
+import mimetypes
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from utils.stage_timing import parse_server_timing, SERVER_TIMING_HEADER
+
+PIPELINE_ENDPOINTS = {
+    'check': '/api/check/analyze',
+    'paystub': '/api/paystub/analyze',
+    'money_order': '/api/money-order/analyze',
+    'bank_statement': '/api/bank-statement/analyze',
+    'real_time': '/api/real-time/analyze',
+}
+PROVIDER_STAGES = ('mindee', 'openai')
+STAGE_ORDER = ('client', 'server') + PROVIDER_STAGES + ('app',)
+PERCENTILES = (50, 95, 99)
+
+
+def load_corpus(corpus_dir: str, pipelines: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    """
+    Documents of the corpus
+
+    Args:
+        corpus_dir: Directory with one subdirectory per pipeline
+        pipelines: Pipelines to include (default: all with documents)
+
+    Returns:
+        (pipeline, file path) pairs, interleaved across pipelines
+    """
+    per_pipeline = {}
+    for pipeline in pipelines or PIPELINE_ENDPOINTS:
+        directory = os.path.join(corpus_dir, pipeline)
+        if os.path.isdir(directory):
+            files = sorted(
+                os.path.join(directory, name) for name in os.listdir(directory)
+                if not name.startswith('.') and os.path.isfile(os.path.join(directory, name))
+            )
+            if files:
+                per_pipeline[pipeline] = files
+    corpus = []
+    for index in range(max((len(files) for files in per_pipeline.values()), default=0)):
+        for pipeline, files in per_pipeline.items():
+            if index < len(files):
+                corpus.append((pipeline, files[index]))
+    return corpus
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for no values)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(-(-pct * len(ordered) // 100)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class InProcessTransport:
+    """Sends requests to the Flask app through its test client"""
+
+    def __init__(self):
+        # Replay providers, report stages and bypass response caches unless configured otherwise
+        os.environ.setdefault('PROVIDER_CASSETTE_MODE', 'replay')
+        os.environ.setdefault('SERVER_TIMING_ENABLED', 'true')
+        os.environ.setdefault('LLM_CACHE_ENABLED', 'false')
+        os.environ.setdefault('CACHE_ENABLED', 'false')
+        from api_server import app
+        self.app = app
+        self._local = threading.local()
+
+    def post_file(self, path: str, file_path: str) -> Tuple[int, Dict[str, float]]:
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        with open(file_path, 'rb') as f:
+            response = client.post(
+                path, data={'file': (f, os.path.basename(file_path))}, content_type='multipart/form-data'
+            )
+        return response.status_code, parse_server_timing(response.headers.get(SERVER_TIMING_HEADER))
+
+
+class HTTPTransport:
+    """Sends requests to a running API server"""
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def post_file(self, path: str, file_path: str) -> Tuple[int, Dict[str, float]]:
+        boundary = uuid.uuid4().hex
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        content_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+        body = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{os.path.basename(file_path)}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+        request = urllib.request.Request(
+            self.base_url + path, data=body, method='POST',
+            headers={'Content-Type': f'multipart/form-data; boundary={boundary}'}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status, parse_server_timing(response.headers.get(SERVER_TIMING_HEADER))
+        except urllib.error.HTTPError as e:
+            return e.code, parse_server_timing(e.headers.get(SERVER_TIMING_HEADER))
+
+
+def run_load(transport, corpus: List[Tuple[str, str]], rps: float, total_requests: int,
+             max_in_flight: int) -> Dict:
+    """
+    Send total_requests requests open-loop at rps, cycling through the corpus
+
+    Returns:
+        Dict with 'samples' (one per request) and 'elapsed_seconds'
+    """
+    samples = []
+    samples_lock = threading.Lock()
+
+    def _send(pipeline: str, file_path: str, scheduled: float):
+        error = None
+        try:
+            status, stages = transport.post_file(PIPELINE_ENDPOINTS[pipeline], file_path)
+        except Exception as e:
+            status, stages, error = 0, {}, f"{type(e).__name__}: {e}"
+        stages = dict(stages)
+        stages['client'] = time.perf_counter() - scheduled
+        if 'total' in stages:
+            stages['server'] = stages.pop('total')
+            stages['app'] = max(stages['server'] - sum(stages.get(name, 0.0) for name in PROVIDER_STAGES), 0.0)
+        with samples_lock:
+            samples.append({'pipeline': pipeline, 'file': file_path, 'status': status, 'error': error, 'stages': stages})
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='load') as pool:
+        for index in range(total_requests):
+            scheduled = started + index / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pipeline, file_path = corpus[index % len(corpus)]
+            pool.submit(_send, pipeline, file_path, scheduled)
+    return {'samples': samples, 'elapsed_seconds': time.perf_counter() - started}
+
+
+def summarize(samples: List[Dict], elapsed_seconds: float) -> Dict:
+    """Per pipeline request counts, error rate, throughput and stage percentiles (ms)"""
+    summary = {}
+    for pipeline in sorted({sample['pipeline'] for sample in samples}):
+        entries = [sample for sample in samples if sample['pipeline'] == pipeline]
+        errors = [sample for sample in entries if sample['error'] or sample['status'] >= 400]
+        stages = {}
+        for name in STAGE_ORDER:
+            values = [sample['stages'][name] for sample in entries if name in sample['stages']]
+            if values:
+                stages[name] = {
+                    'count': len(values),
+                    **{f"p{pct}_ms": round(percentile(values, pct) * 1000, 1) for pct in PERCENTILES}
+                }
+        summary[pipeline] = {
+            'requests': len(entries),
+            'errors': len(errors),
+            'throughput_rps': round(len(entries) / elapsed_seconds, 2) if elapsed_seconds else 0.0,
+            'stages': stages,
+            'sample_errors': sorted({sample['error'] or f"HTTP {sample['status']}" for sample in errors})[:5]
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a document corpus through the API at a target rate')
+    parser.add_argument('--corpus', required=True, help='Directory with one subdirectory per pipeline')
+    parser.add_argument('--pipelines', nargs='+', choices=sorted(PIPELINE_ENDPOINTS), help='Pipelines to include')
+    parser.add_argument('--rps', type=float, default=2.0, help='Target requests per second (default: 2)')
+    parser.add_argument('--duration', type=float, help='Seconds to run (default: one pass over the corpus)')
+    parser.add_argument('--requests', type=int, help='Number of requests (overrides --duration)')
+    parser.add_argument('--max-in-flight', type=int, default=32, help='Concurrent requests (default: 32)')
+    parser.add_argument('--latency', help="Replay latency: 'recorded' or seconds (sets PROVIDER_CASSETTE_LATENCY)")
+    parser.add_argument('--url', help='Base URL of a running API server (default: in-process)')
+    parser.add_argument('--timeout', type=float, default=300, help='HTTP timeout per request with --url')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.pipelines)
+    if not corpus:
+        parser.error(f"No documents under {args.corpus}/<{'|'.join(PIPELINE_ENDPOINTS)}>/")
+    if args.latency is not None:
+        os.environ['PROVIDER_CASSETTE_LATENCY'] = args.latency
+    if args.requests:
+        total_requests = args.requests
+    elif args.duration:
+        total_requests = max(int(args.duration * args.rps), 1)
+    else:
+        total_requests = len(corpus)
+
+    transport = HTTPTransport(args.url, args.timeout) if args.url else InProcessTransport()
+    result = run_load(transport, corpus, args.rps, total_requests, args.max_in_flight)
+    summary = summarize(result['samples'], result['elapsed_seconds'])
+
+    if args.json:
+        print(json.dumps({'target_rps': args.rps, 'elapsed_seconds': round(result['elapsed_seconds'], 2),
+                          'pipelines': summary}, indent=2))
+    else:
+        print("=" * 78)
+        print(f"Load test: {total_requests} requests at {args.rps:g} rps "
+              f"({result['elapsed_seconds']:.1f}s, {'in-process' if not args.url else args.url})")
+        print("=" * 78)
+        for pipeline, entry in summary.items():
+            print(f"\n{pipeline}: {entry['requests']} requests, {entry['errors']} errors, "
+                  f"{entry['throughput_rps']:g} rps")
+            print(f"  {'stage':<8} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+            for name, stats in entry['stages'].items():
+                print(f"  {name:<8} {stats['count']:>6} {stats['p50_ms']:>10.1f} "
+                      f"{stats['p95_ms']:>10.1f} {stats['p99_ms']:>10.1f}")
+            for error in entry['sample_errors']:
+                print(f"  ❌ {error}")
+
+    sys.exit(1 if any(entry['errors'] for entry in summary.values()) else 0)
+
+
+if __name__ == '__main__':
+    main()
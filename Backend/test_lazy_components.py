@@ -0,0 +1,109 @@
+"""
+Test Lazy Components
+Verifies one-time initialization, failure retry, readiness reporting and warm-up.
+"""
+
+import sys
+import os
+import time
+import threading
+import unittest
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import lazy_components
+from lazy_components import LazyComponent, register_component, get_component, readiness, warm_up
+
+
+class TestLazyComponent(unittest.TestCase):
+
+    def test_built_once_across_threads(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        component = LazyComponent('slow', factory)
+        self.assertEqual(component.state, 'cold')
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(component.get())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(component.status()['state'], 'ready')
+        self.assertIsNotNone(component.status()['init_seconds'])
+
+    def test_failure_retried_after_interval(self):
+        attempts = []
+
+        def factory():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError('connection refused')
+            return 'client'
+
+        component = LazyComponent('flaky', factory, retry_interval=60)
+        self.assertIsNone(component.get())
+        self.assertIsNone(component.get())
+        self.assertEqual(len(attempts), 1)
+        self.assertEqual(component.status()['error'], 'connection refused')
+
+        component.retry_interval = 0
+        self.assertEqual(component.get(), 'client')
+        self.assertEqual(component.state, 'ready')
+
+
+class TestRegistry(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.dict(lazy_components._components, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(lazy_components, '_warm_up_thread', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_readiness(self):
+        register_component('db', lambda: 'db', required=True)
+        register_component('ocr', lambda: 1 / 0)
+        self.assertFalse(readiness()['ready'])
+
+        warm_up(background=False)
+        status = readiness()
+        # An optional component that failed does not block readiness
+        self.assertTrue(status['ready'])
+        self.assertEqual(status['components']['db']['state'], 'ready')
+        self.assertEqual(status['components']['ocr']['state'], 'failed')
+
+    def test_required_failure_not_ready(self):
+        register_component('db', lambda: 1 / 0, required=True)
+        warm_up(background=False)
+        self.assertFalse(readiness()['ready'])
+
+    def test_background_warm_up_started_once(self):
+        release = threading.Event()
+        register_component('model', lambda: release.wait(5) and 'model')
+        thread = warm_up()
+        self.assertIs(warm_up(), thread)
+        release.set()
+        thread.join(5)
+        self.assertEqual(get_component('model'), 'model')
+        self.assertTrue(readiness()['ready'])
+
+    def test_mindee_without_key(self):
+        lazy_components.register_component('mindee', lazy_components._create_mindee_client)
+        with mock.patch.dict(os.environ, {'MINDEE_API_KEY': ''}):
+            self.assertIsNone(lazy_components.get_mindee_client())
+        self.assertIn('MINDEE_API_KEY', readiness()['components']['mindee']['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
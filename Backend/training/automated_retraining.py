@@ -11,6 +11,7 @@ import sys
 import json
 import joblib
 import logging
+import time
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, Optional, Tuple, List
@@ -27,6 +28,8 @@ from sklearn.metrics import mean_squared_error, r2_score
 import xgboost as xgb
 
 from training.model_performance_tracker import ModelPerformanceTracker
+from training.model_artifacts import write_bundle
+from training.hyperparameter_search import DEFAULT_MODEL_PARAMS, HyperparameterSearch, tuning_config
 
 logger = logging.getLogger(__name__)
 
@@ -81,6 +84,13 @@ class DocumentModelRetrainer(ABC):
         # For backward compatibility, keep models_dir pointing to production
         self.models_dir = self.production_models_dir
 
+        # Cores for RF/XGBoost training (-1 = all); the parallel orchestrator
+        # lowers this so concurrent document types share the CPU budget
+        self.n_jobs = -1
+
+        # Optional hyperparameter search before training (see training.hyperparameter_search)
+        self.tuning_config = tuning_config(self.config, document_type)
+
         logger.info(f"Initialized {document_type} model retrainer")
         logger.info(f"  Versioned models: {self.versioned_models_dir}")
         logger.info(f"  Production models: {self.production_models_dir}")
@@ -98,15 +108,48 @@ class DocumentModelRetrainer(ABC):
         """
         pass
 
-    @abstractmethod
+    @property
+    def training_columns(self) -> Dict[str, str]:
+        """Stored columns the features are built from (name -> kind, see training.feature_frames)"""
+        from training.feature_frames import FEATURE_FRAMES
+        return FEATURE_FRAMES[self.document_type][0]
+
+    def build_feature_frame(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Build features and risk_score for normalized stored rows in one vectorized pass
+
+        Args:
+            rows: DataFrame with the training_columns
+
+        Returns:
+            DataFrame with features and risk_score column
+        """
+        from training.feature_frames import FEATURE_FRAMES
+        return FEATURE_FRAMES[self.document_type][1](rows)
+
     def fetch_real_data_from_database(self) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
         """
-        Fetch real data from database
+        Fetch real data from database (paged, column-projected, snapshot-cached)
 
         Returns:
             Tuple of (DataFrame with features and labels, error message)
         """
-        pass
+        try:
+            from training.training_data_loader import TrainingDataLoader
+            rows = TrainingDataLoader.for_retrainer(self).load()
+            if rows.empty:
+                logger.warning(f"No high-confidence {self.document_type} data found in database")
+                return None, "No high-confidence data available"
+
+            df = self.build_feature_frame(rows)
+            if df.empty:
+                return None, "Failed to extract features from database rows"
+            logger.info(f"Built {len(df)} {self.document_type} samples with {len(df.columns) - 1} features")
+            return df, None
+
+        except Exception as e:
+            logger.error(f"Error fetching {self.document_type} data from database: {e}", exc_info=True)
+            return None, str(e)
 
     def blend_data(
         self,
@@ -212,7 +255,8 @@ class DocumentModelRetrainer(ABC):
         X_train: np.ndarray,
         y_train: np.ndarray,
         X_test: np.ndarray,
-        y_test: np.ndarray
+        y_test: np.ndarray,
+        hyperparameters: Optional[Dict[str, Dict[str, Any]]] = None
     ) -> Tuple[Any, Any, Any, Dict[str, float]]:
         """
         Train Random Forest + XGBoost ensemble
@@ -220,11 +264,16 @@ class DocumentModelRetrainer(ABC):
         Args:
             X_train, y_train: Training data
             X_test, y_test: Test data
+            hyperparameters: Per-model parameters overriding DEFAULT_MODEL_PARAMS
+                ({'random_forest': {...}, 'xgboost': {...}}, e.g. from tune_hyperparameters)
 
         Returns:
             Tuple of (rf_model, xgb_model, scaler, metrics_dict)
         """
         logger.info("Training ensemble models (Random Forest + XGBoost)...")
+        hyperparameters = hyperparameters or {}
+        rf_params = dict(DEFAULT_MODEL_PARAMS['random_forest'], **hyperparameters.get('random_forest', {}))
+        xgb_params = dict(DEFAULT_MODEL_PARAMS['xgboost'], **hyperparameters.get('xgboost', {}))
 
         # Scale features
         scaler = StandardScaler()
@@ -234,12 +283,9 @@ class DocumentModelRetrainer(ABC):
         # Train Random Forest
         logger.info("Training Random Forest...")
         rf_model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            min_samples_split=5,
-            min_samples_leaf=2,
             random_state=42,
-            n_jobs=-1
+            n_jobs=self.n_jobs,
+            **rf_params
         )
         start_time = datetime.now()
         rf_model.fit(X_train_scaled, y_train)
@@ -253,11 +299,9 @@ class DocumentModelRetrainer(ABC):
         # Train XGBoost
         logger.info("Training XGBoost...")
         xgb_model = xgb.XGBRegressor(
-            n_estimators=100,
-            max_depth=6,
-            learning_rate=0.1,
             random_state=42,
-            n_jobs=-1
+            n_jobs=self.n_jobs,
+            **xgb_params
         )
         start_time = datetime.now()
         xgb_model.fit(X_train_scaled, y_train)
@@ -293,6 +337,40 @@ class DocumentModelRetrainer(ABC):
 
         return rf_model, xgb_model, scaler, metrics
 
+    def tune_hyperparameters(self, X_train: np.ndarray, y_train: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        Choose model parameters for this run
+
+        With tuning enabled, searches the configured space (warm-started from the
+        previous best configuration); otherwise reuses the previous best
+        configuration if reuse_best_params is set.
+
+        Args:
+            X_train, y_train: Training data (scaled here, like train_ensemble_model)
+
+        Returns:
+            Dict with 'params' per model (plus search stats when a search ran),
+            or None to train with DEFAULT_MODEL_PARAMS
+        """
+        previous = self.performance_tracker.get_best_hyperparameters()
+
+        if not self.tuning_config['enabled']:
+            if previous and self.tuning_config['reuse_best_params']:
+                logger.info(f"Using previous best hyperparameters: {previous}")
+                return {'params': previous, 'source': 'previous'}
+            return None
+
+        logger.info(
+            f"Tuning hyperparameters ({self.tuning_config['method']}, "
+            f"budget {self.tuning_config['time_budget_seconds']}s)..."
+        )
+        search = HyperparameterSearch(self.tuning_config, n_jobs=self.n_jobs)
+        X_scaled = StandardScaler().fit_transform(X_train)
+        seed_params = previous if self.tuning_config['warm_start'] else None
+        result = search.search(X_scaled, y_train, seed_params=seed_params)
+        result['source'] = 'search'
+        return result
+
     def save_versioned_model(
         self,
         rf_model: Any,
@@ -336,19 +414,32 @@ class DocumentModelRetrainer(ABC):
             joblib.dump(scaler, scaler_path)
             logger.info(f"Saved versioned: {os.path.basename(scaler_path)}")
 
+            # Bundle of the same version (memory-mappable, checksummed) for atomic activation
+            write_bundle(
+                self.versioned_models_dir,
+                self.document_type,
+                version_id,
+                {'random_forest': rf_model, 'xgboost': xgb_model, 'feature_scaler': scaler}
+            )
+
             return True
 
         except Exception as e:
             logger.error(f"Error saving versioned models: {e}")
             return False
 
-    def retrain(self) -> Dict[str, Any]:
+    def retrain(self, prefetched: Optional[Tuple[Optional[pd.DataFrame], Optional[str]]] = None) -> Dict[str, Any]:
         """
         Main retraining workflow
 
+        Args:
+            prefetched: Result of fetch_real_data_from_database() if it was already
+                run (e.g. by the parallel orchestrator while other types trained)
+
         Returns:
-            Dictionary with retraining results
+            Dictionary with retraining results (including per-stage timings in seconds)
         """
+        timings: Dict[str, float] = {}
         try:
             logger.info(f"="*70)
             logger.info(f"Starting automated retraining for {self.document_type}")
@@ -360,14 +451,21 @@ class DocumentModelRetrainer(ABC):
 
             # Step 1: Fetch real data from database
             logger.info("\nStep 1: Fetching real data from database...")
-            real_df, error = self.fetch_real_data_from_database()
+            stage_start = time.perf_counter()
+            if prefetched is not None:
+                real_df, error = prefetched
+            else:
+                real_df, error = self.fetch_real_data_from_database()
+                timings['fetch'] = time.perf_counter() - stage_start
             if error:
                 logger.warning(f"Database fetch error: {error}")
 
             # Step 2: Generate synthetic data
             logger.info("\nStep 2: Generating synthetic data...")
             synthetic_count = self.data_blending_config['synthetic_sample_count']
+            stage_start = time.perf_counter()
             synthetic_df = self.generate_synthetic_data(n_samples=synthetic_count)
+            timings['synthetic'] = time.perf_counter() - stage_start
             logger.info(f"Generated {len(synthetic_df)} synthetic samples")
 
             # Step 3: Blend data
@@ -407,11 +505,19 @@ class DocumentModelRetrainer(ABC):
                 'fraud_ratio': float(fraud_ratio)
             }
 
-            # Step 6: Train models
+            # Step 6: Tune (optional) and train models
             logger.info("\nStep 6: Training ensemble models...")
+            stage_start = time.perf_counter()
+            tuning = self.tune_hyperparameters(X_train, y_train)
+            if tuning and tuning['source'] == 'search':
+                timings['tune'] = time.perf_counter() - stage_start
+            hyperparameters = tuning['params'] if tuning else None
+
+            stage_start = time.perf_counter()
             rf_model, xgb_model, scaler, metrics = self.train_ensemble_model(
-                X_train, y_train, X_test, y_test
+                X_train, y_train, X_test, y_test, hyperparameters=hyperparameters
             )
+            timings['train'] = time.perf_counter() - stage_start
 
             # Step 7: Save metrics
             logger.info("\nStep 7: Saving performance metrics...")
@@ -419,7 +525,9 @@ class DocumentModelRetrainer(ABC):
                 version_id=version_id,
                 metrics=metrics,
                 data_source=data_source,
-                training_data_info=training_data_info
+                training_data_info=training_data_info,
+                hyperparameters=hyperparameters,
+                tuning=tuning
             )
 
             # Step 8: Compare with previous version
@@ -442,11 +550,14 @@ class DocumentModelRetrainer(ABC):
                     'reason': comparison['reason'],
                     'metrics': metrics,
                     'data_source': data_source,
-                    'training_data': training_data_info
+                    'training_data': training_data_info,
+                    'hyperparameters': hyperparameters,
+                    'timings': timings
                 }
 
             # Step 9: Save versioned models
             logger.info("\nStep 9: Saving versioned models...")
+            stage_start = time.perf_counter()
             save_success = self.save_versioned_model(
                 rf_model, xgb_model, scaler, version_id
             )
@@ -460,6 +571,7 @@ class DocumentModelRetrainer(ABC):
             # Step 10: Activate new version
             logger.info("\nStep 10: Activating new version...")
             activate_success = self.performance_tracker.activate_version(version_id)
+            timings['save'] = time.perf_counter() - stage_start
 
             if not activate_success:
                 return {
@@ -472,6 +584,15 @@ class DocumentModelRetrainer(ABC):
             keep_n = self.global_settings['keep_n_versions']
             self.performance_tracker.cleanup_old_versions(keep_n=keep_n)
 
+            # Step 12: Re-score stored documents with the new model (separate process, resumable)
+            rescoring_started = False
+            rescoring_pid = None
+            if self.config.get('rescoring', {}).get('run_after_activation'):
+                logger.info("\nStep 12: Starting background re-scoring of stored documents...")
+                from training.bulk_rescoring import start_background_rescoring
+                rescoring_pid = start_background_rescoring(self.document_type, version_id).pid
+                rescoring_started = True
+
             logger.info(f"\n{'='*70}")
             logger.info(f"✅ Retraining completed successfully for {self.document_type}")
             logger.info(f"✅ Version {version_id} is now ACTIVE")
@@ -484,7 +605,11 @@ class DocumentModelRetrainer(ABC):
                 'metrics': metrics,
                 'data_source': data_source,
                 'training_data': training_data_info,
-                'comparison': comparison
+                'comparison': comparison,
+                'hyperparameters': hyperparameters,
+                'rescoring_started': rescoring_started,
+                'rescoring_pid': rescoring_pid,
+                'timings': timings
             }
 
         except Exception as e:
@@ -0,0 +1,454 @@
+"""
+Bulk Historical Re-scoring
+Re-scores stored documents with the active model after a new version is activated.
+
+Rows are streamed from Supabase in keyset pages (ordered by primary key), features
+are rebuilt with the retrainer's row-feature logic, scored in large vectorized
+batches across a process pool, adjusted the way the live detector adjusts its
+ensemble score (bank statements: balance-consistency leniency), and only changed
+fraud_risk_score values are written back in bulk (apply_fraud_score_updates RPC, see
+database/setup_bulk_rescoring.sql). Progress is checkpointed after every page so
+an interrupted job resumes where it stopped.
+
+Usage:
+    python -m training.bulk_rescoring --document-type bank_statement
+    python -m training.bulk_rescoring --document-type check --workers 4 --max-rows-per-second 200
+    python -m training.bulk_rescoring --document-type paystub --version-id 20250101_120000
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add parent directory to path for imports
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from training.training_data_loader import TABLE_KEYS
+from training.model_artifacts import load_model, resolve_model_paths
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the "rescoring" section of retraining_config.json
+DEFAULT_RESCORING_CONFIG = {
+    'run_after_activation': False,
+    'page_size': 1000,
+    'batch_size': 5000,
+    'workers': 2,
+    'max_rows_per_second': 0,      # 0 = unthrottled
+    'min_score_delta': 0.0001      # 0-1 scale; smaller changes are not written
+}
+
+# Models loaded once per worker process (see _init_worker)
+_worker_models: Dict[str, Any] = {}
+
+
+def _init_worker(model_paths: Dict[str, str], weights: Dict[str, float]):
+    """Load the active models into this process (bundle arrays are memory-mapped, shared between workers)"""
+    _worker_models.clear()
+    for model_type, path in model_paths.items():
+        _worker_models[model_type] = load_model(path)
+    _worker_models['weights'] = weights
+
+
+def score_feature_matrix(X: np.ndarray) -> np.ndarray:
+    """
+    Score a feature matrix with the loaded models
+
+    Args:
+        X: Unscaled feature matrix (rows x features)
+
+    Returns:
+        Ensemble fraud risk scores on a 0-1 scale (0-100 regressor outputs), before
+        the detector's per-document adjustment (see BulkRescoringJob._adjust_scores)
+    """
+    scaler = _worker_models.get('feature_scaler')
+    if scaler is not None:
+        X = scaler.transform(X)
+    weights = _worker_models['weights']
+    ensemble = (weights['random_forest'] * _worker_models['random_forest'].predict(X)
+                + weights['xgboost'] * _worker_models['xgboost'].predict(X))
+    return np.clip(np.asarray(ensemble, dtype=float) / 100.0, 0.0, 1.0)
+
+
+def normalize_stored_score(value: Any) -> Optional[float]:
+    """Stored fraud_risk_score on a 0-1 scale (older rows may hold percentages)"""
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return None
+    return score / 100.0 if score > 1 else score
+
+
+class RescoringCheckpoint:
+    """JSON checkpoint of a re-scoring run (one file per document type)"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable re-scoring checkpoint {self.path}: {e}")
+            return None
+
+    def save(self, state: Dict[str, Any]):
+        # Write-then-rename so a crash never leaves a truncated checkpoint
+        state['updated_at'] = datetime.now().isoformat()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class BulkRescoringJob:
+    """Re-score all stored rows of one document type with the active model"""
+
+    def __init__(
+        self,
+        document_type: str,
+        version_id: Optional[str] = None,
+        config_path: Optional[str] = None,
+        supabase=None,
+        retrainer=None,
+        models_dir: Optional[str] = None,
+        checkpoint_dir: Optional[str] = None,
+        **overrides
+    ):
+        """
+        Initialize re-scoring job
+
+        Args:
+            document_type: Type of document (paystub, check, money_order, bank_statement)
+            version_id: Model version being rolled out (defaults to the active version)
+            config_path: Path to retraining_config.json (optional)
+            supabase: Supabase client (defaults to get_supabase())
+            retrainer: Retrainer whose row-feature logic is reused (defaults to the document type's retrainer)
+            models_dir: Directory with the active non-versioned models (defaults to production models dir)
+            checkpoint_dir: Directory for the checkpoint file (defaults to versioned models dir)
+            **overrides: page_size, batch_size, workers, max_rows_per_second, min_score_delta
+        """
+        if document_type not in TABLE_KEYS:
+            raise ValueError(f"Unsupported document type: {document_type}")
+        self.document_type = document_type
+
+        if config_path is None:
+            config_path = os.path.join(os.path.dirname(__file__), 'retraining_config.json')
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+        self.doc_config = config['document_types'][document_type]
+        self.settings = {**DEFAULT_RESCORING_CONFIG, **config.get('rescoring', {})}
+        self.settings.update({key: value for key, value in overrides.items() if value is not None})
+
+        self.table = self.doc_config['db_table']
+        self.key_column = TABLE_KEYS[document_type]
+
+        if models_dir is None or checkpoint_dir is None or version_id is None:
+            from training.model_performance_tracker import ModelPerformanceTracker
+            tracker = ModelPerformanceTracker(document_type)
+            models_dir = models_dir or tracker.production_models_dir
+            checkpoint_dir = checkpoint_dir or tracker.training_models_dir
+            version_id = version_id or tracker.get_active_version()
+        self.version_id = version_id or 'unversioned'
+        # Resolved once: every worker loads the same version even if activation swaps mid-run
+        self.model_paths = resolve_model_paths(models_dir, document_type)
+        self.checkpoint = RescoringCheckpoint(os.path.join(checkpoint_dir, 'RESCORING_CHECKPOINT.json'))
+
+        if supabase is None:
+            from database.supabase_client import get_supabase
+            supabase = get_supabase()
+        self.supabase = supabase
+        self.retrainer = retrainer if retrainer is not None else self._create_retrainer()
+
+        self._feature_columns: Optional[List[str]] = getattr(self.retrainer, 'feature_names', None)
+        self._rpc_available: Optional[bool] = None
+        self._stop_event = threading.Event()
+
+    def _create_retrainer(self):
+        """Instantiate the document type's retrainer (imported lazily; each pulls in its dependencies)"""
+        if self.document_type == 'paystub':
+            from training.paystub_model_retrainer import PaystubModelRetrainer
+            return PaystubModelRetrainer()
+        if self.document_type == 'check':
+            from training.check_model_retrainer import CheckModelRetrainer
+            return CheckModelRetrainer()
+        if self.document_type == 'money_order':
+            from training.money_order_model_retrainer import MoneyOrderModelRetrainer
+            return MoneyOrderModelRetrainer()
+        from training.bank_statement_model_retrainer import BankStatementModelRetrainer
+        return BankStatementModelRetrainer()
+
+    def request_stop(self):
+        """Stop after the current page (progress stays checkpointed)"""
+        self._stop_event.set()
+
+    def run(self, resume: bool = True) -> Dict[str, Any]:
+        """
+        Run (or resume) the re-scoring job
+
+        Args:
+            resume: Continue from the checkpoint if it belongs to the same model version
+
+        Returns:
+            Final checkpoint state (rows_scanned, rows_updated, rows_failed, completed, ...)
+        """
+        missing = [path for path in self.model_paths.values() if not os.path.exists(path)]
+        if missing:
+            raise FileNotFoundError(f"Active models not found: {', '.join(missing)}")
+
+        state = self.checkpoint.load() if resume else None
+        if state and state.get('version_id') == self.version_id and not state.get('completed'):
+            logger.info(f"Resuming {self.document_type} re-scoring after key {state.get('last_key')} "
+                        f"({state.get('rows_scanned', 0)} rows already scanned)")
+        else:
+            state = {
+                'document_type': self.document_type,
+                'version_id': self.version_id,
+                'last_key': None,
+                'rows_scanned': 0,
+                'rows_updated': 0,
+                'rows_failed': 0,
+                'completed': False,
+                'started_at': datetime.now().isoformat()
+            }
+            self.checkpoint.save(state)
+
+        page_size = int(self.settings['page_size'])
+        max_rows_per_second = float(self.settings['max_rows_per_second'] or 0)
+        weights = self.doc_config['ensemble_weights']
+        workers = int(self.settings['workers'] or 0)
+
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                           initargs=(self.model_paths, weights))
+        else:
+            _init_worker(self.model_paths, weights)
+
+        run_started = time.monotonic()
+        rows_this_run = 0
+        try:
+            while not self._stop_event.is_set():
+                rows = self._fetch_page(state['last_key'], page_size)
+                if not rows:
+                    state['completed'] = True
+                    break
+
+                keys, old_scores, X, failed = self._build_features(rows)
+                updates = []
+                if len(keys):
+                    new_scores = self._score(X, executor)
+                    updates = self._select_updates(keys, old_scores, new_scores)
+                state['rows_updated'] += self._write_updates(updates)
+                state['rows_failed'] += failed
+                state['rows_scanned'] += len(rows)
+                state['last_key'] = rows[-1][self.key_column]
+                self.checkpoint.save(state)
+
+                logger.info(f"Re-scored {state['rows_scanned']} {self.document_type} rows "
+                            f"({state['rows_updated']} updated, {state['rows_failed']} failed)")
+
+                rows_this_run += len(rows)
+                if len(rows) < page_size:
+                    state['completed'] = True
+                    break
+                self._throttle(rows_this_run, run_started, max_rows_per_second)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            self.checkpoint.save(state)
+
+        status = 'completed' if state['completed'] else 'stopped'
+        logger.info(f"{self.document_type} re-scoring {status}: {state['rows_updated']}/{state['rows_scanned']} rows updated")
+        return state
+
+    def _fetch_page(self, after_key: Optional[str], page_size: int) -> List[Dict]:
+        """Next keyset page (rows with key > after_key, ordered by key)"""
+        query = self.supabase.table(self.table).select('*')
+        if after_key is not None:
+            query = query.gt(self.key_column, after_key)
+        response = query.order(self.key_column).limit(page_size).execute()
+        return response.data or []
+
+    def _row_features(self, row: Dict) -> Optional[Dict[str, float]]:
+        """Training-time features for one stored row"""
+        extract = getattr(self.retrainer, '_extract_features_from_row', None) or \
+            getattr(self.retrainer, '_extract_features_from_record')
+        features = extract(row)
+        if not features:
+            return None
+        features = dict(features)
+        features.pop('risk_score', None)
+        return features
+
+    def _build_features(self, rows: List[Dict]) -> Tuple[List[str], List[Optional[float]], np.ndarray, int]:
+        """Feature matrix for a page; returns (keys, old scores, X, failed row count)"""
+        if hasattr(self.retrainer, 'build_feature_frame'):
+            try:
+                return self._build_feature_frame(rows)
+            except Exception as e:
+                logger.warning(f"Vectorized feature build failed for page, rebuilding row by row: {e}")
+        return self._build_features_by_row(rows)
+
+    def _build_feature_frame(self, rows: List[Dict]) -> Tuple[List[str], List[Optional[float]], np.ndarray, int]:
+        """Whole page in one vectorized pass through the retrainer's build_feature_frame"""
+        from training.feature_frames import normalize_columns
+        frame = self.retrainer.build_feature_frame(normalize_columns(rows, self.retrainer.training_columns))
+        frame = frame.drop(columns='risk_score')
+        if self._feature_columns is None:
+            self._feature_columns = list(frame.columns)
+        X = frame.reindex(columns=self._feature_columns, fill_value=0.0).fillna(0.0).to_numpy(dtype=float)
+        keys = [row[self.key_column] for row in rows]
+        old_scores = [normalize_stored_score(row.get('fraud_risk_score')) for row in rows]
+        return keys, old_scores, X, 0
+
+    def _build_features_by_row(self, rows: List[Dict]) -> Tuple[List[str], List[Optional[float]], np.ndarray, int]:
+        """Row-by-row fallback through the retrainer's per-row extraction"""
+        keys = []
+        old_scores = []
+        vectors = []
+        failed = 0
+        for row in rows:
+            try:
+                features = self._row_features(row)
+            except Exception as e:
+                logger.warning(f"Could not rebuild features for {self.key_column}={row.get(self.key_column)}: {e}")
+                features = None
+            if features is None:
+                failed += 1
+                continue
+            if self._feature_columns is None:
+                # Same column order the retrainer's DataFrame had at training time
+                self._feature_columns = list(features.keys())
+            vectors.append([float(features.get(column, 0.0) or 0.0) for column in self._feature_columns])
+            keys.append(row[self.key_column])
+            old_scores.append(normalize_stored_score(row.get('fraud_risk_score')))
+        X = np.array(vectors, dtype=float) if vectors else np.empty((0, len(self._feature_columns or [])))
+        return keys, old_scores, X, failed
+
+    def _score(self, X: np.ndarray, executor: Optional[ProcessPoolExecutor]) -> np.ndarray:
+        """Score in batch_size chunks, in parallel when a pool is available"""
+        batch_size = max(1, int(self.settings['batch_size']))
+        chunks = [X[start:start + batch_size] for start in range(0, len(X), batch_size)]
+        if executor is None:
+            scores = np.concatenate([score_feature_matrix(chunk) for chunk in chunks])
+        else:
+            scores = np.concatenate(list(executor.map(score_feature_matrix, chunks)))
+        return self._adjust_scores(X, scores)
+
+    def _adjust_scores(self, X: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        """Apply the live detector's adjustment of the ensemble score, so stored scores match live scoring"""
+        if self.document_type != 'bank_statement':
+            return scores
+        # Leniency from the balance features (beginning/ending balance, total credits/debits) of each row
+        from bank_statement.ml.bank_statement_fraud_detector import balance_leniency_factor
+        columns = self._feature_columns or []
+        factors = [balance_leniency_factor(dict(zip(columns, row)))[0] for row in X]
+        return scores * np.asarray(factors, dtype=float)
+
+    def _select_updates(self, keys: List[str], old_scores: List[Optional[float]],
+                        new_scores: np.ndarray) -> List[Dict[str, Any]]:
+        """Rows whose score changed by at least min_score_delta"""
+        min_delta = float(self.settings['min_score_delta'])
+        updates = []
+        for key, old_score, new_score in zip(keys, old_scores, new_scores):
+            new_score = round(float(new_score), 4)
+            if old_score is None or abs(new_score - old_score) >= min_delta:
+                updates.append({'id': str(key), 'fraud_risk_score': new_score})
+        return updates
+
+    def _write_updates(self, updates: List[Dict[str, Any]]) -> int:
+        """Write score changes in bulk; falls back to per-row updates if the RPC is not installed"""
+        if not updates:
+            return 0
+
+        if self._rpc_available is not False:
+            try:
+                response = self.supabase.rpc('apply_fraud_score_updates', {
+                    'target_table': self.table,
+                    'key_column': self.key_column,
+                    'updates': updates
+                }).execute()
+                self._rpc_available = True
+                return int(response.data) if isinstance(response.data, (int, float)) else len(updates)
+            except Exception as e:
+                if self._rpc_available is None:
+                    logger.warning(f"apply_fraud_score_updates not available, using per-row updates "
+                                   f"(run database/setup_bulk_rescoring.sql): {e}")
+                    self._rpc_available = False
+                else:
+                    raise
+
+        for update in updates:
+            self.supabase.table(self.table).update(
+                {'fraud_risk_score': update['fraud_risk_score']}
+            ).eq(self.key_column, update['id']).execute()
+        return len(updates)
+
+    def _throttle(self, rows_done: int, started: float, max_rows_per_second: float):
+        """Sleep so the run stays under max_rows_per_second (wakes early on stop)"""
+        if max_rows_per_second <= 0:
+            return
+        wait = rows_done / max_rows_per_second - (time.monotonic() - started)
+        if wait > 0:
+            self._stop_event.wait(wait)
+
+
+def start_background_rescoring(document_type: str, version_id: str) -> subprocess.Popen:
+    """
+    Start a re-scoring job in its own process (used after activate_version)
+
+    The job runs 'python -m training.bulk_rescoring' in a new session, so it is not
+    killed when the retraining process exits and can use its own process pool.
+    Progress and completion are tracked in the job's checkpoint file.
+
+    Returns:
+        The started process (wait() on it to block until the job finishes)
+    """
+    command = [sys.executable, '-m', 'training.bulk_rescoring',
+               '--document-type', document_type, '--version-id', version_id]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, start_new_session=True)
+    logger.info(f"Started re-scoring of {document_type} version {version_id} (pid {process.pid})")
+    return process
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Re-score stored documents with the active model')
+    parser.add_argument('--document-type', required=True, choices=sorted(TABLE_KEYS))
+    parser.add_argument('--version-id', help='Model version being rolled out (default: the active version)')
+    parser.add_argument('--restart', action='store_true', help='Ignore any checkpoint and start over')
+    parser.add_argument('--workers', type=int, help='Scoring processes')
+    parser.add_argument('--page-size', type=int, help='Rows fetched per keyset page')
+    parser.add_argument('--batch-size', type=int, help='Rows per scoring batch')
+    parser.add_argument('--max-rows-per-second', type=float, help='Throttle (0 = unthrottled)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    job = BulkRescoringJob(
+        args.document_type,
+        version_id=args.version_id,
+        workers=args.workers,
+        page_size=args.page_size,
+        batch_size=args.batch_size,
+        max_rows_per_second=args.max_rows_per_second
+    )
+    print(json.dumps(job.run(resume=not args.restart), indent=2))
+
+
+if __name__ == '__main__':
+    main()
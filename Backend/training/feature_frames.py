@@ -0,0 +1,389 @@
+"""
+Vectorized Training Features
+Builds the retrainers' feature matrices from stored document rows, column at a time.
+
+Each document type declares the stored columns it reads (with their kind, used to
+normalize types so snapshots round-trip through Parquet) and a builder that turns
+a DataFrame of those columns into the same features, in the same order, as the
+retrainer's per-row extraction - plus the risk_score target.
+"""
+
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from training.synthetic_data import categorize_check_amounts
+
+# Column kinds: text (str or None), number (float, NaN if missing), bool (1.0/0.0), json (JSON text or None)
+COLUMN_KINDS = ('text', 'number', 'bool', 'json')
+
+CHECK_COLUMNS = {
+    'bank_name': 'text',
+    'routing_number': 'text',
+    'account_number': 'text',
+    'check_number': 'text',
+    'amount': 'number',
+    'payer_name': 'text',
+    'payee_name': 'text',
+    'payer_address': 'text',
+    'date': 'text',
+    'signature_present': 'bool',
+    'memo': 'text',
+    'ai_recommendation': 'text',
+    'fraud_risk_score': 'number'
+}
+
+MONEY_ORDER_COLUMNS = {
+    'issuer_name': 'text',
+    'serial_number': 'text',
+    'amount': 'number',
+    'payee_name': 'text',
+    'payer_name': 'text',
+    'model_confidence': 'number',
+    'ai_recommendation': 'text',
+    'fraud_risk_score': 'number'
+}
+
+BANK_STATEMENT_COLUMNS = {
+    'bank_name': 'text',
+    'account_number': 'text',
+    'account_holder_name': 'text',
+    'beginning_balance': 'number',
+    'ending_balance': 'number',
+    'total_credits': 'number',
+    'total_debits': 'number',
+    'period_start': 'text',
+    'period_end': 'text',
+    'statement_date': 'text',
+    'ai_recommendation': 'text',
+    'fraud_risk_score': 'number'
+}
+
+PAYSTUB_COLUMNS = {
+    'employer_name': 'text',
+    'employee_name': 'text',
+    'gross_pay': 'number',
+    'net_pay': 'number',
+    'deductions': 'json',
+    'ai_recommendation': 'text',
+    'fraud_risk_score': 'number'
+}
+
+
+def _normalize_value(value: Any, kind: str) -> Any:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return 0.0 if kind == 'bool' else None
+    if kind == 'text':
+        return str(value)
+    if kind == 'bool':
+        return 1.0 if value else 0.0
+    if kind == 'json':
+        return value if isinstance(value, str) else json.dumps(value)
+    return value
+
+
+def normalize_columns(rows: Union[pd.DataFrame, Iterable[Dict]], columns: Dict[str, str]) -> pd.DataFrame:
+    """
+    Project rows onto the declared columns with consistent types
+
+    Args:
+        rows: Row dicts (as returned by Supabase) or a DataFrame
+        columns: Column name -> kind (see COLUMN_KINDS); missing columns become empty
+
+    Returns:
+        DataFrame with exactly the declared columns
+    """
+    if not isinstance(rows, pd.DataFrame):
+        # dtype=object keeps ints as ints (a routing number must not become '123456789.0')
+        rows = pd.DataFrame(list(rows), dtype=object)
+
+    frame = {}
+    for column, kind in columns.items():
+        values = rows[column] if column in rows.columns else pd.Series([None] * len(rows), index=rows.index, dtype=object)
+        if kind == 'number':
+            frame[column] = pd.to_numeric(values, errors='coerce').astype(float)
+        else:
+            frame[column] = values.map(lambda value: _normalize_value(value, kind)).astype(float if kind == 'bool' else object)
+    return pd.DataFrame(frame, index=rows.index).reset_index(drop=True)
+
+
+def _present(values: pd.Series) -> np.ndarray:
+    """Truthiness of a normalized column (non-empty text, non-zero number)"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.fillna(0).to_numpy() != 0
+    return values.fillna('').to_numpy() != ''
+
+
+def _number(values: pd.Series, default: float = 0.0) -> np.ndarray:
+    return values.fillna(default).to_numpy(dtype=float)
+
+
+def _constant(n: int, value: float) -> np.ndarray:
+    return np.full(n, value)
+
+
+def _recommendations(rows: pd.DataFrame) -> np.ndarray:
+    return rows['ai_recommendation'].fillna('APPROVE').map(str.upper).to_numpy()
+
+
+def build_check_features(rows: pd.DataFrame, rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+    """
+    Check features (30) and risk_score from normalized check rows
+
+    Rows without a stored fraud_risk_score get a risk drawn from the recommendation's
+    range (APPROVE 0-30, REJECT 70-100).
+    """
+    rng = rng or np.random.default_rng()
+    n = len(rows)
+    amount = _number(rows['amount'])
+    bank = _present(rows['bank_name'])
+    routing = _present(rows['routing_number'])
+    signature = _present(rows['signature_present']).astype(float)
+    date = _present(rows['date']).astype(float)
+    critical_present = np.column_stack([
+        bank, amount != 0, _present(rows['payer_name']), _present(rows['payee_name']), date.astype(bool)
+    ])
+    critical_missing = (~critical_present).sum(axis=1) / critical_present.shape[1]
+
+    features = pd.DataFrame({
+        'bank_validity': bank.astype(float),
+        'routing_validity': (routing & (rows['routing_number'].fillna('').str.len().to_numpy() == 9)).astype(float),
+        'account_present': _present(rows['account_number']).astype(float),
+        'check_number_valid': _present(rows['check_number']).astype(float),
+        'amount_value': np.minimum(amount / 10000.0, 1.0),
+        'amount_category': categorize_check_amounts(amount),
+        'round_amount': ((amount > 0) & (amount % 100 == 0)).astype(float),
+        'payer_present': _present(rows['payer_name']).astype(float),
+        'payee_present': _present(rows['payee_name']).astype(float),
+        'payer_address_present': _present(rows['payer_address']).astype(float),
+        'date_present': date,
+        'future_date': _constant(n, 0.0),
+        'date_age_days': _constant(n, 0.0),
+        'signature_detected': signature,
+        'memo_present': _present(rows['memo']).astype(float),
+        'amount_matching': _constant(n, 1.0),
+        'amount_parsing_confidence': _constant(n, 0.9),
+        'suspicious_amount': ((amount > 9000) & (amount < 10000)).astype(float),
+        'date_format_valid': date,
+        'weekend_holiday': _constant(n, 0.0),
+        'critical_missing_count': critical_missing,
+        'field_quality': 1.0 - critical_missing,
+        'bank_routing_match': (bank & routing).astype(float),
+        'check_number_pattern': _present(rows['check_number']).astype(float),
+        'address_valid': _present(rows['payer_address']).astype(float),
+        'name_consistency': _constant(n, 1.0),
+        'signature_requirement': signature,
+        'endorsement_present': _constant(n, 0.0),
+        'check_type_risk': _constant(n, 0.3),
+        'text_quality': _constant(n, 0.8)
+    })
+
+    recommendation = _recommendations(rows)
+    mapped = np.select(
+        [recommendation == 'APPROVE', recommendation == 'REJECT'],
+        [rng.uniform(0, 30, n), rng.uniform(70, 100, n)],
+        50.0
+    )
+    stored = rows['fraud_risk_score'].to_numpy(dtype=float)
+    features['risk_score'] = np.where(np.isnan(stored), mapped, stored)
+    return features
+
+
+def build_money_order_features(rows: pd.DataFrame, rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+    """Money order features (feature_0..feature_29) and risk_score from normalized money order rows"""
+    n = len(rows)
+    amount = _number(rows['amount'])
+    columns = {
+        'feature_0': _present(rows['issuer_name']).astype(float),
+        'feature_1': _present(rows['serial_number']).astype(float),
+        'feature_2': _constant(n, 1.0),
+        'feature_3': amount,
+        'feature_4': np.select([amount < 500, amount < 1000], [1.0, 2.0], 3.0),
+        'feature_5': ((amount > 0) & (amount % 100 == 0)).astype(float),
+        'feature_6': _present(rows['payee_name']).astype(float),
+        'feature_7': _present(rows['payer_name']).astype(float)
+    }
+    # Not stored: reconstructed with the same defaults as the per-row extraction
+    defaults = (1.0, 0.0, 30.0, 1.0, 1.0, 0.95, 0.0, 1.0, 0.0, 0.0, 0.0, 0.9,
+                1.0, 1.0, 1.0, 1.0, 1.0, 0.1, 0.9, 0.0, 0.0)
+    for index, value in enumerate(defaults, start=8):
+        columns[f'feature_{index}'] = _constant(n, value)
+    columns['feature_29'] = _number(rows['model_confidence'], 0.9)
+
+    features = pd.DataFrame(columns)
+    reject = _recommendations(rows) == 'REJECT'
+    features['risk_score'] = np.where(np.isnan(rows['fraud_risk_score'].to_numpy(dtype=float)),
+                                      np.where(reject, 85.0, 10.0), rows['fraud_risk_score'].to_numpy(dtype=float))
+    return features
+
+
+def build_bank_statement_features(rows: pd.DataFrame, rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+    """Bank statement features (35) and risk_score from normalized bank statement rows"""
+    n = len(rows)
+    beginning = _number(rows['beginning_balance'])
+    ending = _number(rows['ending_balance'])
+    credits = _number(rows['total_credits'])
+    debits = _number(rows['total_debits'])
+    bank = _present(rows['bank_name'])
+    account = _present(rows['account_number'])
+
+    # Transactions are not stored with the statement: assume an average of 10
+    transaction_count = 10.0
+    avg_transaction = debits / transaction_count
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        credit_debit_ratio = np.where(debits > 0, credits / debits, 0.0)
+
+    features = pd.DataFrame({
+        'bank_validity': bank.astype(float),
+        'account_number_present': account.astype(float),
+        'account_holder_present': _present(rows['account_holder_name']).astype(float),
+        'account_type_present': _constant(n, 1.0),
+        'beginning_balance': beginning,
+        'ending_balance': ending,
+        'total_credits': credits,
+        'total_debits': debits,
+        'period_start_present': _present(rows['period_start']).astype(float),
+        'period_end_present': _present(rows['period_end']).astype(float),
+        'statement_date_present': _present(rows['statement_date']).astype(float),
+        'future_period': _constant(n, 0.0),
+        'period_age_days': _constant(n, 30.0),
+        'transaction_count': _constant(n, transaction_count),
+        'avg_transaction_amount': avg_transaction,
+        'max_transaction_amount': avg_transaction * 2,
+        'balance_change': ending - beginning,
+        'negative_ending_balance': (ending < 0).astype(float),
+        'balance_consistency': np.where(np.abs(beginning + credits - debits - ending) > 1.0, 0.5, 1.0),
+        'currency_present': _constant(n, 1.0),
+        'suspicious_transaction_pattern': _constant(n, 0.0),
+        'large_transaction_count': _constant(n, 0.0),
+        'round_number_transactions': _constant(n, 0.0),
+        'date_format_valid': _constant(n, 1.0),
+        'period_length_days': _constant(n, 30.0),
+        'critical_missing_count': (~bank).astype(float) + (~account).astype(float),
+        'field_quality': _constant(n, 0.9),
+        'transaction_date_consistency': _constant(n, 1.0),
+        'duplicate_transactions': _constant(n, 0.0),
+        'unusual_timing': _constant(n, 0.0),
+        'account_number_format_valid': _constant(n, 1.0),
+        'name_format_valid': _constant(n, 1.0),
+        'balance_volatility': _constant(n, 0.0),
+        'credit_debit_ratio': credit_debit_ratio,
+        'text_quality': _constant(n, 0.95)
+    })
+    reject = _recommendations(rows) == 'REJECT'
+    stored = rows['fraud_risk_score'].to_numpy(dtype=float)
+    features['risk_score'] = np.where(np.isnan(stored), np.where(reject, 85.0, 10.0), stored)
+    return features
+
+
+# Deduction name matchers in priority order -> column in the tax matrix
+_TAX_MATCHERS = (
+    (('federal', 'fed'), 0),
+    (('state',), 1),
+    (('social security', 'fica'), 2),
+    (('medicare',), 3)
+)
+
+
+def _tax_totals(deductions: pd.Series) -> np.ndarray:
+    """(n, 4) federal, state, social security and medicare totals from deductions JSON"""
+    totals = np.zeros((len(deductions), 4))
+    for row_index, raw in enumerate(deductions.to_numpy()):
+        if not raw:
+            continue
+        try:
+            items = json.loads(raw)
+        except (TypeError, ValueError):
+            continue
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            name = str(item.get('name', '')).lower()
+            try:
+                amount = float(item.get('amount', 0) or 0)
+            except (TypeError, ValueError):
+                continue
+            for keywords, column in _TAX_MATCHERS:
+                if any(keyword in name for keyword in keywords):
+                    totals[row_index, column] += amount
+                    break
+    return totals
+
+
+def build_paystub_features(rows: pd.DataFrame, rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+    """Paystub features (18) and risk_score from normalized paystub rows"""
+    n = len(rows)
+    gross = _number(rows['gross_pay'])
+    net = _number(rows['net_pay'])
+    taxes = _tax_totals(rows['deductions'])
+    total_tax = taxes.sum(axis=1)
+    has_gross = gross > 0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tax_ratio = np.where(has_gross, total_tax / gross, 0.0)
+        net_ratio = np.where(has_gross, net / gross, 0.0)
+        deduction_ratio = np.where(has_gross, (gross - net) / gross, 0.0)
+
+    present = np.column_stack([
+        _present(rows['employer_name']), _present(rows['employee_name']), has_gross, net > 0
+    ])
+    missing = (~present).sum(axis=1).astype(float)
+
+    features = pd.DataFrame({
+        'has_company': present[:, 0].astype(float),
+        'has_employee': present[:, 1].astype(float),
+        'has_gross': has_gross.astype(float),
+        'has_net': (net > 0).astype(float),
+        'has_date': _constant(n, 1.0),
+        'gross_pay': np.minimum(gross, 100000.0),
+        'net_pay': np.minimum(net, 100000.0),
+        'tax_error': (has_gross & (net >= gross)).astype(float),
+        'text_quality': 0.5 + (present.shape[1] - missing) / 4.0 * 0.5,
+        'missing_fields_count': missing,
+        'has_federal_tax': (taxes[:, 0] > 0).astype(float),
+        'has_state_tax': (taxes[:, 1] > 0).astype(float),
+        'has_social_security': (taxes[:, 2] > 0).astype(float),
+        'has_medicare': (taxes[:, 3] > 0).astype(float),
+        'total_tax_amount': np.minimum(total_tax, 50000.0),
+        'tax_to_gross_ratio': np.minimum(tax_ratio, 1.0),
+        'net_to_gross_ratio': np.minimum(net_ratio, 1.0),
+        'deduction_percentage': np.minimum(deduction_ratio, 1.0)
+    })
+
+    # Stored scores may be on a 0-1 scale; without one, fall back to the recommendation
+    recommendation = _recommendations(rows)
+    stored = rows['fraud_risk_score'].to_numpy(dtype=float)
+    fallback = np.select([recommendation == 'REJECT', recommendation == 'ESCALATE'], [80.0, 50.0], 10.0)
+    features['risk_score'] = np.where(np.isnan(stored), fallback, np.where(stored <= 1.0, stored * 100.0, stored))
+    return features
+
+
+# document type -> (stored columns, feature builder)
+FEATURE_FRAMES: Dict[str, Tuple[Dict[str, str], Callable[..., pd.DataFrame]]] = {
+    'check': (CHECK_COLUMNS, build_check_features),
+    'money_order': (MONEY_ORDER_COLUMNS, build_money_order_features),
+    'bank_statement': (BANK_STATEMENT_COLUMNS, build_bank_statement_features),
+    'paystub': (PAYSTUB_COLUMNS, build_paystub_features)
+}
+
+
+def build_feature_frame(document_type: str, rows: Union[pd.DataFrame, List[Dict]],
+                        rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+    """
+    Features and risk_score for raw or normalized rows of a document type
+
+    Args:
+        document_type: Type of document (paystub, check, money_order, bank_statement)
+        rows: Row dicts or DataFrame containing the type's stored columns
+        rng: Generator for the check recommendation fallback (optional)
+
+    Returns:
+        DataFrame of features (retrainer order) plus risk_score
+    """
+    columns, builder = FEATURE_FRAMES[document_type]
+    return builder(normalize_columns(rows, columns), rng=rng)
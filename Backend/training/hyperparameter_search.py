@@ -0,0 +1,309 @@
+"""
+Hyperparameter Search for Document Model Retraining
+Optional tuning stage run before DocumentModelRetrainer.train_ensemble_model.
+
+Candidates are sampled from the search space in the "tuning" section of
+retraining_config.json and scored by K-fold cross-validation, folds running in
+parallel within the retrainer's n_jobs. With method "halving", all candidates
+start on a subsample and each rung keeps the best 1/eta on eta times the rows
+(successive halving); with "random", every candidate is scored on all rows.
+XGBoost folds use early stopping on a validation slice of the fold's training
+rows, and the tuned n_estimators is the mean best iteration. A wall-clock budget
+per document type stops the search between evaluations, keeping the best
+configuration found so far. The previous best configuration (from the
+performance history) is always evaluated first, so scheduled retrains
+warm-start from it.
+"""
+
+import os
+import math
+import time
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+import xgboost as xgb
+
+logger = logging.getLogger(__name__)
+
+# Parameters train_ensemble_model uses when no tuned configuration is given
+DEFAULT_MODEL_PARAMS = {
+    'random_forest': {
+        'n_estimators': 100,
+        'max_depth': 10,
+        'min_samples_split': 5,
+        'min_samples_leaf': 2
+    },
+    'xgboost': {
+        'n_estimators': 100,
+        'max_depth': 6,
+        'learning_rate': 0.1
+    }
+}
+
+# Defaults for the "tuning" section of retraining_config.json (a document type's
+# "tuning" entry overrides them for that type)
+DEFAULT_TUNING_CONFIG = {
+    'enabled': False,
+    'method': 'halving',              # "halving" (successive halving) or "random"
+    'n_candidates': 12,               # Per model, including the warm-start configuration
+    'eta': 3,                         # Halving: keep 1/eta of the candidates per rung
+    'min_resources': 200,             # Halving: rows per candidate on the first rung
+    'cv_folds': 3,
+    'time_budget_seconds': 300,       # Wall clock for the whole search, per document type
+    'early_stopping_rounds': 20,
+    'max_xgb_estimators': 1000,       # Upper bound XGBoost early-stops within
+    'validation_fraction': 0.15,      # Share of each fold's training rows for early stopping
+    'warm_start': True,               # Seed the search with the previous best configuration
+    'reuse_best_params': True,        # Tuning disabled: train with the previous best configuration
+    'random_state': 42,
+    'search_space': {
+        'random_forest': {
+            'n_estimators': [100, 200, 300],
+            'max_depth': [6, 10, 14, None],
+            'min_samples_split': {'low': 2, 'high': 10, 'int': True},
+            'min_samples_leaf': {'low': 1, 'high': 5, 'int': True},
+            'max_features': [1.0, 'sqrt', 0.5]
+        },
+        'xgboost': {
+            'max_depth': {'low': 3, 'high': 9, 'int': True},
+            'learning_rate': {'low': 0.02, 'high': 0.3, 'log': True},
+            'subsample': {'low': 0.6, 'high': 1.0},
+            'colsample_bytree': {'low': 0.6, 'high': 1.0},
+            'min_child_weight': {'low': 1, 'high': 10, 'log': True},
+            'reg_lambda': {'low': 0.1, 'high': 10, 'log': True}
+        }
+    }
+}
+
+
+def tuning_config(config: Dict[str, Any], document_type: str) -> Dict[str, Any]:
+    """
+    Effective tuning settings for a document type (defaults < "tuning" < document type's "tuning")
+
+    search_space is merged per model: an override's space for one model replaces that
+    model's space only, the other models keep theirs.
+    """
+    settings = dict(DEFAULT_TUNING_CONFIG)
+    search_space = dict(DEFAULT_TUNING_CONFIG['search_space'])
+    for overrides in (config.get('tuning', {}), config['document_types'].get(document_type, {}).get('tuning', {})):
+        settings.update(overrides)
+        search_space.update(overrides.get('search_space') or {})
+    settings['search_space'] = search_space
+    return settings
+
+
+def sample_param(spec: Any, rng: np.random.Generator) -> Any:
+    """
+    Draw one value from a search space entry
+
+    Args:
+        spec: List of choices, or {"low", "high", "log"?, "int"?} range
+        rng: Random generator
+    """
+    if isinstance(spec, list):
+        value = spec[rng.integers(len(spec))]
+        return value.item() if isinstance(value, np.generic) else value
+    low, high = float(spec['low']), float(spec['high'])
+    if spec.get('log'):
+        value = math.exp(rng.uniform(math.log(low), math.log(high)))
+    else:
+        value = rng.uniform(low, high)
+    if spec.get('int'):
+        return int(round(value))
+    return float(value)
+
+
+def sample_candidates(
+    space: Dict[str, Any],
+    n_candidates: int,
+    rng: np.random.Generator,
+    seed_params: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Random configurations from a search space (seed_params first, if given)
+
+    Duplicate draws are skipped, so small discrete spaces may yield fewer candidates.
+    """
+    candidates: List[Dict[str, Any]] = []
+    seen = set()
+    if seed_params:
+        candidates.append(dict(seed_params))
+        seen.add(repr(sorted(seed_params.items())))
+    attempts = 0
+    while len(candidates) < n_candidates and attempts < n_candidates * 10:
+        attempts += 1
+        params = {name: sample_param(spec, rng) for name, spec in space.items()}
+        key = repr(sorted(params.items()))
+        if key not in seen:
+            seen.add(key)
+            candidates.append(params)
+    return candidates
+
+
+def _fit_fold(
+    model_name: str,
+    params: Dict[str, Any],
+    X: np.ndarray,
+    y: np.ndarray,
+    train_idx: np.ndarray,
+    test_idx: np.ndarray,
+    settings: Dict[str, Any],
+    n_jobs: int
+) -> Tuple[float, Optional[int]]:
+    """Fit one fold; returns (R² on the fold's test rows, XGBoost best iteration)"""
+    random_state = settings['random_state']
+    if model_name == 'random_forest':
+        model = RandomForestRegressor(random_state=random_state, n_jobs=n_jobs, **params)
+        model.fit(X[train_idx], y[train_idx])
+        return float(r2_score(y[test_idx], model.predict(X[test_idx]))), None
+
+    # XGBoost: early stopping on the tail of the (shuffled) fold training rows
+    n_val = max(1, int(len(train_idx) * settings['validation_fraction']))
+    fit_idx, val_idx = train_idx[:-n_val], train_idx[-n_val:]
+    xgb_params = dict(params)
+    xgb_params.pop('n_estimators', None)
+    model = xgb.XGBRegressor(
+        n_estimators=settings['max_xgb_estimators'],
+        early_stopping_rounds=settings['early_stopping_rounds'],
+        random_state=random_state,
+        n_jobs=n_jobs,
+        **xgb_params
+    )
+    model.fit(X[fit_idx], y[fit_idx], eval_set=[(X[val_idx], y[val_idx])], verbose=False)
+    score = float(r2_score(y[test_idx], model.predict(X[test_idx], iteration_range=(0, model.best_iteration + 1))))
+    return score, int(model.best_iteration)
+
+
+class HyperparameterSearch:
+    """Tune the Random Forest and XGBoost configurations of one document type"""
+
+    def __init__(self, settings: Dict[str, Any], n_jobs: int = -1):
+        """
+        Initialize search
+
+        Args:
+            settings: Tuning settings (see tuning_config)
+            n_jobs: Cores for the search (-1 = all); folds run in parallel within it
+        """
+        self.settings = settings
+        self.n_jobs = (os.cpu_count() or 1) if n_jobs is None or n_jobs < 1 else n_jobs
+        self.rng = np.random.default_rng(settings['random_state'])
+
+    def _cross_validate(
+        self, model_name: str, params: Dict[str, Any], X: np.ndarray, y: np.ndarray
+    ) -> Tuple[float, Optional[int]]:
+        """Mean CV R² (and mean XGBoost best iteration) with the folds fitted in parallel"""
+        folds = max(2, int(self.settings['cv_folds']))
+        splits = KFold(n_splits=folds, shuffle=True, random_state=self.settings['random_state']).split(X)
+        parallel_folds = min(folds, self.n_jobs)
+        per_fold_jobs = max(1, self.n_jobs // parallel_folds)
+        results = Parallel(n_jobs=parallel_folds)(
+            delayed(_fit_fold)(model_name, params, X, y, train_idx, test_idx, self.settings, per_fold_jobs)
+            for train_idx, test_idx in splits
+        )
+        score = float(np.mean([result[0] for result in results]))
+        iterations = [result[1] for result in results if result[1] is not None]
+        return score, (int(np.mean(iterations)) + 1 if iterations else None)
+
+    def _search_model(
+        self,
+        model_name: str,
+        X: np.ndarray,
+        y: np.ndarray,
+        seed_params: Optional[Dict[str, Any]],
+        deadline: float
+    ) -> Dict[str, Any]:
+        """Search one model's space; returns best params, score and search stats"""
+        space = self.settings['search_space'][model_name]
+        if seed_params and model_name == 'xgboost':
+            # n_estimators is set by early stopping, not searched
+            seed_params = {name: value for name, value in seed_params.items() if name != 'n_estimators'}
+        candidates = sample_candidates(space, int(self.settings['n_candidates']), self.rng, seed_params)
+
+        eta = max(2, int(self.settings['eta']))
+        if self.settings['method'] == 'halving':
+            rungs = max(1, math.ceil(math.log(len(candidates), eta))) if len(candidates) > 1 else 1
+            resources = max(int(self.settings['min_resources']), len(y) // eta ** (rungs - 1))
+        else:
+            rungs, resources = 1, len(y)
+
+        order = self.rng.permutation(len(y))
+        best: Optional[Dict[str, Any]] = None
+        evaluated = 0
+        survivors = candidates
+        for rung in range(rungs):
+            n_rows = min(len(y), resources * eta ** rung)
+            rows = order[:n_rows]
+            scored = []
+            for params in survivors:
+                if time.perf_counter() >= deadline and best is not None:
+                    break
+                score, iterations = self._cross_validate(model_name, params, X[rows], y[rows])
+                evaluated += 1
+                scored.append((score, params, iterations))
+                # Scores are only comparable within a rung; a later rung replaces earlier bests
+                if best is None or best['rung'] < rung or score > best['cv_r2']:
+                    best = {'cv_r2': score, 'params': params, 'n_estimators': iterations,
+                            'rung': rung, 'rows': n_rows}
+            if time.perf_counter() >= deadline or len(scored) <= 1:
+                break
+            scored.sort(key=lambda item: item[0], reverse=True)
+            survivors = [params for _, params, _ in scored[:max(1, len(scored) // eta)]]
+
+        params = dict(best['params'])
+        if model_name == 'xgboost' and best['n_estimators']:
+            params['n_estimators'] = best['n_estimators']
+        return {
+            'params': params,
+            'cv_r2': best['cv_r2'],
+            'rows': best['rows'],
+            'candidates_evaluated': evaluated
+        }
+
+    def search(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        seed_params: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Tune both models within the time budget (split evenly between them)
+
+        Args:
+            X: Scaled training features
+            y: Training targets
+            seed_params: Previous best {'random_forest': {...}, 'xgboost': {...}} (warm start)
+
+        Returns:
+            Dict with 'params' (per model), 'cv_r2' (per model), candidates evaluated,
+            elapsed seconds and whether the budget ran out
+        """
+        started = time.perf_counter()
+        budget = float(self.settings['time_budget_seconds'])
+        seed_params = seed_params or {}
+
+        results = {}
+        for index, model_name in enumerate(('random_forest', 'xgboost')):
+            # Each model gets half of what is left, so time XGBoost's half doesn't need carries over
+            remaining = budget - (time.perf_counter() - started)
+            deadline = time.perf_counter() + remaining / (2 - index)
+            results[model_name] = self._search_model(model_name, X, y, seed_params.get(model_name), deadline)
+            logger.info(
+                f"Tuned {model_name}: CV R² {results[model_name]['cv_r2']:.4f} "
+                f"({results[model_name]['candidates_evaluated']} evaluations) {results[model_name]['params']}"
+            )
+
+        elapsed = time.perf_counter() - started
+        return {
+            'method': self.settings['method'],
+            'params': {model_name: result['params'] for model_name, result in results.items()},
+            'cv_r2': {model_name: result['cv_r2'] for model_name, result in results.items()},
+            'candidates_evaluated': sum(result['candidates_evaluated'] for result in results.values()),
+            'elapsed_seconds': elapsed,
+            'budget_exhausted': elapsed >= budget
+        }
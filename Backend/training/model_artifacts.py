@@ -0,0 +1,270 @@
+"""
+Model Artifact Bundles
+Versioned, immutable bundles of a document type's ensemble, activated atomically.
+
+A bundle is a directory holding:
+- random_forest.joblib / feature_scaler.joblib - uncompressed joblib, so their
+  numpy arrays can be memory-mapped (mmap_mode='r' arrays are shared page-cache
+  pages across workers; sklearn trees copy their node arrays on unpickle, so for
+  the forest the gain is a decompression-free load straight from the page cache)
+- xgboost.ubj - native XGBoost UBJSON model
+- manifest.json - document type, version, formats and sha256 of every file
+
+Bundles are installed under {models_dir}/bundles/ by copying into a temporary
+directory and renaming it into place, and activated by atomically replacing the
+{models_dir}/{type}_current symlink (a {type}_current.json pointer file where
+symlinks are unavailable). Readers resolve the link once, so they always see a
+complete bundle of a single version.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MODEL_TYPES = ('random_forest', 'xgboost', 'feature_scaler')
+
+BUNDLE_FORMAT_VERSION = 1
+BUNDLES_DIR = 'bundles'
+MANIFEST_NAME = 'manifest.json'
+
+# model type -> (file name, format)
+BUNDLE_FILES = {
+    'random_forest': ('random_forest.joblib', 'joblib'),
+    'xgboost': ('xgboost.ubj', 'xgboost'),
+    'feature_scaler': ('feature_scaler.joblib', 'joblib')
+}
+
+
+def file_sha256(path: str) -> str:
+    """sha256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def bundle_name(document_type: str, version_id: str) -> str:
+    return f"{document_type}_{version_id}"
+
+
+def bundle_path(models_dir: str, document_type: str, version_id: str) -> str:
+    """Where a version's bundle lives under a models directory"""
+    return os.path.join(models_dir, BUNDLES_DIR, bundle_name(document_type, version_id))
+
+
+def _current_link(models_dir: str, document_type: str) -> str:
+    return os.path.join(models_dir, f"{document_type}_current")
+
+
+def write_bundle(
+    models_dir: str,
+    document_type: str,
+    version_id: str,
+    models: Dict[str, Any],
+    metadata: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Write a model bundle (into a temporary directory, then renamed into place)
+
+    Args:
+        models_dir: Directory whose bundles/ subdirectory receives the bundle
+        document_type: Type of document (paystub, check, money_order, bank_statement)
+        version_id: Version timestamp (e.g., "20250122_143052")
+        models: random_forest, xgboost and feature_scaler objects
+        metadata: Extra manifest fields (e.g. metrics)
+
+    Returns:
+        Path of the bundle directory
+    """
+    import joblib
+
+    target = bundle_path(models_dir, document_type, version_id)
+    tmp_dir = f"{target}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    files = {}
+    for model_type in MODEL_TYPES:
+        file_name, file_format = BUNDLE_FILES[model_type]
+        path = os.path.join(tmp_dir, file_name)
+        model = models[model_type]
+        if file_format == 'xgboost':
+            model.save_model(path)
+        else:
+            # No compression: compressed arrays cannot be memory-mapped
+            joblib.dump(model, path, compress=0)
+        files[model_type] = {
+            'file': file_name,
+            'format': file_format,
+            'class': type(model).__name__,
+            'sha256': file_sha256(path),
+            'size': os.path.getsize(path)
+        }
+
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'document_type': document_type,
+        'version_id': version_id,
+        'created_at': datetime.now().isoformat(),
+        'files': files
+    }
+    if metadata:
+        manifest['metadata'] = metadata
+    with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    os.rename(tmp_dir, target)
+    logger.info(f"Wrote model bundle {os.path.basename(target)}")
+    return target
+
+
+def read_manifest(bundle_dir: str) -> Dict[str, Any]:
+    with open(os.path.join(bundle_dir, MANIFEST_NAME), 'r') as f:
+        return json.load(f)
+
+
+def verify_bundle(bundle_dir: str) -> Dict[str, Any]:
+    """
+    Check every file of a bundle against its manifest checksum
+
+    Returns:
+        The manifest
+
+    Raises:
+        ValueError: If a file is missing or its checksum does not match
+    """
+    manifest = read_manifest(bundle_dir)
+    for model_type, entry in manifest['files'].items():
+        path = os.path.join(bundle_dir, entry['file'])
+        if not os.path.exists(path):
+            raise ValueError(f"Bundle {bundle_dir} is missing {entry['file']}")
+        if file_sha256(path) != entry['sha256']:
+            raise ValueError(f"Checksum mismatch for {entry['file']} in {bundle_dir}")
+    return manifest
+
+
+def install_bundle(source_dir: str, models_dir: str) -> str:
+    """
+    Copy a verified bundle into models_dir/bundles (copy to a temporary directory, then rename)
+
+    Returns:
+        Path of the installed bundle
+    """
+    manifest = verify_bundle(source_dir)
+    target = bundle_path(models_dir, manifest['document_type'], manifest['version_id'])
+    if os.path.abspath(source_dir) == os.path.abspath(target):
+        return target
+    if os.path.exists(target):
+        try:
+            verify_bundle(target)
+            return target
+        except (ValueError, OSError):
+            shutil.rmtree(target)
+
+    tmp_dir = f"{target}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    shutil.copytree(source_dir, tmp_dir)
+    verify_bundle(tmp_dir)
+    os.rename(tmp_dir, target)
+    return target
+
+
+def activate_bundle(models_dir: str, document_type: str, bundle_dir: str):
+    """
+    Point {type}_current at a bundle in one atomic step
+
+    A new symlink is created beside the live one and renamed over it (rename is
+    atomic), so readers see either the old or the new bundle, never a mix.
+    """
+    link = _current_link(models_dir, document_type)
+    relative = os.path.relpath(bundle_dir, models_dir)
+    tmp_link = f"{link}.tmp{os.getpid()}"
+    try:
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+        os.symlink(relative, tmp_link)
+        os.replace(tmp_link, link)
+    except (OSError, NotImplementedError) as e:
+        # No symlinks (e.g. Windows without privileges): atomic pointer file instead
+        logger.info(f"Symlink activation unavailable ({e}); using pointer file")
+        _write_json_atomic(f"{link}.json", {'bundle': relative})
+        return
+    # A stale pointer file from an earlier fallback must not shadow the link
+    if os.path.exists(f"{link}.json"):
+        os.remove(f"{link}.json")
+
+
+def active_bundle_dir(models_dir: str, document_type: str) -> Optional[str]:
+    """Resolved directory of the active bundle (None if no bundle is active)"""
+    link = _current_link(models_dir, document_type)
+    if os.path.islink(link) or os.path.isdir(link):
+        resolved = os.path.realpath(link)
+        return resolved if os.path.isdir(resolved) else None
+    pointer = f"{link}.json"
+    if os.path.exists(pointer):
+        with open(pointer, 'r') as f:
+            resolved = os.path.join(models_dir, json.load(f)['bundle'])
+        return resolved if os.path.isdir(resolved) else None
+    return None
+
+
+def resolve_model_paths(models_dir: str, document_type: str) -> Dict[str, str]:
+    """
+    File of each model type to load: the active bundle's files when one is
+    active, else the legacy {type}_{model_type}.pkl files
+
+    The bundle link is resolved once, so all paths belong to the same version.
+    """
+    bundle_dir = active_bundle_dir(models_dir, document_type)
+    if bundle_dir is not None:
+        manifest = read_manifest(bundle_dir)
+        return {
+            model_type: os.path.join(bundle_dir, entry['file'])
+            for model_type, entry in manifest['files'].items()
+        }
+    return {
+        model_type: os.path.join(models_dir, f"{document_type}_{model_type}.pkl")
+        for model_type in MODEL_TYPES
+    }
+
+
+def load_model(path: str, mmap: bool = True) -> Any:
+    """
+    Load one model file by format (.ubj/.json: native XGBoost, otherwise joblib)
+
+    Args:
+        path: Model file
+        mmap: Memory-map joblib arrays read-only (shared between processes)
+    """
+    if path.endswith(('.ubj', '.json')):
+        import xgboost as xgb
+        model = xgb.XGBRegressor()
+        model.load_model(path)
+        return model
+
+    import joblib
+    # Legacy pickles may be compressed; joblib then loads them normally
+    return joblib.load(path, mmap_mode='r' if mmap else None)
+
+
+def replace_file_atomic(source: str, destination: str):
+    """Copy source over destination without readers ever seeing a partial file"""
+    tmp_path = f"{destination}.tmp{os.getpid()}"
+    shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
@@ -5,10 +5,15 @@ Tracks model performance over time and enables rollback decisions
 
 import os
 import json
+import shutil
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+from training.model_artifacts import (
+    MODEL_TYPES, bundle_path, install_bundle, activate_bundle, active_bundle_dir, replace_file_atomic
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -65,7 +70,9 @@ class ModelPerformanceTracker:
         version_id: str,
         metrics: Dict[str, Any],
         data_source: str,
-        training_data_info: Dict[str, Any]
+        training_data_info: Dict[str, Any],
+        hyperparameters: Optional[Dict[str, Dict[str, Any]]] = None,
+        tuning: Optional[Dict[str, Any]] = None
     ) -> bool:
         """
         Save metrics for a model version
@@ -75,6 +82,8 @@ class ModelPerformanceTracker:
             metrics: Dictionary containing r2_score, mse, training_time_seconds, etc.
             data_source: "synthetic", "hybrid", or "real"
             training_data_info: Info about training data (real_samples, synthetic_samples, fraud_ratio)
+            hyperparameters: Per-model parameters the version was trained with (None = defaults)
+            tuning: Hyperparameter search summary (method, CV scores, elapsed time)
 
         Returns:
             True if saved successfully
@@ -90,6 +99,10 @@ class ModelPerformanceTracker:
                 "metrics": metrics,
                 "is_active": False  # Will be updated if activated
             }
+            if hyperparameters:
+                entry["hyperparameters"] = hyperparameters
+            if tuning:
+                entry["tuning"] = {key: value for key, value in tuning.items() if key != 'params'}
 
             history.append(entry)
             self.save_history(history)
@@ -116,6 +129,24 @@ class ModelPerformanceTracker:
 
         return None
 
+    def get_best_hyperparameters(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Hyperparameters of the active version, or of the most recently activated version
+        trained with tuned parameters (warm start for the next search). Versions that were
+        never activated (rejected by the performance check) are not used.
+        """
+        history = self.load_history()
+
+        for entry in reversed(history):
+            if entry.get('is_active') and entry.get('hyperparameters'):
+                return entry['hyperparameters']
+
+        activated = [entry for entry in history if entry.get('activated_at') and entry.get('hyperparameters')]
+        if activated:
+            return max(activated, key=lambda entry: entry['activated_at'])['hyperparameters']
+
+        return None
+
     def compare_with_previous(
         self,
         new_metrics: Dict[str, Any],
@@ -180,8 +211,11 @@ class ModelPerformanceTracker:
         """
         Mark a version as active and copy versioned models to production directory
         
-        Copies versioned models from Backend/training/{type}/ml/models/ to
-        Backend/{type}/ml/models/ as non-versioned files for fraud detector use
+        Installs the version's bundle (verified against its manifest checksums) into
+        Backend/{type}/ml/models/bundles/ and atomically repoints {type}_current at it,
+        then replaces the non-versioned .pkl files (copy to a temporary file, then
+        rename) for loaders that still read them. History and ACTIVE_VERSION.txt are
+        only updated once the production files are in place.
 
         Args:
             version_id: Version to activate (e.g., "20250122_143052")
@@ -190,23 +224,18 @@ class ModelPerformanceTracker:
             True if activated successfully
         """
         try:
-            import shutil
-            
-            # Update history - mark this version as active, others as inactive
-            history = self.load_history()
-            for entry in history:
-                entry['is_active'] = (entry['version_id'] == version_id)
-            self.save_history(history)
-
-            # Update ACTIVE_VERSION.txt in training directory
-            with open(self.active_version_path, 'w') as f:
-                f.write(version_id)
+            # Install and activate the bundle (versions saved before bundles existed have none)
+            source_bundle = bundle_path(self.training_models_dir, self.document_type, version_id)
+            if os.path.isdir(source_bundle):
+                installed = install_bundle(source_bundle, self.production_models_dir)
+                activate_bundle(self.production_models_dir, self.document_type, installed)
+                logger.info(f"Activated bundle {os.path.basename(installed)} in {self.production_models_dir}")
+            else:
+                logger.warning(f"No model bundle for version {version_id}; updating .pkl files only")
 
             # Copy versioned models from training to production as non-versioned files
             # This ensures fraud detectors (which expect non-versioned names) load the new models
-            model_types = ['random_forest', 'xgboost', 'feature_scaler']
-            
-            for model_type in model_types:
+            for model_type in MODEL_TYPES:
                 # Source: versioned file in training directory
                 versioned_path = os.path.join(
                     self.training_models_dir,
@@ -219,11 +248,25 @@ class ModelPerformanceTracker:
                 )
                 
                 if os.path.exists(versioned_path):
-                    shutil.copy2(versioned_path, non_versioned_path)
+                    replace_file_atomic(versioned_path, non_versioned_path)
                     logger.info(f"Copied {os.path.basename(versioned_path)} → {self.production_models_dir}/{os.path.basename(non_versioned_path)}")
                 else:
                     logger.warning(f"Versioned model not found: {versioned_path}")
 
+            # Update history - mark this version as active, others as inactive
+            history = self.load_history()
+            for entry in history:
+                entry['is_active'] = (entry['version_id'] == version_id)
+                if entry['is_active']:
+                    entry['activated_at'] = datetime.now().isoformat()
+            self.save_history(history)
+
+            # Update ACTIVE_VERSION.txt in training directory
+            tmp_path = f"{self.active_version_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(version_id)
+            os.replace(tmp_path, self.active_version_path)
+
             logger.info(f"✓ Activated version {version_id} for {self.document_type}")
             logger.info(f"  Training dir: {self.training_models_dir}")
             logger.info(f"  Production dir: {self.production_models_dir}")
@@ -264,7 +307,7 @@ class ModelPerformanceTracker:
                     version_id = entry['version_id']
 
                     # Delete versioned model files from training directory
-                    for model_type in ['random_forest', 'xgboost', 'feature_scaler']:
+                    for model_type in MODEL_TYPES:
                         model_filename = f"{self.document_type}_{model_type}_{version_id}.pkl"
                         model_path = os.path.join(self.training_models_dir, model_filename)
 
@@ -272,6 +315,16 @@ class ModelPerformanceTracker:
                             os.remove(model_path)
                             logger.info(f"Deleted old model file: {model_filename}")
 
+                    # Delete the version's bundles (never the one production is serving)
+                    for models_dir in (self.training_models_dir, self.production_models_dir):
+                        bundle_dir = bundle_path(models_dir, self.document_type, version_id)
+                        active_dir = active_bundle_dir(models_dir, self.document_type)
+                        if os.path.isdir(bundle_dir) and (
+                            active_dir is None or os.path.realpath(bundle_dir) != active_dir
+                        ):
+                            shutil.rmtree(bundle_dir)
+                            logger.info(f"Deleted old model bundle: {bundle_dir}")
+
                 # Remove from history
                 history = history[-keep_n:]
                 self.save_history(history)
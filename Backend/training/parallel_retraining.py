@@ -0,0 +1,262 @@
+"""
+Parallel Retraining Orchestrator
+Runs the per-document-type retraining pipelines concurrently.
+
+Database fetches (I/O bound) run in a thread pool; as soon as a document type's
+data is in, its training (CPU bound) is submitted to a process pool, so one
+type trains while others are still fetching. A global CPU budget is split
+across the concurrently training types through each retrainer's n_jobs, and a
+combined timing report is written at the end.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import importlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logger = logging.getLogger(__name__)
+
+# document type -> (module, class); imported lazily so workers only load what they train
+RETRAINER_CLASSES = {
+    'paystub': ('training.paystub_model_retrainer', 'PaystubModelRetrainer'),
+    'check': ('training.check_model_retrainer', 'CheckModelRetrainer'),
+    'money_order': ('training.money_order_model_retrainer', 'MoneyOrderModelRetrainer'),
+    'bank_statement': ('training.bank_statement_model_retrainer', 'BankStatementModelRetrainer')
+}
+
+# Defaults for the "orchestration" section of retraining_config.json
+DEFAULT_ORCHESTRATION_CONFIG = {
+    'parallel': True,
+    'cpu_budget': 0,       # 0 = os.cpu_count()
+    'max_workers': 0,      # 0 = one training process per enabled document type
+    'fetch_threads': 4,
+    'report_dir': None     # None = training/reports
+}
+
+
+def create_retrainer(document_type: str, config_path: Optional[str] = None):
+    """Instantiate the retrainer for a document type"""
+    module_name, class_name = RETRAINER_CLASSES[document_type]
+    retrainer_class = getattr(importlib.import_module(module_name), class_name)
+    return retrainer_class(config_path=config_path)
+
+
+def split_cpu_budget(document_types: List[str], cpu_budget: int, max_workers: int) -> Dict[str, int]:
+    """
+    Split a CPU budget into per-type n_jobs
+
+    At most max_workers types train at once, so each gets an equal share of the
+    budget for that many slots (at least 1); leftover cores go to the first types
+    when every type has its own slot.
+
+    Args:
+        document_types: Types to train, in submission order
+        cpu_budget: Total cores available for training
+        max_workers: Training processes
+
+    Returns:
+        Dict of document type -> n_jobs
+    """
+    if not document_types:
+        return {}
+    concurrent = max(1, min(max_workers, len(document_types)))
+    share, leftover = divmod(max(cpu_budget, 1), concurrent)
+    if len(document_types) > concurrent:
+        leftover = 0
+    return {
+        doc_type: max(1, share + (1 if index < leftover else 0))
+        for index, doc_type in enumerate(document_types)
+    }
+
+
+def _train_document_type(
+    document_type: str,
+    config_path: Optional[str],
+    n_jobs: int,
+    prefetched: Tuple[Any, Optional[str]],
+    retrainer_factory: Callable
+) -> Dict[str, Any]:
+    """Process-pool task: run one document type's retraining with the prefetched data"""
+    start = time.perf_counter()
+    retrainer = retrainer_factory(document_type, config_path)
+    retrainer.n_jobs = n_jobs
+    result = retrainer.retrain(prefetched=prefetched)
+    return {
+        'result': result,
+        'pid': os.getpid(),
+        'seconds': time.perf_counter() - start
+    }
+
+
+class ParallelRetrainingOrchestrator:
+    """Retrain all enabled document types concurrently"""
+
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        retrainer_factory: Callable = create_retrainer,
+        **overrides
+    ):
+        """
+        Args:
+            config_path: Path to retraining_config.json (optional)
+            retrainer_factory: (document_type, config_path) -> retrainer; must be picklable
+            **overrides: Values overriding the config's "orchestration" section
+        """
+        if config_path is None:
+            config_path = os.path.join(os.path.dirname(__file__), 'retraining_config.json')
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+
+        self.config_path = config_path
+        self.retrainer_factory = retrainer_factory
+        self.document_types = [
+            doc_type for doc_type, settings in config.get('document_types', {}).items()
+            if settings.get('enabled', False)
+        ]
+
+        settings = dict(DEFAULT_ORCHESTRATION_CONFIG)
+        settings.update(config.get('orchestration', {}))
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        self.cpu_budget = int(settings['cpu_budget']) or os.cpu_count() or 1
+        self.max_workers = int(settings['max_workers']) or max(1, len(self.document_types))
+        self.fetch_threads = max(1, int(settings['fetch_threads']))
+        self.report_dir = settings['report_dir'] or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reports')
+
+    def _fetch(self, document_type: str) -> Tuple[Tuple[Any, Optional[str]], float]:
+        """Thread-pool task: fetch real data; errors become the fetch error message"""
+        start = time.perf_counter()
+        try:
+            retrainer = self.retrainer_factory(document_type, self.config_path)
+            prefetched = retrainer.fetch_real_data_from_database()
+        except Exception as e:
+            logger.warning(f"Fetch failed for {document_type}: {e}")
+            prefetched = (None, str(e))
+        return prefetched, time.perf_counter() - start
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Fetch and retrain every enabled document type
+
+        Returns:
+            Dict with per-type 'results' (as returned by retrain()), the timing
+            'report' and the 'report_path' it was written to
+        """
+        document_types = [doc_type for doc_type in self.document_types if doc_type in RETRAINER_CLASSES]
+        for doc_type in set(self.document_types) - set(document_types):
+            logger.error(f"No retrainer class found for {doc_type}")
+
+        n_jobs = split_cpu_budget(document_types, self.cpu_budget, self.max_workers)
+        logger.info(
+            f"Parallel retraining of {', '.join(document_types) or 'no document types'} "
+            f"(cpu budget {self.cpu_budget}, {self.max_workers} training processes, n_jobs {n_jobs})"
+        )
+
+        started_at = datetime.now()
+        run_start = time.perf_counter()
+        results: Dict[str, Dict[str, Any]] = {}
+        timings: Dict[str, Dict[str, Any]] = {
+            doc_type: {'n_jobs': n_jobs[doc_type]} for doc_type in document_types
+        }
+
+        with ThreadPoolExecutor(max_workers=self.fetch_threads) as fetch_pool, \
+                ProcessPoolExecutor(max_workers=self.max_workers) as train_pool:
+            fetch_futures = {fetch_pool.submit(self._fetch, doc_type): doc_type for doc_type in document_types}
+            train_futures = {}
+            submitted_at = {}
+
+            # Start each type's training as soon as its fetch finishes
+            for future in as_completed(fetch_futures):
+                doc_type = fetch_futures[future]
+                prefetched, fetch_seconds = future.result()
+                timings[doc_type]['fetch_seconds'] = fetch_seconds
+                submitted_at[doc_type] = time.perf_counter()
+                train_futures[train_pool.submit(
+                    _train_document_type, doc_type, self.config_path, n_jobs[doc_type],
+                    prefetched, self.retrainer_factory
+                )] = doc_type
+
+            for future in as_completed(train_futures):
+                doc_type = train_futures[future]
+                finished = time.perf_counter()
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    logger.error(f"Error running retrainer for {doc_type}: {e}", exc_info=True)
+                    results[doc_type] = {'success': False, 'error': str(e)}
+                    timings[doc_type]['train_seconds'] = finished - submitted_at[doc_type]
+                    continue
+
+                result = outcome['result']
+                results[doc_type] = result
+                timings[doc_type].update({
+                    'train_seconds': outcome['seconds'],
+                    'queue_seconds': max(0.0, finished - submitted_at[doc_type] - outcome['seconds']),
+                    'stages': result.get('timings', {}),
+                    'pid': outcome['pid']
+                })
+                status = "SUCCESS" if result.get('success') else "FAILED"
+                logger.info(f"Finished {doc_type}: {status} ({outcome['seconds']:.1f}s, n_jobs={n_jobs[doc_type]})")
+
+        wall_seconds = time.perf_counter() - run_start
+        report = self.build_report(results, timings, started_at, wall_seconds)
+        report_path = self.write_report(report)
+        return {'results': results, 'report': report, 'report_path': report_path}
+
+    def build_report(
+        self,
+        results: Dict[str, Dict[str, Any]],
+        timings: Dict[str, Dict[str, Any]],
+        started_at: datetime,
+        wall_seconds: float
+    ) -> Dict[str, Any]:
+        """Combine per-type results and timings into the timing report"""
+        document_types = {}
+        for doc_type, timing in timings.items():
+            result = results.get(doc_type, {})
+            document_types[doc_type] = dict(
+                timing,
+                success=bool(result.get('success')),
+                activated=bool(result.get('activated')),
+                version_id=result.get('version_id'),
+                error=result.get('error')
+            )
+
+        # What the same work would take run one type after another
+        serial_seconds = sum(
+            timing.get('fetch_seconds', 0.0) + timing.get('train_seconds', 0.0)
+            for timing in timings.values()
+        )
+        return {
+            'started_at': started_at.isoformat(),
+            'wall_seconds': round(wall_seconds, 3),
+            'serial_seconds': round(serial_seconds, 3),
+            'speedup': round(serial_seconds / wall_seconds, 2) if wall_seconds > 0 else None,
+            'cpu_budget': self.cpu_budget,
+            'max_workers': self.max_workers,
+            'document_types': document_types
+        }
+
+    def write_report(self, report: Dict[str, Any]) -> Optional[str]:
+        """Write the timing report as JSON; returns its path (None if it could not be written)"""
+        path = os.path.join(
+            self.report_dir,
+            f"retraining_timing_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        try:
+            os.makedirs(self.report_dir, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+        except OSError as e:
+            logger.warning(f"Could not write timing report: {e}")
+            return None
+        logger.info(f"Timing report written to {path}")
+        return path
@@ -7,6 +7,7 @@ import sys
 import os
 import logging
 import json
+import argparse
 from datetime import datetime
 
 # Add parent directory to path
@@ -16,6 +17,7 @@ from training.paystub_model_retrainer import PaystubModelRetrainer
 from training.check_model_retrainer import CheckModelRetrainer
 from training.money_order_model_retrainer import MoneyOrderModelRetrainer
 from training.bank_statement_model_retrainer import BankStatementModelRetrainer
+from training.parallel_retraining import ParallelRetrainingOrchestrator
 
 # Configure logging
 logging.basicConfig(
@@ -35,16 +37,8 @@ RETRAINER_MAP = {
     'bank_statement': BankStatementModelRetrainer
 }
 
-def main():
-    logger.info("Starting system-wide automated retraining...")
-    
-    # Load config to see what's enabled
-    config_path = os.path.join(os.path.dirname(__file__), 'retraining_config.json')
-    with open(config_path, 'r') as f:
-        config = json.load(f)
-        
-    doc_types = config.get('document_types', {})
-    
+def run_sequential(doc_types):
+    """Retrain each enabled document type in turn"""
     results = {}
     
     for doc_type, settings in doc_types.items():
@@ -71,6 +65,34 @@ def main():
             logger.error(f"Error running retrainer for {doc_type}: {e}", exc_info=True)
             results[doc_type] = {'success': False, 'error': str(e)}
 
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Retrain all enabled document types')
+    parser.add_argument('--sequential', action='store_true', help='Retrain one document type at a time')
+    parser.add_argument('--cpu-budget', type=int, help='Cores shared by the training processes')
+    parser.add_argument('--workers', type=int, help='Training processes')
+    args = parser.parse_args()
+
+    logger.info("Starting system-wide automated retraining...")
+    
+    # Load config to see what's enabled
+    config_path = os.path.join(os.path.dirname(__file__), 'retraining_config.json')
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+        
+    doc_types = config.get('document_types', {})
+    parallel = config.get('orchestration', {}).get('parallel', True) and not args.sequential
+    
+    if parallel:
+        orchestrator = ParallelRetrainingOrchestrator(
+            config_path, cpu_budget=args.cpu_budget, max_workers=args.workers
+        )
+        run = orchestrator.run()
+        results = run['results']
+    else:
+        results = run_sequential(doc_types)
+
     # Summary
     logger.info("="*50)
     logger.info("RETRAINING SUMMARY")
@@ -79,6 +101,10 @@ def main():
         status = "✅ Success" if res.get('success') else "❌ Failed"
         activated = "Activated" if res.get('activated') else "Not Activated"
         logger.info(f"{doc_type.ljust(15)}: {status} ({activated})")
+    if parallel:
+        report = run['report']
+        logger.info(f"Wall time {report['wall_seconds']:.1f}s vs {report['serial_seconds']:.1f}s serial "
+                    f"(speedup {report['speedup']}x)")
         
     logger.info("Done.")
 
@@ -0,0 +1,354 @@
+"""
+Vectorized Synthetic Training Data
+Column-at-a-time generators for the document retrainers' synthetic samples.
+
+Each generator draws every feature column for all N samples at once from a seeded
+np.random.Generator, following the same per-class distributions as the original
+row-by-row generators, so it scales to millions of rows for stress tests and
+hyperparameter search.
+"""
+
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Check amount brackets (upper bound, category value) - same as CheckModelRetrainer._categorize_amount
+CHECK_AMOUNT_BRACKETS = ((100, 0.1), (500, 0.3), (1000, 0.5), (5000, 0.7))
+CHECK_AMOUNT_TOP_CATEGORY = 0.9
+
+# Bank statement target categories: (cumulative probability, risk score range)
+BANK_STATEMENT_CATEGORIES = ((0.45, (0, 30)), (0.70, (31, 60)), (0.875, (61, 85)), (1.0, (86, 100)))
+
+
+def _rng(seed) -> np.random.Generator:
+    return seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+
+
+def _flags(rng: np.random.Generator, n: int, probability) -> np.ndarray:
+    """1.0 with the given probability (scalar or per-row array), else 0.0"""
+    return (rng.random(n) < probability).astype(float)
+
+
+def _uniform_by_class(rng: np.random.Generator, mask: np.ndarray, true_range: Sequence[float],
+                      false_range: Sequence[float]) -> np.ndarray:
+    """Uniform draw from true_range where mask is set, false_range elsewhere"""
+    n = len(mask)
+    return np.where(mask, rng.uniform(*true_range, n), rng.uniform(*false_range, n))
+
+
+def categorize_check_amounts(amounts: np.ndarray) -> np.ndarray:
+    """Vectorized check amount risk bracket (0.1-0.9)"""
+    bounds = np.array([bound for bound, _ in CHECK_AMOUNT_BRACKETS])
+    values = np.array([value for _, value in CHECK_AMOUNT_BRACKETS] + [CHECK_AMOUNT_TOP_CATEGORY])
+    return values[np.searchsorted(bounds, amounts, side='right')]
+
+
+def generate_check_samples(n_samples: int, seed=None) -> pd.DataFrame:
+    """
+    Synthetic check samples: 50% legitimate (risk 0-30), 50% fraudulent (risk 70-100)
+
+    Args:
+        n_samples: Number of rows
+        seed: Seed or np.random.Generator (None = unseeded)
+
+    Returns:
+        DataFrame with 30 features and risk_score column
+    """
+    rng = _rng(seed)
+    n = n_samples
+    fraud = rng.random(n) < 0.5
+
+    def flag(legit_p, fraud_p):
+        return _flags(rng, n, np.where(fraud, fraud_p, legit_p))
+
+    # Legitimate amounts are log-normal (mostly under $1000) capped at $5000
+    amount = np.where(fraud, rng.uniform(500, 15000, n), np.minimum(rng.lognormal(5.0, 1.5, n), 5000))
+
+    columns = {
+        'bank_validity': flag(1.0, 0.7),
+        'routing_validity': flag(1.0, 0.6),
+        'account_present': flag(1.0, 0.8),
+        'check_number_valid': flag(1.0, 0.7),
+        'amount_value': np.minimum(amount / 10000.0, 1.0),
+        'amount_category': categorize_check_amounts(amount),
+        'round_amount': flag(0.3, 0.6),
+        'payer_present': flag(1.0, 0.9),
+        'payee_present': flag(1.0, 0.9),
+        'payer_address_present': flag(0.9, 0.5),
+        'date_present': flag(1.0, 0.9),
+        'future_date': flag(0.0, 0.2),
+        'date_age_days': _uniform_by_class(rng, fraud, (0, 365), (0, 180)) / 365.0,
+        'signature_detected': flag(0.95, 0.6),
+        'memo_present': flag(0.7, 0.4),
+        'amount_matching': flag(1.0, 0.7),
+        'amount_parsing_confidence': _uniform_by_class(rng, fraud, (0.4, 0.8), (0.85, 1.0)),
+        'suspicious_amount': (fraud & (amount > 9000) & (amount < 10000)).astype(float),
+        'date_format_valid': flag(1.0, 0.8),
+        'weekend_holiday': flag(0.1, 0.3),
+        'critical_missing_count': np.where(fraud, rng.uniform(0.1, 0.4, n), 0.0),
+        'field_quality': _uniform_by_class(rng, fraud, (0.5, 0.8), (0.9, 1.0)),
+        'bank_routing_match': flag(1.0, 0.6),
+        'check_number_pattern': flag(1.0, 0.7),
+        'address_valid': flag(1.0, 0.6),
+        'name_consistency': flag(1.0, 0.7),
+        'signature_requirement': flag(1.0, 0.5),
+        'endorsement_present': flag(0.5, 0.2),
+        'check_type_risk': _uniform_by_class(rng, fraud, (0.6, 1.0), (0.0, 0.3)),
+        'text_quality': _uniform_by_class(rng, fraud, (0.3, 0.7), (0.8, 1.0)),
+        'risk_score': _uniform_by_class(rng, fraud, (70, 100), (0, 30))
+    }
+    return pd.DataFrame(columns)
+
+
+def generate_paystub_samples(n_samples: int, seed=42) -> pd.DataFrame:
+    """
+    Synthetic paystub samples: first half legitimate, second half fraudulent
+    (zero withholding, inflated income or missing fields, equally likely)
+
+    Args:
+        n_samples: Number of rows
+        seed: Seed or np.random.Generator (defaults to 42, as before)
+
+    Returns:
+        DataFrame with 18 features and risk_score column
+    """
+    rng = _rng(seed)
+    n = n_samples
+    fraud = np.arange(n) >= n // 2
+    fraud_type = np.where(fraud, rng.integers(0, 3, n), -1)
+    zero_withholding = fraud_type == 0
+    inflated = fraud_type == 1
+    missing = fraud_type == 2
+    legit = ~fraud
+
+    gross = np.select(
+        [legit, zero_withholding, inflated],
+        [rng.uniform(2000, 15000, n), rng.uniform(3000, 20000, n), rng.uniform(50000, 100000, n)],
+        rng.uniform(2000, 10000, n)
+    )
+    # Legitimate: federal 10-25%, state 3-8%, social security 6.2%, medicare 1.45%
+    legit_tax_rate = rng.uniform(0.10, 0.25, n) + rng.uniform(0.03, 0.08, n) + 0.062 + 0.0145
+    total_tax = np.select(
+        [legit, zero_withholding, inflated],
+        [gross * legit_tax_rate, gross * 0.02 * rng.random(n), gross * rng.uniform(0.25, 0.35, n)],
+        0.0
+    )
+    net = np.where(missing, gross * rng.uniform(0.7, 0.9, n), gross - total_tax)
+
+    withheld = (legit | inflated).astype(float)
+    tax_ratio = total_tax / gross
+
+    columns = {
+        'has_company': np.where(missing, _flags(rng, n, 0.5), 1.0),
+        'has_employee': np.where(missing, _flags(rng, n, 0.5), 1.0),
+        'has_gross': np.ones(n),
+        'has_net': np.ones(n),
+        'has_date': np.where(missing, _flags(rng, n, 0.5), 1.0),
+        'gross_pay': np.where(inflated, np.minimum(gross, 100000.0), gross),
+        'net_pay': np.where(inflated, np.minimum(net, 100000.0), net),
+        'tax_error': np.zeros(n),
+        'text_quality': np.select(
+            [legit, zero_withholding, inflated],
+            [rng.uniform(0.85, 1.0, n), rng.uniform(0.7, 0.9, n), rng.uniform(0.6, 0.85, n)],
+            rng.uniform(0.5, 0.7, n)
+        ),
+        'missing_fields_count': np.where(missing, rng.integers(2, 4, n), 0).astype(float),
+        'has_federal_tax': withheld,
+        'has_state_tax': withheld,
+        'has_social_security': withheld,
+        'has_medicare': withheld,
+        'total_tax_amount': np.where(inflated, np.minimum(total_tax, 50000.0), total_tax),
+        'tax_to_gross_ratio': np.where(inflated, np.minimum(tax_ratio, 1.0), tax_ratio),
+        'net_to_gross_ratio': np.where(inflated, np.minimum(net / gross, 1.0), net / gross),
+        'deduction_percentage': np.select(
+            [missing, inflated], [(gross - net) / gross, np.minimum(tax_ratio, 1.0)], tax_ratio
+        ),
+        'risk_score': np.select(
+            [legit, zero_withholding, inflated],
+            [rng.uniform(5, 25, n), rng.uniform(85, 99, n), rng.uniform(75, 95, n)],
+            rng.uniform(70, 90, n)
+        )
+    }
+    return pd.DataFrame(columns)
+
+
+def money_order_risk_scores(X: np.ndarray) -> np.ndarray:
+    """Vectorized money order rule-based risk score (0-100) from the 30-feature matrix"""
+    risk = (
+        25.0 * (X[:, 0] < 0.5)
+        + 20.0 * (X[:, 1] < 0.5)
+        + 40.0 * (X[:, 9] > 0.5)
+        + 10.0 * (X[:, 10] > 180)
+        + np.minimum(30.0, X[:, 27] * 10)
+        + 10.0 * (X[:, 3] > 5000)
+        + 15.0 * (X[:, 12] < 0.5)
+        + 10.0 * (X[:, 14] > 0.5)
+        + 50.0 * (X[:, 11] < 0.5)
+        + 15.0 * (X[:, 19] < 0.5)
+        + 15.0 * (X[:, 26] < 0.5)
+    )
+    return np.minimum(100.0, risk)
+
+
+def generate_money_order_samples(n_samples: int, seed=None) -> pd.DataFrame:
+    """
+    Synthetic money order samples: 70% legitimate, 30% fraudulent (invalid issuer,
+    missing fields, date fraud, amount fraud or a combination, equally likely)
+
+    Args:
+        n_samples: Number of rows
+        seed: Seed or np.random.Generator (None = unseeded)
+
+    Returns:
+        DataFrame with feature_0..feature_29 and risk_score column
+    """
+    rng = _rng(seed)
+    n = n_samples
+    legit = rng.random(n) < 0.7
+    fraud_type = rng.integers(0, 5, n)
+    combo = fraud_type == 4
+    invalid_issuer = ~legit & ((fraud_type == 0) | combo)
+    missing_fields = ~legit & ((fraud_type == 1) | combo)
+    date_fraud = ~legit & ((fraud_type == 2) | combo)
+    amount_fraud = ~legit & ((fraud_type == 3) | combo)
+
+    # Fraudulent rows start at 0.5 and are overwritten per fraud pattern (column-major: filled column by column)
+    X = np.full((n, 30), 0.5, order='F')
+
+    def legit_uniform(column, low, high):
+        X[legit, column] = rng.uniform(low, high, legit.sum())
+
+    for column in (0, 1, 2, 5, 6, 7, 8, 11, 12, 15, 20, 22, 24, 28):
+        X[legit, column] = 1.0
+    for column in (9, 14, 17, 18, 27):
+        X[legit, column] = 0.0
+    legit_uniform(3, 50, 2000)
+    X[legit, 4] = rng.integers(1, 3, legit.sum())
+    legit_uniform(10, 0, 60)
+    legit_uniform(13, 0.85, 1.0)
+    # Weekend flag: a 15% chance of a coin flip
+    X[legit, 16] = _flags(rng, legit.sum(), 0.075)
+    legit_uniform(19, 0.8, 1.0)
+    legit_uniform(21, 0.8, 1.0)
+    legit_uniform(23, 0.85, 1.0)
+    legit_uniform(25, 0.0, 0.2)
+    legit_uniform(26, 0.85, 1.0)
+    legit_uniform(29, 0.8, 1.0)
+
+    X[invalid_issuer, 0] = 0.0
+    X[invalid_issuer, 1] = _flags(rng, invalid_issuer.sum(), 0.5)
+    X[invalid_issuer, 2] = rng.uniform(0.2, 0.5, invalid_issuer.sum())
+
+    X[missing_fields, 6] = _flags(rng, missing_fields.sum(), 0.6)
+    X[missing_fields, 7] = _flags(rng, missing_fields.sum(), 0.6)
+    X[missing_fields, 11] = _flags(rng, missing_fields.sum(), 0.4)
+    X[missing_fields, 27] = rng.integers(2, 6, missing_fields.sum())
+
+    X[date_fraud, 9] = 1.0
+    X[date_fraud, 10] = rng.uniform(180, 500, date_fraud.sum())
+
+    X[amount_fraud, 3] = rng.uniform(5000, 25000, amount_fraud.sum())
+    X[amount_fraud, 4] = rng.integers(3, 5, amount_fraud.sum())
+    X[amount_fraud, 12] = 0.0
+    X[amount_fraud, 14] = 1.0
+
+    fraud = ~legit
+    X[fraud, 18] = rng.uniform(0.3, 0.8, fraud.sum())
+    X[fraud, 19] = rng.uniform(0.3, 0.6, fraud.sum())
+    X[fraud, 26] = rng.uniform(0.3, 0.6, fraud.sum())
+    X[fraud, 29] = rng.uniform(0.4, 0.7, fraud.sum())
+
+    df = pd.DataFrame(X, columns=[f'feature_{i}' for i in range(30)])
+    df['risk_score'] = money_order_risk_scores(X)
+    return df
+
+
+def generate_bank_statement_samples(n_samples: int, seed=None) -> pd.DataFrame:
+    """
+    Synthetic bank statement samples across four target categories
+    (45% risk 0-30, 25% 31-60, 17.5% 61-85, 12.5% 86-100)
+
+    Args:
+        n_samples: Number of rows
+        seed: Seed or np.random.Generator (None = unseeded)
+
+    Returns:
+        DataFrame with 35 features and risk_score column
+    """
+    rng = _rng(seed)
+    n = n_samples
+    cumulative = np.array([threshold for threshold, _ in BANK_STATEMENT_CATEGORIES])
+    category = np.minimum(np.searchsorted(cumulative, rng.random(n), side='right'), len(cumulative) - 1)
+
+    def per_category(values: Dict[int, np.ndarray]) -> np.ndarray:
+        return np.select([category == c for c in range(4)], [values[c] for c in range(4)]).astype(float)
+
+    def flag_by_category(probabilities: Sequence[float]) -> np.ndarray:
+        return _flags(rng, n, np.array(probabilities)[category])
+
+    bank_valid = flag_by_category((1.0, 1 / 2, 1 / 3, 0.0))
+    account_present = flag_by_category((1.0, 1 / 2, 1 / 3, 1 / 4))
+    account_holder_present = flag_by_category((1.0, 1 / 2, 1 / 3, 0.0))
+    future_period = flag_by_category((0.0, 1 / 2, 2 / 3, 1.0))
+    negative_ending = flag_by_category((0.0, 1 / 2, 2 / 3, 3 / 4))
+    consistency = per_category({
+        0: np.ones(n),
+        1: rng.uniform(0.3, 0.7, n),
+        2: rng.uniform(0.0, 0.5, n),
+        3: rng.uniform(0.0, 0.3, n)
+    })
+    critical_missing = per_category({
+        0: rng.integers(0, 2, n),
+        1: rng.integers(2, 5, n),
+        2: rng.integers(4, 7, n),
+        3: rng.integers(5, 8, n)
+    })
+
+    beginning = account_present * rng.uniform(0, 100000, n)
+    ending = account_present * rng.uniform(0, 100000, n)
+    credits = account_present * rng.uniform(0, 50000, n)
+    debits = account_present * rng.uniform(0, 50000, n)
+
+    risk_ranges = np.array([score_range for _, score_range in BANK_STATEMENT_CATEGORIES], dtype=float)
+    risk_score = rng.uniform(risk_ranges[category, 0], risk_ranges[category, 1])
+
+    columns = {
+        'bank_validity': bank_valid,
+        'account_number_present': account_present,
+        'account_holder_present': account_holder_present,
+        'account_type_present': _flags(rng, n, 0.5),
+        'beginning_balance': beginning,
+        'ending_balance': ending,
+        'total_credits': credits,
+        'total_debits': debits,
+        'period_start_present': _flags(rng, n, 0.5),
+        'period_end_present': _flags(rng, n, 0.5),
+        'statement_date_present': _flags(rng, n, 0.5),
+        'future_period': future_period,
+        'period_age_days': rng.uniform(0, 365, n),
+        'transaction_count': rng.integers(0, 501, n),
+        'avg_transaction_amount': rng.uniform(0, 5000, n),
+        'max_transaction_amount': rng.uniform(0, 10000, n),
+        'balance_change': ending - beginning,
+        'negative_ending_balance': negative_ending,
+        'balance_consistency': consistency,
+        'currency_present': np.ones(n),
+        'suspicious_transaction_pattern': _flags(rng, n, 0.5),
+        'large_transaction_count': rng.integers(0, 51, n),
+        'round_number_transactions': rng.uniform(0, 50, n),
+        'date_format_valid': np.ones(n),
+        'period_length_days': np.full(n, 30.0),
+        'critical_missing_count': critical_missing,
+        'field_quality': rng.uniform(0.0, 1.0, n),
+        'transaction_date_consistency': rng.uniform(0.0, 1.0, n),
+        'duplicate_transactions': rng.choice([0.0, 0.5, 1.0], n),
+        'unusual_timing': rng.uniform(0.0, 1.0, n),
+        'account_number_format_valid': np.ones(n),
+        'name_format_valid': np.ones(n),
+        'balance_volatility': rng.uniform(0.0, 10.0, n),
+        'credit_debit_ratio': rng.uniform(0.0, 10.0, n),
+        'text_quality': rng.uniform(0.0, 1.0, n),
+        'risk_score': risk_score
+    }
+    return pd.DataFrame(columns)
@@ -0,0 +1,226 @@
+"""
+Test Bulk Re-scoring
+Verifies keyset paging, delta write-back, RPC fallback and checkpoint resume.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from training.bulk_rescoring import BulkRescoringJob, _init_worker, score_feature_matrix, start_background_rescoring
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.after = None
+        self.count = None
+        self.update_values = None
+
+    def select(self, columns):
+        return self
+
+    def gt(self, column, value):
+        self.after = value
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    def update(self, values):
+        self.update_values = values
+        return self
+
+    def eq(self, column, value):
+        self.after = value
+        return self
+
+    def execute(self):
+        if self.update_values is not None:
+            self.db.row_updates.append((self.after, self.update_values['fraud_risk_score']))
+            return _Response([])
+        rows = sorted(self.db.rows, key=lambda row: row['statement_id'])
+        if self.after is not None:
+            rows = [row for row in rows if row['statement_id'] > self.after]
+        self.db.pages += 1
+        return _Response(rows[:self.count])
+
+
+class _RpcCall:
+    def __init__(self, db, params):
+        self.db = db
+        self.params = params
+
+    def execute(self):
+        if not self.db.rpc_installed:
+            raise Exception('function apply_fraud_score_updates does not exist')
+        self.db.rpc_calls.append(self.params)
+        if self.db.fail_rpc_call == len(self.db.rpc_calls):
+            raise RuntimeError('connection reset')
+        return _Response(len(self.params['updates']))
+
+
+class _FakeSupabase:
+    def __init__(self, rows, rpc_installed=True, fail_rpc_call=None):
+        self.rows = rows
+        self.rpc_installed = rpc_installed
+        self.fail_rpc_call = fail_rpc_call
+        self.rpc_calls = []
+        self.row_updates = []
+        self.pages = 0
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, name, params):
+        return _RpcCall(self, params)
+
+
+class _FakeRetrainer:
+    feature_names = ['a', 'b', 'beginning_balance', 'ending_balance', 'total_credits', 'total_debits']
+
+    def _extract_features_from_row(self, row):
+        if row.get('broken'):
+            raise ValueError('bad row')
+        features = {'b': row['b'], 'a': row['a'], 'risk_score': 50.0}
+        features.update({column: row.get(column, 0.0) for column in self.feature_names[2:]})
+        return features
+
+
+class TestBulkRescoring(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.models_dir = tempfile.mkdtemp()
+        rng = np.random.RandomState(0)
+        X = np.hstack([rng.rand(100, 2), np.zeros((100, 4))])
+        y = X[:, 0] * 100
+        scaler = StandardScaler().fit(X)
+        joblib.dump(RandomForestRegressor(n_estimators=5, random_state=0).fit(scaler.transform(X), y),
+                    os.path.join(cls.models_dir, 'bank_statement_random_forest.pkl'))
+        joblib.dump(LinearRegression().fit(scaler.transform(X), y),
+                    os.path.join(cls.models_dir, 'bank_statement_xgboost.pkl'))
+        joblib.dump(scaler, os.path.join(cls.models_dir, 'bank_statement_feature_scaler.pkl'))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.models_dir)
+
+    def setUp(self):
+        self.checkpoint_dir = tempfile.mkdtemp()
+        self.rows = [{'statement_id': f'id{i:02d}', 'a': i / 10.0, 'b': 0.5, 'fraud_risk_score': None}
+                     for i in range(7)]
+
+    def tearDown(self):
+        shutil.rmtree(self.checkpoint_dir)
+
+    def _job(self, supabase, **overrides):
+        settings = {'page_size': 3, 'workers': 0, 'batch_size': 2}
+        settings.update(overrides)
+        return BulkRescoringJob('bank_statement', version_id='v2', supabase=supabase, retrainer=_FakeRetrainer(),
+                                models_dir=self.models_dir, checkpoint_dir=self.checkpoint_dir, **settings)
+
+    def test_full_run_writes_deltas_in_bulk(self):
+        self.rows[1]['broken'] = True
+        supabase = _FakeSupabase(self.rows)
+        state = self._job(supabase).run()
+
+        self.assertTrue(state['completed'])
+        self.assertEqual(state['rows_scanned'], 7)
+        self.assertEqual(state['rows_failed'], 1)
+        self.assertEqual(state['rows_updated'], 6)
+        self.assertEqual(len(supabase.rpc_calls), 3)
+        scores = {u['id']: u['fraud_risk_score'] for call in supabase.rpc_calls for u in call['updates']}
+        self.assertTrue(all(0.0 <= score <= 1.0 for score in scores.values()))
+        self.assertLess(scores['id00'], scores['id06'])
+
+        # Second pass: stored scores now match, nothing is written
+        for row in self.rows:
+            row['fraud_risk_score'] = scores.get(row['statement_id'])
+        supabase = _FakeSupabase(self.rows)
+        state = self._job(supabase).run(resume=False)
+        self.assertEqual(state['rows_updated'], 0)
+        self.assertEqual(supabase.rpc_calls, [])
+
+    def test_resume_from_checkpoint(self):
+        supabase = _FakeSupabase(self.rows, fail_rpc_call=2)
+        with self.assertRaises(RuntimeError):
+            self._job(supabase).run()
+
+        supabase = _FakeSupabase(self.rows)
+        state = self._job(supabase).run()
+        self.assertTrue(state['completed'])
+        self.assertEqual(state['rows_scanned'], 7)
+        # Only the pages after the checkpoint are rescanned
+        rescored = [u['id'] for call in supabase.rpc_calls for u in call['updates']]
+        self.assertEqual(rescored, ['id03', 'id04', 'id05', 'id06'])
+
+    def test_per_row_fallback_without_rpc(self):
+        supabase = _FakeSupabase(self.rows, rpc_installed=False)
+        state = self._job(supabase, page_size=10).run()
+        self.assertEqual(state['rows_updated'], 7)
+        self.assertEqual(len(supabase.row_updates), 7)
+
+    def test_process_pool_matches_in_process(self):
+        in_process = _FakeSupabase(self.rows)
+        self._job(in_process).run()
+        pooled = _FakeSupabase(self.rows)
+        self._job(pooled, workers=2).run(resume=False)
+        self.assertEqual(in_process.rpc_calls, pooled.rpc_calls)
+
+    def test_balance_leniency_matches_detector(self):
+        # Consistent balances get the detector's 0.65 leniency, a $50 gap only 0.90
+        self.rows = self.rows[:2]
+        self.rows[0].update({'beginning_balance': 100.0, 'ending_balance': 150.0, 'total_credits': 50.0})
+        self.rows[1].update({'a': 0.0, 'beginning_balance': 100.0, 'ending_balance': 200.0, 'total_credits': 50.0})
+        supabase = _FakeSupabase(self.rows)
+        job = self._job(supabase)
+        job.run()
+        scores = {u['id']: u['fraud_risk_score'] for call in supabase.rpc_calls for u in call['updates']}
+
+        _init_worker(job.model_paths, job.doc_config['ensemble_weights'])
+        X = np.array([[0.0, 0.5, 100.0, 150.0, 50.0, 0.0], [0.0, 0.5, 100.0, 200.0, 50.0, 0.0]])
+        raw = score_feature_matrix(X)
+        self.assertAlmostEqual(scores['id00'], round(raw[0] * 0.65, 4), places=4)
+        self.assertAlmostEqual(scores['id01'], round(raw[1] * 0.90, 4), places=4)
+
+    def test_missing_models(self):
+        job = self._job(_FakeSupabase(self.rows))
+        job.model_paths['xgboost'] = os.path.join(self.checkpoint_dir, 'missing.pkl')
+        with self.assertRaises(FileNotFoundError):
+            job.run()
+
+    def test_background_rescoring_runs_in_own_process(self):
+        with mock.patch('training.bulk_rescoring.subprocess.Popen') as popen:
+            process = start_background_rescoring('check', '20250101_120000')
+        self.assertIs(process, popen.return_value)
+        command = popen.call_args[0][0]
+        self.assertEqual(command[1:], ['-m', 'training.bulk_rescoring', '--document-type', 'check',
+                                       '--version-id', '20250101_120000'])
+        self.assertTrue(popen.call_args[1]['start_new_session'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Test Feature Frames
+Verifies the vectorized feature builders against hand-computed per-row values.
+"""
+
+import sys
+import os
+import json
+import unittest
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from training.feature_frames import build_feature_frame, normalize_columns, CHECK_COLUMNS
+
+
+class TestNormalizeColumns(unittest.TestCase):
+
+    def test_kinds(self):
+        frame = normalize_columns(
+            [{'routing_number': 123456789, 'amount': '12.5', 'signature_present': True},
+             {'routing_number': None, 'amount': None, 'signature_present': None, 'extra': 1}],
+            CHECK_COLUMNS
+        )
+        self.assertEqual(list(frame.columns), list(CHECK_COLUMNS))
+        self.assertEqual(frame['routing_number'].tolist(), ['123456789', None])
+        self.assertEqual(frame['amount'][0], 12.5)
+        self.assertTrue(np.isnan(frame['amount'][1]))
+        self.assertEqual(frame['signature_present'].tolist(), [1.0, 0.0])
+        self.assertIsNone(frame['bank_name'][0])
+
+    def test_empty(self):
+        self.assertEqual(len(build_feature_frame('check', [])), 0)
+
+
+class TestCheckFeatures(unittest.TestCase):
+
+    def test_values(self):
+        rows = [
+            {'bank_name': 'Chase', 'routing_number': '021000021', 'account_number': '1', 'check_number': '101',
+             'amount': 9500, 'payer_name': 'A', 'payee_name': 'B', 'payer_address': '1 Main St', 'date': '2025-01-01',
+             'signature_present': True, 'memo': 'rent', 'ai_recommendation': 'APPROVE', 'fraud_risk_score': 12.0},
+            {'routing_number': '12345', 'amount': None, 'payee_name': 'B', 'ai_recommendation': 'REJECT'}
+        ]
+        df = build_feature_frame('check', rows, rng=np.random.default_rng(0))
+        self.assertEqual(len(df.columns), 31)
+        first, second = df.iloc[0], df.iloc[1]
+
+        self.assertEqual(first['routing_validity'], 1.0)
+        self.assertEqual(first['amount_value'], 0.95)
+        self.assertEqual(first['amount_category'], 0.9)
+        self.assertEqual(first['round_amount'], 1.0)
+        self.assertEqual(first['suspicious_amount'], 1.0)
+        self.assertEqual(first['critical_missing_count'], 0.0)
+        self.assertEqual(first['bank_routing_match'], 1.0)
+        self.assertEqual(first['risk_score'], 12.0)
+
+        self.assertEqual(second['routing_validity'], 0.0)
+        self.assertEqual(second['amount_category'], 0.1)
+        self.assertEqual(second['critical_missing_count'], 0.8)
+        self.assertAlmostEqual(second['field_quality'], 0.2)
+        self.assertEqual(second['signature_detected'], 0.0)
+        self.assertTrue(70 <= second['risk_score'] <= 100)
+
+
+class TestMoneyOrderFeatures(unittest.TestCase):
+
+    def test_values(self):
+        df = build_feature_frame('money_order', [
+            {'issuer_name': 'USPS', 'serial_number': 'X1', 'amount': 700, 'payee_name': 'A',
+             'model_confidence': 0.85, 'ai_recommendation': 'REJECT'},
+            {'amount': 1500, 'payer_name': 'B', 'ai_recommendation': 'APPROVE', 'fraud_risk_score': 33}
+        ])
+        self.assertEqual(list(df.columns), [f'feature_{i}' for i in range(30)] + ['risk_score'])
+        np.testing.assert_array_equal(df.iloc[0, :8], [1, 1, 1, 700, 2, 1, 1, 0])
+        np.testing.assert_array_equal(df.iloc[1, :8], [0, 0, 1, 1500, 3, 1, 0, 1])
+        self.assertEqual(df['feature_10'][0], 30.0)
+        self.assertEqual(df['feature_13'][0], 0.95)
+        self.assertEqual(df['feature_29'].tolist(), [0.85, 0.9])
+        self.assertEqual(df['risk_score'].tolist(), [85.0, 33.0])
+
+
+class TestBankStatementFeatures(unittest.TestCase):
+
+    def test_values(self):
+        df = build_feature_frame('bank_statement', [
+            {'bank_name': 'Chase', 'account_number': '1', 'beginning_balance': 1000, 'ending_balance': 1200,
+             'total_credits': 500, 'total_debits': 300, 'ai_recommendation': 'APPROVE'},
+            {'ending_balance': -50, 'total_credits': 100, 'ai_recommendation': 'REJECT', 'fraud_risk_score': 91}
+        ])
+        self.assertEqual(len(df.columns), 36)
+        first, second = df.iloc[0], df.iloc[1]
+        self.assertEqual(first['balance_consistency'], 1.0)
+        self.assertEqual(first['avg_transaction_amount'], 30.0)
+        self.assertEqual(first['max_transaction_amount'], 60.0)
+        self.assertAlmostEqual(first['credit_debit_ratio'], 500 / 300)
+        self.assertEqual(first['risk_score'], 10.0)
+        self.assertEqual(second['negative_ending_balance'], 1.0)
+        self.assertEqual(second['balance_consistency'], 0.5)
+        self.assertEqual(second['critical_missing_count'], 2.0)
+        self.assertEqual(second['credit_debit_ratio'], 0.0)
+        self.assertEqual(second['risk_score'], 91.0)
+
+
+class TestPaystubFeatures(unittest.TestCase):
+
+    def test_values(self):
+        deductions = [{'name': 'Federal Income Tax', 'amount': 400}, {'name': 'State Tax', 'amount': '100'},
+                      {'name': 'FICA', 'amount': 124}, {'name': 'Medicare', 'amount': 29}, {'name': '401k', 'amount': 50}]
+        df = build_feature_frame('paystub', [
+            {'employer_name': 'Acme', 'employee_name': 'Jo', 'gross_pay': 2000, 'net_pay': 1297,
+             'deductions': json.dumps(deductions), 'ai_recommendation': 'approve', 'fraud_risk_score': 0.2},
+            {'gross_pay': 1000, 'net_pay': 1000, 'deductions': 'not json', 'ai_recommendation': 'ESCALATE'}
+        ])
+        self.assertEqual(len(df.columns), 19)
+        first, second = df.iloc[0], df.iloc[1]
+        self.assertEqual(first['total_tax_amount'], 653.0)
+        self.assertEqual([first['has_federal_tax'], first['has_state_tax'], first['has_social_security'],
+                          first['has_medicare']], [1.0, 1.0, 1.0, 1.0])
+        self.assertAlmostEqual(first['tax_to_gross_ratio'], 653 / 2000)
+        self.assertAlmostEqual(first['deduction_percentage'], 703 / 2000)
+        self.assertEqual(first['text_quality'], 1.0)
+        self.assertAlmostEqual(first['risk_score'], 20.0)
+        self.assertEqual(second['tax_error'], 1.0)
+        self.assertEqual(second['missing_fields_count'], 2.0)
+        self.assertEqual(second['text_quality'], 0.75)
+        self.assertEqual(second['risk_score'], 50.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
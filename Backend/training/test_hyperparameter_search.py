@@ -0,0 +1,123 @@
+"""
+Test Hyperparameter Search
+Verifies candidate sampling, warm start, XGBoost early stopping, the time budget
+and recording the tuned configuration in the performance history.
+"""
+
+import sys
+import os
+import copy
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from training.hyperparameter_search import (
+    DEFAULT_TUNING_CONFIG, HyperparameterSearch, sample_candidates, tuning_config
+)
+from training.model_performance_tracker import ModelPerformanceTracker
+
+
+def _data(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 6))
+    y = 40 * X[:, 0] + 10 * X[:, 1] ** 2 + rng.normal(scale=2, size=n)
+    return X, y
+
+
+def _settings(**overrides):
+    settings = copy.deepcopy(DEFAULT_TUNING_CONFIG)
+    settings.update({'n_candidates': 4, 'cv_folds': 2, 'min_resources': 150,
+                     'max_xgb_estimators': 300, 'early_stopping_rounds': 10})
+    settings['search_space']['random_forest']['n_estimators'] = [10, 20]
+    settings.update(overrides)
+    return settings
+
+
+class TestSampling(unittest.TestCase):
+
+    def test_candidates_within_space(self):
+        space = DEFAULT_TUNING_CONFIG['search_space']['xgboost']
+        seed = {'max_depth': 4, 'learning_rate': 0.05}
+        candidates = sample_candidates(space, 8, np.random.default_rng(0), seed_params=seed)
+        self.assertEqual(len(candidates), 8)
+        self.assertEqual(candidates[0], seed)
+        for params in candidates[1:]:
+            self.assertIsInstance(params['max_depth'], int)
+            self.assertTrue(3 <= params['max_depth'] <= 9)
+            self.assertTrue(0.02 <= params['learning_rate'] <= 0.3)
+
+    def test_document_type_overrides(self):
+        config = {'tuning': {'enabled': True, 'time_budget_seconds': 60},
+                  'document_types': {'check': {'tuning': {'time_budget_seconds': 10}}, 'paystub': {}}}
+        self.assertEqual(tuning_config(config, 'check')['time_budget_seconds'], 10)
+        self.assertEqual(tuning_config(config, 'paystub')['time_budget_seconds'], 60)
+        self.assertTrue(tuning_config(config, 'paystub')['enabled'])
+
+    def test_search_space_merged_per_model(self):
+        rf_space = {'n_estimators': [50]}
+        config = {'tuning': {'search_space': {'random_forest': rf_space}},
+                  'document_types': {'check': {'tuning': {'search_space': {'xgboost': {'max_depth': [3]}}}}}}
+        space = tuning_config(config, 'check')['search_space']
+        self.assertEqual(space['random_forest'], rf_space)
+        self.assertEqual(space['xgboost'], {'max_depth': [3]})
+        space = tuning_config(config, 'paystub')['search_space']
+        self.assertEqual(space['xgboost'], DEFAULT_TUNING_CONFIG['search_space']['xgboost'])
+        self.assertEqual(DEFAULT_TUNING_CONFIG['search_space']['random_forest']['n_estimators'], [100, 200, 300])
+        self.assertEqual(tuning_config(config, 'paystub')['cv_folds'], DEFAULT_TUNING_CONFIG['cv_folds'])
+
+
+class TestHyperparameterSearch(unittest.TestCase):
+
+    def test_halving_search(self):
+        X, y = _data()
+        result = HyperparameterSearch(_settings(), n_jobs=2).search(X, y)
+        self.assertEqual(set(result['params']), {'random_forest', 'xgboost'})
+        # XGBoost's n_estimators comes from early stopping, below the cap
+        self.assertTrue(1 <= result['params']['xgboost']['n_estimators'] < 300)
+        self.assertGreater(result['cv_r2']['xgboost'], 0.8)
+        # 4 candidates, eta 3: 4 on the first rung, 1 on the second, per model
+        self.assertEqual(result['candidates_evaluated'], 10)
+        self.assertFalse(result['budget_exhausted'])
+
+    def test_budget_keeps_warm_start(self):
+        X, y = _data()
+        seed = {'random_forest': {'n_estimators': 10, 'max_depth': 4},
+                'xgboost': {'max_depth': 3, 'learning_rate': 0.2, 'n_estimators': 50}}
+        result = HyperparameterSearch(_settings(time_budget_seconds=0), n_jobs=1).search(X, y, seed_params=seed)
+        # Out of budget: only the warm-start configuration of each model is evaluated
+        self.assertEqual(result['candidates_evaluated'], 2)
+        self.assertTrue(result['budget_exhausted'])
+        self.assertEqual(result['params']['random_forest'], seed['random_forest'])
+        self.assertEqual(result['params']['xgboost']['max_depth'], 3)
+
+
+class TestTrackerHyperparameters(unittest.TestCase):
+
+    def test_best_hyperparameters_round_trip(self):
+        tracker = ModelPerformanceTracker('check')
+        with tempfile.TemporaryDirectory() as tmp:
+            tracker.history_path = os.path.join(tmp, 'performance_history.json')
+            self.assertIsNone(tracker.get_best_hyperparameters())
+
+            tuned = {'random_forest': {'max_depth': 6}, 'xgboost': {'n_estimators': 42}}
+            tracker.save_metrics('v1', {'r2_score': 0.9}, 'synthetic', {}, hyperparameters=tuned,
+                                 tuning={'params': tuned, 'method': 'halving', 'elapsed_seconds': 1.0})
+            tracker.save_metrics('v2', {'r2_score': 0.8}, 'synthetic', {})
+            # v1 was never activated (e.g. rejected), so it is no warm start
+            self.assertIsNone(tracker.get_best_hyperparameters())
+
+            history = tracker.load_history()
+            history[0]['activated_at'] = '2025-01-22T14:30:52'
+            tracker.save_history(history)
+            self.assertEqual(tracker.get_best_hyperparameters(), tuned)
+
+            entry = tracker.load_history()[0]
+            self.assertEqual(entry['tuning'], {'method': 'halving', 'elapsed_seconds': 1.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
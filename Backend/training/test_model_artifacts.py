@@ -0,0 +1,106 @@
+"""
+Test Model Artifacts
+Verifies bundle round-trips (memory-mapped joblib, native XGBoost), checksum
+verification, atomic activation and the legacy .pkl fallback.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import joblib
+import numpy as np
+import xgboost as xgb
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from training.model_artifacts import (
+    write_bundle, verify_bundle, install_bundle, activate_bundle, active_bundle_dir,
+    resolve_model_paths, load_model, MODEL_TYPES
+)
+
+
+def _models(seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, 5))
+    y = X[:, 0] * 10 + rng.normal(size=200)
+    scaler = StandardScaler().fit(X)
+    rf = RandomForestRegressor(n_estimators=10, random_state=seed).fit(scaler.transform(X), y)
+    xgb_model = xgb.XGBRegressor(n_estimators=10, max_depth=3).fit(scaler.transform(X), y)
+    return X, {'random_forest': rf, 'xgboost': xgb_model, 'feature_scaler': scaler}
+
+
+class TestModelArtifacts(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.training_dir = os.path.join(self.tmp, 'training')
+        self.production_dir = os.path.join(self.tmp, 'production')
+        os.makedirs(self.production_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_round_trip_predictions_match(self):
+        X, models = _models()
+        bundle = write_bundle(self.training_dir, 'check', 'v1', models, metadata={'r2': 0.9})
+        manifest = verify_bundle(bundle)
+        self.assertEqual(manifest['version_id'], 'v1')
+        self.assertEqual(set(manifest['files']), set(MODEL_TYPES))
+
+        loaded = {model_type: load_model(os.path.join(bundle, entry['file']))
+                  for model_type, entry in manifest['files'].items()}
+        X_scaled = loaded['feature_scaler'].transform(X)
+        np.testing.assert_allclose(X_scaled, models['feature_scaler'].transform(X))
+        np.testing.assert_allclose(loaded['random_forest'].predict(X_scaled),
+                                   models['random_forest'].predict(X_scaled))
+        np.testing.assert_allclose(loaded['xgboost'].predict(X_scaled),
+                                   models['xgboost'].predict(X_scaled), rtol=1e-6)
+        # Plain numpy arrays come back memory-mapped rather than copied into the process
+        self.assertIsInstance(loaded['feature_scaler'].mean_, np.memmap)
+
+    def test_tampered_bundle_rejected(self):
+        _, models = _models()
+        bundle = write_bundle(self.training_dir, 'check', 'v1', models)
+        with open(os.path.join(bundle, 'xgboost.ubj'), 'ab') as f:
+            f.write(b'tampered')
+        with self.assertRaises(ValueError):
+            verify_bundle(bundle)
+        with self.assertRaises(ValueError):
+            install_bundle(bundle, self.production_dir)
+        self.assertFalse(os.path.exists(os.path.join(self.production_dir, 'bundles', 'check_v1')))
+
+    def test_activation_swaps_versions(self):
+        _, models_v1 = _models(0)
+        _, models_v2 = _models(1)
+        for version, models in (('v1', models_v1), ('v2', models_v2)):
+            bundle = write_bundle(self.training_dir, 'check', version, models)
+            activate_bundle(self.production_dir, 'check', install_bundle(bundle, self.production_dir))
+            active = active_bundle_dir(self.production_dir, 'check')
+            self.assertEqual(os.path.basename(active), f'check_{version}')
+
+        paths = resolve_model_paths(self.production_dir, 'check')
+        self.assertTrue(all(os.path.dirname(path) == active for path in paths.values()))
+        self.assertTrue(paths['xgboost'].endswith('.ubj'))
+        # The previous version stays installed for rollback
+        self.assertTrue(os.path.isdir(os.path.join(self.production_dir, 'bundles', 'check_v1')))
+        self.assertEqual(
+            [name for name in os.listdir(self.production_dir) if '.tmp' in name], []
+        )
+
+    def test_legacy_pkl_fallback(self):
+        _, models = _models()
+        for model_type, model in models.items():
+            joblib.dump(model, os.path.join(self.production_dir, f'check_{model_type}.pkl'))
+        paths = resolve_model_paths(self.production_dir, 'check')
+        self.assertEqual(paths['random_forest'], os.path.join(self.production_dir, 'check_random_forest.pkl'))
+        self.assertIsInstance(load_model(paths['xgboost']), xgb.XGBRegressor)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Test Parallel Retraining
+Verifies CPU budget splitting, fetch/train hand-off and the timing report.
+"""
+
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from training.parallel_retraining import ParallelRetrainingOrchestrator, split_cpu_budget
+
+
+class FakeRetrainer:
+    """Stands in for a DocumentModelRetrainer (no database, no models written)"""
+
+    def __init__(self, document_type):
+        self.document_type = document_type
+        self.n_jobs = -1
+
+    def fetch_real_data_from_database(self):
+        if self.document_type == 'money_order':
+            raise ConnectionError('database unavailable')
+        return None, f'no {self.document_type} rows'
+
+    def retrain(self, prefetched=None):
+        if self.document_type == 'bank_statement':
+            raise RuntimeError('training crashed')
+        return {
+            'success': True,
+            'activated': True,
+            'version_id': '20250101_000000',
+            'n_jobs': self.n_jobs,
+            'fetch_error': prefetched[1],
+            'pid': os.getpid(),
+            'timings': {'train': 0.01}
+        }
+
+
+def fake_factory(document_type, config_path):
+    return FakeRetrainer(document_type)
+
+
+class TestSplitCpuBudget(unittest.TestCase):
+
+    def test_even_split_with_leftover(self):
+        self.assertEqual(split_cpu_budget(['a', 'b', 'c'], 8, 4), {'a': 3, 'b': 3, 'c': 2})
+
+    def test_more_types_than_workers(self):
+        self.assertEqual(split_cpu_budget(['a', 'b', 'c', 'd'], 9, 2), {'a': 4, 'b': 4, 'c': 4, 'd': 4})
+
+    def test_at_least_one_core(self):
+        self.assertEqual(split_cpu_budget(['a', 'b', 'c'], 2, 3), {'a': 1, 'b': 1, 'c': 1})
+        self.assertEqual(split_cpu_budget([], 8, 4), {})
+
+
+class TestParallelRetrainingOrchestrator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.tmp_dir, 'retraining_config.json')
+        config = {
+            'orchestration': {'cpu_budget': 6, 'max_workers': 3, 'report_dir': os.path.join(self.tmp_dir, 'reports')},
+            'document_types': {
+                'check': {'enabled': True},
+                'paystub': {'enabled': True},
+                'money_order': {'enabled': True},
+                'bank_statement': {'enabled': True},
+                'unknown_type': {'enabled': True},
+                'disabled_type': {'enabled': False}
+            }
+        }
+        with open(self.config_path, 'w') as f:
+            json.dump(config, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_run(self):
+        orchestrator = ParallelRetrainingOrchestrator(self.config_path, retrainer_factory=fake_factory, max_workers=4)
+        run = orchestrator.run()
+        results = run['results']
+
+        self.assertEqual(set(results), {'check', 'paystub', 'money_order', 'bank_statement'})
+        self.assertEqual(results['check']['n_jobs'], 2)
+        self.assertEqual(results['check']['fetch_error'], 'no check rows')
+        self.assertNotEqual(results['check']['pid'], os.getpid())
+        # Fetch exceptions become fetch errors; training still runs on synthetic data
+        self.assertTrue(results['money_order']['success'])
+        self.assertEqual(results['money_order']['fetch_error'], 'database unavailable')
+        self.assertEqual(results['bank_statement'], {'success': False, 'error': 'training crashed'})
+
+        with open(run['report_path']) as f:
+            report = json.load(f)
+        self.assertEqual(report['cpu_budget'], 6)
+        self.assertEqual(report['max_workers'], 4)
+        self.assertEqual(report['document_types']['paystub']['stages'], {'train': 0.01})
+        self.assertFalse(report['document_types']['bank_statement']['success'])
+        self.assertGreaterEqual(report['serial_seconds'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Test Synthetic Data
+Verifies the vectorized generators keep the per-class distributions of the
+original row-by-row generators.
+"""
+
+import sys
+import os
+import unittest
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from training.synthetic_data import (
+    categorize_check_amounts,
+    generate_bank_statement_samples,
+    generate_check_samples,
+    generate_money_order_samples,
+    generate_paystub_samples,
+    money_order_risk_scores
+)
+
+N = 200000
+TOLERANCE = 0.01
+
+
+class TestCheckSamples(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = generate_check_samples(N, seed=1)
+        cls.fraud = cls.df['risk_score'] >= 70
+
+    def test_columns_and_class_balance(self):
+        self.assertEqual(len(self.df.columns), 31)
+        self.assertEqual(self.df.columns[-1], 'risk_score')
+        self.assertAlmostEqual(self.fraud.mean(), 0.5, delta=TOLERANCE)
+        self.assertTrue((self.df.loc[~self.fraud, 'risk_score'] <= 30).all())
+
+    def test_per_class_probabilities(self):
+        legit, fraud = self.df[~self.fraud], self.df[self.fraud]
+        for column, legit_p, fraud_p in (('routing_validity', 1.0, 0.6), ('payer_address_present', 0.9, 0.5),
+                                         ('signature_detected', 0.95, 0.6), ('future_date', 0.0, 0.2)):
+            self.assertAlmostEqual(legit[column].mean(), legit_p, delta=TOLERANCE, msg=column)
+            self.assertAlmostEqual(fraud[column].mean(), fraud_p, delta=TOLERANCE, msg=column)
+
+    def test_amounts(self):
+        legit, fraud = self.df[~self.fraud], self.df[self.fraud]
+        self.assertLessEqual(legit['amount_value'].max(), 0.5)
+        self.assertAlmostEqual(np.median(legit['amount_value'] * 10000), np.exp(5.0), delta=5)
+        self.assertGreaterEqual(fraud['amount_value'].min(), 0.05)
+        self.assertTrue((legit['suspicious_amount'] == 0).all())
+        # U(500, 15000) lands in (9000, 10000) with probability 1000/14500
+        self.assertAlmostEqual(fraud['suspicious_amount'].mean(), 1000 / 14500, delta=TOLERANCE)
+
+    def test_amount_categories(self):
+        np.testing.assert_array_equal(categorize_check_amounts(np.array([50, 100, 499, 999, 4999, 5000])),
+                                      [0.1, 0.3, 0.3, 0.5, 0.7, 0.9])
+
+
+class TestMoneyOrderSamples(unittest.TestCase):
+
+    def test_distributions(self):
+        df = generate_money_order_samples(N, seed=2)
+        self.assertEqual(list(df.columns), [f'feature_{i}' for i in range(30)] + ['risk_score'])
+        legit = df['feature_0'] == 1.0
+        self.assertAlmostEqual(legit.mean(), 0.7, delta=TOLERANCE)
+
+        # Legitimate rows carry no date fraud; fraud rows have date fraud 2/5 of the time
+        date_fraud = df['feature_9'] == 1.0
+        self.assertAlmostEqual(date_fraud.mean(), 0.3 * 0.4, delta=TOLERANCE)
+        self.assertTrue((df.loc[date_fraud, 'feature_10'] >= 180).all())
+        self.assertAlmostEqual(df.loc[df['feature_17'] == 0, 'feature_16'].mean(), 0.075, delta=TOLERANCE)
+        self.assertTrue(df['risk_score'].between(0, 100).all())
+
+    def test_risk_score_rules(self):
+        X = np.full((2, 30), 0.5)
+        X[0, [0, 1, 11, 12, 19, 26]] = 1.0
+        X[0, [9, 14, 27]] = 0.0
+        X[0, 3] = 100
+        X[0, 10] = 10
+        X[1, [0, 11]] = 0.0
+        X[1, 9] = 1.0
+        X[1, 27] = 2
+        np.testing.assert_array_equal(money_order_risk_scores(X), [0.0, 100.0])
+
+
+class TestBankStatementSamples(unittest.TestCase):
+
+    def test_categories(self):
+        df = generate_bank_statement_samples(N, seed=3)
+        self.assertEqual(len(df.columns), 36)
+        low = df['risk_score'] <= 30
+        critical = df['risk_score'] >= 86
+        self.assertAlmostEqual(low.mean(), 0.45, delta=TOLERANCE)
+        self.assertAlmostEqual(critical.mean(), 0.125, delta=TOLERANCE)
+        self.assertTrue((df.loc[low, 'bank_validity'] == 1).all())
+        self.assertTrue(df.loc[low, 'critical_missing_count'].isin([0, 1]).all())
+        self.assertTrue((df.loc[critical, 'bank_validity'] == 0).all())
+        self.assertAlmostEqual(df.loc[critical, 'account_number_present'].mean(), 0.25, delta=TOLERANCE)
+        self.assertTrue((df.loc[df['account_number_present'] == 0, 'ending_balance'] == 0).all())
+        np.testing.assert_allclose(df['balance_change'], df['ending_balance'] - df['beginning_balance'])
+        self.assertEqual(df['transaction_count'].max(), 500)
+
+
+class TestPaystubSamples(unittest.TestCase):
+
+    def test_halves_and_fraud_types(self):
+        df = generate_paystub_samples(N)
+        legit, fraud = df.iloc[:N // 2], df.iloc[N // 2:]
+        self.assertTrue(legit['risk_score'].between(5, 25).all())
+        self.assertTrue((fraud['risk_score'] >= 70).all())
+        self.assertTrue(legit['tax_to_gross_ratio'].between(0.1765, 0.4065).all())
+        np.testing.assert_allclose(legit['net_pay'], legit['gross_pay'] - legit['total_tax_amount'])
+
+        missing = fraud['missing_fields_count'] > 0
+        zero_withholding = (fraud['has_federal_tax'] == 0) & ~missing
+        self.assertAlmostEqual(missing.mean(), 1 / 3, delta=TOLERANCE)
+        self.assertAlmostEqual(zero_withholding.mean(), 1 / 3, delta=TOLERANCE)
+        self.assertTrue((fraud.loc[zero_withholding, 'tax_to_gross_ratio'] <= 0.02).all())
+        self.assertTrue((fraud['gross_pay'] <= 100000).all())
+
+    def test_seeded_generation_is_reproducible(self):
+        self.assertTrue(generate_paystub_samples(1000).equals(generate_paystub_samples(1000)))
+        self.assertTrue(generate_check_samples(1000, seed=7).equals(generate_check_samples(1000, seed=7)))
+        self.assertFalse(generate_check_samples(1000, seed=7).equals(generate_check_samples(1000, seed=8)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+"""
+Test Training Data Loader
+Verifies column projection, keyset paging past the server row cap, projection
+fallback and snapshot delta fetches.
+"""
+
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from training.training_data_loader import TrainingDataLoader
+
+SERVER_ROW_CAP = 3
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, db):
+        self.db = db
+        self.filters = []
+        self.columns = None
+        self.count = None
+
+    def select(self, columns):
+        self.columns = columns
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] >= value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row[column] > value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    def execute(self):
+        self.db.selects.append(self.columns)
+        if self.columns != '*':
+            unknown = set(self.columns.split(',')) - self.db.table_columns
+            if unknown:
+                raise Exception(f"column checks.{sorted(unknown)[0]} does not exist")
+        rows = [row for row in sorted(self.db.rows, key=lambda row: row['check_id'])
+                if all(match(row) for match in self.filters)]
+        rows = rows[:min(self.count, SERVER_ROW_CAP)]
+        if self.columns != '*':
+            rows = [{column: row.get(column) for column in self.columns.split(',')} for row in rows]
+        return _Response(rows)
+
+
+class _FakeSupabase:
+    def __init__(self, rows, table_columns):
+        self.rows = rows
+        self.table_columns = set(table_columns)
+        self.selects = []
+
+    def table(self, name):
+        return _Query(self)
+
+
+def _row(index, created_at, recommendation='APPROVE', confidence=0.9):
+    return {
+        'check_id': f'c{index:03d}',
+        'created_at': created_at,
+        'amount': 100 * index,
+        'routing_number': 123456789,
+        'ai_recommendation': recommendation,
+        'model_confidence': confidence,
+        'ocr_text': 'x' * 1000
+    }
+
+
+CONFIG = {
+    'document_types': {'check': {'db_table': 'checks'}},
+    'data_quality': {'confidence_score_field': 'model_confidence', 'min_confidence_score': 0.8}
+}
+COLUMNS = {'amount': 'number', 'routing_number': 'text', 'ai_recommendation': 'text'}
+
+
+class TestTrainingDataLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.rows = [_row(i, f'2025-01-{i:02d}') for i in range(1, 8)]
+        self.rows.append(_row(8, '2025-01-08', recommendation='ESCALATE'))
+        self.rows.append(_row(9, '2025-01-09', confidence=0.5))
+        self.supabase = _FakeSupabase(self.rows, self.rows[0].keys())
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def _loader(self, columns=COLUMNS, **overrides):
+        return TrainingDataLoader('check', columns, CONFIG, supabase=self.supabase,
+                                  cache_dir=self.cache_dir, page_size=100, **overrides)
+
+    def test_projection_and_keyset_paging(self):
+        frame = self._loader(cache_enabled=False).load()
+        self.assertEqual(list(frame['check_id']), [f'c{i:03d}' for i in range(1, 8)])
+        self.assertEqual(list(frame.columns), ['check_id', 'created_at', 'amount', 'routing_number', 'ai_recommendation'])
+        self.assertEqual(frame['routing_number'][0], '123456789')
+        self.assertEqual(self.supabase.selects[0], 'check_id,created_at,amount,routing_number,ai_recommendation')
+        # 7 rows at 3 per page, then an empty page ends the walk
+        self.assertEqual(len(self.supabase.selects), 4)
+
+    def test_missing_column_falls_back_to_all_columns(self):
+        frame = self._loader(columns=dict(COLUMNS, signature_present='bool'), cache_enabled=False).load()
+        self.assertEqual(len(frame), 7)
+        self.assertTrue((frame['signature_present'] == 0.0).all())
+        self.assertEqual(self.supabase.selects[1:], ['*'] * (len(self.supabase.selects) - 1))
+
+    def test_snapshot_delta_fetch(self):
+        self.assertEqual(len(self._loader().load()), 7)
+
+        self.rows[0]['amount'] = 1
+        self.rows.append(_row(10, '2025-01-10', recommendation='REJECT'))
+        self.supabase.selects.clear()
+        frame = self._loader().load()
+
+        self.assertEqual(len(frame), 8)
+        # Only rows at or after the watermark (2025-01-07) were fetched: one page
+        self.assertEqual(len(self.supabase.selects), 2)
+        self.assertEqual(frame.loc[frame['check_id'] == 'c010', 'ai_recommendation'].item(), 'REJECT')
+        self.assertEqual(frame.loc[frame['check_id'] == 'c001', 'amount'].item(), 100.0)
+
+        with open(os.path.join(self.cache_dir, 'checks_training_snapshot.json')) as f:
+            self.assertEqual(json.load(f)['watermark'], '2025-01-10')
+
+        self.assertEqual(self._loader().load(refresh=True).loc[0, 'amount'], 1.0)
+
+    def test_periodic_full_refresh(self):
+        self._loader().load()
+        # An old row is relabeled after the snapshot: the created_at delta cannot see it
+        self.rows[0]['ai_recommendation'] = 'ESCALATE'
+        self.assertEqual(len(self._loader().load()), 7)
+
+        meta_path = os.path.join(self.cache_dir, 'checks_training_snapshot.json')
+        with open(meta_path) as f:
+            meta = json.load(f)
+        meta['full_fetch_at'] = (datetime.now() - timedelta(hours=25)).isoformat()
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+        frame = self._loader().load()
+        self.assertEqual(len(frame), 6)
+        self.assertNotIn('c001', set(frame['check_id']))
+        with open(meta_path) as f:
+            self.assertGreater(json.load(f)['full_fetch_at'], meta['full_fetch_at'])
+
+    def test_snapshot_ignored_when_columns_change(self):
+        self._loader().load()
+        self.supabase.selects.clear()
+        frame = self._loader(columns={'amount': 'number'}).load()
+        self.assertEqual(len(frame), 7)
+        self.assertEqual(len(self.supabase.selects), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,280 @@
+"""
+Training Data Loader
+Shared, paged and column-projected fetch of labeled documents for the retrainers.
+
+Only the columns a retrainer reads are selected, pages are walked with keyset
+cursors on the table's primary key (so the PostgREST row limit never truncates
+the result), and the rows are kept as a local snapshot (Parquet when a Parquet
+engine is installed, pickle otherwise). Later loads fetch only rows whose
+timestamp_column is at or after the snapshot's watermark and merge them in.
+
+A created_at watermark does not see rows that changed or were deleted after they
+were snapshotted (relabeled, re-scored, confidence lowered), so the snapshot is
+rebuilt with a full fetch every full_refresh_hours. Point timestamp_column at a
+last-modified column (e.g. updated_at) where the table has one to pick up changed
+rows on every load.
+"""
+
+import os
+import sys
+import json
+import logging
+import importlib.util
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from training.feature_frames import normalize_columns
+
+logger = logging.getLogger(__name__)
+
+# Primary key of each document table (keyset pagination)
+TABLE_KEYS = {
+    'paystub': 'paystub_id',
+    'check': 'check_id',
+    'money_order': 'money_order_id',
+    'bank_statement': 'statement_id'
+}
+
+# Defaults for the "training_data" section of retraining_config.json
+DEFAULT_TRAINING_DATA_CONFIG = {
+    'page_size': 1000,
+    'cache_enabled': True,
+    'cache_dir': None,                 # None = training/{type}/data_cache
+    'timestamp_column': 'created_at',  # Watermark column for delta fetches (prefer a last-modified column)
+    'full_refresh_hours': 24           # Full fetch when the snapshot's last one is older (0 = never)
+}
+
+LABELED_RECOMMENDATIONS = ['APPROVE', 'REJECT']
+
+
+def parquet_available() -> bool:
+    """True if pandas has a Parquet engine (pyarrow or fastparquet)"""
+    return any(importlib.util.find_spec(engine) is not None for engine in ('pyarrow', 'fastparquet'))
+
+
+class SnapshotCache:
+    """Local snapshot of fetched rows plus a JSON metadata file, both written atomically"""
+
+    def __init__(self, base_path: str):
+        """
+        Args:
+            base_path: Path without extension ('.parquet'/'.pkl' and '.json' are appended)
+        """
+        self.format = 'parquet' if parquet_available() else 'pickle'
+        self.data_path = base_path + ('.parquet' if self.format == 'parquet' else '.pkl')
+        self.meta_path = base_path + '.json'
+
+    def load(self) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+        """Cached rows and metadata, or (None, {}) if there is no usable snapshot"""
+        if not (os.path.exists(self.meta_path) and os.path.exists(self.data_path)):
+            return None, {}
+        try:
+            with open(self.meta_path, 'r') as f:
+                meta = json.load(f)
+            if self.format == 'parquet':
+                frame = pd.read_parquet(self.data_path)
+            else:
+                frame = pd.read_pickle(self.data_path)
+            return frame, meta
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable training data snapshot {self.data_path}: {e}")
+            return None, {}
+
+    def save(self, frame: pd.DataFrame, meta: Dict[str, Any]):
+        """Write rows then metadata (a crash in between leaves the old metadata pointing at complete data)"""
+        os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
+        tmp_data = self.data_path + '.tmp'
+        if self.format == 'parquet':
+            frame.to_parquet(tmp_data, index=False)
+        else:
+            frame.to_pickle(tmp_data)
+        os.replace(tmp_data, self.data_path)
+
+        tmp_meta = self.meta_path + '.tmp'
+        with open(tmp_meta, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_meta, self.meta_path)
+
+
+class TrainingDataLoader:
+    """Load the labeled, high-confidence rows of one document table"""
+
+    def __init__(
+        self,
+        document_type: str,
+        columns: Dict[str, str],
+        config: Dict[str, Any],
+        supabase=None,
+        **overrides
+    ):
+        """
+        Initialize loader
+
+        Args:
+            document_type: Type of document (paystub, check, money_order, bank_statement)
+            columns: Stored columns the retrainer reads (name -> kind, see feature_frames)
+            config: Parsed retraining_config.json
+            supabase: Supabase client (defaults to get_supabase())
+            **overrides: page_size, cache_enabled, cache_dir, timestamp_column, full_refresh_hours
+        """
+        self.document_type = document_type
+        self.table = config['document_types'][document_type]['db_table']
+        self.key_column = TABLE_KEYS[document_type]
+
+        settings = dict(DEFAULT_TRAINING_DATA_CONFIG)
+        settings.update(config.get('training_data', {}))
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        self.page_size = max(1, int(settings['page_size']))
+        self.timestamp_column = settings['timestamp_column']
+        self.full_refresh_hours = float(settings['full_refresh_hours'] or 0)
+
+        quality = config['data_quality']
+        self.confidence_field = quality['confidence_score_field']
+        self.min_confidence = quality['min_confidence_score']
+
+        # Key and watermark columns are always fetched
+        self.columns = {self.key_column: 'text'}
+        if self.timestamp_column:
+            self.columns[self.timestamp_column] = 'text'
+        self.columns.update(columns)
+        self._select = ','.join(self.columns)
+
+        self.cache = None
+        if settings['cache_enabled']:
+            cache_dir = settings['cache_dir'] or os.path.join(
+                os.path.dirname(os.path.abspath(__file__)), document_type, 'data_cache'
+            )
+            self.cache = SnapshotCache(os.path.join(cache_dir, f"{self.table}_training_snapshot"))
+
+        self._supabase = supabase
+
+    @classmethod
+    def for_retrainer(cls, retrainer, **overrides) -> 'TrainingDataLoader':
+        """Loader for a DocumentModelRetrainer (uses its training_columns, config and client)"""
+        return cls(
+            retrainer.document_type,
+            retrainer.training_columns,
+            retrainer.config,
+            supabase=getattr(retrainer, 'supabase', None),
+            **overrides
+        )
+
+    @property
+    def supabase(self):
+        if self._supabase is None:
+            from database.supabase_client import get_supabase
+            self._supabase = get_supabase()
+        return self._supabase
+
+    def _snapshot_signature(self) -> Dict[str, Any]:
+        """What a snapshot must match to be reused"""
+        return {
+            'table': self.table,
+            'columns': self.columns,
+            'confidence_field': self.confidence_field,
+            'min_confidence': self.min_confidence
+        }
+
+    def load(self, refresh: bool = False) -> pd.DataFrame:
+        """
+        Load rows, fetching only the delta since the cached snapshot
+
+        Args:
+            refresh: Ignore the snapshot and fetch everything
+
+        Returns:
+            Normalized DataFrame of the declared columns (one row per key)
+        """
+        cached, meta = (None, {}) if refresh or self.cache is None else self.cache.load()
+        if cached is not None and meta.get('signature') != self._snapshot_signature():
+            logger.info(f"{self.table} snapshot was taken with different columns or filters; refetching")
+            cached, meta = None, {}
+        if cached is not None and self._full_refresh_due(meta):
+            logger.info(f"{self.table} snapshot is older than {self.full_refresh_hours:g}h since its last full fetch; "
+                        f"refetching to pick up changed and deleted rows")
+            cached, meta = None, {}
+
+        since = meta.get('watermark') if cached is not None else None
+        full_fetch_at = meta.get('full_fetch_at') if cached is not None else datetime.now().isoformat()
+        fresh = normalize_columns(self._fetch_all(since), self.columns)
+
+        if cached is not None:
+            frame = pd.concat([cached, fresh], ignore_index=True)
+            frame = frame.drop_duplicates(subset=self.key_column, keep='last').reset_index(drop=True)
+            logger.info(f"Loaded {len(frame)} {self.table} rows ({len(cached)} cached, {len(fresh)} fetched since {since})")
+        else:
+            frame = fresh
+            logger.info(f"Loaded {len(frame)} {self.table} rows (full fetch)")
+
+        if self.cache is not None:
+            watermark = None
+            if self.timestamp_column and len(frame):
+                timestamps = frame[self.timestamp_column].dropna()
+                watermark = timestamps.max() if len(timestamps) else None
+            try:
+                self.cache.save(frame, {
+                    'signature': self._snapshot_signature(),
+                    'watermark': watermark,
+                    'full_fetch_at': full_fetch_at,
+                    'row_count': len(frame),
+                    'format': self.cache.format,
+                    'updated_at': datetime.now().isoformat()
+                })
+            except Exception as e:
+                logger.warning(f"Could not write {self.table} training data snapshot: {e}")
+        return frame
+
+    def _full_refresh_due(self, meta: Dict[str, Any]) -> bool:
+        """Whether the snapshot's last full fetch is older than full_refresh_hours"""
+        if not self.full_refresh_hours:
+            return False
+        try:
+            full_fetch_at = datetime.fromisoformat(meta['full_fetch_at'])
+        except (KeyError, TypeError, ValueError):
+            return True
+        return datetime.now() - full_fetch_at >= timedelta(hours=self.full_refresh_hours)
+
+    def _fetch_all(self, since: Optional[str]) -> List[Dict]:
+        """All matching rows (created at/after since, if given), walked in keyset pages"""
+        rows: List[Dict] = []
+        last_key = None
+        while True:
+            page = self._fetch_page(last_key, since)
+            if not page:
+                break
+            rows.extend(page)
+            last_key = page[-1][self.key_column]
+        return rows
+
+    def _fetch_page(self, after_key: Optional[str], since: Optional[str]) -> List[Dict]:
+        """
+        Next keyset page. An empty page ends the walk: a short page may just be the
+        server's row cap.
+        """
+        try:
+            return self._query(self._select, after_key, since)
+        except Exception as e:
+            if self._select == '*':
+                raise
+            # Some declared columns may not exist in this deployment's table
+            logger.warning(f"Projected select on {self.table} failed ({e}); falling back to all columns")
+            self._select = '*'
+            return self._query(self._select, after_key, since)
+
+    def _query(self, select: str, after_key: Optional[str], since: Optional[str]) -> List[Dict]:
+        query = self.supabase.table(self.table)\
+            .select(select)\
+            .gte(self.confidence_field, self.min_confidence)\
+            .in_('ai_recommendation', LABELED_RECOMMENDATIONS)
+        if since is not None:
+            # gte: rows sharing the watermark timestamp are re-fetched and de-duplicated by key
+            query = query.gte(self.timestamp_column, since)
+        if after_key is not None:
+            query = query.gt(self.key_column, after_key)
+        response = query.order(self.key_column).limit(self.page_size).execute()
+        return response.data or []
@@ -0,0 +1,246 @@
+"""
+Provider Cassettes
+Record and replay of Mindee inferences and OpenAI completions for offline runs and load tests
+
+In record mode every outbound call made through utils.resilience.ResilientClient
+is stored as a JSON file ("cassette") keyed by a hash of its input: the document
+bytes and inference parameters for Mindee, the model and canonical messages
+(plus the output schema) for OpenAI. In replay mode the stored response is
+returned instead of calling the provider, after a simulated latency, so the
+pipelines can be benchmarked without network access or provider costs.
+
+Settings:
+    PROVIDER_CASSETTE_MODE     off (default), record, replay, or auto (replay hits, record misses)
+    PROVIDER_CASSETTE_DIR      Cassette directory (default Backend/cassettes)
+    PROVIDER_CASSETTE_LATENCY  Replay latency: 'recorded' (default) sleeps the recorded
+                               duration, a number sleeps that many seconds, 0 disables;
+                               PROVIDER_CASSETTE_<PROVIDER>_LATENCY overrides per provider
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OFF = 'off'
+RECORD = 'record'
+REPLAY = 'replay'
+AUTO = 'auto'
+MODES = (OFF, RECORD, REPLAY, AUTO)
+
+DEFAULT_CASSETTE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cassettes')
+
+
+class CassetteMissError(LookupError):
+    """Replay mode found no cassette for a call"""
+
+
+def cassette_mode() -> str:
+    mode = os.getenv('PROVIDER_CASSETTE_MODE', OFF).strip().lower() or OFF
+    if mode not in MODES:
+        raise ValueError(f"PROVIDER_CASSETTE_MODE must be one of {', '.join(MODES)}, got '{mode}'")
+    return mode
+
+
+def replay_latency(provider: str, recorded_seconds: float) -> float:
+    """Seconds to wait before returning a replayed response"""
+    value = os.getenv(f"PROVIDER_CASSETTE_{provider.upper()}_LATENCY") or os.getenv('PROVIDER_CASSETTE_LATENCY', 'recorded')
+    if value.strip().lower() == 'recorded':
+        return recorded_seconds
+    return max(float(value), 0.0)
+
+
+# ==================== CODECS ====================
+# (key material, encode response, decode response) per kind of call
+
+def _hash_input_source(input_source) -> str:
+    digest = hashlib.sha256()
+    file_object = getattr(input_source, 'file_object', None)
+    if file_object is not None:
+        position = file_object.tell()
+        file_object.seek(0)
+        digest.update(file_object.read())
+        file_object.seek(position)
+    else:
+        with open(input_source.filepath, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _mindee_key(target, args, kwargs) -> Any:
+    input_source, params = (list(args) + [kwargs.get('input_source'), kwargs.get('params')])[:2]
+    settings = {
+        name: getattr(params, name, None)
+        for name in ('model_id', 'rag', 'raw_text', 'polygon', 'confidence')
+    }
+    return {'document_sha256': _hash_input_source(input_source), 'params': settings}
+
+
+def _mindee_encode(response) -> Any:
+    return json.loads(response.raw_http)
+
+
+def _mindee_decode(data) -> Any:
+    from mindee import InferenceResponse
+    return InferenceResponse(data)
+
+
+def _llm_key(target, args, kwargs) -> Any:
+    from utils.llm_cache import canonical_messages
+    messages = args[0] if args else kwargs.get('input')
+    if isinstance(messages, str):
+        messages = [('human', messages)]
+    model_name = getattr(target, 'model_name', None) or getattr(target, 'model', '')
+    return {'model': model_name, 'messages': canonical_messages(messages)}
+
+
+def _llm_encode(message) -> Any:
+    data = {'content': message.content}
+    function_call = (getattr(message, 'additional_kwargs', None) or {}).get('function_call')
+    if function_call:
+        data['function_call'] = function_call
+    return data
+
+
+def _llm_decode(data) -> Any:
+    from langchain_core.messages import AIMessage
+    additional_kwargs = {'function_call': data['function_call']} if data.get('function_call') else {}
+    return AIMessage(content=data['content'], additional_kwargs=additional_kwargs)
+
+
+def _structured_encode(result) -> Any:
+    return result if isinstance(result, dict) else result.model_dump()
+
+
+def _structured_decode(data) -> Any:
+    # invoke_structured validates dicts against the schema
+    return data
+
+
+CODECS: Dict[str, Tuple[Callable, Callable, Callable]] = {
+    'mindee.enqueue_and_get_inference': (_mindee_key, _mindee_encode, _mindee_decode),
+    'openai.invoke': (_llm_key, _llm_encode, _llm_decode),
+    'openai.structured.invoke': (_llm_key, _structured_encode, _structured_decode),
+    'openai.bound.invoke': (_llm_key, _llm_encode, _llm_decode),
+}
+
+
+class CassetteStore:
+    """
+    Directory of recorded provider responses
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize cassette store
+
+        Args:
+            directory: Cassette directory (default PROVIDER_CASSETTE_DIR or Backend/cassettes)
+        """
+        self.directory = directory or os.getenv('PROVIDER_CASSETTE_DIR') or DEFAULT_CASSETTE_DIR
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    def key(self, call_name: str, material: Any) -> str:
+        payload = json.dumps([call_name, material], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path(self, call_name: str, key: str) -> str:
+        return os.path.join(self.directory, call_name.split('.')[0], f"{key}.json")
+
+    def load(self, call_name: str, key: str) -> Optional[Dict]:
+        try:
+            with open(self.path(call_name, key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, call_name: str, key: str, response: Any, seconds: float, material: Any):
+        path = self.path(call_name, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        record = {
+            'call': call_name,
+            'recorded_at': datetime.utcnow().isoformat() + 'Z',
+            'latency_seconds': round(seconds, 4),
+            'request': material,
+            'response': response
+        }
+        # Write then rename, so a concurrent replay never reads a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.recorded += 1
+
+    def wrap(self, call_name: str, target: Any, fn: Callable[..., Any], mode: Optional[str] = None,
+             context: Optional[str] = None) -> Callable[..., Any]:
+        """
+        Wrap an outbound method with record / replay
+
+        Args:
+            call_name: '<provider>.<method>' (a key of CODECS)
+            target: Client object the method belongs to
+            fn: Bound outbound method
+            mode: Cassette mode (default PROVIDER_CASSETTE_MODE)
+            context: Extra key material (e.g. the output schema of a structured call)
+
+        Returns:
+            fn itself when the mode is 'off' or the call has no codec, else a wrapper
+        """
+        mode = mode or cassette_mode()
+        if mode == OFF or call_name not in CODECS:
+            return fn
+        key_material, encode, decode = CODECS[call_name]
+        provider = call_name.split('.')[0]
+
+        def _call(*args, **kwargs):
+            material = key_material(target, args, kwargs)
+            if context:
+                material['context'] = context
+            key = self.key(call_name, material)
+            if mode in (REPLAY, AUTO):
+                record = self.load(call_name, key)
+                if record is not None:
+                    with self._lock:
+                        self.hits += 1
+                    delay = replay_latency(provider, record.get('latency_seconds', 0.0))
+                    if delay:
+                        time.sleep(delay)
+                    return decode(record['response'])
+                with self._lock:
+                    self.misses += 1
+                if mode == REPLAY:
+                    raise CassetteMissError(f"No {call_name} cassette {key[:12]} in {self.directory}")
+            started = time.perf_counter()
+            response = fn(*args, **kwargs)
+            self.save(call_name, key, encode(response), time.perf_counter() - started, material)
+            return response
+
+        return _call
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'directory': self.directory, 'hits': self.hits, 'misses': self.misses, 'recorded': self.recorded}
+
+
+_store: Optional[CassetteStore] = None
+_store_lock = threading.Lock()
+
+
+def get_cassette_store() -> CassetteStore:
+    """Get the process-wide cassette store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CassetteStore()
+    return _store
@@ -0,0 +1,133 @@
+"""
+Shared Date Parsing
+Memoized multi-format date parsing (each value with the first matching format),
+plus a vectorized pandas path for transaction date columns.
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Raw string -> parsed result entries kept by the shared LRU
+DATE_PARSE_CACHE_SIZE = 8192
+
+MONTH_NUMBERS = {
+    'JANUARY': '01', 'FEBRUARY': '02', 'MARCH': '03', 'APRIL': '04',
+    'MAY': '05', 'JUNE': '06', 'JULY': '07', 'AUGUST': '08',
+    'SEPTEMBER': '09', 'OCTOBER': '10', 'NOVEMBER': '11', 'DECEMBER': '12',
+    'JAN': '01', 'FEB': '02', 'MAR': '03', 'APR': '04',
+    'JUN': '06', 'JUL': '07', 'AUG': '08',
+    'SEP': '09', 'OCT': '10', 'NOV': '11', 'DEC': '12'
+}
+
+# Full names before abbreviations so 'JUNE' is not read as 'JUN'
+_MONTH_NAME_DATE = re.compile(
+    r'(' + '|'.join(sorted(MONTH_NUMBERS, key=len, reverse=True)) + r')\s+(\d{1,2}),?\s+(\d{4})',
+    re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=DATE_PARSE_CACHE_SIZE)
+def _parse_with_formats(text: str, formats: Tuple[str, ...]) -> Tuple[Optional[datetime], Optional[str]]:
+    """Try each format in order; returns (datetime, winning format) or (None, None)"""
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt), fmt
+        except ValueError:
+            continue
+    return None, None
+
+
+def parse_date(value, formats: Sequence[str]) -> Optional[datetime]:
+    """
+    Parse a date string using the first matching format (results are memoized)
+
+    Args:
+        value: Raw date value (stripped and converted to str)
+        formats: strptime formats in priority order
+
+    Returns:
+        datetime or None if no format matches
+    """
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    return _parse_with_formats(text, tuple(formats))[0]
+
+
+def parse_month_name_date(value: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Find a 'Month DD, YYYY' date (full or abbreviated month name)
+
+    Returns:
+        (month number, zero-padded day, year) strings, or None
+    """
+    if not value:
+        return None
+    return _parse_month_name_cached(value)
+
+
+@lru_cache(maxsize=DATE_PARSE_CACHE_SIZE)
+def _parse_month_name_cached(value: str) -> Optional[Tuple[str, str, str]]:
+    match = _MONTH_NAME_DATE.search(value)
+    if not match:
+        return None
+    return MONTH_NUMBERS[match.group(1).upper()], match.group(2).zfill(2), match.group(3)
+
+
+def parse_date_array(values: Sequence, formats: Sequence[str]) -> np.ndarray:
+    """
+    Parse a column of date values with vectorized passes
+
+    Runs pd.to_datetime(format=...) once per format in priority order, each pass
+    only over the values still unparsed, so every value gets the first format that
+    matches it - the same result as parse_date(), and the same date features the
+    models were trained on (a column is never reinterpreted as day-first because
+    some of its values are). Values no pass covers (e.g. years outside pandas'
+    range) are parsed one by one through the memoized parser. Each distinct string
+    is parsed once.
+
+    Args:
+        values: Raw date values (None/empty allowed)
+        formats: strptime formats in priority order
+
+    Returns:
+        datetime64[D] array, NaT where a value could not be parsed
+    """
+    formats = tuple(formats)
+    result = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[D]')
+    if not len(values):
+        return result
+
+    texts = ['' if value is None else str(value).strip() for value in values]
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object))
+    parsed_uniques = np.full(len(uniques), np.datetime64('NaT'), dtype='datetime64[D]')
+    unique_texts = pd.Series(uniques, dtype=object)
+    pending = (unique_texts != '').to_numpy()
+    for fmt in formats:
+        if not pending.any():
+            break
+        positions = np.flatnonzero(pending)
+        parsed = pd.to_datetime(unique_texts.iloc[positions], format=fmt, errors='coerce')
+        parsed = parsed.to_numpy(dtype='datetime64[ns]')
+        matched = ~np.isnat(parsed)
+        parsed_uniques[positions[matched]] = parsed[matched].astype('datetime64[D]')
+        pending[positions[matched]] = False
+
+    for index in np.flatnonzero(pending):
+        parsed_value = _parse_with_formats(unique_texts.iat[index], formats)[0]
+        if parsed_value:
+            parsed_uniques[index] = np.datetime64(parsed_value.date(), 'D')
+    return parsed_uniques[codes]
+
+
+def clear_date_cache():
+    """Clear the shared parse caches"""
+    _parse_with_formats.cache_clear()
+    _parse_month_name_cached.cache_clear()
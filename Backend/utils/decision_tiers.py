@@ -0,0 +1,254 @@
+"""
+Decision Tiers
+Deterministic decisions for clear-cut ML scores, so only ambiguous documents pay for an LLM call
+
+The document agents' policy rules (repeat offenders, first uploads, duplicates)
+already decide many documents without the LLM. The ones left over reach the
+decision-tier engine just before the LLM call:
+
+- low tier: fraud_risk_score <= low_risk_max, no fraud history and not a duplicate
+  -> APPROVE
+- high tier: fraud_risk_score >= high_risk_min
+  -> REJECT (ESCALATE where the agent's policy forbids rejecting, e.g. a new customer)
+- everything in between goes to the LLM
+
+Decisions use the agents' output schema (recommendation, confidence_score, summary,
+reasoning, key_indicators, actionable_recommendations, fraud_types,
+fraud_explanations) and go through the agent's own result validation, like LLM
+decisions. As with the agents' policy rejections, fraud types are left to the LLM:
+ML anomalies are reported as key indicators, not as fraud types. Per document type
+counters report how many documents skipped the LLM (policy rules or tiers) out of
+all analyzed.
+
+Thresholds come from LLM_BYPASS_LOW_RISK_MAX / LLM_BYPASS_HIGH_RISK_MIN, and can be
+overridden per document type (e.g. LLM_BYPASS_CHECK_LOW_RISK_MAX).
+LLM_BYPASS_ENABLED=false sends every undecided document to the LLM.
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LOW_RISK = 'low_risk'
+HIGH_RISK = 'high_risk'
+AMBIGUOUS = 'ambiguous'
+
+DEFAULT_LOW_RISK_MAX = 0.05
+DEFAULT_HIGH_RISK_MIN = 0.90
+
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def _env_float(names: List[str], default: float) -> float:
+    for name in names:
+        value = os.getenv(name)
+        if value not in (None, ''):
+            return float(value)
+    return default
+
+
+def _record(document_type: str, outcome: str):
+    with _stats_lock:
+        counters = _stats.setdefault(
+            document_type, {'documents': 0, 'llm_calls': 0, LOW_RISK: 0, HIGH_RISK: 0}
+        )
+        counters[outcome] += 1
+
+
+def get_decision_tier_stats() -> Dict[str, Any]:
+    """
+    LLM bypass counters of this process
+
+    Returns:
+        Dict with overall and per document type 'documents', 'llm_calls',
+        'low_risk' / 'high_risk' tier decisions, 'policy' decisions (policy rules
+        that returned before the engine) and 'skip_rate' (share that skipped the LLM)
+    """
+    with _stats_lock:
+        document_types = {name: dict(counters) for name, counters in _stats.items()}
+    totals = {'documents': 0, 'llm_calls': 0, LOW_RISK: 0, HIGH_RISK: 0}
+    for counters in document_types.values():
+        for name in totals:
+            totals[name] += counters[name]
+    for counters in list(document_types.values()) + [totals]:
+        skipped = max(counters['documents'] - counters['llm_calls'], 0)
+        counters['policy'] = max(skipped - counters[LOW_RISK] - counters[HIGH_RISK], 0)
+        counters['skip_rate'] = round(skipped / counters['documents'], 4) if counters['documents'] else 0.0
+    totals['document_types'] = document_types
+    return totals
+
+
+def reset_decision_tier_stats():
+    """Reset the bypass counters"""
+    with _stats_lock:
+        _stats.clear()
+
+
+class DecisionTierEngine:
+    """
+    Tiered routing of one document type between deterministic decisions and the LLM
+    """
+
+    def __init__(self, document_type: str, document_label: Optional[str] = None,
+                 low_risk_max: Optional[float] = None, high_risk_min: Optional[float] = None,
+                 enabled: Optional[bool] = None):
+        """
+        Initialize decision-tier engine
+
+        Args:
+            document_type: Document type used in stats and env overrides (e.g. 'check')
+            document_label: Name used in decision text (default: document_type with spaces)
+            low_risk_max: Highest score approved without the LLM
+            high_risk_min: Lowest score rejected without the LLM
+            enabled: Route through tiers (default LLM_BYPASS_ENABLED, true)
+        """
+        prefix = f"LLM_BYPASS_{document_type.upper()}_"
+        self.document_type = document_type
+        self.document_label = document_label or document_type.replace('_', ' ')
+        self.low_risk_max = low_risk_max if low_risk_max is not None else _env_float(
+            [prefix + 'LOW_RISK_MAX', 'LLM_BYPASS_LOW_RISK_MAX'], DEFAULT_LOW_RISK_MAX)
+        self.high_risk_min = high_risk_min if high_risk_min is not None else _env_float(
+            [prefix + 'HIGH_RISK_MIN', 'LLM_BYPASS_HIGH_RISK_MIN'], DEFAULT_HIGH_RISK_MIN)
+        if enabled is None:
+            enabled = os.getenv('LLM_BYPASS_ENABLED', 'true').lower() == 'true'
+        self.enabled = enabled
+        if self.low_risk_max >= self.high_risk_min:
+            raise ValueError(
+                f"low_risk_max ({self.low_risk_max}) must be below high_risk_min ({self.high_risk_min})"
+            )
+
+    def record_document(self):
+        """Count a document entering the agent (call once per analyze_fraud)"""
+        _record(self.document_type, 'documents')
+
+    def classify(self, fraud_risk_score: float, fraud_count: int = 0, is_duplicate: bool = False) -> str:
+        """
+        Tier of a document
+
+        Args:
+            fraud_risk_score: ML fraud risk score (0-1)
+            fraud_count: Previous fraud decisions for the customer
+            is_duplicate: Document was submitted before
+
+        Returns:
+            'low_risk', 'high_risk' or 'ambiguous'
+        """
+        if not self.enabled:
+            return AMBIGUOUS
+        if fraud_risk_score >= self.high_risk_min:
+            return HIGH_RISK
+        if fraud_risk_score <= self.low_risk_max and not fraud_count and not is_duplicate:
+            return LOW_RISK
+        return AMBIGUOUS
+
+    def decide(
+        self,
+        subject_name: str,
+        ml_analysis: Optional[Dict],
+        customer_info: Optional[Dict] = None,
+        is_duplicate: bool = False,
+        allow_reject: bool = True,
+        validate: Optional[Callable[[Dict], Dict]] = None
+    ) -> Optional[Dict]:
+        """
+        Deterministic decision for a clear-cut document, or None to call the LLM
+
+        Args:
+            subject_name: Customer / payer / employee name for the decision text
+            ml_analysis: ML fraud analysis results
+            customer_info: Customer history (fraud_count, escalate_count)
+            is_duplicate: Document was submitted before
+            allow_reject: False when the agent's policy forbids a REJECT (high tier escalates)
+            validate: The agent's result validation (e.g. _validate_and_format_result), applied
+                      to the decision as to an LLM result
+
+        Returns:
+            Decision dict in the agents' output schema, or None (counted as an LLM call)
+        """
+        ml_analysis = ml_analysis or {}
+        customer_info = customer_info or {}
+        fraud_risk_score = float(ml_analysis.get('fraud_risk_score', 0.0) or 0.0)
+        fraud_count = customer_info.get('fraud_count', 0) or 0
+        escalate_count = customer_info.get('escalate_count', 0) or 0
+
+        tier = self.classify(fraud_risk_score, fraud_count, is_duplicate)
+        if tier == AMBIGUOUS:
+            _record(self.document_type, 'llm_calls')
+            return None
+
+        _record(self.document_type, tier)
+        logger.info(
+            f"Decision tier {tier} for {self.document_label} of {subject_name} "
+            f"(fraud_risk_score={fraud_risk_score:.1%}); skipping LLM analysis"
+        )
+        if tier == LOW_RISK:
+            decision = self._low_risk_approval(subject_name, fraud_risk_score, escalate_count)
+        else:
+            decision = self._high_risk_decision(subject_name, fraud_risk_score, ml_analysis, escalate_count, allow_reject)
+        if validate is not None:
+            decision = dict(validate(decision), decision_tier=tier)
+        return decision
+
+    def _low_risk_approval(self, subject_name: str, fraud_risk_score: float, escalate_count: int) -> Dict:
+        return {
+            'recommendation': 'APPROVE',
+            'confidence_score': round(1.0 - fraud_risk_score, 4),
+            'summary': (
+                f"Automatic approval: {subject_name} has no fraud history and the {self.document_label} "
+                f"fraud risk score ({fraud_risk_score:.1%}) is at or below {self.low_risk_max:.0%}."
+            ),
+            'reasoning': [
+                f"Fraud risk score ({fraud_risk_score:.1%}) is in the low-risk tier (<= {self.low_risk_max:.0%})",
+                f"{subject_name} has no recorded fraud (fraud_count = 0)",
+                f"Previous escalations: {escalate_count}",
+                'LLM analysis skipped - clear-cut low-risk decision'
+            ],
+            'key_indicators': [
+                f'Fraud risk score: {fraud_risk_score:.1%}',
+                'Fraud count: 0',
+                'Policy: low-risk tier is approved'
+            ],
+            'actionable_recommendations': [],
+            'fraud_types': [],
+            'fraud_explanations': [],
+            'decision_tier': LOW_RISK
+        }
+
+    def _high_risk_decision(self, subject_name: str, fraud_risk_score: float, ml_analysis: Dict,
+                            escalate_count: int, allow_reject: bool) -> Dict:
+        recommendation = 'REJECT' if allow_reject else 'ESCALATE'
+        ml_reasons = list(ml_analysis.get('fraud_reasons') or ml_analysis.get('anomalies') or [])[:3]
+        if allow_reject:
+            actions = [
+                'Block this transaction immediately',
+                'Flag customer account for fraud investigation',
+                f'Review the {self.document_label} against the ML anomalies listed'
+            ]
+        else:
+            actions = [
+                f'Route this {self.document_label} to the manual review queue',
+                'Verify the document with the issuer before any decision'
+            ]
+        return {
+            'recommendation': recommendation,
+            'confidence_score': round(fraud_risk_score, 4),
+            'summary': (
+                f"Automatic {recommendation.lower()}: the {self.document_label} of {subject_name} has fraud "
+                f"risk score {fraud_risk_score:.1%}, at or above {self.high_risk_min:.0%}."
+            ),
+            'reasoning': [
+                f"Fraud risk score ({fraud_risk_score:.1%}) is in the high-risk tier (>= {self.high_risk_min:.0%})",
+                f"Previous escalations: {escalate_count}",
+                *([] if allow_reject else ['Policy does not allow rejecting this customer; escalating instead']),
+                'LLM analysis skipped - clear-cut high-risk decision'
+            ],
+            'key_indicators': [f'Fraud risk score: {fraud_risk_score:.1%}'] + ml_reasons,
+            'actionable_recommendations': actions,
+            'fraud_types': [],  # Only the LLM provides fraud_types - automatic decisions skip it
+            'fraud_explanations': [],
+            'decision_tier': HIGH_RISK
+        }
@@ -0,0 +1,224 @@
+"""
+LLM Response Cache
+Exact-match cache of LLM responses, keyed on the model and the final (sanitized) prompt
+
+Re-analyzing the same document (re-uploads, retries, re-runs of a saved analysis)
+sends the same prompt to the same model; the cached response is returned instead
+of paying for and waiting on another completion. Entries live in the shared cache
+backend (utils.cache - Redis or in-memory) with a configurable TTL.
+
+Keys carry a prompt version - a hash of the source of the prompt modules - so
+editing a prompt template invalidates every response produced with the old one
+without flushing the cache.
+
+Settings (environment, read per call):
+    LLM_CACHE_ENABLED   Cache LLM responses (default true)
+    LLM_CACHE_TTL       Entry lifetime in seconds (default 86400)
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'llm'
+
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def _cache_enabled() -> bool:
+    return os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+
+
+def _cache_ttl() -> int:
+    return int(os.getenv('LLM_CACHE_TTL', '86400'))
+
+
+def prompt_version(prompt_modules: Iterable[Any]) -> str:
+    """
+    Version of a set of prompt modules: hash of their source files
+
+    Args:
+        prompt_modules: Modules (or file paths) holding the prompt templates
+
+    Returns:
+        Short hex digest that changes whenever any of the files changes
+    """
+    digest = hashlib.sha256()
+    for module in prompt_modules:
+        path = module.__file__ if isinstance(module, ModuleType) else module
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except (OSError, TypeError):
+            # Source not available (e.g. frozen build) - fall back to the module's string constants
+            constants = sorted(
+                (name, value) for name, value in vars(module).items()
+                if isinstance(value, str) and not name.startswith('__')
+            ) if isinstance(module, ModuleType) else [str(path)]
+            digest.update(json.dumps(constants).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def canonical_messages(messages: List[Any]) -> List[List[str]]:
+    """
+    Canonical form of a chat prompt: (role, content) pairs with normalized line endings
+    and surrounding whitespace removed
+
+    Args:
+        messages: LangChain messages (anything with .type and .content) or (role, content) tuples
+    """
+    canonical = []
+    for message in messages:
+        if isinstance(message, (tuple, list)):
+            role, content = message[0], message[1]
+        else:
+            role, content = getattr(message, 'type', type(message).__name__), message.content
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True, default=str)
+        canonical.append([str(role), content.replace('\r\n', '\n').strip()])
+    return canonical
+
+
+def _record(namespace: str, outcome: str):
+    with _stats_lock:
+        counters = _stats.setdefault(namespace, {'hits': 0, 'misses': 0, 'errors': 0})
+        counters[outcome] += 1
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """
+    Hit/miss counters of this process
+
+    Returns:
+        Dict with 'enabled', 'ttl_seconds', overall 'hits', 'misses', 'hit_rate'
+        and the same per namespace (agent)
+    """
+    with _stats_lock:
+        namespaces = {name: dict(counters) for name, counters in _stats.items()}
+    for counters in namespaces.values():
+        lookups = counters['hits'] + counters['misses']
+        counters['hit_rate'] = round(counters['hits'] / lookups, 4) if lookups else 0.0
+    hits = sum(counters['hits'] for counters in namespaces.values())
+    misses = sum(counters['misses'] for counters in namespaces.values())
+    return {
+        'enabled': _cache_enabled(),
+        'ttl_seconds': _cache_ttl(),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        'namespaces': namespaces
+    }
+
+
+def reset_llm_cache_stats():
+    """Reset the hit/miss counters"""
+    with _stats_lock:
+        _stats.clear()
+
+
+class LLMResponseCache:
+    """
+    Response cache for one agent's LLM calls
+    """
+
+    def __init__(self, namespace: str, prompt_modules: Iterable[Any] = (),
+                 ttl: Optional[int] = None, cache=None):
+        """
+        Initialize LLM response cache
+
+        Args:
+            namespace: Agent name used in keys and stats (e.g. 'check')
+            prompt_modules: Modules holding the agent's prompt templates; a change to
+                any of them changes the prompt version and so every key
+            ttl: Entry lifetime in seconds (default LLM_CACHE_TTL, 24 hours)
+            cache: CacheManager (default: the global one from utils.cache)
+        """
+        self.namespace = namespace
+        self.version = prompt_version(prompt_modules)
+        self.ttl = ttl
+        self._cache = cache
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            from utils.cache import get_cache_manager
+            self._cache = get_cache_manager()
+        return self._cache
+
+    def key(self, model_name: str, messages: List[Any]) -> str:
+        """
+        Cache key for a prompt
+
+        Args:
+            model_name: Model the prompt is sent to
+            messages: Final prompt messages
+
+        Returns:
+            'llm:{namespace}:{prompt version}:{sha256 of model and canonical messages}'
+        """
+        payload = json.dumps([model_name, canonical_messages(messages)], ensure_ascii=False)
+        digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        return f"{KEY_PREFIX}:{self.namespace}:{self.version}:{digest}"
+
+    def invoke(self, llm, messages: List[Any], model_name: Optional[str] = None) -> str:
+        """
+        Response text for messages, from the cache or from llm.invoke()
+
+        Args:
+            llm: LangChain chat model
+            messages: Final prompt messages
+            model_name: Model name for the key (default: llm.model_name)
+
+        Returns:
+            Response content
+        """
+        model_name = model_name or getattr(llm, 'model_name', None) or getattr(llm, 'model', '')
+        return self.get_or_call(messages, model_name, lambda: llm.invoke(messages).content)
+
+    def get_or_call(self, messages: List[Any], model_name: str, call: Callable[[], str]) -> str:
+        """
+        Cached text for messages, or the result of call() (cached when non-empty)
+
+        Args:
+            messages: Prompt messages (and any extra (role, content) entries that shape the response)
+            model_name: Model the prompt is sent to
+            call: Produces the response text on a miss
+
+        Returns:
+            Response text
+        """
+        if not _cache_enabled():
+            return call()
+
+        key = self.key(model_name, messages)
+        try:
+            cached = self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            cached = None
+            _record(self.namespace, 'errors')
+        if isinstance(cached, str):
+            _record(self.namespace, 'hits')
+            logger.info(f"LLM cache hit ({self.namespace})")
+            return cached
+
+        _record(self.namespace, 'misses')
+        content = call()
+        if isinstance(content, str) and content.strip():
+            self.cache.set(key, content, ttl=self.ttl or _cache_ttl())
+        return content
+
+    def discard(self, messages: List[Any], model_name: str) -> bool:
+        """Remove one cached response (e.g. one the caller could not parse)"""
+        return self.cache.delete(self.key(model_name, messages))
+
+    def clear(self) -> int:
+        """Remove this agent's cached responses (all prompt versions)"""
+        return self.cache.clear(f"{KEY_PREFIX}:{self.namespace}:*")
@@ -0,0 +1,59 @@
+"""
+LLM Output Schemas
+Pydantic models for the agents' structured (schema-constrained) LLM output
+
+Used with utils.structured_output.invoke_structured(). Models forbid unknown
+fields and constrain enums and ranges, so a reply either validates as-is or is
+retried once - no text repair.
+
+Requires pydantic v2 (installed with langchain); import this module only where
+the LLM is used.
+"""
+
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class FraudExplanation(BaseModel):
+    """Why one fraud type applies (check prompts use 'explanation', others 'reasons')"""
+    model_config = ConfigDict(extra='forbid')
+
+    type: str = Field(min_length=1, description="Fraud type ID, e.g. SIGNATURE_FORGERY")
+    explanation: Optional[str] = Field(default=None, description="Explanation with specific data references")
+    reasons: Optional[List[str]] = Field(default=None, description="Specific reasons with document data")
+
+
+class DocumentDecision(BaseModel):
+    """Fraud decision of the check, paystub and bank statement agents"""
+    model_config = ConfigDict(extra='forbid')
+
+    recommendation: Literal['APPROVE', 'REJECT', 'ESCALATE']
+    confidence_score: float = Field(ge=0.0, le=1.0)
+    summary: str
+    reasoning: List[str] = Field(default_factory=list)
+    key_indicators: List[str] = Field(default_factory=list)
+    actionable_recommendations: List[str] = Field(default_factory=list)
+    fraud_types: List[str] = Field(default_factory=list)
+    fraud_explanations: List[FraudExplanation] = Field(default_factory=list)
+
+
+class PatternRecommendation(BaseModel):
+    """Recommendation for one fraud pattern of a real-time analysis"""
+    model_config = ConfigDict(extra='forbid')
+
+    title: str = Field(description="SEVERITY: Exact Fraud Pattern Name")
+    description: str
+    fraud_rate: str
+    total_amount: str
+    case_count: str
+    immediate_actions: List[str]
+    prevention_steps: List[str]
+    monitor: str
+
+
+class PatternRecommendations(BaseModel):
+    """One recommendation per fraud pattern, in the order of the prompt"""
+    model_config = ConfigDict(extra='forbid')
+
+    recommendations: List[PatternRecommendation]
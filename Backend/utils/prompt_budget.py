@@ -0,0 +1,218 @@
+"""
+Prompt Token Budget
+Token counting and budget-driven compaction for the document agents' prompts
+
+Each agent's prompt is a static instruction prefix (system prompt + recommendation
+guidelines) followed by the per-document analysis text. The prefix is kept
+byte-identical across calls so the provider's prompt (prefix) caching applies;
+only the analysis text varies. fit_prompt() renders the analysis text at
+decreasing detail levels - fewer transactions, risk factors, history entries -
+until prefix + text fit the model's prompt budget, truncates as a last resort,
+and logs the token count of every call.
+
+Tokens are counted with tiktoken; without it a 4-characters-per-token estimate is used.
+"""
+
+import os
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Prompt token budget by model name prefix (context window minus room for the completion)
+MODEL_PROMPT_BUDGETS = (
+    ('gpt-4o', 24000),
+    ('gpt-4-turbo', 24000),
+    ('gpt-4.1', 24000),
+    ('gpt-4', 6000),
+    ('gpt-3.5-turbo', 12000),
+    ('o1', 24000),
+    ('o3', 24000),
+    ('o4', 24000),
+)
+DEFAULT_PROMPT_BUDGET = 6000
+
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = "\n[... truncated to fit the prompt token budget ...]"
+
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+@lru_cache(maxsize=16)
+def _get_encoding(model_name: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        # Unknown to this tiktoken version: o-series and gpt-4o use o200k, older models cl100k
+        name = 'o200k_base' if model_name.startswith(('o', 'gpt-4o', 'gpt-4.1')) else 'cl100k_base'
+        try:
+            return tiktoken.get_encoding(name)
+        except ValueError:
+            return tiktoken.get_encoding('cl100k_base')
+
+
+def count_tokens(text: str, model_name: str = 'gpt-4') -> int:
+    """
+    Count prompt tokens
+
+    Args:
+        text: Prompt text
+        model_name: Model whose tokenizer is used
+
+    Returns:
+        Token count (estimated from length when tiktoken is not installed)
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model_name)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=64)
+def _count_static(text: str, model_name: str) -> int:
+    return count_tokens(text, model_name)
+
+
+def prompt_token_budget(model_name: str) -> int:
+    """Prompt token budget for a model (PROMPT_TOKEN_BUDGET overrides)"""
+    override = os.getenv('PROMPT_TOKEN_BUDGET')
+    if override:
+        return int(override)
+    for prefix, budget in MODEL_PROMPT_BUDGETS:
+        if model_name.startswith(prefix):
+            return budget
+    return DEFAULT_PROMPT_BUDGET
+
+
+def compact_items(items: Sequence[Any], max_items: Optional[int], label: str = 'items',
+                  omitted_summary: Optional[Callable[[Sequence[Any]], str]] = None) -> List[Any]:
+    """
+    Keep the first max_items of a prompt list and summarize the rest in one line
+
+    Args:
+        items: List entries (risk factors, transactions, history rows)
+        max_items: Entries to keep (None keeps all)
+        label: Name of the entries in the summary line
+        omitted_summary: Builds extra detail about the omitted entries (e.g. their totals)
+
+    Returns:
+        Kept entries, followed by a '... and N more <label>' line if any were dropped
+    """
+    items = list(items or [])
+    if max_items is None or len(items) <= max_items:
+        return items
+    kept, omitted = items[:max_items], items[max_items:]
+    summary = f"... and {len(omitted)} more {label}"
+    if omitted_summary:
+        summary += f" ({omitted_summary(omitted)})"
+    return kept + [summary]
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model_name: str = 'gpt-4') -> str:
+    """Cut text to at most max_tokens tokens, marking the cut"""
+    if count_tokens(text, model_name) <= max_tokens:
+        return text
+    encoding = _get_encoding(model_name)
+    marker_tokens = count_tokens(TRUNCATION_MARKER, model_name)
+    keep = max(max_tokens - marker_tokens, 0)
+    if encoding is None:
+        return text[:keep * CHARS_PER_TOKEN] + TRUNCATION_MARKER
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:keep]) + TRUNCATION_MARKER
+
+
+def _record(namespace: str, tokens: int, compacted: bool, truncated: bool):
+    with _stats_lock:
+        counters = _stats.setdefault(
+            namespace, {'calls': 0, 'total_tokens': 0, 'max_tokens': 0, 'compacted': 0, 'truncated': 0}
+        )
+        counters['calls'] += 1
+        counters['total_tokens'] += tokens
+        counters['max_tokens'] = max(counters['max_tokens'], tokens)
+        counters['compacted'] += int(compacted)
+        counters['truncated'] += int(truncated)
+
+
+def get_prompt_token_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Prompt token counters of this process
+
+    Returns:
+        Per namespace (agent): calls, total/avg/max prompt tokens, and how many
+        prompts were compacted or truncated to fit the budget
+    """
+    with _stats_lock:
+        stats = {name: dict(counters) for name, counters in _stats.items()}
+    for counters in stats.values():
+        counters['avg_tokens'] = round(counters['total_tokens'] / counters['calls'], 1) if counters['calls'] else 0.0
+    return stats
+
+
+def reset_prompt_token_stats():
+    """Reset the token counters"""
+    with _stats_lock:
+        _stats.clear()
+
+
+def fit_prompt(
+    namespace: str,
+    model_name: str,
+    static_prefix: str,
+    render: Callable[..., str],
+    levels: Iterable[Dict[str, Any]] = ({},),
+    budget: Optional[int] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Render the variable part of a prompt within the model's token budget
+
+    Args:
+        namespace: Agent name for logs and stats (e.g. 'bank_statement')
+        model_name: Model the prompt is sent to
+        static_prefix: Instruction prefix sent unchanged before the variable text
+        render: Builds the variable text; called with the keyword limits of a level
+        levels: Limits from most to least detailed; the first level that fits is used
+        budget: Prompt token budget (default: prompt_token_budget(model_name))
+
+    Returns:
+        (variable text, info) where info has 'static_tokens', 'variable_tokens',
+        'total_tokens', 'budget', 'level' and 'truncated'
+    """
+    budget = budget or prompt_token_budget(model_name)
+    static_tokens = _count_static(static_prefix, model_name)
+    available = max(budget - static_tokens, 0)
+
+    levels = list(levels) or [{}]
+    text, variable_tokens, level = '', 0, 0
+    for level, limits in enumerate(levels):
+        text = render(**limits)
+        variable_tokens = count_tokens(text, model_name)
+        if variable_tokens <= available:
+            break
+
+    truncated = variable_tokens > available
+    if truncated:
+        text = truncate_to_tokens(text, available, model_name)
+        variable_tokens = count_tokens(text, model_name)
+
+    total = static_tokens + variable_tokens
+    _record(namespace, total, compacted=level > 0, truncated=truncated)
+    logger.info(
+        f"Prompt tokens ({namespace}, {model_name}): static={static_tokens} variable={variable_tokens} "
+        f"total={total}/{budget} level={level}{' truncated' if truncated else ''}"
+    )
+    return text, {
+        'static_tokens': static_tokens,
+        'variable_tokens': variable_tokens,
+        'total_tokens': total,
+        'budget': budget,
+        'level': level,
+        'truncated': truncated
+    }
@@ -0,0 +1,503 @@
+"""
+Outbound Call Resilience
+Deadlines, circuit breaking, retries, concurrency limits and latency histograms
+for calls to external providers (OpenAI, Mindee)
+
+Every call goes through call_with_resilience(provider, fn):
+
+- deadline: each attempt runs on the provider's worker pool and the caller waits
+  at most `timeout` seconds, so a hung provider cannot pin a Flask worker
+- circuit breaker: after `failure_threshold` consecutive provider failures
+  (timeouts, connection errors, 408/429/5xx) calls fail fast with
+  CircuitOpenError for `reset_timeout` seconds, then one trial call decides
+  whether the circuit closes again
+- retries: transient failures are retried up to `max_retries` times with full
+  jitter backoff; client errors (4xx, validation) are raised at once
+- concurrency: at most `concurrency` calls in flight per provider; an attempt
+  that cannot start within its deadline raises ProviderBusyError
+- hedging (opt-in, `hedge_after` > 0): if an attempt has not finished after
+  hedge_after seconds a second identical request is sent and the first reply wins
+- latency histograms and outcome counters per provider (get_resilience_stats)
+
+ResilientClient wraps a client object (LangChain chat model, Mindee ClientV2) so
+its outbound methods go through the same path (and through record / replay,
+see utils.cassettes). Errors raised here reach the
+callers' existing fallbacks (e.g. _create_fallback_decision).
+
+Settings come from RESILIENCE_<PROVIDER>_<SETTING> environment variables, e.g.
+RESILIENCE_OPENAI_TIMEOUT=30 or RESILIENCE_MINDEE_CONCURRENCY=2.
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, fields, replace
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from utils.cassettes import get_cassette_store
+from utils.stage_timing import stage
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Latency histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+# Exception class names of the OpenAI / httpx / requests clients that signal a transient failure
+RETRYABLE_ERROR_NAMES = (
+    'APIConnectionError', 'APITimeoutError', 'RateLimitError', 'InternalServerError',
+    'ServiceUnavailableError', 'ConnectError', 'ReadTimeout', 'ConnectTimeout', 'RemoteProtocolError'
+)
+
+
+class ResilienceError(RuntimeError):
+    """Base class of the errors raised by the resilience layer"""
+
+
+class CircuitOpenError(ResilienceError):
+    """The provider's circuit is open; the call was not attempted"""
+
+
+class ProviderBusyError(ResilienceError):
+    """The provider's concurrency limit was reached for the whole deadline"""
+
+
+class CallTimeoutError(ResilienceError, TimeoutError):
+    """An attempt did not finish within the provider deadline"""
+
+
+@dataclass(frozen=True)
+class ProviderPolicy:
+    """Resilience settings of one provider"""
+    timeout: float = 60.0
+    max_retries: int = 2
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    concurrency: int = 8
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    hedge_after: float = 0.0
+
+
+DEFAULT_POLICIES = {
+    'openai': ProviderPolicy(timeout=60.0, max_retries=2, concurrency=8, failure_threshold=5, reset_timeout=30.0),
+    # enqueue_and_get_inference includes Mindee's server-side polling, so the deadline is longer
+    'mindee': ProviderPolicy(timeout=120.0, max_retries=1, concurrency=4, failure_threshold=5, reset_timeout=60.0),
+}
+
+
+def policy_from_env(provider: str) -> ProviderPolicy:
+    """
+    Policy of a provider: its defaults overridden by RESILIENCE_<PROVIDER>_<SETTING>
+
+    Args:
+        provider: Provider name (e.g. 'openai')
+
+    Returns:
+        ProviderPolicy
+    """
+    policy = DEFAULT_POLICIES.get(provider, ProviderPolicy())
+    overrides = {}
+    for field in fields(ProviderPolicy):
+        value = os.getenv(f"RESILIENCE_{provider.upper()}_{field.name.upper()}")
+        if value not in (None, ''):
+            overrides[field.name] = type(getattr(policy, field.name))(value)
+    return replace(policy, **overrides)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Transient provider failure (timeout, connection error, 408/429/5xx) worth a retry"""
+    if isinstance(error, (CallTimeoutError, TimeoutError, ConnectionError)):
+        return True
+    for attr in ('status_code', 'http_status', 'status', 'code'):
+        status = getattr(error, attr, None)
+        if isinstance(status, int):
+            return status in RETRYABLE_STATUS_CODES
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS_CODES
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker (closed -> open -> half open -> closed)
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now (admits one trial call when half open)"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(f"Circuit opened after {self._failures} consecutive failures")
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+
+    def release_trial(self):
+        """End a half-open trial that was neither a success nor a provider failure"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class OutboundProvider:
+    """
+    Breaker, concurrency limit, worker pool and metrics of one provider
+    """
+
+    def __init__(self, name: str, policy: Optional[ProviderPolicy] = None):
+        """
+        Initialize provider
+
+        Args:
+            name: Provider name used in logs and stats
+            policy: Resilience settings (default: policy_from_env(name))
+        """
+        self.name = name
+        self.policy = policy or policy_from_env(name)
+        self.breaker = CircuitBreaker(self.policy.failure_threshold, self.policy.reset_timeout)
+        self._slots = threading.BoundedSemaphore(self.policy.concurrency)
+        # Hedged requests may add one worker per call in flight
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.policy.concurrency * 2, thread_name_prefix=f"outbound-{name}"
+        )
+        self._stats_lock = threading.Lock()
+        self._counters = {
+            'calls': 0, 'successes': 0, 'failures': 0, 'timeouts': 0,
+            'retries': 0, 'hedges': 0, 'short_circuited': 0, 'rejected_busy': 0
+        }
+        self._histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._latency_sum = 0.0
+        self._latency_count = 0
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self._counters[name] += amount
+
+    def _observe(self, seconds: float):
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        with self._stats_lock:
+            self._histogram[index] += 1
+            self._latency_sum += seconds
+            self._latency_count += 1
+
+    def _submit(self, fn: Callable[[], Any], wait_seconds: float, block: bool = True):
+        """Start fn on the worker pool once a concurrency slot is free (None if none freed in time)"""
+        if not self._slots.acquire(blocking=block, timeout=wait_seconds if block else None):
+            return None
+        started = time.monotonic()
+
+        def _run():
+            try:
+                return fn()
+            finally:
+                # Released when the call really ends, so abandoned (timed out) calls still hold their slot
+                self._observe(time.monotonic() - started)
+                self._slots.release()
+
+        return self._executor.submit(_run)
+
+    def _attempt(self, fn: Callable[[], Any]) -> Any:
+        deadline = time.monotonic() + self.policy.timeout
+        future = self._submit(fn, self.policy.timeout)
+        if future is None:
+            self._count('rejected_busy')
+            raise ProviderBusyError(
+                f"{self.name}: {self.policy.concurrency} calls already in flight for {self.policy.timeout:.0f}s"
+            )
+
+        pending = {future}
+        hedge_after = self.policy.hedge_after
+        if 0 < hedge_after < self.policy.timeout:
+            done, _ = wait(pending, timeout=hedge_after)
+            if not done:
+                hedge = self._submit(fn, 0, block=False)
+                if hedge is not None:
+                    self._count('hedges')
+                    logger.info(f"{self.name}: no reply after {hedge_after:.2f}s, sent hedged request")
+                    pending.add(hedge)
+
+        first_error = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for finished in done:
+                error = finished.exception()
+                if error is None:
+                    return finished.result()
+                # A failed hedge does not end the attempt while the other request is pending
+                first_error = first_error or error
+
+        for unfinished in pending:
+            unfinished.cancel()
+        if first_error is not None:
+            raise first_error
+        self._count('timeouts')
+        raise CallTimeoutError(f"{self.name}: no reply within {self.policy.timeout:.1f}s")
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call fn with deadline, breaker, retries and concurrency limit
+
+        Args:
+            fn: Function performing the outbound request
+            *args, **kwargs: Passed to fn
+
+        Returns:
+            fn's result
+
+        Raises:
+            CircuitOpenError: The circuit is open (no request was sent)
+            ProviderBusyError: No concurrency slot freed within the deadline
+            CallTimeoutError: The last attempt exceeded the deadline
+            Exception: fn's own error when it is not retryable or retries ran out
+        """
+        self._count('calls')
+        bound = (lambda: fn(*args, **kwargs)) if args or kwargs else fn
+        attempts = self.policy.max_retries + 1
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                self._count('short_circuited')
+                raise CircuitOpenError(
+                    f"{self.name}: circuit open after repeated failures; retry in up to {self.policy.reset_timeout:.0f}s"
+                )
+            try:
+                result = self._attempt(bound)
+            except ProviderBusyError:
+                self.breaker.release_trial()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # Client errors say nothing about the provider's health
+                    self.breaker.release_trial()
+                    self._count('failures')
+                    raise
+                self.breaker.record_failure()
+                if attempt == attempts - 1:
+                    self._count('failures')
+                    raise
+                delay = random.uniform(0, min(self.policy.backoff_max, self.policy.backoff_base * (2 ** attempt)))
+                logger.warning(
+                    f"{self.name} call failed ({type(e).__name__}: {str(e)[:200]}); "
+                    f"retry {attempt + 1}/{self.policy.max_retries} in {delay:.2f}s"
+                )
+                self._count('retries')
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                self._count('successes')
+                return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters, breaker state and latency histogram of this provider"""
+        with self._stats_lock:
+            stats = dict(self._counters)
+            histogram = list(self._histogram)
+            latency_sum, latency_count = self._latency_sum, self._latency_count
+        stats['circuit'] = self.breaker.state
+        stats['latency'] = {
+            'count': latency_count,
+            'avg_seconds': round(latency_sum / latency_count, 4) if latency_count else 0.0,
+            'buckets': {
+                **{f"le_{bound:g}s": count for bound, count in zip(LATENCY_BUCKETS, histogram)},
+                'le_inf': histogram[-1]
+            }
+        }
+        stats['policy'] = {field.name: getattr(self.policy, field.name) for field in fields(ProviderPolicy)}
+        return stats
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_providers: Dict[str, OutboundProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name: str) -> OutboundProvider:
+    """Get the process-wide OutboundProvider for a provider name"""
+    with _providers_lock:
+        provider = _providers.get(name)
+        if provider is None:
+            provider = _providers[name] = OutboundProvider(name)
+        return provider
+
+
+def configure_provider(name: str, policy: Optional[ProviderPolicy] = None) -> OutboundProvider:
+    """
+    Replace a provider's settings (resets its breaker and metrics)
+
+    Args:
+        name: Provider name
+        policy: New settings (default: policy_from_env(name))
+
+    Returns:
+        The new OutboundProvider
+    """
+    provider = OutboundProvider(name, policy)
+    with _providers_lock:
+        previous = _providers.get(name)
+        _providers[name] = provider
+    if previous is not None:
+        previous.shutdown()
+    return provider
+
+
+def call_with_resilience(provider: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Call an outbound function through a provider's resilience policy
+
+    Args:
+        provider: Provider name ('openai', 'mindee')
+        fn: Function performing the request
+        *args, **kwargs: Passed to fn
+
+    Returns:
+        fn's result
+    """
+    return get_provider(provider).call(fn, *args, **kwargs)
+
+
+def get_resilience_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Outbound call metrics of this process
+
+    Returns:
+        Per provider: calls, successes, failures, timeouts, retries, hedges,
+        short_circuited, rejected_busy, circuit state, latency histogram and policy
+    """
+    with _providers_lock:
+        providers = dict(_providers)
+    return {name: provider.stats() for name, provider in providers.items()}
+
+
+class ResilientClient:
+    """
+    Proxy sending a client's outbound methods through call_with_resilience()
+
+    Other attributes pass through unchanged. Methods listed in wrap_results return
+    objects whose outbound methods are wrapped as well (e.g. a chat model's
+    with_structured_output() or bind() runnable). Outbound calls are also recorded or
+    replayed by utils.cassettes and timed as a stage of the current request
+    (utils.stage_timing).
+    """
+
+    # Cassette name part of the objects returned by wrap_results methods
+    RESULT_PREFIXES = {'with_structured_output': 'structured', 'bind': 'bound'}
+
+    def __init__(self, target: Any, provider: str, methods: Iterable[str] = ('invoke',),
+                 wrap_results: Iterable[str] = ('with_structured_output', 'bind'),
+                 call_prefix: str = '', key_target: Any = None, key_context: Optional[str] = None):
+        """
+        Initialize proxy
+
+        Args:
+            target: Client object
+            provider: Provider name
+            methods: Outbound methods to wrap
+            wrap_results: Methods whose return values are wrapped with the same methods
+            call_prefix: Cassette name prefix of the methods (set for wrapped results)
+            key_target: Object whose attributes (e.g. model name) key cassettes (default: target)
+            key_context: Extra cassette key material (e.g. the output schema)
+        """
+        self._target = target
+        self._provider = provider
+        self._methods = tuple(methods)
+        self._wrap_results = tuple(wrap_results)
+        self._call_prefix = call_prefix
+        self._key_target = target if key_target is None else key_target
+        self._key_context = key_context
+
+    def _outbound(self, name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        call = get_cassette_store().wrap(
+            f"{self._provider}.{self._call_prefix}{name}", self._key_target, method, context=self._key_context
+        )
+
+        def _call(*args, **kwargs):
+            with stage(self._provider):
+                return call_with_resilience(self._provider, call, *args, **kwargs)
+
+        return _call
+
+    def _wrap_result(self, name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        def _call(*args, **kwargs):
+            argument = args[0] if args else next(iter(kwargs.values()), None)
+            context = getattr(argument, '__name__', None) or repr(argument)
+            return ResilientClient(
+                method(*args, **kwargs), self._provider, self._methods, self._wrap_results,
+                call_prefix=f"{self._call_prefix}{self.RESULT_PREFIXES.get(name, name)}.",
+                key_target=self._key_target,
+                key_context=context
+            )
+
+        return _call
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if name in self._methods:
+            return self._outbound(name, attr)
+        if name in self._wrap_results:
+            return self._wrap_result(name, attr)
+        return attr
+
+    def __repr__(self) -> str:
+        return f"ResilientClient({self._target!r}, provider={self._provider!r})"
+
+
+def openai_client_kwargs() -> Dict[str, Any]:
+    """
+    ChatOpenAI keyword arguments matching the 'openai' policy
+
+    The client's own timeout is set to the policy deadline so abandoned requests
+    end too, and its built-in retries are disabled because retries happen here.
+
+    Returns:
+        Dict with 'request_timeout' and 'max_retries'
+    """
+    return {'request_timeout': get_provider('openai').policy.timeout, 'max_retries': 0}
@@ -0,0 +1,101 @@
+"""
+Stage Timing
+Per-request durations of pipeline stages (OCR, LLM, ...), reported as a Server-Timing header
+
+The API server starts a recorder for each request when SERVER_TIMING_ENABLED is
+set; outbound clients (utils.resilience.ResilientClient) add the time spent in
+their calls to it. The recorder lives in a context variable, so calls made on
+other threads are counted when the thread runs in a copy of the request's
+context (see real_time.llm_concurrency). The load-test driver
+(scripts/load_test.py) reads the header to report per-stage percentiles.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+SERVER_TIMING_HEADER = 'Server-Timing'
+
+_current: ContextVar[Optional['StageTimings']] = ContextVar('stage_timings', default=None)
+
+
+class StageTimings:
+    """Accumulated seconds per stage of one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._seconds: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self._seconds[stage] = self._seconds.get(stage, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._seconds)
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (durations in milliseconds, 'total' = whole request)"""
+        stages = self.as_dict()
+        stages['total'] = time.perf_counter() - self.started
+        return ', '.join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in stages.items())
+
+
+def start_stage_timing():
+    """
+    Start recording stages for the current request
+
+    Returns:
+        Token for stop_stage_timing()
+    """
+    return _current.set(StageTimings())
+
+
+def stop_stage_timing(token):
+    """Stop recording (restores the previous recorder)"""
+    _current.reset(token)
+
+
+def current_stage_timings() -> Optional[StageTimings]:
+    """Recorder of the current request (None when not recording)"""
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str):
+    """Add the duration of the block to stage `name` of the current request"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """
+    Parse a Server-Timing header
+
+    Args:
+        header: Header value, e.g. 'mindee;dur=812.4, openai;dur=2310.0, total;dur=3350.2'
+
+    Returns:
+        Stage name -> seconds
+    """
+    stages = {}
+    for entry in (header or '').split(','):
+        name, _, params = entry.strip().partition(';')
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if name and key == 'dur':
+                try:
+                    stages[name] = float(value) / 1000
+                except ValueError:
+                    pass
+    return stages
@@ -0,0 +1,144 @@
+"""
+Structured LLM Output
+Schema-constrained LLM calls validated strictly against a Pydantic model
+
+Chat models that support it are called through with_structured_output() (OpenAI
+function calling), so the reply is produced against the schema instead of being
+parsed out of free text. Chat models whose with_structured_output() is the base
+class stub raising NotImplementedError, as with the pinned langchain-openai 0.0.2
+ChatOpenAI, get the schema bound as an OpenAI function with a forced function_call,
+and the call's arguments are validated. Models without bind() are asked for JSON
+as before and the reply must validate as-is. There is no fence stripping, regex
+extraction or bracket scanning: a reply that does not validate is retried once
+with the validation error, and a second failure raises StructuredOutputError for
+the caller's fallback.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RETRIES = 1
+MAX_ERROR_CHARS = 500
+
+
+class StructuredOutputError(ValueError):
+    """The LLM reply did not validate against the schema after the retry"""
+
+
+def _schema_fingerprint(schema) -> str:
+    return json.dumps(schema.model_json_schema(), sort_keys=True)
+
+
+def _retry_message(error: Exception) -> tuple:
+    details = str(error)[:MAX_ERROR_CHARS]
+    return (
+        'human',
+        f"Your previous reply did not match the required schema: {details}\n"
+        f"Reply again with only a JSON object that matches the schema exactly."
+    )
+
+
+def _bind_schema(llm, schema):
+    """Structured-output runnable for the schema, or None when the model does not implement it"""
+    if not hasattr(llm, 'with_structured_output'):
+        return None
+    try:
+        return llm.with_structured_output(schema)
+    except NotImplementedError:
+        # langchain-core's BaseLanguageModel stub, not overridden by older chat model integrations
+        logger.debug(f"{type(llm).__name__} has no structured output support; validating plain JSON replies")
+        return None
+
+
+def function_spec(schema) -> Dict[str, Any]:
+    """OpenAI function definition whose parameters are the schema's JSON schema"""
+    parameters = schema.model_json_schema()
+    return {
+        'name': schema.__name__,
+        'description': (schema.__doc__ or '').strip() or f"Return a {schema.__name__}",
+        'parameters': parameters
+    }
+
+
+def _bind_function(llm, schema):
+    """Model forced to call the schema as an OpenAI function, or None when it cannot bind()"""
+    if not hasattr(llm, 'bind'):
+        return None
+    spec = function_spec(schema)
+    return llm.bind(functions=[spec], function_call={'name': spec['name']})
+
+
+def _reply_text(message) -> str:
+    """Arguments of the reply's function call, else its content"""
+    function_call = (getattr(message, 'additional_kwargs', None) or {}).get('function_call') or {}
+    if function_call.get('arguments'):
+        return function_call['arguments']
+    return message.content
+
+
+def _call_validated(llm, messages: List[Any], schema, max_retries: int):
+    """Call the model until the reply validates, at most 1 + max_retries times"""
+    structured = _bind_schema(llm, schema)
+    function_llm = _bind_function(llm, schema) if structured is None else None
+    attempt_messages = list(messages)
+    for attempt in range(max_retries + 1):
+        try:
+            if structured is not None:
+                result = structured.invoke(attempt_messages)
+                data = result if isinstance(result, dict) else result.model_dump()
+                return schema.model_validate(data)
+            content = _reply_text((function_llm or llm).invoke(attempt_messages))
+            return schema.model_validate_json(content.strip())
+        except ValueError as e:
+            # pydantic ValidationError and LangChain OutputParserException are ValueErrors
+            logger.warning(
+                f"{schema.__name__} reply failed validation (attempt {attempt + 1}/{max_retries + 1}): "
+                f"{str(e)[:MAX_ERROR_CHARS]}"
+            )
+            if attempt == max_retries:
+                raise StructuredOutputError(f"{schema.__name__} reply failed validation: {e}") from e
+            attempt_messages = list(messages) + [_retry_message(e)]
+
+
+def invoke_structured(
+    llm,
+    messages: List[Any],
+    schema,
+    cache=None,
+    model_name: Optional[str] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES
+):
+    """
+    Call the LLM for output matching a Pydantic schema
+
+    Args:
+        llm: LangChain chat model
+        messages: Prompt messages
+        schema: Pydantic (v2) model class the reply must validate against
+        cache: LLMResponseCache storing the validated reply (optional)
+        model_name: Model name for the cache key (default: llm.model_name)
+        max_retries: Extra calls after a reply that fails validation
+
+    Returns:
+        Validated schema instance
+
+    Raises:
+        StructuredOutputError: The reply still failed validation after the retries
+    """
+    call = lambda: _call_validated(llm, messages, schema, max_retries).model_dump_json(exclude_none=True)
+    if cache is None:
+        return schema.model_validate_json(call())
+
+    model_name = model_name or getattr(llm, 'model_name', None) or getattr(llm, 'model', '')
+    # The schema shapes the reply, so it is part of the key
+    key_messages = list(messages) + [('schema', _schema_fingerprint(schema))]
+    text = cache.get_or_call(key_messages, model_name, call)
+    try:
+        return schema.model_validate_json(text)
+    except ValueError:
+        logger.warning(f"Cached {schema.__name__} reply no longer validates; calling the LLM again")
+        cache.discard(key_messages, model_name)
+        return schema.model_validate_json(cache.get_or_call(key_messages, model_name, call))
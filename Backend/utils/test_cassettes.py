@@ -0,0 +1,173 @@
+"""
+Test Provider Cassettes
+Verifies record / replay keyed by input hash, simulated latency, replay misses
+and per-request stage timing of outbound calls.
+"""
+
+import sys
+import os
+import io
+import time
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import cassettes
+from utils.cassettes import CassetteStore, CassetteMissError, RECORD, REPLAY, AUTO
+from utils.resilience import ResilientClient, ProviderPolicy, configure_provider
+from utils.stage_timing import start_stage_timing, stop_stage_timing, current_stage_timings, stage, parse_server_timing
+
+try:
+    import langchain_core  # noqa: F401
+    LANGCHAIN_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_AVAILABLE = False
+
+
+class FakeChatModel:
+    """Chat model stub: plain and structured replies, counting calls"""
+
+    model_name = 'gpt-4'
+
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def invoke(self, messages):
+        self.calls += 1
+        time.sleep(self.delay)
+        return SimpleNamespace(content=f"reply {self.calls}")
+
+    def with_structured_output(self, schema):
+        model = self
+
+        class Runnable:
+            def invoke(self, messages):
+                model.calls += 1
+                time.sleep(model.delay)
+                return {'recommendation': 'APPROVE', 'call': model.calls}
+
+        return Runnable()
+
+
+class Decision:
+    pass
+
+
+class TestCassetteStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.store = CassetteStore(self.directory)
+        patcher = mock.patch.object(cassettes, '_store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        configure_provider('openai', ProviderPolicy(timeout=5.0, max_retries=0))
+        configure_provider('mindee', ProviderPolicy(timeout=5.0, max_retries=0))
+
+    def _mode(self, mode, latency='0'):
+        return mock.patch.dict(os.environ, {'PROVIDER_CASSETTE_MODE': mode, 'PROVIDER_CASSETTE_LATENCY': latency})
+
+    def test_structured_record_then_replay(self):
+        model = FakeChatModel()
+        client = ResilientClient(model, 'openai')
+        messages = [('system', 'You are a fraud analyst.'), ('human', 'Analyze check 1001')]
+        with self._mode(RECORD):
+            recorded = client.with_structured_output(Decision).invoke(messages)
+        with self._mode(REPLAY):
+            replayed = client.with_structured_output(Decision).invoke(messages)
+            with self.assertRaises(CassetteMissError):
+                client.with_structured_output(Decision).invoke([('human', 'Analyze check 1002')])
+        self.assertEqual(recorded, replayed)
+        self.assertEqual(model.calls, 1)
+        self.assertEqual(self.store.stats()['hits'], 1)
+
+    def test_keys_separate_model_schema_and_prompt(self):
+        key = lambda call_name, model, messages, context=None: self.store.key(
+            call_name, {**cassettes._llm_key(SimpleNamespace(model_name=model), (messages,), {}),
+                        **({'context': context} if context else {})}
+        )
+        base = key('openai.invoke', 'gpt-4', [('human', 'a')])
+        self.assertEqual(base, key('openai.invoke', 'gpt-4', [('human', 'a\r\n')]))
+        self.assertNotEqual(base, key('openai.invoke', 'o4-mini', [('human', 'a')]))
+        self.assertNotEqual(base, key('openai.invoke', 'gpt-4', [('human', 'b')]))
+        self.assertNotEqual(base, key('openai.structured.invoke', 'gpt-4', [('human', 'a')], 'Decision'))
+
+    def test_mindee_key_hashes_document(self):
+        params = SimpleNamespace(model_id='check-model', raw_text=True)
+        first = cassettes._mindee_key(None, (SimpleNamespace(file_object=io.BytesIO(b'%PDF-1')), params), {})
+        same = cassettes._mindee_key(None, (SimpleNamespace(file_object=io.BytesIO(b'%PDF-1')), params), {})
+        other = cassettes._mindee_key(None, (SimpleNamespace(file_object=io.BytesIO(b'%PDF-2')), params), {})
+        self.assertEqual(first, same)
+        self.assertNotEqual(first['document_sha256'], other['document_sha256'])
+        self.assertEqual(first['params']['model_id'], 'check-model')
+
+    def test_recorded_latency_is_simulated(self):
+        model = FakeChatModel(delay=0.2)
+        client = ResilientClient(model, 'openai')
+        messages = [('human', 'Analyze paystub')]
+        with self._mode(AUTO):
+            client.with_structured_output(Decision).invoke(messages)
+        with self._mode(REPLAY, latency='recorded'):
+            started = time.perf_counter()
+            client.with_structured_output(Decision).invoke(messages)
+            self.assertGreaterEqual(time.perf_counter() - started, 0.2)
+        with self._mode(REPLAY, latency='0'):
+            started = time.perf_counter()
+            client.with_structured_output(Decision).invoke(messages)
+            self.assertLess(time.perf_counter() - started, 0.1)
+        self.assertEqual(model.calls, 1)
+
+    @unittest.skipUnless(LANGCHAIN_AVAILABLE, "langchain not installed")
+    def test_plain_invoke_replay(self):
+        model = FakeChatModel()
+        client = ResilientClient(model, 'openai')
+        with self._mode(RECORD):
+            client.invoke([('human', 'Explain the plot')])
+        with self._mode(REPLAY):
+            self.assertEqual(client.invoke([('human', 'Explain the plot')]).content, 'reply 1')
+
+    def test_off_calls_provider(self):
+        model = FakeChatModel()
+        client = ResilientClient(model, 'openai')
+        with self._mode('off'):
+            client.invoke([('human', 'x')])
+            client.invoke([('human', 'x')])
+        self.assertEqual(model.calls, 2)
+        self.assertFalse(os.listdir(self.directory))
+
+
+class TestStageTiming(unittest.TestCase):
+
+    def test_outbound_calls_are_timed(self):
+        configure_provider('openai', ProviderPolicy(timeout=5.0, max_retries=0))
+        client = ResilientClient(FakeChatModel(delay=0.05), 'openai')
+        token = start_stage_timing()
+        try:
+            with mock.patch.dict(os.environ, {'PROVIDER_CASSETTE_MODE': 'off'}):
+                client.invoke([('human', 'x')])
+            with stage('ml'):
+                time.sleep(0.01)
+            header = current_stage_timings().server_timing()
+        finally:
+            stop_stage_timing(token)
+
+        stages = parse_server_timing(header)
+        self.assertGreaterEqual(stages['openai'], 0.05)
+        self.assertGreaterEqual(stages['ml'], 0.01)
+        self.assertGreaterEqual(stages['total'], stages['openai'] + stages['ml'])
+
+    def test_not_recording_outside_requests(self):
+        with stage('openai'):
+            pass
+        self.assertEqual(parse_server_timing(None), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
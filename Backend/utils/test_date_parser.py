@@ -0,0 +1,71 @@
+"""
+Test Date Parser
+Verifies memoized parsing, vectorized column parsing (same result as per value) and month-name dates.
+"""
+
+import sys
+import os
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.date_parser import (
+    _parse_with_formats, clear_date_cache, parse_date, parse_date_array, parse_month_name_date
+)
+
+FORMATS = ('%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d', '%b %d, %Y')
+
+
+class TestDateParser(unittest.TestCase):
+
+    def setUp(self):
+        clear_date_cache()
+
+    def test_parse_date_memoized(self):
+        self.assertEqual(parse_date(' 10/15/2024 ', FORMATS), datetime(2024, 10, 15))
+        self.assertEqual(parse_date('10/15/2024', FORMATS), datetime(2024, 10, 15))
+        self.assertEqual(_parse_with_formats.cache_info().hits, 1)
+        self.assertIsNone(parse_date('garbage', FORMATS))
+        self.assertIsNone(parse_date(None, FORMATS))
+        self.assertIsNone(parse_date('   ', FORMATS))
+
+    def test_column_parsed_per_value(self):
+        # A day-first value does not make the ambiguous ones day-first
+        values = ['01/02/2024', '25/01/2024', '26/01/2024', '01/02/2024']
+        result = parse_date_array(values, FORMATS)
+        self.assertEqual([str(value) for value in result], ['2024-01-02', '2024-01-25', '2024-01-26', '2024-01-02'])
+        self.assertEqual([str(value) for value in result],
+                         [parse_date(value, FORMATS).date().isoformat() for value in values])
+
+    def test_vectorized_column_matches_parse_date(self):
+        formats = ('%Y-%m-%d', '%m-%d-%Y', '%m/%d/%Y', '%m/%d/%y', '%d/%m/%Y', '%B %d, %Y', '%b %d, %Y')
+        values = ['03/04/2024', '13/04/2024', '3/4/2024', '04/03/24', '31/12/2024', '12-31-2024',
+                  '2024-2-3', 'March 4, 2024', 'Mar 4, 2024', '2300-01-02', '1500-12-31', '02/30/2024',
+                  '2024-01-02T00:00:00', ' 03/04/2024 ', None, '', 'n/a'] * 3
+        result = parse_date_array(values, formats)
+        expected = [parse_date(value, formats) for value in values]
+        self.assertEqual([str(value) for value in result],
+                         [value.date().isoformat() if value else 'NaT' for value in expected])
+
+    def test_parse_date_array(self):
+        values = ['2024-01-02', None, '', '2024-1-5', 'Jan 7, 2024', 'bad', '1500-03-04']
+        result = parse_date_array(values, FORMATS)
+        self.assertEqual(result.dtype, np.dtype('datetime64[D]'))
+        expected = ['2024-01-02', 'NaT', 'NaT', '2024-01-05', '2024-01-07', 'NaT', '1500-03-04']
+        self.assertEqual([str(value) for value in result], expected)
+        self.assertEqual(len(parse_date_array([], FORMATS)), 0)
+
+    def test_month_name_date(self):
+        self.assertEqual(parse_month_name_date('January 5, 2024'), ('01', '05', '2024'))
+        self.assertEqual(parse_month_name_date('DATE: june 12 2023'), ('06', '12', '2023'))
+        self.assertEqual(parse_month_name_date('Sep 30, 2021'), ('09', '30', '2021'))
+        self.assertIsNone(parse_month_name_date('10/15/2024'))
+        self.assertIsNone(parse_month_name_date(''))
+
+
+if __name__ == '__main__':
+    unittest.main()
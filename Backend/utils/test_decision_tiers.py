@@ -0,0 +1,98 @@
+"""
+Test Decision Tiers
+Verifies tier boundaries, the deterministic decision schema and skip-rate reporting.
+"""
+
+import sys
+import os
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.decision_tiers import (
+    DecisionTierEngine, get_decision_tier_stats, reset_decision_tier_stats,
+    LOW_RISK, HIGH_RISK, AMBIGUOUS
+)
+
+SCHEMA_KEYS = {
+    'recommendation', 'confidence_score', 'summary', 'reasoning', 'key_indicators',
+    'actionable_recommendations', 'fraud_types', 'fraud_explanations'
+}
+
+
+class TestDecisionTierEngine(unittest.TestCase):
+
+    def setUp(self):
+        reset_decision_tier_stats()
+        self.engine = DecisionTierEngine('check', low_risk_max=0.05, high_risk_min=0.90, enabled=True)
+
+    def test_classify(self):
+        self.assertEqual(self.engine.classify(0.02), LOW_RISK)
+        self.assertEqual(self.engine.classify(0.05), LOW_RISK)
+        self.assertEqual(self.engine.classify(0.50), AMBIGUOUS)
+        self.assertEqual(self.engine.classify(0.90), HIGH_RISK)
+        # Low scores with fraud history or duplicates still need the LLM
+        self.assertEqual(self.engine.classify(0.02, fraud_count=1), AMBIGUOUS)
+        self.assertEqual(self.engine.classify(0.02, is_duplicate=True), AMBIGUOUS)
+
+    def test_disabled_sends_everything_to_llm(self):
+        engine = DecisionTierEngine('check', enabled=False)
+        self.assertEqual(engine.classify(0.0), AMBIGUOUS)
+        self.assertIsNone(engine.decide('Jane Doe', {'fraud_risk_score': 0.99}))
+
+    def test_invalid_thresholds(self):
+        with self.assertRaises(ValueError):
+            DecisionTierEngine('check', low_risk_max=0.5, high_risk_min=0.4)
+
+    def test_decisions_use_agent_schema(self):
+        approval = self.engine.decide('Jane Doe', {'fraud_risk_score': 0.01}, {'escalate_count': 1})
+        self.assertEqual(approval['recommendation'], 'APPROVE')
+        self.assertTrue(SCHEMA_KEYS <= set(approval))
+
+        rejection = self.engine.decide(
+            'Jane Doe',
+            {'fraud_risk_score': 0.95, 'fraud_types': ['FABRICATED_DOCUMENT'], 'fraud_reasons': ['Balance mismatch']},
+            {'escalate_count': 1}
+        )
+        self.assertEqual(rejection['recommendation'], 'REJECT')
+        # Fraud types are left to the LLM; ML reasons are reported as indicators
+        self.assertEqual((rejection['fraud_types'], rejection['fraud_explanations']), ([], []))
+        self.assertIn('Balance mismatch', rejection['key_indicators'])
+        self.assertTrue(SCHEMA_KEYS <= set(rejection))
+
+        escalation = self.engine.decide('Jane Doe', {'fraud_risk_score': 0.95}, allow_reject=False)
+        self.assertEqual(escalation['recommendation'], 'ESCALATE')
+        self.assertEqual(escalation['fraud_types'], [])
+
+    def test_decisions_run_through_agent_validation(self):
+        seen = []
+
+        def validate(result):
+            seen.append(result)
+            return {'recommendation': result['recommendation'], 'ml_fraud_score': 0.95}
+
+        decision = self.engine.decide('Jane Doe', {'fraud_risk_score': 0.95}, validate=validate)
+        self.assertEqual(seen[0]['decision_tier'], HIGH_RISK)
+        self.assertEqual(decision, {'recommendation': 'REJECT', 'ml_fraud_score': 0.95, 'decision_tier': HIGH_RISK})
+        self.assertIsNone(self.engine.decide('Jane Doe', {'fraud_risk_score': 0.5}, validate=validate))
+        self.assertEqual(len(seen), 1)
+
+    def test_skip_rate(self):
+        for score in (0.01, 0.5, 0.95):
+            self.engine.record_document()
+            self.engine.decide('Jane Doe', {'fraud_risk_score': score})
+        # Decided by the agent's policy rules before reaching the engine
+        self.engine.record_document()
+
+        stats = get_decision_tier_stats()
+        check = stats['document_types']['check']
+        self.assertEqual(check['documents'], 4)
+        self.assertEqual(check['llm_calls'], 1)
+        self.assertEqual((check[LOW_RISK], check[HIGH_RISK], check['policy']), (1, 1, 1))
+        self.assertEqual(check['skip_rate'], 0.75)
+        self.assertEqual(stats['skip_rate'], 0.75)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Test LLM Response Cache
+Verifies hits on identical prompts, key separation by model and prompt version,
+and hit-rate reporting.
+"""
+
+import sys
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache import CacheManager
+from utils.llm_cache import LLMResponseCache, get_llm_cache_stats, reset_llm_cache_stats, prompt_version
+
+
+class FakeLLM:
+    """Chat model stub that counts calls"""
+
+    def __init__(self, reply='{"recommendation": "APPROVE"}'):
+        self.reply = reply
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return SimpleNamespace(content=self.reply)
+
+
+def _messages(text):
+    return [SimpleNamespace(type='system', content='You are a fraud analyst.'),
+            SimpleNamespace(type='human', content=text)]
+
+
+class TestLLMResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        reset_llm_cache_stats()
+        self.backend = CacheManager.__new__(CacheManager)
+        self.backend.default_ttl = 60
+        self.backend.redis_client = None
+        self.backend.use_redis = False
+        self.prompt_file = tempfile.NamedTemporaryFile('w', suffix='.py', delete=False)
+        self.prompt_file.write('SYSTEM_PROMPT = "v1"\n')
+        self.prompt_file.close()
+        self.addCleanup(os.unlink, self.prompt_file.name)
+        self.cache = LLMResponseCache('test', prompt_modules=[self.prompt_file.name], cache=self.backend)
+        self.addCleanup(self.cache.clear)
+
+    def test_identical_prompt_is_served_from_cache(self):
+        llm = FakeLLM()
+        first = self.cache.invoke(llm, _messages('Analyze check 1001'), 'gpt-4')
+        # Line endings and surrounding whitespace do not change the key
+        second = self.cache.invoke(llm, _messages('Analyze check 1001\r\n'), 'gpt-4')
+        self.assertEqual(first, second)
+        self.assertEqual(llm.calls, 1)
+
+        stats = get_llm_cache_stats()['namespaces']['test']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_model_and_input_are_part_of_key(self):
+        llm = FakeLLM()
+        self.cache.invoke(llm, _messages('Analyze check 1001'), 'gpt-4')
+        self.cache.invoke(llm, _messages('Analyze check 1001'), 'o4-mini')
+        self.cache.invoke(llm, _messages('Analyze check 1002'), 'gpt-4')
+        self.assertEqual(llm.calls, 3)
+
+    def test_prompt_change_invalidates(self):
+        before = prompt_version([self.prompt_file.name])
+        with open(self.prompt_file.name, 'w') as f:
+            f.write('SYSTEM_PROMPT = "v2"\n')
+        self.assertNotEqual(prompt_version([self.prompt_file.name]), before)
+
+        llm = FakeLLM()
+        self.cache.invoke(llm, _messages('Analyze check 1001'), 'gpt-4')
+        edited = LLMResponseCache('test', prompt_modules=[self.prompt_file.name], cache=self.backend)
+        edited.invoke(llm, _messages('Analyze check 1001'), 'gpt-4')
+        self.assertEqual(llm.calls, 2)
+
+    def test_discard_and_empty_responses_not_cached(self):
+        llm = FakeLLM(reply='   ')
+        self.cache.invoke(llm, _messages('Analyze check 1001'), 'gpt-4')
+        self.cache.invoke(llm, _messages('Analyze check 1001'), 'gpt-4')
+        self.assertEqual(llm.calls, 2)
+
+        llm = FakeLLM(reply='not json')
+        self.cache.invoke(llm, _messages('Analyze check 1003'), 'gpt-4')
+        self.cache.discard(_messages('Analyze check 1003'), 'gpt-4')
+        self.cache.invoke(llm, _messages('Analyze check 1003'), 'gpt-4')
+        self.assertEqual(llm.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
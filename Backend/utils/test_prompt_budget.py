@@ -0,0 +1,91 @@
+"""
+Test Prompt Token Budget
+Verifies list compaction, budget-driven detail levels, truncation and bank statement
+transaction compaction.
+"""
+
+import sys
+import os
+import unittest
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.prompt_budget import (
+    compact_items, count_tokens, fit_prompt, prompt_token_budget,
+    get_prompt_token_stats, reset_prompt_token_stats, TRUNCATION_MARKER
+)
+from bank_statement.ai import bank_statement_prompts
+
+
+def _statement(transaction_count):
+    return {
+        'bank_name': 'Example Bank',
+        'account_holder_name': 'Jane Doe',
+        'statement_period_start_date': '2024-01-01',
+        'statement_period_end_date': '2024-01-31',
+        'beginning_balance': 1000.0,
+        'ending_balance': 1000.0,
+        'transactions': [
+            {'date': '2024-01-15', 'type': 'debit' if i % 2 else 'credit',
+             'amount': 25.0, 'description': f'Card purchase at merchant number {i}'}
+            for i in range(transaction_count)
+        ]
+    }
+
+
+class TestPromptBudget(unittest.TestCase):
+
+    def setUp(self):
+        reset_prompt_token_stats()
+
+    def test_compact_items(self):
+        self.assertEqual(compact_items(['a', 'b'], None), ['a', 'b'])
+        self.assertEqual(compact_items(['a', 'b'], 5), ['a', 'b'])
+        self.assertEqual(compact_items(['a', 'b', 'c'], 1, 'factors'), ['a', '... and 2 more factors'])
+        self.assertEqual(
+            compact_items([1, 2, 3], 1, 'values', lambda rest: f'sum {sum(rest)}'),
+            [1, '... and 2 more values (sum 5)']
+        )
+
+    def test_budget_by_model(self):
+        self.assertEqual(prompt_token_budget('gpt-4'), 6000)
+        self.assertEqual(prompt_token_budget('gpt-4o-mini'), 24000)
+        self.assertEqual(prompt_token_budget('o4-mini'), 24000)
+        with mock.patch.dict(os.environ, {'PROMPT_TOKEN_BUDGET': '1234'}):
+            self.assertEqual(prompt_token_budget('gpt-4'), 1234)
+
+    def test_first_fitting_level_is_used(self):
+        render = lambda size=1000: 'x' * size
+        text, info = fit_prompt('test', 'gpt-4', 'prefix', render, [{}, {'size': 400}, {'size': 40}], budget=150)
+        self.assertEqual(info['level'], 1)
+        self.assertEqual(text, 'x' * 400)
+        self.assertFalse(info['truncated'])
+        self.assertLessEqual(info['total_tokens'], 150)
+        self.assertEqual(get_prompt_token_stats()['test']['compacted'], 1)
+
+    def test_truncates_when_no_level_fits(self):
+        text, info = fit_prompt('test', 'gpt-4', 'prefix', lambda: 'word ' * 2000, budget=100)
+        self.assertTrue(info['truncated'])
+        self.assertTrue(text.endswith(TRUNCATION_MARKER))
+        self.assertLessEqual(info['total_tokens'], 100)
+
+    def test_bank_statement_transactions_compacted(self):
+        statement = _statement(300)
+        ml_analysis = {'fraud_risk_score': 0.4, 'anomalies': [f'anomaly {i}' for i in range(40)]}
+        render = lambda **limits: bank_statement_prompts.format_analysis_template(statement, ml_analysis, {}, **limits)
+
+        full = render()
+        self.assertIn('... and 290 more transactions (credits $3,625.00, debits $3,625.00)', full)
+
+        prefix = bank_statement_prompts.INSTRUCTION_PREFIX
+        budget = count_tokens(prefix) + count_tokens(full) - 1
+        text, info = fit_prompt('bank_statement', 'gpt-4', prefix, render,
+                                bank_statement_prompts.COMPACTION_LEVELS, budget=budget)
+        self.assertGreater(info['level'], 0)
+        self.assertIn('... and 295 more transactions', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+"""
+Test Outbound Call Resilience
+Runs the resilience layer against a local fake HTTP server: deadlines, retries,
+circuit breaking, concurrency limits and hedging.
+"""
+
+import sys
+import os
+import time
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.resilience import (
+    OutboundProvider, ProviderPolicy, ResilientClient, CircuitBreaker,
+    CircuitOpenError, CallTimeoutError, ProviderBusyError, configure_provider, get_resilience_stats,
+    CLOSED, OPEN, HALF_OPEN
+)
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    """/ok replies at once, /slow/<seconds> after a delay, /fail/<status> with an error,
+    /flaky fails the first request of each test"""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits += 1
+            hit = server.hits
+        parts = self.path.strip('/').split('/')
+        if parts[0] == 'slow':
+            time.sleep(float(parts[1]))
+        if parts[0] == 'fail' or (parts[0] == 'flaky' and hit == 1):
+            status = int(parts[1]) if len(parts) > 1 else 503
+            self.send_response(status)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HTTPStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _policy(**overrides):
+    settings = dict(timeout=2.0, max_retries=0, backoff_base=0.01, backoff_max=0.02,
+                    concurrency=4, failure_threshold=3, reset_timeout=60.0)
+    settings.update(overrides)
+    return ProviderPolicy(**settings)
+
+
+class TestResilienceAgainstFakeServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeProviderHandler)
+        cls.server.daemon_threads = True
+        cls.server.lock = threading.Lock()
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.hits = 0
+
+    def fetch(self, path):
+        try:
+            with urllib.request.urlopen(self.base_url + path, timeout=10) as response:
+                return response.read().decode()
+        except urllib.error.HTTPError as e:
+            raise HTTPStatusError(e.code)
+
+    def test_deadline_frees_caller(self):
+        provider = OutboundProvider('fake', _policy(timeout=0.3))
+        started = time.monotonic()
+        with self.assertRaises(CallTimeoutError):
+            provider.call(self.fetch, '/slow/1.5')
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(provider.stats()['timeouts'], 1)
+
+    def test_transient_failure_retried(self):
+        provider = OutboundProvider('fake', _policy(max_retries=2))
+        self.assertEqual(provider.call(self.fetch, '/flaky'), 'ok')
+        self.assertEqual(self.server.hits, 2)
+        stats = provider.stats()
+        self.assertEqual((stats['retries'], stats['successes']), (1, 1))
+        self.assertEqual(stats['latency']['count'], 2)
+
+    def test_client_error_not_retried(self):
+        provider = OutboundProvider('fake', _policy(max_retries=2))
+        with self.assertRaises(HTTPStatusError):
+            provider.call(self.fetch, '/fail/400')
+        self.assertEqual(self.server.hits, 1)
+        self.assertEqual(provider.breaker.state, CLOSED)
+
+    def test_circuit_opens_and_fails_fast(self):
+        provider = OutboundProvider('fake', _policy(failure_threshold=3))
+        for _ in range(3):
+            with self.assertRaises(HTTPStatusError):
+                provider.call(self.fetch, '/fail/503')
+        self.assertEqual(provider.breaker.state, OPEN)
+
+        started = time.monotonic()
+        with self.assertRaises(CircuitOpenError):
+            provider.call(self.fetch, '/ok')
+        self.assertLess(time.monotonic() - started, 0.1)
+        # The open circuit sent no request
+        self.assertEqual(self.server.hits, 3)
+        self.assertEqual(provider.stats()['short_circuited'], 1)
+
+    def test_concurrency_limit(self):
+        provider = OutboundProvider('fake', _policy(timeout=0.5, concurrency=1))
+        worker = threading.Thread(target=lambda: self.assertRaises(Exception, provider.call, self.fetch, '/slow/0.8'))
+        worker.start()
+        time.sleep(0.1)
+        with self.assertRaises(ProviderBusyError):
+            provider.call(self.fetch, '/ok')
+        worker.join()
+        self.assertEqual(provider.stats()['rejected_busy'], 1)
+
+    def test_hedged_request(self):
+        calls = []
+
+        def first_slow():
+            calls.append(time.monotonic())
+            return self.fetch('/slow/1.0' if len(calls) == 1 else '/ok')
+
+        provider = OutboundProvider('fake', _policy(hedge_after=0.1))
+        started = time.monotonic()
+        self.assertEqual(provider.call(first_slow), 'ok')
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertEqual(provider.stats()['hedges'], 1)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_half_open_trial(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        now[0] = 10.0
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        # Only one trial call at a time
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+
+        now[0] = 20.0
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+
+
+class TestResilientClient(unittest.TestCase):
+
+    def test_wraps_outbound_methods(self):
+        class Model:
+            model_name = 'gpt-4'
+
+            def invoke(self, messages):
+                return f"reply to {messages}"
+
+            def with_structured_output(self, schema):
+                return Model()
+
+            def bind(self, **kwargs):
+                return Model()
+
+        configure_provider('fake_client', _policy())
+        client = ResilientClient(Model(), 'fake_client')
+        self.assertEqual(client.model_name, 'gpt-4')
+        self.assertEqual(client.invoke('hi'), 'reply to hi')
+        self.assertEqual(client.with_structured_output(dict).invoke('hi'), 'reply to hi')
+        self.assertEqual(client.bind(functions=[]).invoke('hi'), 'reply to hi')
+        self.assertEqual(get_resilience_stats()['fake_client']['successes'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Test Structured Output
+Verifies strict validation, the single bounded retry and caching of validated replies.
+"""
+
+import sys
+import os
+import json
+import unittest
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache import CacheManager
+from utils.llm_cache import LLMResponseCache
+from utils.structured_output import invoke_structured, StructuredOutputError
+
+try:
+    import pydantic  # noqa: F401
+    PYDANTIC_AVAILABLE = True
+except ImportError:
+    PYDANTIC_AVAILABLE = False
+
+try:
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+    LANGCHAIN_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_AVAILABLE = False
+
+
+class Decision:
+    """Minimal schema with the pydantic v2 methods invoke_structured relies on"""
+
+    def __init__(self, recommendation):
+        self.recommendation = recommendation
+
+    @classmethod
+    def model_validate(cls, data):
+        if not isinstance(data, dict) or set(data) != {'recommendation'}:
+            raise ValueError(f"unexpected fields: {data}")
+        if data['recommendation'] not in ('APPROVE', 'REJECT', 'ESCALATE'):
+            raise ValueError(f"invalid recommendation: {data['recommendation']}")
+        return cls(data['recommendation'])
+
+    @classmethod
+    def model_validate_json(cls, text):
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(str(e)) from e
+        return cls.model_validate(data)
+
+    @classmethod
+    def model_json_schema(cls):
+        return {'title': 'Decision', 'required': ['recommendation']}
+
+    def model_dump_json(self, exclude_none=False):
+        return json.dumps({'recommendation': self.recommendation})
+
+
+class FakeLLM:
+    """Chat model without with_structured_output, returning the given replies in order"""
+
+    model_name = 'gpt-4'
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append(list(messages))
+        return SimpleNamespace(content=self.replies.pop(0))
+
+
+class FakeStructuredLLM(FakeLLM):
+    """Chat model with with_structured_output, returning dicts"""
+
+    def with_structured_output(self, schema):
+        return SimpleNamespace(invoke=lambda messages: self.invoke(messages).content)
+
+
+class FakeUnsupportedStructuredLLM(FakeLLM):
+    """Chat model inheriting the base class with_structured_output stub"""
+
+    def with_structured_output(self, schema):
+        raise NotImplementedError()
+
+
+class FakeFunctionLLM(FakeUnsupportedStructuredLLM):
+    """Chat model without structured output that supports OpenAI function calling via bind()"""
+
+    def __init__(self, replies):
+        super().__init__(replies)
+        self.bound = []
+
+    def bind(self, **kwargs):
+        self.bound.append(kwargs)
+
+        def invoke(messages):
+            self.calls.append(list(messages))
+            arguments = self.replies.pop(0)
+            return SimpleNamespace(content='', additional_kwargs={'function_call': {'name': 'Decision', 'arguments': arguments}})
+        return SimpleNamespace(invoke=invoke)
+
+
+class TestInvokeStructured(unittest.TestCase):
+
+    def setUp(self):
+        backend = CacheManager.__new__(CacheManager)
+        backend.default_ttl = 60
+        backend.redis_client = None
+        backend.use_redis = False
+        self.cache = LLMResponseCache('structured_test', cache=backend)
+        self.addCleanup(self.cache.clear)
+
+    def test_valid_reply(self):
+        llm = FakeLLM(['{"recommendation": "APPROVE"}'])
+        result = invoke_structured(llm, [('human', 'decide')], Decision)
+        self.assertEqual(result.recommendation, 'APPROVE')
+        self.assertEqual(len(llm.calls), 1)
+
+    def test_invalid_reply_is_retried_once(self):
+        llm = FakeLLM(['```json\n{"recommendation": "APPROVE"}\n```', '{"recommendation": "REJECT"}'])
+        result = invoke_structured(llm, [('human', 'decide')], Decision)
+        self.assertEqual(result.recommendation, 'REJECT')
+        self.assertEqual(len(llm.calls), 2)
+        # The retry carries the validation error
+        self.assertIn('did not match the required schema', llm.calls[1][-1][1])
+
+    def test_second_failure_raises(self):
+        llm = FakeLLM(['not json', '{"recommendation": "MAYBE"}'])
+        with self.assertRaises(StructuredOutputError):
+            invoke_structured(llm, [('human', 'decide')], Decision)
+        self.assertEqual(len(llm.calls), 2)
+
+    def test_with_structured_output(self):
+        llm = FakeStructuredLLM([{'recommendation': 'ESCALATE'}])
+        result = invoke_structured(llm, [('human', 'decide')], Decision)
+        self.assertEqual(result.recommendation, 'ESCALATE')
+
+    def test_structured_output_not_implemented(self):
+        llm = FakeUnsupportedStructuredLLM(['not json', '{"recommendation": "REJECT"}'])
+        result = invoke_structured(llm, [('human', 'decide')], Decision)
+        self.assertEqual(result.recommendation, 'REJECT')
+        self.assertEqual(len(llm.calls), 2)
+
+    def test_function_call_when_structured_output_not_implemented(self):
+        llm = FakeFunctionLLM(['{"recommendation": "REJECT"}'])
+        result = invoke_structured(llm, [('human', 'decide')], Decision)
+        self.assertEqual(result.recommendation, 'REJECT')
+        self.assertEqual(len(llm.calls), 1)
+        # The schema is bound as a function the model is forced to call
+        functions = llm.bound[0]['functions']
+        self.assertEqual(functions[0]['name'], 'Decision')
+        self.assertEqual(functions[0]['parameters'], Decision.model_json_schema())
+        self.assertEqual(llm.bound[0]['function_call'], {'name': 'Decision'})
+
+    @unittest.skipUnless(LANGCHAIN_AVAILABLE, "langchain not installed")
+    def test_base_chat_model_without_override(self):
+        class PlainChatModel(BaseChatModel):
+            """Chat model that does not override with_structured_output"""
+
+            @property
+            def _llm_type(self):
+                return 'plain'
+
+            def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+                message = AIMessage(content='{"recommendation": "ESCALATE"}')
+                return ChatResult(generations=[ChatGeneration(message=message)])
+
+        result = invoke_structured(PlainChatModel(), [('human', 'decide')], Decision)
+        self.assertEqual(result.recommendation, 'ESCALATE')
+
+    def test_validated_reply_is_cached(self):
+        llm = FakeLLM(['{"recommendation": "APPROVE"}'])
+        first = invoke_structured(llm, [('human', 'decide')], Decision, cache=self.cache)
+        second = invoke_structured(llm, [('human', 'decide')], Decision, cache=self.cache)
+        self.assertEqual((first.recommendation, second.recommendation), ('APPROVE', 'APPROVE'))
+        self.assertEqual(len(llm.calls), 1)
+
+    def test_failed_reply_is_not_cached(self):
+        llm = FakeLLM(['bad', 'still bad', '{"recommendation": "APPROVE"}'])
+        with self.assertRaises(StructuredOutputError):
+            invoke_structured(llm, [('human', 'decide')], Decision, cache=self.cache)
+        result = invoke_structured(llm, [('human', 'decide')], Decision, cache=self.cache)
+        self.assertEqual(result.recommendation, 'APPROVE')
+
+
+@unittest.skipUnless(PYDANTIC_AVAILABLE, "pydantic not installed")
+class TestLLMSchemas(unittest.TestCase):
+
+    def test_document_decision(self):
+        from utils.llm_schemas import DocumentDecision
+        decision = DocumentDecision.model_validate_json(json.dumps({
+            'recommendation': 'REJECT',
+            'confidence_score': 0.9,
+            'summary': 'Forged signature',
+            'fraud_types': ['SIGNATURE_FORGERY'],
+            'fraud_explanations': [{'type': 'SIGNATURE_FORGERY', 'explanation': 'Mismatch'}]
+        }))
+        self.assertEqual(decision.model_dump(exclude_none=True)['fraud_explanations'][0],
+                         {'type': 'SIGNATURE_FORGERY', 'explanation': 'Mismatch'})
+
+        for bad in ({'recommendation': 'MAYBE'}, {'confidence_score': 'ninety'}, {'extra': 1}):
+            data = {'recommendation': 'APPROVE', 'confidence_score': 0.9, 'summary': 'ok', **bad}
+            with self.assertRaises(ValueError):
+                DocumentDecision.model_validate_json(json.dumps(data))
+
+
+if __name__ == '__main__':
+    unittest.main()